@@ -1,3 +1,4 @@
+import os
 import time
 
 import asyncio
@@ -31,13 +32,23 @@ from src.agents.orchestration_agent import (
     personal_assistant_system_prompt,
     OrchestrationAgentCard,
 )
+from src.agents.orchestration_agent.briefing import BriefingService
 from src.agents.common.tool_client import A2AToolClient
 from src.agents.common.agent import run_agent_in_background
 from src.agents.common.server import create_agent_a2a_server
+from src.agents.common.model import rate_limited
+from src.agents.common.speculation import Speculator
+from src.core.rate_limit import Priority
+from src.mcp_handler import mcp_gcal, mcp_gmail, mcp_todoist
+from src.mcp_handler.provision import server_cache
 from a2a.server.apps import A2AStarletteApplication
 from pydantic_ai import Agent
 
 a2a_client = A2AToolClient()
+# Optional speculative prefetch of sub-agent calls (ORCHESTRATOR_SPECULATION=1)
+speculator = Speculator.from_env(a2a_client)
+# Optional precomputed daily briefing (DAILY_BRIEFING=1)
+briefing = BriefingService.from_env(a2a_client)
 
 
 def create_gmail_agent_server(host="localhost", port=10020) -> A2AStarletteApplication:
@@ -87,10 +98,11 @@ def create_calendar_agent_server(
 
 
 orchestration_agent = Agent(
-    model="google-gla:gemini-2.5-pro",
+    model=rate_limited("google-gla:gemini-2.5-pro", Priority.INTERACTIVE),
     name="personal_assistant_agent",
-    tools=[a2a_client.list_remote_agents, a2a_client.create_task],
-    system_prompt=personal_assistant_system_prompt(),
+    tools=[a2a_client.list_remote_agents, a2a_client.create_task]
+    + ([briefing.get_daily_briefing] if briefing else []),
+    system_prompt=personal_assistant_system_prompt(speculation=speculator is not None),
 )
 
 
@@ -107,6 +119,8 @@ def create_orchestration_agent_server(
         port=port,
         status_message="Searching for Calendar events...",
         artifact_name="response",
+        default_priority=Priority.INTERACTIVE,
+        speculator=speculator,
     )
 
 
@@ -133,6 +147,12 @@ agents: list[Dict[str, Callable[[str, int], A2AStarletteApplication]]] = [
     },
 ]
 
+# Install and pin any MCP server missing from mcp_servers.lock.json; the
+# servers pick up the install the next time they start.
+if os.getenv("MCP_AUTO_PROVISION", "1") != "0":
+    for server in server_cache.provision_missing():
+        print(f"Pinned {server.package}@{server.version} in {server_cache.lock_path}")
+
 # Start agent servers with corrected function calls
 print("Starting agent servers...\n")
 
@@ -166,12 +186,25 @@ for k, v in remote_agents.items():
     print(f"Remote agent version: {v['version']}")
     print("----\n")
 
+if briefing is not None:
+    briefing.run_in_background()
+
 
 async def main():
     trending_topics = await a2a_client.create_task(
         "http://localhost:10024", "has arda@getdelve.com sent me an email today?"
     )
     print(trending_topics)
+    if speculator is not None:
+        print(f"Speculation stats: {speculator.stats()}")
+    if briefing is not None:
+        print(f"Briefing stats: {briefing.stats()}")
+    for name, module in (
+        ("Gmail", mcp_gmail),
+        ("Calendar", mcp_gcal),
+        ("Todoist", mcp_todoist),
+    ):
+        print(f"{name} compaction stats: {module.compactor.stats()}")
 
 
 asyncio.run(main())
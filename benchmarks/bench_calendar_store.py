@@ -0,0 +1,108 @@
+"""
+Local calendar store vs the API, against the Calendar stand-in.
+
+Runs a full sync, an incremental sync after a create/cancel made through the
+stand-in (as the MCP server would), a forced 410 resync, and then times range
+queries answered from the store.
+
+    python -m benchmarks.bench_calendar_store [events_per_calendar] [calendars]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+
+from benchmarks.calendar_standin import BASE_URL, CalendarStandIn
+from src.agents.calendar_agent.store import CalendarStore
+from src.agents.common.google_api import GoogleApiClient, GoogleAuth
+
+
+async def main(n_events: int, n_calendars: int) -> None:
+    origin = datetime(2025, 1, 1, tzinfo=UTC)
+    standin = CalendarStandIn(latency=0.05)
+    for c in range(n_calendars):
+        calendar_id = f"calendar{c}@example.com"
+        standin.add_calendar(
+            calendar_id, "Europe/Berlin" if c % 2 else "America/New_York"
+        )
+        standin.populate(calendar_id, n_events, origin, days=365, seed=c)
+
+    api = GoogleApiClient(
+        BASE_URL, GoogleAuth(access_token="bench"), transport=standin.transport()
+    )
+    path = os.path.join(tempfile.mkdtemp(), "calendar_store.json")
+    # The fixture year lies in the past: mirror back to its start.
+    history_days = (datetime.now(UTC) - origin).days + 1
+    store = CalendarStore(api, path, history_days=history_days)
+
+    start = time.perf_counter()
+    full = await store.sync()
+    full_time = time.perf_counter() - start
+    print(
+        f"full sync        : {full_time:7.3f}s  {full}  ({standin.requests} requests)"
+    )
+
+    calendar_id = "calendar0@example.com"
+    standin.put_event(
+        calendar_id,
+        {
+            "id": "new-event",
+            "status": "confirmed",
+            "summary": "Lunch with Sam",
+            "start": {"dateTime": "2025-03-04T12:00:00+00:00"},
+            "end": {"dateTime": "2025-03-04T13:00:00+00:00"},
+        },
+    )
+    standin.cancel_event(calendar_id, f"{calendar_id[:8]}-0")
+    store.invalidate("create-event", {}, None)
+    requests = standin.requests
+    start = time.perf_counter()
+    await store.ensure_fresh()
+    print(
+        f"incremental sync : {time.perf_counter() - start:7.3f}s  "
+        f"({standin.requests - requests} requests)"
+    )
+    found = store.events_between(
+        datetime(2025, 3, 4, 11, tzinfo=UTC),
+        datetime(2025, 3, 4, 14, tzinfo=UTC),
+        query="lunch",
+    )
+    assert [e.id for e in found] == ["new-event"], found
+    assert f"{calendar_id[:8]}-0" not in store.calendars[calendar_id].events
+
+    store.calendars[calendar_id].sync_token = "expired"
+    store.invalidate()
+    await store.ensure_fresh()
+    assert "new-event" in store.calendars[calendar_id].events
+    print(f"410 resync ok    : {store.stats()}")
+
+    reloaded = CalendarStore(api, path, history_days=history_days)
+    assert reloaded.stats()["events"] == store.stats()["events"]
+
+    # "Tomorrow after lunch" style queries over random afternoons.
+    queries = 10_000
+    days = [origin + timedelta(days=d, hours=13) for d in range(0, 365, 3)]
+    start = time.perf_counter()
+    hits = 0
+    for i in range(queries):
+        lo = days[i % len(days)]
+        hits += len(store.events_between(lo, lo + timedelta(hours=5)))
+    per_query = (time.perf_counter() - start) / queries
+    print(
+        f"range query      : {per_query * 1e6:7.1f}us avg over {queries} queries "
+        f"({hits / queries:.1f} events each, {store.stats()['events']} events stored)"
+    )
+    print(
+        f"API round trip   : {standin.latency * 1000:7.1f}ms per list request (stand-in)"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    calendars = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    asyncio.run(main(n, calendars))
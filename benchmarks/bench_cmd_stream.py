@@ -0,0 +1,112 @@
+"""
+Command output capture: ``run_command`` vs streaming ``run_command_async``.
+
+A stand-in "linter" prints lines of findings — as semgrep or pytest do on a
+big repository. Each capture runs in a fresh interpreter and reports its
+peak RSS above the interpreter's own, for growing amounts of output; the
+streaming run also spools the full output to a file. A second command
+prints one line, works for a second, then finishes, to show when the first
+line reaches the caller.
+
+    python -m benchmarks.bench_cmd_stream [max_mb]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+
+# The helpers import each other as ``core.*``, i.e. with src/ on the path.
+SRC = os.path.join(os.path.dirname(__file__), os.pardir, "src")
+sys.path.insert(0, SRC)
+
+from core.cmd import run_command, run_command_async, stream_command
+
+LINE = "src/module.py:{}:8: W0612 Unused variable 'result' (unused-variable)"
+
+
+def emitter(mb: float) -> list[str]:
+    code = (
+        f"import sys\nline = {LINE!r}\nn = int({mb} * 1e6 / (len(line) + 6))\n"
+        "out = sys.stdout\nfor i in range(n): out.write(line.format(i) + '\\n')\n"
+    )
+    return [sys.executable, "-c", code]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(variant: str, mb: float) -> None:
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if variant == "run_command":
+        result = run_command(emitter(mb), cwd=".")
+    else:
+        result = asyncio.run(run_command_async(emitter(mb), cwd=".", spool=True))
+        os.unlink(result["stdout_path"])
+        os.unlink(result["stderr_path"])
+    assert result["success"], result["stderr"]
+    print(f"{peak_rss_mb() - baseline:.1f} {time.perf_counter() - start:.2f}")
+
+
+def measure(variant: str, mb: float) -> tuple[float, float]:
+    out = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_cmd_stream",
+            "--child",
+            variant,
+            str(mb),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join([os.getcwd(), SRC])},
+    )
+    rss, elapsed = out.stdout.split()
+    return float(rss), float(elapsed)
+
+
+async def first_line_delay() -> tuple[float, float]:
+    command = ["sh", "-c", "echo scanning; sleep 1; echo done"]
+    start = time.perf_counter()
+    run_command(command, cwd=".")
+    blocking = time.perf_counter() - start
+    start = time.perf_counter()
+    async with stream_command(command, cwd=".") as stream:
+        async for _ in stream:
+            streamed = time.perf_counter() - start
+            break
+    return blocking, streamed
+
+
+def main(max_mb: float) -> None:
+    sizes = [s for s in (1, 10, 50, 200, 500) if s <= max_mb]
+    print(f"{'output':>8}  {'run_command':>22}  {'run_command_async':>22}")
+    for mb in sizes:
+        before_rss, before_s = measure("run_command", mb)
+        after_rss, after_s = measure("run_command_async", mb)
+        print(
+            f"{mb:6.0f}MB  {before_rss:8.1f}MB peak {before_s:6.2f}s  "
+            f"{after_rss:8.1f}MB peak {after_s:6.2f}s"
+        )
+    blocking, streamed = asyncio.run(first_line_delay())
+    print(
+        f"first line after: {blocking * 1000:.0f}ms with run_command, "
+        f"{streamed * 1000:.0f}ms streamed"
+    )
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    if argv[:1] == ["--child"]:
+        child(argv[1], float(argv[2]))
+    else:
+        main(float(argv[0]) if argv else 500)
@@ -0,0 +1,162 @@
+"""
+Sort-and-sweep free-slot finding on large synthetic calendars.
+
+Compares ``find_slots`` with a naive scan that tests every 15-minute
+candidate start against every busy interval, on many attendees' calendars
+over a year, then runs one end-to-end query through the Calendar stand-in
+(local store for the user, freeBusy for the attendees).
+
+    python -m benchmarks.bench_free_slots [attendees] [events_per_attendee]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from benchmarks.calendar_standin import BASE_URL, CalendarStandIn
+from src.agents.calendar_agent.slots import (
+    WorkingHours,
+    find_slots,
+    merge_busy,
+    query_free_busy,
+)
+from src.agents.calendar_agent.store import CalendarStore
+from src.agents.common.google_api import GoogleApiClient, GoogleAuth
+
+TZ = ZoneInfo("America/New_York")
+ORIGIN = datetime(2025, 1, 6, tzinfo=TZ)
+
+
+def synthetic_busy(n_events: int, days: int, seed: int) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+    busy = []
+    for _ in range(n_events):
+        day = ORIGIN + timedelta(days=rng.randrange(days))
+        # Attendees in other zones: some meetings are early/late in New York time.
+        begin = day.replace(
+            hour=rng.randrange(6, 20), minute=rng.choice([0, 15, 30, 45])
+        )
+        length = rng.choice([15, 30, 30, 45, 60, 90])
+        busy.append(
+            (begin.timestamp(), (begin + timedelta(minutes=length)).timestamp())
+        )
+    if rng.random() < 0.5:  # an all-day out-of-office
+        day = ORIGIN + timedelta(days=rng.randrange(days))
+        busy.append((day.timestamp(), (day + timedelta(days=1)).timestamp()))
+    return busy
+
+
+def naive_slots(sources, start, end, duration, hours, limit):
+    """Test every 15-minute candidate start against every busy interval.
+
+    Returns the first feasible start of each run of consecutive feasible
+    starts, which is what ``find_slots`` reports as a slot start.
+    """
+    intervals = [i for source in sources for i in source]
+    windows = hours.windows(start, end, TZ)
+    starts = []
+    for lo, hi in windows:
+        candidate = lo
+        previous_ok = False
+        while candidate + duration <= hi:
+            ok = all(
+                b[1] <= candidate or b[0] >= candidate + duration for b in intervals
+            )
+            if ok and not previous_ok:
+                starts.append(candidate)
+                if len(starts) >= limit:
+                    return starts
+            previous_ok = ok
+            candidate += 15 * 60
+    return starts
+
+
+def bench_algorithm(n_attendees: int, n_events: int) -> None:
+    sources = [synthetic_busy(n_events, 365, seed) for seed in range(n_attendees)]
+    hours = WorkingHours()
+    total = sum(len(s) for s in sources)
+
+    for label, days in (("1 week", 7), ("1 quarter", 91)):
+        start = ORIGIN.timestamp()
+        end = (ORIGIN + timedelta(days=days)).timestamp()
+
+        t0 = time.perf_counter()
+        slots = find_slots(sources, start, end, 30 * 60, TZ, hours, limit=5)
+        sweep = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        naive = naive_slots(sources, start, end, 30 * 60, hours, limit=5)
+        scan = time.perf_counter() - t0
+
+        assert [s[0] for s in slots] == naive, (slots, naive)
+        first = (
+            f"{datetime.fromtimestamp(slots[0][0], TZ):%a %d %b %H:%M}"
+            if slots
+            else "-"
+        )
+        print(
+            f"{n_attendees} attendees, {total} busy intervals, {label:9}: "
+            f"sweep {sweep * 1000:8.2f}ms  naive {scan * 1000:9.2f}ms  "
+            f"({len(slots)} slots, first {first})"
+        )
+
+    t0 = time.perf_counter()
+    merged = merge_busy(*sources)
+    print(
+        f"merge of {total} intervals into {len(merged)}: "
+        f"{(time.perf_counter() - t0) * 1000:.2f}ms"
+    )
+
+
+async def bench_end_to_end(n_attendees: int, n_events: int) -> None:
+    standin = CalendarStandIn(latency=0.05)
+    standin.add_calendar("me@example.com", "America/New_York")
+    standin.populate("me@example.com", n_events, ORIGIN.astimezone(UTC), days=365)
+    attendees = [f"person{i}@example.com" for i in range(n_attendees)]
+    for seed, attendee in enumerate(attendees, start=1):
+        standin.add_calendar(attendee, "Europe/Berlin")
+        standin.populate(attendee, n_events, ORIGIN.astimezone(UTC), 365, seed)
+
+    api = GoogleApiClient(
+        BASE_URL, GoogleAuth(access_token="bench"), transport=standin.transport()
+    )
+    store = CalendarStore(
+        api,
+        os.path.join(tempfile.mkdtemp(), "store.json"),
+        history_days=(datetime.now(UTC) - ORIGIN).days + 1,
+    )
+    await store.sync()
+
+    lo, hi = ORIGIN + timedelta(days=1, hours=12), ORIGIN + timedelta(days=1, hours=18)
+    t0 = time.perf_counter()
+    own = store.busy_intervals(lo, hi, ["me@example.com"])
+    others, unavailable = await query_free_busy(
+        api, attendees, lo.timestamp(), hi.timestamp()
+    )
+    slots = find_slots(
+        [own, *others.values()],
+        lo.timestamp(),
+        hi.timestamp(),
+        30 * 60,
+        TZ,
+        WorkingHours(),
+    )
+    print(
+        f"end to end, {n_attendees} attendees, Tuesday afternoon: "
+        f"{(time.perf_counter() - t0) * 1000:.1f}ms (one freeBusy round trip), "
+        f"{len(slots)} slots, unavailable={unavailable}"
+    )
+
+
+if __name__ == "__main__":
+    attendees = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    bench_algorithm(attendees, events)
+    asyncio.run(bench_end_to_end(min(attendees, 10), events // 4))
@@ -0,0 +1,139 @@
+"""
+GitHub access: blocking per-call requests vs the pooled async ``GitHubClient``.
+
+Against the GitHub stand-in (``latency_ms`` per request):
+
+* repeated note reads — a fresh ``requests.get`` of the JSON Contents API per
+  read (what the tools used to do) vs conditional raw reads, where unchanged
+  notes come back as ``304`` and cost no rate limit;
+* reading 100 notes — one REST call per note vs one GraphQL query;
+* a small rate-limit budget — blocking calls run into ``403`` while the
+  client spaces its requests out and waits for the reset.
+
+    python -m benchmarks.bench_github_client [n_notes] [latency_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import sys
+import time
+
+import requests
+
+from benchmarks.github_standin import GitHubStandIn
+from src.agents.obsidian_agent.github import GitHubApiError, GitHubClient
+
+RAW = "application/vnd.github.raw"
+
+
+def report(label: str, standin: GitHubStandIn, fn) -> None:
+    before_requests = sum(standin.requests.values())
+    before_charged = standin.charged
+    before_304 = standin.not_modified
+    start = time.perf_counter()
+    outcome = fn()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:32}: {elapsed * 1000:8.1f}ms  "
+        f"{sum(standin.requests.values()) - before_requests:4d} requests  "
+        f"{standin.not_modified - before_304:4d} not modified  "
+        f"{standin.charged - before_charged:4d} charged  {outcome}"
+    )
+
+
+def main(n_notes: int, latency: float) -> None:
+    standin = GitHubStandIn(latency=latency)
+    standin.populate(n_notes)
+    owner, repo = standin.owner, standin.repo
+    paths = sorted(standin.files())
+    hot, batch = paths[:10], paths[:100]
+
+    with standin.serve() as api:
+        contents = f"{api}/repos/{owner}/{repo}/contents"
+
+        def blocking_reads() -> str:
+            for _ in range(5):
+                for path in hot:
+                    response = requests.get(f"{contents}/{path}")
+                    base64.b64decode(response.json()["content"]).decode()
+            return "ok"
+
+        async def client_reads(client: GitHubClient) -> str:
+            for _ in range(5):
+                texts = await asyncio.gather(
+                    *(
+                        client.request(
+                            "GET", f"/repos/{owner}/{repo}/contents/{p}", accept=RAW
+                        )
+                        for p in hot
+                    )
+                )
+                assert all(t.text for t in texts)
+            return "ok"
+
+        print(f"vault: {n_notes} notes, {latency * 1000:.0f}ms per request")
+        report("5 x 10 reads, requests", standin, blocking_reads)
+        client = GitHubClient(None, api_url=api)
+        report(
+            "5 x 10 reads, client (ETag)",
+            standin,
+            lambda: asyncio.run(client_reads(client)),
+        )
+
+        def rest_per_note() -> str:
+            with requests.Session() as session:
+                for path in batch:
+                    session.get(f"{contents}/{path}").raise_for_status()
+            return "ok"
+
+        report("100 notes, REST per note", standin, rest_per_note)
+        client = GitHubClient(None, api_url=api)
+        found = {}
+        report(
+            "100 notes, one GraphQL query",
+            standin,
+            lambda: found.update(asyncio.run(client.files(owner, repo, batch))) or "ok",
+        )
+        files = standin.files()
+        assert all(found[p].encode() == standin.blobs[files[p]] for p in batch)
+
+        # A budget of 40 requests per 2s window, for 100 distinct reads.
+        standin.rate_limit, standin.rate_window = 40, 2.0
+        standin.used.clear()
+        standin.window_start = time.time()
+
+        def blocking_budget() -> str:
+            failed = sum(
+                requests.get(f"{contents}/{p}").status_code == 403 for p in batch
+            )
+            return f"{failed} rate limited"
+
+        async def client_budget(client: GitHubClient) -> str:
+            failed = 0
+            for path in batch:
+                try:
+                    await client.request(
+                        "GET", f"/repos/{owner}/{repo}/contents/{path}", accept=RAW
+                    )
+                except GitHubApiError:
+                    failed += 1
+            return f"{failed} failed, throttled {client.stats()['throttled_s']}s"
+
+        report("100 reads over budget, requests", standin, blocking_budget)
+        time.sleep(max(standin.window_start + standin.rate_window - time.time(), 0))
+        client = GitHubClient(None, api_url=api, min_remaining=10)
+        report(
+            "100 reads over budget, client",
+            standin,
+            lambda: asyncio.run(client_budget(client)),
+        )
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    main(
+        int(argv[0]) if len(argv) > 0 else 2_000,
+        float(argv[1]) / 1000 if len(argv) > 1 else 0.03,
+    )
@@ -0,0 +1,123 @@
+"""
+Batched vs per-message Gmail fetches against a local stand-in.
+
+The stand-in is an ``httpx.MockTransport`` that answers ``messages.get`` and
+the batch endpoint with a fixed round-trip latency, so the numbers reflect the
+number of round trips rather than the network.
+
+    python -m benchmarks.bench_gmail_batch [n_messages] [latency_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import sys
+import time
+
+import httpx
+
+from src.agents.common.google_api import GoogleApiClient, GoogleAuth
+from src.agents.gmail_agent.batch import GmailBatchFetcher
+
+BASE_URL = "http://standin/gmail/v1/users/me"
+BATCH_URL = "http://standin/batch/gmail/v1"
+
+
+def _message(message_id: str) -> dict:
+    return {
+        "id": message_id,
+        "threadId": f"t{message_id}",
+        "labelIds": ["INBOX", "UNREAD"],
+        "snippet": "Quarterly numbers attached, please review before Friday.",
+        "internalDate": "1760000000000",
+        "payload": {
+            "headers": [
+                {"name": "From", "value": "Alice <alice@example.com>"},
+                {"name": "To", "value": "me@example.com"},
+                {"name": "Subject", "value": f"Report {message_id}"},
+                {"name": "Date", "value": "Mon, 13 Oct 2025 09:00:00 +0000"},
+            ]
+        },
+    }
+
+
+def make_transport(latency: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        if request.url.path.startswith("/batch/"):
+            body = request.content.decode()
+            items = re.findall(
+                r"Content-ID: <(item-\d+)>\r\n\r\nGET \S+/messages/([^?\s]+)", body
+            )
+            out = "batch_response"
+            parts = [
+                f"--{out}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{item}>\r\n\r\n"
+                "HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n"
+                f"{json.dumps(_message(message_id))}\r\n"
+                for item, message_id in items
+            ]
+            return httpx.Response(
+                200,
+                content=("".join(parts) + f"--{out}--\r\n").encode(),
+                headers={"content-type": f"multipart/mixed; boundary={out}"},
+            )
+        message_id = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200, json=_message(message_id))
+
+    return httpx.MockTransport(handler)
+
+
+async def main(n_messages: int, latency: float) -> None:
+    ids = [f"m{i:05d}" for i in range(n_messages)]
+    transport = make_transport(latency)
+
+    def client() -> GoogleApiClient:
+        return GoogleApiClient(
+            BASE_URL, GoogleAuth(access_token="bench"), transport=transport
+        )
+
+    # Today: one read_email call per message, issued one after another.
+    api = client()
+    start = time.perf_counter()
+    for message_id in ids:
+        await api.get(f"messages/{message_id}", {"format": "metadata"})
+    sequential = time.perf_counter() - start
+    sequential_requests = api.requests_sent
+
+    # Per-message requests over the pool, 10 at a time.
+    api = client()
+    semaphore = asyncio.Semaphore(10)
+
+    async def fetch(message_id: str) -> dict:
+        async with semaphore:
+            return await api.get(f"messages/{message_id}", {"format": "metadata"})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch(m) for m in ids))
+    concurrent = time.perf_counter() - start
+    concurrent_requests = api.requests_sent
+
+    api = client()
+    fetcher = GmailBatchFetcher(api, batch_url=BATCH_URL)
+    start = time.perf_counter()
+    messages = await fetcher.fetch_messages(ids)
+    batched = time.perf_counter() - start
+    assert len(messages) == n_messages and messages[0]["subject"] == "Report m00000"
+
+    print(f"{n_messages} messages, {latency * 1000:.0f} ms per round trip")
+    print(
+        f"  per-message, sequential : {sequential:7.3f}s  {sequential_requests} requests"
+    )
+    print(
+        f"  per-message, 10 parallel: {concurrent:7.3f}s  {concurrent_requests} requests"
+    )
+    print(f"  batched                 : {batched:7.3f}s  {api.requests_sent} requests")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(n, latency_ms / 1000))
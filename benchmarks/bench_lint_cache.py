@@ -0,0 +1,155 @@
+"""
+Repeated lint runs: linting every file vs the content-hash lint cache.
+
+A synthetic git repository of Python modules (with the usual unused
+variables, long functions and missing docstrings) and Markdown notes is
+linted with pylint and Ruff — and markdownlint when it is installed —
+through ``run_incremental``: cold (every file is linted), again with
+nothing changed, after editing a few files and adding an untracked one, and
+after committing those and editing a couple more. Each state's merged
+findings are checked against a cold run with an empty cache.
+
+    python -m benchmarks.bench_lint_cache [n_modules]
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# The linters import their helpers as ``core.*``, i.e. with src/ on the path.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from core.linters.cache import LintCache, changed_files
+from core.linters.markdownlint import run_markdownlint
+from core.linters.pylint import run_pylint
+from core.linters.ruff import run_ruff
+
+PYPROJECT = """\
+[tool.pylint."messages control"]
+disable = ["duplicate-code"]
+"""
+
+
+def module(rng: random.Random, i: int) -> str:
+    parts = ["import os\nimport json\nimport re\n\n"]
+    for f in range(rng.randrange(8, 20)):
+        args = ", ".join(f"arg{a}" for a in range(rng.randrange(1, 6)))
+        body = "\n".join(
+            f"    value{v} = {args.split(', ')[0]} * {v} + len(str({v}))"
+            for v in range(rng.randrange(3, 12))
+        )
+        parts.append(
+            f"\ndef func_{i}_{f}({args}):\n{body}\n"
+            f"    if value0 > {rng.randrange(100)}:\n        return json.dumps(value0)\n"
+            f"    return os.path.join(str(value0), 'x')\n\n"
+        )
+    return "".join(parts)
+
+
+def note(rng: random.Random, i: int) -> str:
+    items = "\n".join(f"* item {n}" for n in range(rng.randrange(2, 8)))
+    return f"# Note {i}\n## Section\n{items}\n\nSome text   \n"
+
+
+def git(repo: str, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def keyed(findings: list[dict]) -> list[tuple]:
+    return sorted(
+        (
+            f["path"],
+            f.get("line", f.get("lineNumber")),
+            str(f.get("symbol", f.get("code", f.get("ruleNames")))),
+        )
+        for f in findings
+    )
+
+
+def main(n_modules: int) -> None:
+    rng = random.Random(0)
+    linters = {
+        "pylint": lambda repo, cache: run_pylint(repo, cache=cache),
+        "ruff": lambda repo, cache: run_ruff(repo, cache=cache),
+    }
+    if shutil.which("markdownlint"):
+        linters["markdownlint"] = lambda repo, cache: run_markdownlint(
+            repo, cache=cache
+        )
+    else:
+        print("markdownlint not installed; skipping it")
+
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(repo, "pkg"))
+        os.makedirs(os.path.join(repo, "docs"))
+        for i in range(n_modules):
+            with open(os.path.join(repo, "pkg", f"mod_{i}.py"), "w") as f:
+                f.write(module(rng, i))
+        for i in range(n_modules // 4):
+            with open(os.path.join(repo, "docs", f"note_{i}.md"), "w") as f:
+                f.write(note(rng, i))
+        with open(os.path.join(repo, "pyproject.toml"), "w") as f:
+            f.write(PYPROJECT)
+        git(repo, "init", "-q")
+        git(repo, "add", ".")
+        git(repo, "-c", "user.name=b", "-c", "user.email=b@x", "commit", "-qm", "init")
+        print(f"repo: {n_modules} Python modules, {n_modules // 4} Markdown notes")
+
+        def edit(paths: list[str]) -> None:
+            for path in paths:
+                with open(os.path.join(repo, path), "a") as f:
+                    f.write(
+                        f"\n\ndef added_{rng.randrange(10**6)}(x):\n    y = 1\n    return x\n"
+                    )
+
+        cache = LintCache(os.path.join(tmp, "lint.sqlite3"))
+        rows: dict[str, dict[str, dict]] = {name: {} for name in linters}
+
+        def run_all(state: str) -> None:
+            for name, run in linters.items():
+                result = run(repo, cache)
+                truth = run(
+                    repo, LintCache(os.path.join(tmp, f"{state}-{name}.sqlite3"))
+                )
+                assert keyed(result["findings"]) == keyed(truth["findings"]), (
+                    name,
+                    state,
+                )
+                rows[name][state] = result
+
+        run_all("cold")
+        run_all("unchanged")
+        edit([f"pkg/mod_{i}.py" for i in range(3)] + ["docs/note_0.md"])
+        with open(os.path.join(repo, "pkg", "new_module.py"), "w") as f:
+            f.write(module(rng, n_modules))
+        run_all("3 files edited")
+        git(repo, "add", ".")
+        git(repo, "-c", "user.name=b", "-c", "user.email=b@x", "commit", "-qm", "edit")
+        edit(["pkg/mod_10.py", "pkg/mod_11.py"])
+        run_all("commit + 2 edited")
+        print(
+            f"changed since the first commit: {len(changed_files(repo, 'HEAD~1'))} "
+            f"files; uncommitted: {sorted(changed_files(repo))}"
+        )
+
+        for name, states in rows.items():
+            cold = states["cold"]["duration_s"]
+            print(f"{name}: {cold:.2f}s for {states['cold']['files']} files cold")
+            for state, result in states.items():
+                print(
+                    f"  {state:18}: {result['duration_s']:6.2f}s  "
+                    f"linted {result['linted']:4d}, cached {result['cached']:4d}, "
+                    f"{len(result['findings']):5d} findings  "
+                    f"({cold / result['duration_s']:.0f}x)"
+                )
+        print(f"cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    main(int(argv[0]) if argv else 200)
@@ -0,0 +1,112 @@
+"""
+``lint_repo``: tools one after another vs concurrently.
+
+Stand-in executables named after each tool (``semgrep``, ``pytest``, …) are
+put first on ``PATH``; each sleeps for a typical share of a real run and
+prints some output. The same repository is linted with
+``max_parallel=1`` (the old sequential behaviour) and with the default cap,
+without the lint cache.
+A last run makes ``pytest`` hang with a child process and checks that its
+timeout kills the whole tree while the other tools still report.
+
+    python -m benchmarks.bench_lint_parallel [scale]
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import sys
+import tempfile
+import time
+
+# The linters import their helpers as ``core.*``, i.e. with src/ on the path.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from core.linters.base import LINTERS, lint_repo
+
+# Seconds each stand-in tool takes at scale 1.
+DURATIONS = {
+    "semgrep": 4.0,
+    "pytest": 3.0,
+    "pylint": 2.5,
+    "gitleaks": 1.0,
+    "markdownlint": 0.5,
+    "dotenv-linter": 0.2,
+}
+
+
+def install_standins(bin_dir: str, scale: float, hang: str | None = None) -> None:
+    for tool, seconds in DURATIONS.items():
+        if tool == hang:
+            # A child in the background keeps running unless the group is killed.
+            body = f'sleep 1000 &\necho $! > "{bin_dir}/{tool}.child"\nwait\n'
+        else:
+            body = f'sleep {seconds * scale}\nseq 1 2000\necho "{tool}: done"\n'
+        path = os.path.join(bin_dir, tool)
+        with open(path, "w") as f:
+            f.write(f"#!/bin/sh\n{body}")
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+def sample_repo(path: str) -> None:
+    files = {
+        "README.md": "# Sample\n",
+        ".env": "API_KEY=x\n",
+        "pyproject.toml": "[project]\nname = 'sample'\n",
+        "app.py": "print('hi')\n",
+    }
+    for name, text in files.items():
+        with open(os.path.join(path, name), "w") as f:
+            f.write(text)
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A zombie still answers signal 0 until its parent reaps it.
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().split()[2] != "Z"
+
+
+def main(scale: float) -> None:
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as bins:
+        sample_repo(repo)
+        os.environ["PATH"] = f"{bins}{os.pathsep}{os.environ['PATH']}"
+        install_standins(bins, scale)
+        summed = sum(DURATIONS.values()) * scale
+        print(
+            f"{len(LINTERS)} tools, {summed:.1f}s summed, "
+            f"slowest {max(DURATIONS.values()) * scale:.1f}s"
+        )
+
+        runs = {}
+        for label, cap in (("sequential (max_parallel=1)", 1), ("parallel", None)):
+            report = lint_repo(repo, max_parallel=cap, incremental=False)
+            assert all(getattr(report, n)["success"] for n in LINTERS), report
+            runs[label] = report.wall_s
+            tools = "  ".join(f"{n} {s:.1f}s" for n, s in report.timings.items())
+            print(f"{label:28}: {report.wall_s:5.2f}s wall  ({tools})")
+        sequential, parallel = runs.values()
+        print(f"speedup: {sequential / parallel:.1f}x")
+
+        install_standins(bins, scale, hang="pytest")
+        start = time.perf_counter()
+        report = lint_repo(repo, timeouts={"pytest": 1.0}, incremental=False)
+        elapsed = time.perf_counter() - start
+        with open(os.path.join(bins, "pytest.child")) as f:
+            child = int(f.read())
+        assert report.pytest["timed_out"] and not report.pytest["success"]
+        assert not alive(child), "pytest's child survived the timeout"
+        assert all(getattr(report, n)["success"] for n in LINTERS if n != "pytest")
+        print(
+            f"hung pytest, 1s timeout      : {elapsed:5.2f}s wall, pytest killed after "
+            f"{report.timings['pytest']:.1f}s with its child, other tools reported"
+        )
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    main(float(argv[0]) if argv else 1.0)
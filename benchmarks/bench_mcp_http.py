@@ -0,0 +1,125 @@
+"""
+Load test: many agent workers sharing one MCP server through the gateway.
+
+Each worker runs ``requests`` agent requests back to back; a request opens
+an MCP session, lists tools and makes ``calls`` tool calls (the stand-in
+sleeps ``tool_ms`` per call). Compared setups:
+
+* stdio      — every request spawns its own server process (today's setup);
+* http       — one shared gateway, a fresh HTTP client per session;
+* http+pool  — one shared gateway, pooled keep-alive connections per worker.
+
+    python -m benchmarks.bench_mcp_http [workers] [requests] [calls] [tool_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import time
+
+import httpx
+from pydantic_ai.mcp import MCPServer, MCPServerStdio, MCPServerStreamableHTTP
+
+from src.mcp_handler.remote import HTTPClientPool, PooledMCPServerStreamableHTTP
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_gateway(port: int, standin: list[str]) -> asyncio.subprocess.Process:
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "src.mcp_handler.gateway",
+        "--port",
+        str(port),
+        "--",
+        *standin,
+        env={**os.environ, "LOGFIRE_IGNORE_NO_CONFIG": "1"},
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    async with httpx.AsyncClient() as client:
+        for _ in range(200):
+            try:
+                await client.get(f"http://127.0.0.1:{port}/mcp/")
+                return proc
+            except httpx.TransportError:
+                await asyncio.sleep(0.05)
+    raise RuntimeError("gateway did not start")
+
+
+async def worker(server: MCPServer, requests: int, calls: int) -> list[float]:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with server:
+            tools = await server.list_tools()
+            assert len(tools) == 20, tools
+            for i in range(calls):
+                tool = i % len(tools)
+                result = await server.call_tool(f"tool_{tool}", {"query": "q"})
+                assert result == {"tool": tool, "query": "q", "max_results": 10}
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(label: str, servers: list[MCPServer], requests: int, calls: int):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(worker(s, requests, calls) for s in servers))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(x for r in results for x in r)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:10}: {len(latencies) / elapsed:7.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.1f}ms  p95 {p95 * 1000:7.1f}ms"
+    )
+
+
+async def main(workers: int, requests: int, calls: int, tool_ms: int) -> None:
+    standin = [sys.executable, "-m", "benchmarks.mcp_standin", "20", str(tool_ms)]
+    port = free_port()
+    gateway = await start_gateway(port, standin)
+    url = f"http://127.0.0.1:{port}/mcp"
+    try:
+        print(f"{workers} workers x {requests} requests x {calls} tool calls")
+        await run(
+            "stdio",
+            [
+                MCPServerStdio(standin[0], standin[1:], cwd=os.getcwd(), timeout=60)
+                for _ in range(workers)
+            ],
+            requests,
+            calls,
+        )
+        await run(
+            "http",
+            [MCPServerStreamableHTTP(url) for _ in range(workers)],
+            requests,
+            calls,
+        )
+        await run(
+            "http+pool",
+            [
+                PooledMCPServerStreamableHTTP(url=url, pool=HTTPClientPool())
+                for _ in range(workers)
+            ],
+            requests,
+            calls,
+        )
+        print(f"backend processes: stdio up to {workers}, gateway 1")
+    finally:
+        gateway.terminate()
+        await gateway.wait()
+
+
+if __name__ == "__main__":
+    argv = [int(a) for a in sys.argv[1:]]
+    defaults = [16, 10, 5, 20]
+    asyncio.run(main(*(argv + defaults[len(argv) :])))
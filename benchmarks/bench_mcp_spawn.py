@@ -0,0 +1,90 @@
+"""
+MCP server spawn-to-ready time: ``npx --yes`` vs the provisioned ``node`` launch.
+
+Uses the dependency-free Node stand-in in ``benchmarks/node_mcp_standin``,
+packed into a local tarball so both paths work offline. Spawn-to-ready is
+process start through the MCP ``initialize`` handshake and the first
+``tools/list``. Against the registry, npx additionally pays a metadata
+round trip (or a full download on a cold cache) on every spawn, so these
+numbers are the floor of what npx costs.
+
+    python -m benchmarks.bench_mcp_spawn [spawns]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.mcp_handler.provision import (
+    MCPServerCache,
+    ProvisionedMCPServerStdio,
+    mcp_server,
+)
+
+PACKAGE = "mcp-node-standin"
+STANDIN_DIR = os.path.join(os.path.dirname(__file__), "node_mcp_standin")
+
+
+async def spawn_times(server: ProvisionedMCPServerStdio, spawns: int) -> list[float]:
+    times = []
+    for _ in range(spawns):
+        start = time.perf_counter()
+        async with server:
+            await server.list_tools()
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def main(spawns: int) -> None:
+    workdir = tempfile.mkdtemp()
+    subprocess.run(
+        ["npm", "pack", "--pack-destination", workdir, STANDIN_DIR],
+        check=True,
+        capture_output=True,
+    )
+    tarball = os.path.join(workdir, f"{PACKAGE}-1.0.0.tgz")
+    cache = MCPServerCache(
+        os.path.join(workdir, "mcp_servers"), os.path.join(workdir, "lock.json")
+    )
+
+    t0 = time.perf_counter()
+    installed = cache.provision(PACKAGE, source=tarball)
+    print(f"provision (once) : {time.perf_counter() - t0:6.2f}s  {installed.version}")
+    assert cache.provision(PACKAGE, source=tarball) == installed  # idempotent
+
+    servers = {
+        "npx --yes": ProvisionedMCPServerStdio(
+            "npx",
+            ["--yes", "--package", tarball, PACKAGE],
+            package=PACKAGE,
+            launcher="npx",
+        ),
+        "node (cached)": mcp_server(PACKAGE, cache=cache),
+    }
+    assert servers["node (cached)"].launcher == "node"
+    for label, server in servers.items():
+        times = asyncio.run(spawn_times(server, spawns))
+        print(
+            f"{label:17}: median {statistics.median(times) * 1000:7.1f}ms  "
+            f"min {min(times) * 1000:7.1f}ms  max {max(times) * 1000:7.1f}ms"
+        )
+
+    # A modified install fails verification and falls back to npx.
+    with open(installed.bin_path, "a", encoding="utf-8") as f:
+        f.write("\n// tampered\n")
+    # The server built before the change re-verifies when it next starts.
+    server = servers["node (cached)"]
+    server.refresh_launch()
+    assert server.launcher == "npx"
+    assert server.args == ["--yes", f"{PACKAGE}@{installed.version}"]
+    print(f"tampered install : falls back to {server.command} {' '.join(server.args)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,70 @@
+"""
+MCP tool-list round trips per request, with and without the tool cache.
+
+A request is one server session in which the agent takes ``steps`` model
+steps and makes ``calls`` MCP tool calls. pydantic-ai lists the server's
+tools once per step and once per tool call; the cached server lists them at
+most once per session, and not at all once the package version is pinned
+and the definitions are on disk.
+
+    python -m benchmarks.bench_mcp_tool_cache [n_tools] [requests] [steps] [calls]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from pydantic_ai.mcp import MCPServerStdio
+
+from src.mcp_handler.tool_cache import CachedMCPServerStdio, ToolListCache
+
+
+async def run_request(server: MCPServerStdio, steps: int, calls: int) -> float:
+    """Time spent listing tools during one simulated request."""
+    listing = 0.0
+    async with server:
+        for step in range(steps):
+            t0 = time.perf_counter()
+            tools = await server.list_tools()  # add_mcp_server_tools
+            listing += time.perf_counter() - t0
+            for _ in range(calls // steps + (step < calls % steps)):
+                t0 = time.perf_counter()
+                await server.list_tools()  # _tool_from_mcp_server
+                listing += time.perf_counter() - t0
+                await server.call_tool(tools[0].name, {"query": "x"})
+    return listing
+
+
+async def main(n_tools: int, requests: int, steps: int, calls: int) -> None:
+    args = ["-m", "benchmarks.mcp_standin", str(n_tools)]
+    cache = ToolListCache(os.path.join(tempfile.mkdtemp(), "mcp_tools.json"))
+    cwd = os.getcwd()
+    servers = {
+        "uncached": MCPServerStdio(sys.executable, args, cwd=cwd),
+        "session cache": CachedMCPServerStdio(
+            sys.executable, args, cwd=cwd, cache=cache
+        ),
+        "pinned + disk": CachedMCPServerStdio(
+            sys.executable, args, cwd=cwd, version="1.0.0", cache=cache
+        ),
+    }
+    for label, server in servers.items():
+        per_request = [await run_request(server, steps, calls) for _ in range(requests)]
+        # The first pinned request populates the disk cache; report warm requests.
+        warm = per_request[1:] or per_request
+        remote = getattr(server, "remote_list_calls", requests * (steps + calls))
+        print(
+            f"{label:14}: {sum(warm) / len(warm) * 1000:8.2f}ms listing tools per "
+            f"request  ({remote} tools/list round trips over {requests} requests)"
+        )
+    print(f"disk cache    : hits={cache.hits} misses={cache.misses}")
+
+
+if __name__ == "__main__":
+    argv = [int(a) for a in sys.argv[1:]]
+    defaults = [40, 5, 4, 6]
+    asyncio.run(main(*(argv + defaults[len(argv) :])))
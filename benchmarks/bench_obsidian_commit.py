@@ -0,0 +1,133 @@
+"""
+Writing ten notes: one Contents API PUT per note vs one Git Data API commit.
+
+Baselines, against the GitHub stand-in (``latency_ms`` per request):
+
+* previous ``send_new_content_to_github`` — a PUT per note without ``sha``,
+  so updates of existing notes are rejected;
+* per-note Contents API done right — GET each note's ``sha``, then PUT.
+
+``VaultWriter`` commits the same ten changes (and a mix of writes, appends
+and deletes) as one commit, and retries when a concurrent commit moves the
+branch between building its commit and updating the ref.
+
+    python -m benchmarks.bench_obsidian_commit [n_notes] [latency_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import sys
+import time
+
+import requests
+
+from benchmarks.github_standin import GitHubStandIn
+from src.agents.obsidian_agent.github import GitHubClient
+from src.agents.obsidian_agent.models import NoteChange
+from src.agents.obsidian_agent.vault import VaultTreeCache
+from src.agents.obsidian_agent.writer import VaultWriter
+
+
+def run(label: str, standin: GitHubStandIn, fn) -> None:
+    before_requests = sum(standin.requests.values())
+    before_commits = len(standin.commits)
+    start = time.perf_counter()
+    outcome = fn()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:30}: {elapsed * 1000:8.1f}ms  "
+        f"{sum(standin.requests.values()) - before_requests:3d} requests  "
+        f"{len(standin.commits) - before_commits:3d} commits  {outcome}"
+    )
+
+
+def main(n_notes: int, latency: float) -> None:
+    standin = GitHubStandIn(latency=latency)
+    standin.populate(n_notes)
+    owner, repo = standin.owner, standin.repo
+    existing = sorted(standin.files())[:5]
+    new = [f"inbox/idea {i}.md" for i in range(5)]
+
+    with standin.serve() as api:
+        contents = f"{api}/repos/{owner}/{repo}/contents"
+
+        def old_put() -> str:
+            failed = 0
+            for path in existing + new:
+                body = {"message": "my commit message", "content": _b64("v1")}
+                failed += (
+                    requests.put(f"{contents}/{path}", json=body).status_code >= 400
+                )
+            return f"{failed} of 10 failed"
+
+        def contents_api(version: str) -> str:
+            for path in existing + new:
+                current = requests.get(f"{contents}/{path}")
+                body = {"message": f"Update {path}", "content": _b64(version)}
+                if current.status_code == 200:
+                    body["sha"] = current.json()["sha"]
+                requests.put(f"{contents}/{path}", json=body).raise_for_status()
+            return "ok"
+
+        run("contents PUT, no sha (old)", standin, old_put)
+        run("contents GET + PUT per note", standin, lambda: contents_api("v2"))
+
+        writer = VaultWriter(VaultTreeCache(GitHubClient(None, api_url=api)))
+        run(
+            "git data API, 10 writes",
+            standin,
+            lambda: _attempts(
+                writer.commit(
+                    owner,
+                    repo,
+                    [NoteChange(path=p, content="v3") for p in existing + new],
+                )
+            ),
+        )
+        files = standin.files()
+        assert all(standin.blobs[files[p]] == b"v3" for p in existing + new)
+
+        mixed = (
+            [NoteChange(path=p, content="v4") for p in new[:4]]
+            + [NoteChange(path=p, action="append", content="+") for p in existing[:3]]
+            + [NoteChange(path=p, action="delete") for p in existing[3:] + new[4:]]
+        )
+        run(
+            "git data API, mixed 10",
+            standin,
+            lambda: _attempts(writer.commit(owner, repo, mixed)),
+        )
+        files = standin.files()
+        assert standin.blobs[files[existing[0]]] == b"v3+"
+        assert existing[4] not in files and new[4] not in files
+
+        standin.interfere = 1
+        run(
+            "git data API, with a conflict",
+            standin,
+            lambda: _attempts(
+                writer.commit(owner, repo, [NoteChange(path=new[0], content="v5")])
+            ),
+        )
+        files = standin.files()
+        assert standin.blobs[files[new[0]]] == b"v5"
+        assert any(p.startswith("elsewhere/") for p in files)
+
+
+def _b64(text: str) -> str:
+    return base64.b64encode(text.encode()).decode()
+
+
+def _attempts(commit) -> str:
+    result = asyncio.run(commit)
+    return f"ok, {result['attempts']} attempt(s)"
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    main(
+        int(argv[0]) if len(argv) > 0 else 2_000,
+        float(argv[1]) / 1000 if len(argv) > 1 else 0.03,
+    )
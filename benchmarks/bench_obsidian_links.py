@@ -0,0 +1,156 @@
+"""
+Related notes: scanning every note for links vs the in-memory link graph.
+
+A synthetic vault of notes connected by ``[[wikilinks]]`` (popular notes
+get linked more), with inline and frontmatter tags, is served by the GitHub
+stand-in. The baseline answers "what links here?" by scanning every note's
+text — shown with the texts already in memory, its best case; without them
+it also means reading the whole vault. ``VaultLinks`` is built cold through
+the GitHub client, updated after a commit, reloaded from disk, and queried.
+
+    python -m benchmarks.bench_obsidian_links [n_notes] [latency_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+from benchmarks.github_standin import WORDS, GitHubStandIn
+from src.agents.obsidian_agent.github import GitHubClient
+from src.agents.obsidian_agent.links import VaultLinks
+from src.agents.obsidian_agent.vault import VaultTreeCache
+
+TAGS = [f"{w}/{sub}" for w in WORDS[:20] for sub in ("open", "done")] + WORDS[20:60]
+
+
+def synthetic_vault(n_notes: int, seed: int = 0) -> dict[str, str]:
+    rng = random.Random(seed)
+    names = [f"{rng.choice(WORDS)} {i}" for i in range(n_notes)]
+    weights = [1 / (rank + 10) for rank in range(n_notes)]
+    notes = {}
+    for i, name in enumerate(names):
+        links = rng.choices(names, weights, k=rng.randrange(1, 8))
+        if rng.random() < 0.1:
+            links.append(f"missing {i}")
+        tags = rng.sample(TAGS, rng.randrange(0, 3))
+        front = f"---\ntags: [{', '.join(tags)}]\n---\n" if rng.random() < 0.5 else ""
+        inline = "" if front else " ".join(f"#{t}" for t in tags)
+        body = " ".join(f"{' '.join(rng.sample(WORDS, 5))} [[{t}]]" for t in links)
+        folder = f"area-{i % 40}"
+        notes[f"{folder}/{name}.md"] = f"{front}# {name}\n\n{body}\n{inline}\n"
+    return notes
+
+
+def scan_backlinks(texts: dict[str, str], name: str) -> list[str]:
+    pattern = re.compile(rf"\[\[{re.escape(name)}(?:[|#\]])", re.IGNORECASE)
+    return sorted(p for p, text in texts.items() if pattern.search(text))
+
+
+def per_call(fn, args: list) -> float:
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / len(args)
+
+
+def main(n_notes: int, latency: float) -> None:
+    notes = synthetic_vault(n_notes)
+    standin = GitHubStandIn(latency=latency)
+    standin.commit_files(notes, "Populate vault")
+    owner, repo = standin.owner, standin.repo
+    print(f"vault: {len(notes)} notes, {latency * 1000:.0f}ms per request")
+    sample = random.Random(1).sample(sorted(notes), 50)
+    names = [p.rpartition("/")[2][:-3] for p in sample]
+
+    per_scan = per_call(lambda n: scan_backlinks(notes, n), names[:10])
+    print(
+        f"baseline scan     : {per_scan * 1000:9.3f}ms per backlinks query, "
+        f"after reading {len(notes)} notes"
+    )
+
+    with standin.serve() as api, tempfile.TemporaryDirectory() as tmp:
+        client = GitHubClient(None, api_url=api)
+        trees = VaultTreeCache(client, max_age=0)
+        path = os.path.join(tmp, "links.json")
+
+        async def update(links: VaultLinks) -> dict[str, int]:
+            head = await trees.head(owner, repo)
+            tree = await trees.tree_at(owner, repo, head)
+            return await links.update(
+                owner,
+                repo,
+                tree,
+                lambda paths: client.files(owner, repo, paths, ref=head),
+            )
+
+        def timed(label: str, links: VaultLinks) -> None:
+            before = sum(standin.requests.values())
+            start = time.perf_counter()
+            stats = asyncio.run(update(links))
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label:18}: {elapsed * 1000:9.1f}ms  "
+                f"{sum(standin.requests.values()) - before:4d} requests  {stats}"
+            )
+
+        links = VaultLinks(path)
+        timed("cold build", links)
+        print(f"graph on disk     : {os.path.getsize(path) / 1e6:9.1f} MB")
+        for name in names[:10]:
+            found = links.backlinks(owner, repo, name)["backlinks"]
+            assert found == scan_backlinks(notes, name), name
+        timed("unchanged vault", links)
+
+        # Edit some notes, delete others, and create a note that an existing
+        # link pointed at before it existed.
+        files = sorted(notes)
+        changes: dict[str, str | None] = {
+            p: notes[p] + f"\nsee [[{names[0]}]]\n" for p in files[:20]
+        }
+        changes.update({p: None for p in files[20:25]})
+        dangling = next(
+            t for t in links.graph(owner, repo).unresolved.values() for t in t
+        )
+        changes[f"inbox/{dangling}.md"] = "# Now it exists\n"
+        standin.commit_files(changes, "Edit, delete and create notes")
+        timed("after a commit", links)
+        created = links.backlinks(owner, repo, dangling)
+        assert created["note"] == f"inbox/{dangling}.md" and created["backlinks"]
+        assert set(files[:20]) <= set(
+            links.backlinks(owner, repo, names[0])["backlinks"]
+        )
+
+        start = time.perf_counter()
+        links = VaultLinks(path)
+        print(f"reload from disk  : {(time.perf_counter() - start) * 1000:9.1f}ms")
+        timed("reloaded, update", links)
+
+        queries = {
+            "backlinks": lambda n: links.backlinks(owner, repo, n),
+            "neighbors": lambda n: links.neighbors(owner, repo, n),
+            "neighbors, depth 2": lambda n: links.neighbors(owner, repo, n, depth=2),
+        }
+        for label, fn in queries.items():
+            print(f"{label:18}: {per_call(fn, names) * 1000:9.3f}ms per query")
+        tags = TAGS[:10]
+        tagged = per_call(lambda t: links.tagged(owner, repo, t), tags)
+        print(f"{'tagged':18}: {tagged * 1000:9.3f}ms per query")
+        print(
+            f"example           : {names[0]!r} has "
+            f"{len(links.backlinks(owner, repo, names[0])['backlinks'])} backlinks, "
+            f"#{WORDS[0]} has {len(links.tagged(owner, repo, WORDS[0]))} notes"
+        )
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    main(
+        int(argv[0]) if len(argv) > 0 else 30_000,
+        float(argv[1]) / 1000 if len(argv) > 1 else 0.03,
+    )
@@ -0,0 +1,132 @@
+"""
+Note reads: Contents API round trips vs the local git mirror.
+
+The baseline is what ``read_note`` does without a mirror: one Contents API
+request per note (against the GitHub stand-in, ``latency_ms`` per request)
+and a base64 decode of the JSON body. The mirror clones a local bare repo
+holding the same vault once, then serves reads from the working tree and
+picks up new commits with an incremental fetch.
+
+    python -m benchmarks.bench_obsidian_mirror [n_notes] [latency_ms]
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.github_standin import GitHubStandIn
+from src.agents.obsidian_agent.mirror import VaultMirror
+
+
+def git(cwd: str, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def export(standin: GitHubStandIn, root: str) -> tuple[str, str]:
+    """Write the stand-in's vault to a work tree and push it to a bare repo."""
+    work, bare = os.path.join(root, "work"), os.path.join(root, "vault.git")
+    git(root, "init", "--quiet", "--bare", "--initial-branch=main", bare)
+    git(root, "init", "--quiet", "--initial-branch=main", work)
+    for path, sha in standin.files().items():
+        full = os.path.join(work, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "wb") as f:
+            f.write(standin.blobs[sha])
+    git(work, "add", "-A")
+    git(work, "-c", "user.name=b", "-c", "user.email=b@b", "commit", "-qm", "Vault")
+    git(work, "push", "--quiet", bare, "main")
+    return work, bare
+
+
+def per_read(fn, paths: list[str]) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        fn(path)
+    return (time.perf_counter() - start) / len(paths)
+
+
+def main(n_notes: int, latency: float) -> None:
+    standin = GitHubStandIn(latency=latency)
+    standin.populate(n_notes)
+    journal = "".join(
+        f"## Day {d}\n\n" + "Notes about the day. " * 400 + "\n\n" for d in range(365)
+    )
+    standin.commit_files({"journal/2024.md": journal}, "Add journal")
+    owner, repo = standin.owner, standin.repo
+    paths = random.Random(0).sample(sorted(standin.files()), 50)
+    print(f"vault: {n_notes} notes, journal {len(journal) / 1e6:.1f}MB")
+
+    root = tempfile.mkdtemp()
+    work, bare = export(standin, root)
+    with standin.serve() as api:
+
+        def api_read(path: str) -> str:
+            response = requests.get(f"{api}/repos/{owner}/{repo}/contents/{path}")
+            response.raise_for_status()
+            return base64.b64decode(response.json()["content"]).decode("utf-8")
+
+        api_note = per_read(api_read, paths)
+        api_journal = per_read(api_read, ["journal/2024.md"] * 5)
+
+    mirror = VaultMirror(bare, os.path.join(root, "mirror"), max_age=3600)
+    start = time.perf_counter()
+    mirror.sync()
+    clone = time.perf_counter() - start
+    assert mirror.read(paths[0]) == api_read_text(standin, paths[0])
+    mirror_note = per_read(mirror.read, paths * 20)
+    mirror_journal = per_read(mirror.read, ["journal/2024.md"] * 50)
+    offset = journal.index("## Day 200")
+    section = statistics.median(
+        _timed(lambda: mirror.read_bytes("journal/2024.md", offset, offset + 8192))
+        for _ in range(200)
+    )
+    start = time.perf_counter()
+    listing = mirror.tree().folder("journal")
+    tree = time.perf_counter() - start
+
+    # A note written elsewhere arrives with an incremental fetch.
+    with open(os.path.join(work, "inbox.md"), "w") as f:
+        f.write("# Inbox\n")
+    git(work, "add", "-A")
+    git(work, "-c", "user.name=b", "-c", "user.email=b@b", "commit", "-qm", "Inbox")
+    git(work, "push", "--quiet", bare, "main")
+    mirror.mark_stale()
+    start = time.perf_counter()
+    assert mirror.read("inbox.md") == "# Inbox\n"
+    fetch = time.perf_counter() - start
+
+    print(f"api read (note)        : {api_note * 1000:9.3f}ms per read")
+    print(f"api read (journal)     : {api_journal * 1000:9.3f}ms per read")
+    print(f"mirror clone           : {clone * 1000:9.1f}ms once")
+    print(f"mirror read (note)     : {mirror_note * 1000:9.3f}ms per read")
+    print(f"mirror read (journal)  : {mirror_journal * 1000:9.3f}ms per read (mmap)")
+    print(f"mirror 8KB range       : {section * 1000:9.3f}ms per read (mmap)")
+    print(f"mirror listing (cold)  : {tree * 1000:9.1f}ms  {listing}")
+    print(f"fetch + read new note  : {fetch * 1000:9.1f}ms")
+
+
+def api_read_text(standin: GitHubStandIn, path: str) -> str:
+    return standin.blobs[standin.files()[path]].decode("utf-8")
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    main(
+        int(argv[0]) if len(argv) > 0 else 3_000,
+        float(argv[1]) / 1000 if len(argv) > 1 else 0.03,
+    )
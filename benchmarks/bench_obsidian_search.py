@@ -0,0 +1,162 @@
+"""
+Vault search: scanning every note vs the incremental BM25 index.
+
+A synthetic vault (Zipf-distributed vocabulary, a few "needle" notes with
+known phrases) is served by the GitHub stand-in. The baseline is what the
+agent could do before: read every note and scan it for the query terms —
+shown as the scan alone, over texts already in memory, which is its best
+case. ``VaultSearchIndex`` is built cold through the GitHub client (one
+GraphQL query per 100 notes), then updated after a commit touching a few
+notes, reopened from disk, and queried.
+
+    python -m benchmarks.bench_obsidian_search [n_notes] [latency_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.github_standin import GitHubStandIn
+from src.agents.obsidian_agent.github import GitHubClient
+from src.agents.obsidian_agent.search import VaultSearchIndex
+from src.agents.obsidian_agent.vault import VaultTreeCache
+
+NEEDLES = {
+    "Q3 offsite planning": "Agenda for the quarterly offsite in Lisbon",
+    "Hiring loop retro": "What went wrong with the backend hiring loop",
+    "Kitchen renovation": "Quotes from contractors for the kitchen cabinets",
+}
+
+
+def synthetic_vault(n_notes: int, seed: int = 0) -> tuple[dict[str, str], list[str]]:
+    rng = random.Random(seed)
+    syllables = [c + v for c in "bcdfghklmnprstvz" for v in "aeiou"]
+    vocabulary = sorted(
+        {"".join(rng.choices(syllables, k=rng.randrange(2, 5))) for _ in range(30_000)}
+    )
+    rng.shuffle(vocabulary)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    folders = [f"area-{i}/{sub}" for i in range(20) for sub in ("notes", "log")]
+    notes = {}
+    for i in range(n_notes):
+        title = " ".join(rng.choices(vocabulary[:2000], k=3))
+        body = "\n\n".join(
+            " ".join(rng.choices(vocabulary, weights, k=rng.randrange(20, 80)))
+            for _ in range(rng.randrange(1, 5))
+        )
+        notes[f"{rng.choice(folders)}/{title} {i}.md"] = f"# {title}\n\n{body}\n"
+    for title, line in NEEDLES.items():
+        notes[f"area-0/notes/{title}.md"] = f"# {title}\n\n{line}.\n"
+    return notes, vocabulary
+
+
+def scan(texts: dict[str, str], query: str) -> list[str]:
+    terms = query.lower().split()
+    return [p for p, text in texts.items() if all(t in text.lower() for t in terms)]
+
+
+def main(n_notes: int, latency: float) -> None:
+    notes, vocabulary = synthetic_vault(n_notes)
+    standin = GitHubStandIn(latency=latency)
+    standin.commit_files(notes, "Populate vault")
+    owner, repo = standin.owner, standin.repo
+    rng = random.Random(1)
+    queries = [
+        " ".join(rng.sample(vocabulary[200:5000], rng.randrange(1, 3)))
+        for _ in range(200)
+    ]
+    size = sum(len(t.encode()) for t in notes.values())
+    print(
+        f"vault: {len(notes)} notes, {size / 1e6:.1f} MB, "
+        f"{latency * 1000:.0f}ms per request"
+    )
+
+    start = time.perf_counter()
+    for query in queries[:20]:
+        scan(notes, query)
+    per_scan = (time.perf_counter() - start) / 20
+    print(
+        f"baseline scan    : {per_scan * 1000:8.1f}ms per query, "
+        f"after reading {len(notes)} notes"
+    )
+
+    with standin.serve() as api, tempfile.TemporaryDirectory() as tmp:
+        client = GitHubClient(None, api_url=api)
+        trees = VaultTreeCache(client, max_age=0)
+        path = os.path.join(tmp, "search.sqlite3")
+
+        async def update(index: VaultSearchIndex) -> dict[str, int]:
+            head = await trees.head(owner, repo)
+            tree = await trees.tree_at(owner, repo, head)
+            return await index.update(
+                owner,
+                repo,
+                tree,
+                lambda paths: client.files(owner, repo, paths, ref=head),
+            )
+
+        def timed(label: str, index: VaultSearchIndex) -> None:
+            before = sum(standin.requests.values())
+            start = time.perf_counter()
+            stats = asyncio.run(update(index))
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label:17}: {elapsed * 1000:8.1f}ms  "
+                f"{sum(standin.requests.values()) - before:4d} requests  {stats}"
+            )
+
+        index = VaultSearchIndex(path)
+        timed("cold build", index)
+        stats = index.stats()
+        print(
+            f"index on disk    : {stats['bytes'] / 1e6:8.1f} MB for {stats['notes']} "
+            f"notes ({stats['bytes'] / size:.2f}x the text)"
+        )
+        timed("unchanged vault", index)
+
+        files = sorted(notes)
+        changes: dict[str, str | None] = {
+            p: notes[p] + "\nedited\n" for p in files[:20]
+        }
+        changes.update({p: None for p in files[20:30]})
+        # Five of the deletions come back under a new name (a rename).
+        changes.update({f"archive/{p}": notes[p] for p in files[25:30]})
+        standin.commit_files(changes, "Edit, delete and move notes")
+        timed("after a commit", index)
+
+        start = time.perf_counter()
+        index = VaultSearchIndex(path)
+        print(f"reopen from disk : {(time.perf_counter() - start) * 1000:8.1f}ms")
+        timed("reopened, update", index)
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(owner, repo, query)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(
+            f"query            : {statistics.median(latencies) * 1000:8.2f}ms p50  "
+            f"{latencies[int(len(latencies) * 0.95)] * 1000:.2f}ms p95  "
+            f"({per_scan / statistics.median(latencies):.0f}x faster than a scan)"
+        )
+        for title, line in NEEDLES.items():
+            query = " ".join(line.lower().split()[-2:])
+            best = index.search(owner, repo, query, limit=1)
+            assert best and best[0]["path"].endswith(f"{title}.md"), (query, best)
+        print(f"needle queries   : {len(NEEDLES)}/{len(NEEDLES)} ranked first")
+        print(f"example          : {index.search(owner, repo, 'offsite lisbon')[0]}")
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    main(
+        int(argv[0]) if len(argv) > 0 else 30_000,
+        float(argv[1]) / 1000 if len(argv) > 1 else 0.03,
+    )
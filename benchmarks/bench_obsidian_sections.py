@@ -0,0 +1,149 @@
+"""
+Reading part of a note: ``read_note`` (whole file) vs outline + section reads.
+
+A sample vault of daily journals and meeting logs (one ``##`` heading per
+day or meeting, ``###`` subsections) and short notes is served by the
+GitHub stand-in. Each simulated question needs one subsection of one note.
+Before, the agent reads the whole note; after, it asks for the note's
+outline (``max_level=2``) and reads the one section. Tokens are estimated
+from the JSON the tools return (~4 bytes per token).
+
+    python -m benchmarks.bench_obsidian_sections [n_questions] [latency_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.github_standin import WORDS, GitHubStandIn
+from src.mcp_handler.compaction import estimate_tokens
+
+SUBSECTIONS = ("Notes", "Decisions", "Actions")
+
+
+def sample_vault(seed: int = 0) -> dict[str, str]:
+    rng = random.Random(seed)
+
+    def paragraph() -> str:
+        return " ".join(rng.choices(WORDS, k=rng.randrange(15, 60)))
+
+    def log(title: str, entries: list[str]) -> str:
+        parts = [f"---\ntags: [log]\n---\n# {title}\n"]
+        for entry in entries:
+            parts.append(f"\n## {entry}\n")
+            for sub in SUBSECTIONS:
+                items = "\n".join(
+                    f"- {paragraph()}" for _ in range(rng.randrange(1, 5))
+                )
+                parts.append(f"\n### {sub}\n\n{items}\n")
+        return "".join(parts)
+
+    notes = {}
+    start = date(2024, 1, 1)
+    for year in (2023, 2024):
+        days = [
+            (start.replace(year=year) + timedelta(d)).isoformat() for d in range(365)
+        ]
+        notes[f"journal/{year}.md"] = log(f"Journal {year}", days)
+    for team in ("platform", "design", "sales", "hiring"):
+        meetings = [f"{(start + timedelta(7 * w)).isoformat()} sync" for w in range(52)]
+        notes[f"meetings/{team}.md"] = log(f"{team} meetings", meetings)
+    for i in range(40):
+        months = [f"Week {w}" for w in range(rng.randrange(2, 12))]
+        notes[f"projects/project {i}.md"] = log(f"Project {i}", months)
+    for i in range(200):
+        notes[f"inbox/idea {i}.md"] = f"# Idea {i}\n\n{paragraph()}\n"
+    return notes
+
+
+def tokens(result: dict) -> int:
+    return estimate_tokens(len(json.dumps(result).encode()))
+
+
+def main(n_questions: int, latency: float) -> None:
+    notes = sample_vault()
+    standin = GitHubStandIn(latency=latency)
+    standin.commit_files(notes, "Sample vault")
+    owner, repo = standin.owner, standin.repo
+    rng = random.Random(1)
+    logs = [p for p in notes if not p.startswith("inbox/")]
+    questions = []
+    for _ in range(n_questions):
+        path = rng.choice(logs)
+        entries = [
+            line[3:] for line in notes[path].splitlines() if line.startswith("## ")
+        ]
+        questions.append((path, f"{rng.choice(entries)} > {rng.choice(SUBSECTIONS)}"))
+    sizes = [len(notes[p].encode()) for p, _ in questions]
+    print(
+        f"vault: {len(notes)} notes, {sum(len(t) for t in notes.values()) / 1e6:.1f} MB;"
+        f" questions read notes of {statistics.median(sizes) / 1e3:.0f} KB median, "
+        f"{max(sizes) / 1e3:.0f} KB max; {latency * 1000:.0f}ms per request"
+    )
+
+    with standin.serve() as api, tempfile.TemporaryDirectory() as tmp:
+        # The tools read their GitHub settings at import.
+        os.environ["GITHUB_API_URL"] = api
+        os.environ["OBSIDIAN_SEARCH_INDEX_PATH"] = os.path.join(tmp, "s.sqlite3")
+        os.environ["OBSIDIAN_LINKS_PATH"] = os.path.join(tmp, "links.json")
+        from src.agents.obsidian_agent import tools
+
+        async def before() -> list[int]:
+            used = []
+            for path, _ in questions:
+                result = await tools.get_github_file_contents(owner, repo, path)
+                assert result["success"]
+                used.append(tokens(result))
+            return used
+
+        async def after(outline_every_time: bool) -> list[int]:
+            used, outlined = [], set()
+            for path, heading in questions:
+                spent = 0
+                if outline_every_time or path not in outlined:
+                    outline = await tools.get_note_outline(owner, repo, path, 2)
+                    spent += tokens(outline)
+                    outlined.add(path)
+                section = await tools.get_note_section(owner, repo, path, heading)
+                assert section["success"], section
+                assert section["content"].startswith(f"### {heading.split(' > ')[1]}")
+                used.append(spent + tokens(section))
+            return used
+
+        def report(label: str, run) -> list[int]:
+            before_requests = sum(standin.requests.values())
+            start = time.perf_counter()
+            used = asyncio.run(run)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label:34}: {statistics.mean(used):8.0f} tokens per read  "
+                f"{elapsed / len(used) * 1000:6.1f}ms per read  "
+                f"{sum(standin.requests.values()) - before_requests:4d} requests"
+            )
+            return used
+
+        full = report("read_note (whole note)", before())
+        each = report("outline + section, every read", after(True))
+        once = report("section, outline once per note", after(False))
+        print(
+            f"tokens per read: {statistics.mean(full) / statistics.mean(each):.0f}x "
+            f"fewer with an outline each time, "
+            f"{statistics.mean(full) / statistics.mean(once):.0f}x when the outline "
+            f"is reused; outlines cached: {tools.note_outlines.stats()}"
+        )
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    main(
+        int(argv[0]) if len(argv) > 0 else 200,
+        float(argv[1]) / 1000 if len(argv) > 1 else 0.03,
+    )
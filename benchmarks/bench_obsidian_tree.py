@@ -0,0 +1,126 @@
+"""
+Vault tree listing: recursive Contents API walk vs one Git Trees API call.
+
+The baseline is what ``get_github_folder_contents`` used to do: one blocking
+Contents API request per folder, recursing into every subfolder. The
+``VaultTreeCache`` lists the whole vault with ``git/trees/<sha>?recursive=1``
+and serves folder listings from the tree cached by SHA.
+
+    python -m benchmarks.bench_obsidian_tree [n_notes] [n_folders] [latency_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import sys
+import time
+
+import requests
+
+from benchmarks.github_standin import GitHubStandIn
+from src.agents.obsidian_agent.github import GitHubClient
+from src.agents.obsidian_agent.vault import VaultTreeCache, render_folder_tree
+
+
+def contents_walk(api: str, owner: str, repo: str, path: str = "") -> dict:
+    """The previous implementation: one Contents API call per folder."""
+    response = requests.get(f"{api}/repos/{owner}/{repo}/contents/{path}")
+    response.raise_for_status()
+    tree = {}
+    for item in response.json():
+        if item["type"] == "dir":
+            sub = f"{path}/{item['name']}" if path else item["name"]
+            tree[item["name"]] = contents_walk(api, owner, repo, sub)
+        elif item["type"] == "file":
+            tree[item["name"]] = "file"
+    return tree
+
+
+def timed(label: str, standin: GitHubStandIn, fn):
+    before = sum(standin.requests.values())
+    start = time.perf_counter()
+    result = fn()
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    elapsed = time.perf_counter() - start
+    requests_made = sum(standin.requests.values()) - before
+    print(f"{label:30}: {elapsed * 1000:9.1f}ms  {requests_made:5d} requests")
+    return result
+
+
+def main(n_notes: int, n_folders: int, latency: float) -> None:
+    standin = GitHubStandIn(latency=latency)
+    standin.populate(n_notes, n_folders)
+    owner, repo = standin.owner, standin.repo
+    # The top-level folder holding the most notes.
+    files = standin.files()
+    folder = max(
+        (p for p in _dirs(standin) if "/" not in p),
+        key=lambda p: sum(f.startswith(f"{p}/") for f in files),
+    )
+    print(
+        f"vault: {n_notes} notes, {sum(1 for _ in _dirs(standin))} folders, "
+        f"{latency * 1000:.0f}ms per request"
+    )
+    with standin.serve() as api:
+        baseline = timed(
+            "contents walk (whole vault)",
+            standin,
+            lambda: contents_walk(api, owner, repo),
+        )
+        timed(
+            f"contents walk ({folder}/)",
+            standin,
+            lambda: contents_walk(api, owner, repo, folder),
+        )
+
+        cache = VaultTreeCache(GitHubClient(None, api_url=api), max_age=30)
+        listing = timed(
+            "git trees (whole vault, cold)", standin, lambda: cache.folder(owner, repo)
+        )
+        assert listing == baseline
+        sub = timed(
+            f"git trees ({folder}/, cached)",
+            standin,
+            lambda: cache.folder(owner, repo, folder),
+        )
+        assert sub == baseline[folder]
+        timed("git trees (repeat, cached)", standin, lambda: cache.folder(owner, repo))
+
+        # Past max_age the head is re-checked: a 304 if unchanged.
+        cache.max_age = 0
+        timed("git trees (head re-check)", standin, lambda: cache.folder(owner, repo))
+        standin.commit_files({f"{folder}/new note.md": "# New\n"}, "Add note")
+        listing = timed(
+            "git trees (after a commit)", standin, lambda: cache.folder(owner, repo)
+        )
+        assert "new note.md" in listing[folder]
+
+        # A vault too large for one recursive listing is walked per subtree.
+        standin.truncate_at = n_notes // 4
+        cache = VaultTreeCache(GitHubClient(None, api_url=api))
+        listing = timed(
+            "git trees (truncated, cold)", standin, lambda: cache.folder(owner, repo)
+        )
+        assert "new note.md" in listing[folder]
+    print(f"rendered {folder}/: {len(render_folder_tree(sub).splitlines())} lines")
+
+
+def _root(standin: GitHubStandIn) -> str:
+    return standin.commits[standin.head()]["tree"]
+
+
+def _dirs(standin: GitHubStandIn):
+    return (
+        p for p, kind, _ in standin.walk(_root(standin), "", True) if kind == "tree"
+    )
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    main(
+        int(argv[0]) if len(argv) > 0 else 3_000,
+        int(argv[1]) if len(argv) > 1 else 300,
+        float(argv[2]) / 1000 if len(argv) > 2 else 0.03,
+    )
@@ -0,0 +1,93 @@
+"""
+Parallel tool calls in one turn: per-turn wall-clock vs summed tool time.
+
+A scripted model emits six MCP tool calls in a single response (four reads,
+then two mutations, e.g. "look these up, then update two of them"), then
+answers. Each call takes ``tool_ms`` in the stand-in server. Compared
+schedulers:
+
+* serial     — one call at a time (what sequential execution costs);
+* cap 4      — ``ToolCallScheduler`` default: reads overlap, mutations are
+  ordered after everything emitted before them.
+
+    python -m benchmarks.bench_parallel_tools [tool_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from src.core.tool_timing import run_timed
+from src.mcp_handler.scheduling import ToolCallScheduler
+from src.mcp_handler.tool_cache import CachedMCPServerStdio
+
+CALLS = ["tool_0", "tool_1", "tool_2", "tool_3", "tool_4", "tool_5"]
+MUTATING = ("tool_4", "tool_5")
+
+
+def scripted_model(messages, info: AgentInfo) -> ModelResponse:
+    if any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+        return ModelResponse(parts=[TextPart("done")])
+    return ModelResponse(
+        parts=[
+            ToolCallPart(name, {"query": name}, tool_call_id=f"call-{i}")
+            for i, name in enumerate(CALLS)
+        ]
+    )
+
+
+class Recorder:
+    """Innermost processor: records when each call actually ran."""
+
+    def __init__(self):
+        self.spans: dict[str, tuple[float, float]] = {}
+
+    async def __call__(self, ctx, call_tool, tool_name, arguments):
+        start = time.perf_counter()
+        result = await call_tool(tool_name, arguments, None)
+        self.spans[tool_name] = (start, time.perf_counter())
+        return result
+
+
+def check_order(spans: dict[str, tuple[float, float]]) -> None:
+    for i, name in enumerate(CALLS):
+        if name not in MUTATING:
+            continue
+        # A mutation starts after every earlier call ended, and later ones
+        # start after it ended.
+        assert all(spans[e][1] <= spans[name][0] for e in CALLS[:i])
+        assert all(spans[name][1] <= spans[later][0] for later in CALLS[i + 1 :])
+
+
+async def main(tool_ms: int) -> None:
+    args = ["-m", "benchmarks.mcp_standin", "6", str(tool_ms)]
+    for label, cap in (("serial", 1), ("cap 4", 4)):
+        recorder = Recorder()
+        server = CachedMCPServerStdio(
+            sys.executable,
+            args,
+            cwd=os.getcwd(),
+            process_tool_call=ToolCallScheduler(recorder, cap, mutating=MUTATING),
+        )
+        agent = Agent(FunctionModel(scripted_model), mcp_servers=[server])
+        async with agent.run_mcp_servers():
+            result, timing = await run_timed(agent, "go")
+        assert result.output == "done"
+        check_order(recorder.spans)
+        turn = timing.turns[0]
+        print(
+            f"{label:7}: turn wall {turn.wall * 1000:6.0f}ms  summed tool "
+            f"{turn.summed * 1000:6.0f}ms  queued {turn.queued * 1000:6.0f}ms  "
+            f"({len(turn.calls)} calls, mutations ordered)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
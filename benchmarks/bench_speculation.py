@@ -0,0 +1,127 @@
+"""
+Speculative sub-agent prefetch: hit rate, wasted runs and time to answer.
+
+Each query goes through a stand-in orchestrator that "plans" for
+``plan_ms`` (its first LLM call) and then asks the sub-agents it needs, each
+answering after ``agent_ms``. The same queries are run:
+
+* without speculation;
+* with speculation, the orchestrator rephrasing each request for the agent
+  (what it did before it was told to forward the request unchanged);
+* with speculation, the orchestrator forwarding the request word for word
+  (``FORWARD_QUERY_INSTRUCTION``).
+
+A hit saves up to ``plan_ms`` per query; a miss is a wasted sub-agent run.
+
+    python -m benchmarks.bench_speculation [agent_ms] [plan_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+from src.agents.common.speculation import READ_ONLY_PREFIX, Speculator
+
+AGENTS = {
+    "http://calendar": "Calendar Agent",
+    "http://todoist": "Todoist Agent",
+    "http://gmail": "Gmail Agent",
+}
+
+# (user query, agents the orchestrator asks, how it rephrases the request)
+QUERIES = [
+    ("What meetings do I have today?", ["http://calendar"], "List today's events."),
+    ("Which tasks are overdue?", ["http://todoist"], "Get overdue tasks."),
+    ("Did Arda email me today?", ["http://gmail"], "Search for today's mail."),
+    (
+        "What does my day look like?",
+        ["http://calendar", "http://todoist", "http://gmail"],
+        "Summarise today.",
+    ),
+    ("Am I free on Friday afternoon?", ["http://calendar"], "Check Friday 12-18h."),
+    # Not speculated: it changes state.
+    ("Add a task to call John", ["http://todoist"], "Create task: call John."),
+]
+
+
+class StandInClient:
+    def __init__(self, agent_ms: int):
+        self._agent_info_cache = {url: {"name": name} for url, name in AGENTS.items()}
+        self.agent_s = agent_ms / 1000
+        self.runs = 0
+
+    async def send_message(self, agent_url: str, message: str) -> str:
+        self.runs += 1
+        await asyncio.sleep(self.agent_s)
+        return f"{agent_url}: {message.removeprefix(READ_ONLY_PREFIX)}"
+
+    async def create_task(self, session, agent_url: str, message: str) -> str:
+        # What A2AToolClient.create_task does with the current session.
+        if session is not None:
+            speculative = session.take(agent_url, message)
+            if speculative is not None:
+                return await speculative
+        return await self.send_message(agent_url, message)
+
+
+async def answer(
+    client: StandInClient,
+    speculator: Speculator | None,
+    query: str,
+    agents: list[str],
+    message: str,
+    plan_s: float,
+) -> float:
+    start = time.perf_counter()
+
+    async def orchestrate(session) -> None:
+        await asyncio.sleep(plan_s)
+        await asyncio.gather(
+            *(client.create_task(session, url, message) for url in agents)
+        )
+
+    if speculator is None:
+        await orchestrate(None)
+    else:
+        async with speculator.session(query) as session:
+            await orchestrate(session)
+    return time.perf_counter() - start
+
+
+async def run(label: str, agent_ms: int, plan_ms: int, mode: str | None) -> None:
+    client = StandInClient(agent_ms)
+    speculator = Speculator(client) if mode else None
+    total = 0.0
+    for query, agents, rephrased in QUERIES:
+        message = query if mode == "verbatim" else rephrased
+        total += await answer(
+            client, speculator, query, agents, message, plan_ms / 1000
+        )
+    line = (
+        f"{label:26}: {total / len(QUERIES) * 1000:5.0f}ms per query, "
+        f"{client.runs:2d} sub-agent runs"
+    )
+    if speculator is not None:
+        stats = speculator.stats()
+        line += (
+            f", hit rate {stats['hit_rate']:.0%} "
+            f"({stats['hits']}/{stats['speculated_calls']}), "
+            f"{stats['wasted_calls']} wasted runs"
+        )
+        if mode == "verbatim":
+            assert stats["wasted_calls"] == 0, stats
+    print(line)
+
+
+async def main(agent_ms: int, plan_ms: int) -> None:
+    print(f"{len(QUERIES)} queries, agents {agent_ms}ms, planning {plan_ms}ms")
+    await run("no speculation", agent_ms, plan_ms, None)
+    await run("speculation, rephrased", agent_ms, plan_ms, "rephrased")
+    await run("speculation, forwarded", agent_ms, plan_ms, "verbatim")
+
+
+if __name__ == "__main__":
+    argv = [int(a) for a in sys.argv[1:]]
+    asyncio.run(main(*(argv + [400, 600][len(argv) :])))
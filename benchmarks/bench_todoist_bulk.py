@@ -0,0 +1,82 @@
+"""
+One Sync API command batch vs one request per task change, against the
+Todoist Sync stand-in.
+
+The request: complete five tasks, reschedule ten to Monday, and add a task
+with a subtask (the subtask refers to its parent by temp id). One id is
+bogus to show per-command error reporting.
+
+    python -m benchmarks.bench_todoist_bulk [latency_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.todoist_standin import SYNC_URL, TodoistStandIn
+from src.agents.todoist_agent.mirror import TodoistMirror
+from src.agents.todoist_agent.models import TaskOperation
+
+
+def operations(task_ids: list[str]) -> list[TaskOperation]:
+    ops = [TaskOperation(action="complete", task_id=i) for i in task_ids[:5]]
+    ops += [
+        TaskOperation(action="update", task_id=i, due_string="next monday")
+        for i in task_ids[5:15]
+    ]
+    ops.append(TaskOperation(action="add", ref="trip", content="Plan Lisbon trip"))
+    ops.append(
+        TaskOperation(action="add", content="Book hotel", parent_id="trip", priority=4)
+    )
+    ops.append(TaskOperation(action="complete", task_id="does-not-exist"))
+    return ops
+
+
+async def main(latency: float) -> None:
+    results = {}
+    for mode in ("per-operation", "batched"):
+        standin = TodoistStandIn(latency=latency)
+        standin.populate(500)
+        path = os.path.join(tempfile.mkdtemp(), "todoist.json")
+        mirror = TodoistMirror("bench", SYNC_URL, path, transport=standin.transport())
+        await mirror.sync()
+        ids = [t["id"] for t in mirror.query(limit=15)]
+        commands = [op.to_command() for op in operations(ids)]
+        before = standin.requests
+
+        t0 = time.perf_counter()
+        if mode == "batched":
+            outcome = await mirror.commit(commands)
+        else:
+            # One request per change, as with one MCP tool call per task
+            # (temp ids can't span requests, so resolve them as we go).
+            outcome = {"sync_status": {}, "temp_id_mapping": {}}
+            for command in commands:
+                parent = command["args"].get("parent_id")
+                if parent in outcome["temp_id_mapping"]:
+                    command["args"]["parent_id"] = outcome["temp_id_mapping"][parent]
+                part = await mirror.commit([command])
+                outcome["sync_status"].update(part["sync_status"])
+                outcome["temp_id_mapping"].update(part["temp_id_mapping"])
+        elapsed = time.perf_counter() - t0
+
+        statuses = list(outcome["sync_status"].values())
+        subtask = next(
+            t for t in standin.items.values() if t["content"] == "Book hotel"
+        )
+        assert subtask["parent_id"] == outcome["temp_id_mapping"]["trip"]
+        assert statuses.count("ok") == len(commands) - 1
+        assert not any(i in mirror.tasks for i in ids[:5])
+        results[mode] = (elapsed, standin.requests - before)
+
+    for mode, (elapsed, requests) in results.items():
+        print(f"{mode:14}: {elapsed:7.3f}s  {requests} requests for 18 changes")
+
+
+if __name__ == "__main__":
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 150
+    asyncio.run(main(latency_ms / 1000))
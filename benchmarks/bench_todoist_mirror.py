@@ -0,0 +1,85 @@
+"""
+Local Todoist mirror vs full task-list fetches, against the Sync stand-in.
+
+The baseline is what ``todoist_get_tasks`` does for every lookup: fetch the
+whole active task list and filter it. The mirror syncs once, then applies
+incremental changes and answers from its indexes.
+
+    python -m benchmarks.bench_todoist_mirror [n_tasks] [latency_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from benchmarks.todoist_standin import SYNC_URL, TodoistStandIn
+from src.agents.todoist_agent.mirror import TodoistMirror
+
+
+async def main(n_tasks: int, latency: float) -> None:
+    standin = TodoistStandIn(latency=latency)
+    standin.populate(n_tasks)
+    path = os.path.join(tempfile.mkdtemp(), "todoist.json")
+    mirror = TodoistMirror("bench", SYNC_URL, path, transport=standin.transport())
+
+    t0 = time.perf_counter()
+    result = await mirror.sync()
+    print(f"full sync         : {time.perf_counter() - t0:7.3f}s  {result}")
+
+    # A change made elsewhere (e.g. through the MCP server) arrives incrementally.
+    task = next(iter(standin.items.values()))
+    standin.put("items", {**task, "content": "Call the dentist about Friday"})
+    done = list(standin.items.values())[1]
+    standin.put("items", {**done, "checked": True})
+    mirror.invalidate()
+    t0 = time.perf_counter()
+    result = await mirror.sync()
+    print(f"incremental sync  : {time.perf_counter() - t0:7.3f}s  {result}")
+    assert done["id"] not in mirror.tasks
+    assert mirror.find("dentist friday")[0]["id"] == task["id"]
+    # Writes are debounced; the incremental sync is on disk after a flush.
+    mirror.flush()
+    assert TodoistMirror("bench", SYNC_URL, path).stats()["tasks"] == len(mirror.tasks)
+
+    today = date.today().isoformat()
+
+    # Baseline: one full fetch + linear filter per question.
+    client = TodoistMirror("bench", SYNC_URL, os.devnull, transport=standin.transport())
+    t0 = time.perf_counter()
+    payload = await client._post({"sync_token": "*", "resource_types": '["items"]'})
+    overdue_scan = [
+        t for t in payload["items"] if t.get("due") and t["due"]["date"][:10] < today
+    ]
+    baseline = time.perf_counter() - t0
+
+    runs = 1_000
+    timings = {}
+    for label, fn in (
+        ("overdue", lambda: mirror.overdue()),
+        ("due today", lambda: mirror.due_today()),
+        ("p1 in project", lambda: mirror.query(priority=4, project="Project 3")),
+        ("fuzzy name", lambda: mirror.find("reviw the draft reprt")),
+    ):
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            fn()
+        timings[label] = (time.perf_counter() - t0) / runs
+
+    print(
+        f"baseline overdue  : {baseline * 1000:9.2f}ms  (full list of "
+        f"{len(payload['items'])} tasks + scan, {len(overdue_scan)} overdue)"
+    )
+    for label, seconds in timings.items():
+        print(f"mirror {label:11}: {seconds * 1000:9.3f}ms")
+    print(f"mirror stats      : {mirror.stats()}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 150
+    asyncio.run(main(n, latency_ms / 1000))
@@ -0,0 +1,166 @@
+"""
+In-process stand-in for the parts of Google Calendar v3 the agent uses.
+
+It implements ``calendarList.list``, ``events.list`` (with ``singleEvents``,
+``timeMin``, paging and the ``syncToken`` protocol, including 410 for unknown
+tokens) and ``freeBusy.query``, served through ``httpx.MockTransport``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from datetime import UTC, datetime, timedelta
+from urllib.parse import unquote
+
+import httpx
+
+BASE_URL = "http://standin/calendar/v3"
+
+
+def _end(event: dict) -> datetime:
+    end = event["end"]
+    if "dateTime" in end:
+        return datetime.fromisoformat(end["dateTime"])
+    return datetime.fromisoformat(end["date"]).replace(tzinfo=UTC)
+
+
+class CalendarStandIn:
+    def __init__(self, latency: float = 0.0, page_size: int = 250):
+        self.latency = latency
+        self.page_size = page_size
+        self.time_zones: dict[str, str] = {}
+        self.events: dict[str, dict[str, dict]] = {}
+        # Append-only change log; a sync token is an offset into it.
+        self.log: list[tuple[str, str]] = []
+        self.requests = 0
+
+    # -------------------- Fixture helpers --------------------
+
+    def add_calendar(self, calendar_id: str, time_zone: str = "UTC") -> None:
+        self.time_zones[calendar_id] = time_zone
+        self.events.setdefault(calendar_id, {})
+
+    def put_event(self, calendar_id: str, event: dict) -> None:
+        self.events[calendar_id][event["id"]] = event
+        self.log.append((calendar_id, event["id"]))
+
+    def cancel_event(self, calendar_id: str, event_id: str) -> None:
+        self.events[calendar_id][event_id]["status"] = "cancelled"
+        self.log.append((calendar_id, event_id))
+
+    def populate(
+        self, calendar_id: str, n_events: int, start: datetime, days: int, seed: int = 0
+    ) -> None:
+        """Add ``n_events`` random meetings (and some all-day events)."""
+        rng = random.Random(seed)
+        for i in range(n_events):
+            day = start + timedelta(days=rng.randrange(days))
+            event_id = f"{calendar_id[:8]}-{i}"
+            if rng.random() < 0.05:
+                self.put_event(
+                    calendar_id,
+                    {
+                        "id": event_id,
+                        "status": "confirmed",
+                        "summary": f"All-day {i}",
+                        "start": {"date": day.date().isoformat()},
+                        "end": {"date": (day + timedelta(days=1)).date().isoformat()},
+                        "transparency": rng.choice(["opaque", "transparent"]),
+                    },
+                )
+                continue
+            begin = day.replace(
+                hour=rng.randrange(7, 19), minute=rng.choice([0, 15, 30, 45])
+            )
+            self.put_event(
+                calendar_id,
+                {
+                    "id": event_id,
+                    "status": "confirmed",
+                    "summary": f"Meeting {i}",
+                    "start": {"dateTime": begin.isoformat()},
+                    "end": {
+                        "dateTime": (
+                            begin + timedelta(minutes=rng.choice([15, 30, 45, 60, 90]))
+                        ).isoformat()
+                    },
+                },
+            )
+
+    # -------------------- HTTP --------------------
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        path = request.url.path.removeprefix("/calendar/v3/")
+        params = request.url.params
+        if path == "users/me/calendarList":
+            items = [{"id": c, "timeZone": tz} for c, tz in self.time_zones.items()]
+            return httpx.Response(200, json={"items": items})
+        if path == "freeBusy":
+            return self._free_busy(json.loads(request.content))
+        if path.startswith("calendars/") and path.endswith("/events"):
+            calendar_id = unquote(path.split("/")[1])
+            return self._list_events(calendar_id, params)
+        return httpx.Response(404, json={"error": {"message": f"no route {path}"}})
+
+    def _list_events(
+        self, calendar_id: str, params: httpx.QueryParams
+    ) -> httpx.Response:
+        token = params.get("syncToken")
+        if token is not None:
+            offset = int(token) if token.isdigit() else -1
+            if not 0 <= offset <= len(self.log):
+                return httpx.Response(
+                    410, json={"error": {"message": "fullSyncRequired"}}
+                )
+            changed = dict.fromkeys(
+                event_id for cal, event_id in self.log[offset:] if cal == calendar_id
+            )
+            items = [self.events[calendar_id][event_id] for event_id in changed]
+        else:
+            time_min = params.get("timeMin")
+            lo = datetime.fromisoformat(time_min) if time_min else None
+            items = [
+                e
+                for e in self.events[calendar_id].values()
+                if e.get("status") != "cancelled" and (lo is None or _end(e) > lo)
+            ]
+        start = int(params.get("pageToken", 0))
+        page = items[start : start + self.page_size]
+        body: dict = {"items": page}
+        if start + self.page_size < len(items):
+            body["nextPageToken"] = str(start + self.page_size)
+        else:
+            body["nextSyncToken"] = str(len(self.log))
+        return httpx.Response(200, json=body)
+
+    def _free_busy(self, body: dict) -> httpx.Response:
+        lo = datetime.fromisoformat(body["timeMin"])
+        hi = datetime.fromisoformat(body["timeMax"])
+        calendars = {}
+        for item in body.get("items", []):
+            busy = []
+            for event in self.events.get(item["id"], {}).values():
+                if (
+                    "dateTime" not in event["start"]
+                    or event.get("status") == "cancelled"
+                ):
+                    continue
+                start = datetime.fromisoformat(event["start"]["dateTime"])
+                end = datetime.fromisoformat(event["end"]["dateTime"])
+                if start < hi and end > lo:
+                    busy.append(
+                        {
+                            "start": start.astimezone(UTC).isoformat(),
+                            "end": end.astimezone(UTC).isoformat(),
+                        }
+                    )
+            calendars[item["id"]] = {"busy": busy}
+        return httpx.Response(200, json={"calendars": calendars})
@@ -0,0 +1,522 @@
+"""
+Local stand-in for the parts of the GitHub REST API the Obsidian agent uses.
+
+The vault is held as real git objects (blobs, trees and commits with git's
+SHA-1 object ids) behind ``refs/heads/main``, and served by a Starlette app:
+
+* ``GET /repos/{owner}/{repo}/contents/{path}`` — folder listings and files;
+* ``GET /repos/{owner}/{repo}/commits/{ref}`` — JSON, or the bare SHA with
+  ``Accept: application/vnd.github.sha``;
+* ``GET /repos/{owner}/{repo}/git/trees/{sha}[?recursive=1]`` — recursive
+  listings are truncated past ``truncate_at`` entries, like GitHub's;
+* the Git Data API writes: ``POST git/blobs``, ``git/trees`` (with
+  ``base_tree``, inline ``content`` and ``sha: null`` deletions) and
+  ``git/commits``, and ``PATCH git/refs/heads/{branch}``, which rejects
+  updates that are not a fast-forward unless ``force`` is set;
+* ``PUT``/``DELETE`` on contents, which require the current blob ``sha`` to
+  change an existing note, like GitHub's;
+* ``POST /graphql`` for the ``object(expression: $eN) { ... on Blob }``
+  aliases the bulk file fetch sends.
+
+Every successful GET carries an ``ETag``; a matching ``If-None-Match`` gets
+a bodiless ``304`` that is not charged to the rate limit. Responses carry
+``X-RateLimit-*`` headers for a budget of ``rate_limit`` requests per
+``rate_window`` seconds (``core`` and ``graphql`` counted separately), and
+requests over budget get GitHub's ``403`` until the window resets.
+
+Setting ``interfere`` to ``n`` makes the next ``n`` ``POST git/commits``
+calls first commit an unrelated note, as a concurrent writer would.
+
+``serve()`` runs the app with uvicorn on a background thread for clients
+that need a real socket (``requests``); every request sleeps ``latency``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextlib
+import hashlib
+import math
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+WORDS = [
+    "meeting",
+    "notes",
+    "project",
+    "roadmap",
+    "offsite",
+    "budget",
+    "review",
+    "hiring",
+    "design",
+    "launch",
+    "retro",
+    "customer",
+    "feedback",
+    "planning",
+    "journal",
+    "ideas",
+    "reading",
+    "research",
+    "metrics",
+    "quarter",
+]
+
+
+def _object_sha(kind: str, data: bytes) -> str:
+    return hashlib.sha1(b"%s %d\0" % (kind.encode(), len(data)) + data).hexdigest()
+
+
+class GitHubStandIn:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        truncate_at: int = 100_000,
+        rate_limit: int = 5000,
+        rate_window: float = 3600.0,
+    ):
+        self.latency = latency
+        self.truncate_at = truncate_at
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.used: Counter[str] = Counter()
+        self.not_modified = 0
+        self.charged = 0
+        self.window_start = time.time()
+        self.blobs: dict[str, bytes] = {}
+        # Tree SHA -> entries (name, mode, type, sha) in git order.
+        self.trees: dict[str, list[tuple[str, str, str, str]]] = {}
+        self.commits: dict[str, dict] = {}
+        self.refs: dict[str, str] = {}
+        self.requests: Counter[str] = Counter()
+        self.interfere = 0
+        self.owner = "owner"
+        self.repo = "vault"
+        self.commit_files({}, "Initial commit")
+
+    # -------------------- Git objects --------------------
+
+    def put_blob(self, data: bytes) -> str:
+        sha = _object_sha("blob", data)
+        self.blobs[sha] = data
+        return sha
+
+    def put_tree(self, entries: list[tuple[str, str, str, str]]) -> str:
+        # Git sorts tree entries by name, with trees compared as "name/".
+        entries = sorted(entries, key=lambda e: e[0] + ("/" if e[2] == "tree" else ""))
+        data = b"".join(
+            f"{mode} {name}".encode() + b"\0" + bytes.fromhex(sha)
+            for name, mode, _, sha in entries
+        )
+        sha = _object_sha("tree", data)
+        self.trees[sha] = entries
+        return sha
+
+    def build_tree(self, files: dict[str, str]) -> str:
+        """Tree SHA for a flat ``{path: blob sha}`` mapping."""
+        children: dict[str, dict[str, str]] = {}
+        entries = []
+        for path, sha in files.items():
+            head, sep, rest = path.partition("/")
+            if sep:
+                children.setdefault(head, {})[rest] = sha
+            else:
+                entries.append((head, "100644", "blob", sha))
+        for name, sub in children.items():
+            entries.append((name, "040000", "tree", self.build_tree(sub)))
+        return self.put_tree(entries)
+
+    def put_commit(self, tree: str, parents: list[str], message: str) -> str:
+        text = f"tree {tree}\n" + "".join(f"parent {p}\n" for p in parents)
+        text += f"author Stand In <standin@example.com> {len(self.commits)} +0000\n"
+        text += f"\n{message}\n"
+        sha = _object_sha("commit", text.encode())
+        self.commits[sha] = {"tree": tree, "parents": parents, "message": message}
+        return sha
+
+    def head(self) -> str:
+        return self.refs["heads/main"]
+
+    def files(self, commit: str | None = None) -> dict[str, str]:
+        """Flat ``{path: blob sha}`` of ``commit`` (the branch head by default)."""
+        tree = self.commits[commit or self.head()]["tree"]
+        return {
+            path: sha for path, kind, sha in self.walk(tree, "", True) if kind == "blob"
+        }
+
+    def walk(
+        self, tree: str, prefix: str, recursive: bool
+    ) -> Iterator[tuple[str, str, str]]:
+        for name, _, kind, sha in self.trees[tree]:
+            yield f"{prefix}{name}", kind, sha
+            if kind == "tree" and recursive:
+                yield from self.walk(sha, f"{prefix}{name}/", True)
+
+    def commit_files(self, changes: dict[str, str | None], message: str) -> str:
+        """Commit ``{path: text, or None to delete}`` on top of the head."""
+        files = self.files() if self.refs else {}
+        for path, text in changes.items():
+            if text is None:
+                files.pop(path, None)
+            else:
+                files[path] = self.put_blob(text.encode())
+        parents = [self.head()] if self.refs else []
+        commit = self.put_commit(self.build_tree(files), parents, message)
+        self.refs["heads/main"] = commit
+        return commit
+
+    def populate(self, n_notes: int, n_folders: int = 50, seed: int = 0) -> None:
+        rng = random.Random(seed)
+        folders = [""]
+        for i in range(n_folders):
+            parent = rng.choice(folders)
+            folders.append(f"{parent}/{rng.choice(WORDS)}-{i}".lstrip("/"))
+        changes: dict[str, str | None] = {}
+        for i in range(n_notes):
+            folder = rng.choice(folders)
+            title = f"{' '.join(rng.sample(WORDS, 3))} {i}"
+            body = "\n\n".join(
+                " ".join(rng.choices(WORDS, k=rng.randrange(20, 80)))
+                for _ in range(rng.randrange(1, 6))
+            )
+            changes[f"{folder}/{title}.md".lstrip("/")] = f"# {title}\n\n{body}\n"
+        self.commit_files(changes, "Populate vault")
+
+    # -------------------- HTTP --------------------
+
+    def app(self) -> Starlette:
+        base = "/repos/{owner}/{repo}"
+        return Starlette(
+            middleware=[Middleware(BaseHTTPMiddleware, dispatch=self.conditional)],
+            routes=[
+                Route("/graphql", self.graphql, methods=["POST"]),
+                Route(base, self.repository),
+                Route(
+                    f"{base}/contents/{{path:path}}",
+                    self.contents,
+                    methods=["GET", "PUT", "DELETE"],
+                ),
+                Route(f"{base}/contents", self.contents),
+                Route(f"{base}/commits/{{ref}}", self.commit),
+                Route(f"{base}/git/trees/{{sha}}", self.tree),
+                Route(f"{base}/git/trees", self.create_tree, methods=["POST"]),
+                Route(f"{base}/git/blobs/{{sha}}", self.blob),
+                Route(f"{base}/git/blobs", self.create_blob, methods=["POST"]),
+                Route(f"{base}/git/commits/{{sha}}", self.git_commit),
+                Route(f"{base}/git/commits", self.create_commit, methods=["POST"]),
+                Route(f"{base}/git/ref/heads/{{branch:path}}", self.ref),
+                Route(
+                    f"{base}/git/refs/heads/{{branch:path}}",
+                    self.update_ref,
+                    methods=["PATCH"],
+                ),
+            ],
+        )
+
+    async def conditional(self, request: Request, call_next) -> Response:
+        """ETags and rate-limit accounting around every request."""
+        resource = "graphql" if request.url.path == "/graphql" else "core"
+        if time.time() >= self.window_start + self.rate_window:
+            self.window_start = time.time()
+            self.used.clear()
+        if self.used[resource] >= self.rate_limit:
+            self.requests["rate limited"] += 1
+            return JSONResponse(
+                {"message": "API rate limit exceeded"},
+                status_code=403,
+                headers=self._limit_headers(resource),
+            )
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = dict(response.headers)
+        if request.method == "GET" and response.status_code == 200:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if request.headers.get("if-none-match") == etag:
+                self.not_modified += 1
+                return Response(
+                    status_code=304,
+                    headers={"ETag": etag, **self._limit_headers(resource)},
+                )
+            headers["etag"] = etag
+        self.used[resource] += 1
+        self.charged += 1
+        headers.update(self._limit_headers(resource))
+        return Response(body, status_code=response.status_code, headers=headers)
+
+    def _limit_headers(self, resource: str) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(self.rate_limit - self.used[resource], 0)),
+            "X-RateLimit-Reset": str(math.ceil(self.window_start + self.rate_window)),
+            "X-RateLimit-Resource": resource,
+        }
+
+    async def _count(self, kind: str) -> None:
+        self.requests[kind] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _resolve(self, ref: str) -> str | None:
+        if ref == "HEAD":
+            return self.head()
+        if ref in self.commits:
+            return ref
+        return self.refs.get(f"heads/{ref}")
+
+    async def repository(self, request: Request) -> Response:
+        await self._count("repos")
+        return JSONResponse({"name": self.repo, "default_branch": "main"})
+
+    async def contents(self, request: Request) -> Response:
+        await self._count("contents")
+        path = request.path_params.get("path", "").strip("/")
+        files = self.files()
+        if request.method != "GET":
+            body = await request.json()
+            if path in files and body.get("sha") != files[path]:
+                return JSONResponse(
+                    {"message": '"sha" wasn\'t supplied.'}, status_code=422
+                )
+            if request.method == "DELETE":
+                if path not in files:
+                    return JSONResponse({"message": "Not Found"}, status_code=404)
+                commit = self.commit_files({path: None}, body["message"])
+            else:
+                text = base64.b64decode(body["content"]).decode()
+                commit = self.commit_files({path: text}, body["message"])
+            return JSONResponse({"commit": {"sha": commit}})
+        if path in files:
+            data = self.blobs[files[path]]
+            if request.headers.get("accept") == "application/vnd.github.raw":
+                return Response(data, media_type="text/plain")
+            return JSONResponse(
+                {
+                    "type": "file",
+                    "name": path.rpartition("/")[2],
+                    "path": path,
+                    "sha": files[path],
+                    "size": len(data),
+                    "encoding": "base64",
+                    "content": base64.encodebytes(data).decode(),
+                    "html_url": f"https://github.com/{path}",
+                }
+            )
+        tree = self.commits[self.head()]["tree"]
+        for part in filter(None, path.split("/")):
+            match = [e for e in self.trees[tree] if e[0] == part and e[2] == "tree"]
+            if not match:
+                return JSONResponse({"message": "Not Found"}, status_code=404)
+            tree = match[0][3]
+        return JSONResponse(
+            [
+                {
+                    "type": "dir" if kind == "tree" else "file",
+                    "name": name,
+                    "path": f"{path}/{name}".lstrip("/"),
+                    "sha": sha,
+                    "html_url": f"https://github.com/{path}/{name}",
+                }
+                for name, _, kind, sha in self.trees[tree]
+            ]
+        )
+
+    async def commit(self, request: Request) -> Response:
+        await self._count("commits")
+        sha = self._resolve(request.path_params["ref"])
+        if sha is None:
+            return JSONResponse({"message": "No commit found"}, status_code=422)
+        if request.headers.get("accept") == "application/vnd.github.sha":
+            return PlainTextResponse(sha)
+        commit = self.commits[sha]
+        return JSONResponse(
+            {
+                "sha": sha,
+                "commit": {
+                    "message": commit["message"],
+                    "tree": {"sha": commit["tree"]},
+                },
+                "parents": [{"sha": p} for p in commit["parents"]],
+            }
+        )
+
+    async def tree(self, request: Request) -> Response:
+        await self._count("git/trees")
+        sha = request.path_params["sha"]
+        if sha not in self.trees:
+            sha = self.commits.get(self._resolve(sha) or "", {}).get("tree", sha)
+        if sha not in self.trees:
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+        recursive = request.query_params.get("recursive") not in (None, "", "0")
+        entries = []
+        for path, kind, entry_sha in self.walk(sha, "", recursive):
+            entry = {"path": path, "type": kind, "sha": entry_sha}
+            entry["mode"] = "040000" if kind == "tree" else "100644"
+            if kind == "blob":
+                entry["size"] = len(self.blobs[entry_sha])
+            entries.append(entry)
+        truncated = len(entries) > self.truncate_at
+        return JSONResponse(
+            {"sha": sha, "tree": entries[: self.truncate_at], "truncated": truncated}
+        )
+
+    async def graphql(self, request: Request) -> Response:
+        await self._count("graphql")
+        body = await request.json()
+        variables = body.get("variables", {})
+        repository = {}
+        listings: dict[str, dict[str, str]] = {}
+        pattern = r"(\w+): object\(expression: \$(\w+)\)"
+        for alias, name in re.findall(pattern, body["query"]):
+            ref, _, path = variables[name].partition(":")
+            commit = self._resolve(ref)
+            if commit is not None and commit not in listings:
+                listings[commit] = self.files(commit)
+            sha = listings[commit].get(path) if commit else None
+            if sha is None:
+                repository[alias] = None
+                continue
+            data = self.blobs[sha]
+            truncated = len(data) > 512 * 1024
+            repository[alias] = {
+                "oid": sha,
+                "isBinary": False,
+                "isTruncated": truncated,
+                "text": None if truncated else data.decode(),
+            }
+        return JSONResponse({"data": {"repository": repository}})
+
+    async def blob(self, request: Request) -> Response:
+        await self._count("git/blobs")
+        data = self.blobs.get(request.path_params["sha"])
+        if data is None:
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+        return JSONResponse(
+            {
+                "sha": request.path_params["sha"],
+                "size": len(data),
+                "encoding": "base64",
+                "content": base64.encodebytes(data).decode(),
+            }
+        )
+
+    async def create_blob(self, request: Request) -> Response:
+        await self._count("git/blobs")
+        body = await request.json()
+        data = body["content"].encode()
+        if body.get("encoding") == "base64":
+            data = base64.b64decode(data)
+        return JSONResponse({"sha": self.put_blob(data)}, status_code=201)
+
+    async def create_tree(self, request: Request) -> Response:
+        await self._count("git/trees")
+        body = await request.json()
+        files: dict[str, str] = {}
+        if body.get("base_tree"):
+            files = {
+                p: sha
+                for p, kind, sha in self.walk(body["base_tree"], "", True)
+                if kind == "blob"
+            }
+        for entry in body["tree"]:
+            if "content" in entry:
+                files[entry["path"]] = self.put_blob(entry["content"].encode())
+            elif entry.get("sha") is None:
+                if files.pop(entry["path"], None) is None:
+                    return JSONResponse(
+                        {"message": "GitHub tree path not found"}, status_code=422
+                    )
+            else:
+                files[entry["path"]] = entry["sha"]
+        return JSONResponse({"sha": self.build_tree(files)}, status_code=201)
+
+    async def git_commit(self, request: Request) -> Response:
+        await self._count("git/commits")
+        commit = self.commits.get(request.path_params["sha"])
+        if commit is None:
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+        return JSONResponse(
+            {
+                "sha": request.path_params["sha"],
+                "tree": {"sha": commit["tree"]},
+                "parents": [{"sha": p} for p in commit["parents"]],
+                "message": commit["message"],
+            }
+        )
+
+    async def create_commit(self, request: Request) -> Response:
+        await self._count("git/commits")
+        if self.interfere:
+            self.interfere -= 1
+            self.commit_files(
+                {f"elsewhere/{len(self.commits)}.md": "# Edited elsewhere\n"},
+                "Concurrent edit",
+            )
+        body = await request.json()
+        sha = self.put_commit(body["tree"], body["parents"], body["message"])
+        return JSONResponse({"sha": sha}, status_code=201)
+
+    async def ref(self, request: Request) -> Response:
+        await self._count("git/refs")
+        sha = self.refs.get(f"heads/{request.path_params['branch']}")
+        if sha is None:
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+        return JSONResponse(
+            {
+                "ref": f"refs/heads/{request.path_params['branch']}",
+                "object": {"sha": sha, "type": "commit"},
+            }
+        )
+
+    async def update_ref(self, request: Request) -> Response:
+        await self._count("git/refs")
+        name = f"heads/{request.path_params['branch']}"
+        body = await request.json()
+        if not body.get("force") and not self.descends(body["sha"], self.refs[name]):
+            return JSONResponse(
+                {"message": "Update is not a fast forward"}, status_code=422
+            )
+        self.refs[name] = body["sha"]
+        return JSONResponse({"ref": f"refs/{name}", "object": {"sha": body["sha"]}})
+
+    def descends(self, commit: str, ancestor: str) -> bool:
+        pending = [commit]
+        while pending:
+            sha = pending.pop()
+            if sha == ancestor:
+                return True
+            pending.extend(self.commits[sha]["parents"])
+        return False
+
+    @contextlib.contextmanager
+    def serve(self) -> Iterator[str]:
+        """Serve the app on a free local port; yields the API base URL."""
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = uvicorn.Server(
+            uvicorn.Config(self.app(), port=port, log_level="warning")
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        try:
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            server.should_exit = True
+            thread.join()
@@ -0,0 +1,60 @@
+"""
+Local MCP server stand-in with a configurable number of tools.
+
+Each tool has a Gmail/Todoist-sized input schema and echoes its arguments
+after an optional delay, so benchmarks can measure protocol overhead
+without Node or network access.
+
+    python -m benchmarks.mcp_standin [n_tools] [tool_delay_ms] [transport] [port]
+
+``transport`` is ``stdio`` (default), ``sse`` or ``streamable-http``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from typing import Annotated
+
+from mcp.server.fastmcp import FastMCP
+from pydantic import Field
+
+
+def build(n_tools: int, delay: float, port: int = 8765) -> FastMCP:
+    server = FastMCP("mcp-standin", port=port, log_level="WARNING")
+
+    def make_tool(i: int):
+        async def tool(
+            query: Annotated[str, Field(description="Free-text query.")],
+            max_results: Annotated[int, Field(description="Page size.")] = 10,
+            labels: Annotated[
+                list[str] | None, Field(description="Labels to filter by.")
+            ] = None,
+            include_body: Annotated[
+                bool, Field(description="Return full bodies instead of snippets.")
+            ] = False,
+            page_token: Annotated[
+                str | None, Field(description="Token from a previous page.")
+            ] = None,
+        ) -> dict:
+            if delay:
+                await asyncio.sleep(delay)
+            return {"tool": i, "query": query, "max_results": max_results}
+
+        return tool
+
+    for i in range(n_tools):
+        server.add_tool(
+            make_tool(i),
+            name=f"tool_{i}",
+            description=f"Stand-in tool number {i}. " * 8,
+        )
+    return server
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    transport = sys.argv[3] if len(sys.argv) > 3 else "stdio"
+    port = int(sys.argv[4]) if len(sys.argv) > 4 else 8765
+    build(n, delay_ms / 1000, port).run(transport)
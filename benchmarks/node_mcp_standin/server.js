@@ -0,0 +1,51 @@
+#!/usr/bin/env node
+// Minimal MCP server over stdio (newline-delimited JSON-RPC): initialize,
+// tools/list and an echo tools/call. No dependencies, so it installs offline.
+const readline = require("readline");
+
+const pkg = require("./package.json");
+const nTools = Number(process.env.STANDIN_TOOLS || 20);
+const tools = Array.from({ length: nTools }, (_, i) => ({
+  name: `tool_${i}`,
+  description: `Stand-in tool number ${i}.`,
+  inputSchema: {
+    type: "object",
+    properties: { query: { type: "string", description: "Free-text query." } },
+    required: ["query"],
+  },
+}));
+
+function reply(id, result) {
+  process.stdout.write(JSON.stringify({ jsonrpc: "2.0", id, result }) + "\n");
+}
+
+function fail(id, code, message) {
+  process.stdout.write(
+    JSON.stringify({ jsonrpc: "2.0", id, error: { code, message } }) + "\n"
+  );
+}
+
+readline.createInterface({ input: process.stdin }).on("line", (line) => {
+  if (!line.trim()) return;
+  const msg = JSON.parse(line);
+  if (msg.id === undefined) return; // notification
+  switch (msg.method) {
+    case "initialize":
+      return reply(msg.id, {
+        protocolVersion: msg.params.protocolVersion,
+        capabilities: { tools: {} },
+        serverInfo: { name: pkg.name, version: pkg.version },
+      });
+    case "ping":
+      return reply(msg.id, {});
+    case "tools/list":
+      return reply(msg.id, { tools });
+    case "tools/call":
+      return reply(msg.id, {
+        content: [{ type: "text", text: JSON.stringify(msg.params.arguments) }],
+        isError: false,
+      });
+    default:
+      return fail(msg.id, -32601, `Method not found: ${msg.method}`);
+  }
+});
@@ -0,0 +1,217 @@
+"""
+In-process stand-in for the Todoist Sync API (``POST /api/v1/sync``).
+
+Implements incremental reads (``sync_token``/``resource_types``, where a
+token is an offset into a change log and ``"*"`` means full sync) and item
+write commands with ``temp_id`` resolution and per-command ``sync_status``,
+served through ``httpx.MockTransport``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from datetime import date, timedelta
+from urllib.parse import parse_qs
+
+import httpx
+
+SYNC_URL = "http://standin/api/v1/sync"
+
+WORDS = [
+    "call",
+    "dentist",
+    "pay",
+    "invoice",
+    "review",
+    "draft",
+    "report",
+    "email",
+    "team",
+    "plan",
+    "sprint",
+    "buy",
+    "groceries",
+    "book",
+    "flight",
+    "renew",
+    "passport",
+    "fix",
+    "bug",
+    "update",
+    "docs",
+    "prepare",
+    "slides",
+    "clean",
+    "garage",
+    "water",
+    "plants",
+    "schedule",
+    "meeting",
+    "send",
+    "contract",
+]
+
+
+class TodoistStandIn:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.items: dict[str, dict] = {}
+        self.projects: dict[str, dict] = {}
+        self.labels: dict[str, dict] = {}
+        self.log: list[tuple[str, str]] = []
+        self.requests = 0
+        self._next_id = 1000
+
+    # -------------------- Fixture helpers --------------------
+
+    def new_id(self) -> str:
+        self._next_id += 1
+        return str(self._next_id)
+
+    def put(self, kind: str, obj: dict) -> None:
+        getattr(self, kind)[obj["id"]] = obj
+        self.log.append((kind, obj["id"]))
+
+    def populate(self, n_tasks: int, n_projects: int = 20, seed: int = 0) -> None:
+        rng = random.Random(seed)
+        today = date.today()
+        for p in range(n_projects):
+            self.put("projects", {"id": f"p{p}", "name": f"Project {p}"})
+        for name in ("work", "home", "errand", "waiting"):
+            self.put("labels", {"id": f"l-{name}", "name": name})
+        for _ in range(n_tasks):
+            due = None
+            if rng.random() < 0.7:
+                day = today + timedelta(days=rng.randrange(-30, 60))
+                due = {
+                    "date": day.isoformat()
+                    if rng.random() < 0.8
+                    else f"{day.isoformat()}T{rng.randrange(8, 20):02d}:00:00",
+                    "string": "",
+                    "is_recurring": rng.random() < 0.1,
+                }
+            self.put(
+                "items",
+                {
+                    "id": self.new_id(),
+                    "content": " ".join(rng.sample(WORDS, 3)).capitalize(),
+                    "description": "",
+                    "project_id": f"p{rng.randrange(n_projects)}",
+                    "priority": rng.choice([1, 1, 1, 2, 3, 4]),
+                    "labels": rng.sample(["work", "home", "errand", "waiting"], 1),
+                    "due": due,
+                    "checked": False,
+                    "is_deleted": False,
+                },
+            )
+
+    # -------------------- HTTP --------------------
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        form = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+        body: dict = {}
+        self.handle_commands(json.loads(form.get("commands", "[]")), body)
+        if "resource_types" in form:
+            self.read(
+                form.get("sync_token", "*"), json.loads(form["resource_types"]), body
+            )
+        body["sync_token"] = str(len(self.log))
+        return httpx.Response(200, json=body)
+
+    def read(self, token: str, resource_types: list[str], body: dict) -> None:
+        full = token == "*" or not token.isdigit() or int(token) > len(self.log)
+        body["full_sync"] = full
+        for kind in resource_types:
+            store = getattr(self, kind)
+            if full:
+                body[kind] = [
+                    o
+                    for o in store.values()
+                    if not o.get("is_deleted") and not o.get("checked")
+                ]
+            else:
+                changed = dict.fromkeys(
+                    i for k, i in self.log[int(token) :] if k == kind
+                )
+                body[kind] = [store[i] for i in changed]
+
+    def handle_commands(self, commands: list[dict], body: dict) -> None:
+        status: dict = {}
+        mapping: dict[str, str] = {}
+        for command in commands:
+            args = {
+                k: mapping.get(v, v) if isinstance(v, str) else v
+                for k, v in command["args"].items()
+            }
+            kind = command["type"]
+            if kind == "item_add":
+                item = {
+                    "id": self.new_id(),
+                    "content": args["content"],
+                    "description": args.get("description", ""),
+                    "project_id": args.get("project_id", "p0"),
+                    "parent_id": args.get("parent_id"),
+                    "priority": args.get("priority", 1),
+                    "labels": args.get("labels", []),
+                    "due": _due(args.get("due")),
+                    "checked": False,
+                    "is_deleted": False,
+                }
+                mapping[command["temp_id"]] = item["id"]
+                self.put("items", item)
+                status[command["uuid"]] = "ok"
+                continue
+            item = self.items.get(args.get("id"))
+            if item is None or item.get("is_deleted"):
+                status[command["uuid"]] = {
+                    "error_code": 22,
+                    "error": "Item not found",
+                    "error_tag": "ITEM_NOT_FOUND",
+                    "http_code": 404,
+                }
+                continue
+            if kind == "item_update":
+                for key in ("content", "description", "priority", "labels"):
+                    if key in args:
+                        item[key] = args[key]
+                if "due" in args:
+                    item["due"] = _due(args["due"])
+            elif kind == "item_close":
+                item["checked"] = True
+            elif kind == "item_uncomplete":
+                item["checked"] = False
+            elif kind == "item_delete":
+                item["is_deleted"] = True
+            elif kind == "item_move":
+                item.update({k: v for k, v in args.items() if k != "id"})
+            else:
+                status[command["uuid"]] = {"error": f"unknown command {kind}"}
+                continue
+            self.put("items", dict(item))
+            status[command["uuid"]] = "ok"
+        if commands:
+            body["sync_status"] = status
+            body["temp_id_mapping"] = mapping
+
+
+def _due(due: dict | None) -> dict | None:
+    """Resolve the few due strings the benchmarks use."""
+    if not due:
+        return None
+    if "date" in due:
+        return {"date": due["date"], "string": due["date"], "is_recurring": False}
+    today = date.today()
+    offsets = {"today": 0, "tomorrow": 1}
+    if due["string"] in offsets:
+        day = today + timedelta(days=offsets[due["string"]])
+    else:  # "next monday" and anything else: the next Monday
+        day = today + timedelta(days=7 - today.weekday())
+    return {"date": day.isoformat(), "string": due["string"], "is_recurring": False}
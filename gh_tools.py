@@ -1,63 +1,29 @@
-import requests
+import asyncio
 import os
 
+import httpx
+
+from src.agents.obsidian_agent.github import GitHubApiError
+from src.agents.obsidian_agent.vault import render_folder_tree, vault_trees
+
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")  # Get token from environment variable
-BASE_URL = "https://api.github.com/repos"
 
 
-def get_github_folder_contents(owner, repo, path=""):
+async def get_github_folder_contents(owner, repo, path=""):
     """
     Fetches the contents of a given folder in a GitHub repository.
-    Recursively fetches contents of subfolders to build a complete tree.
+    The whole tree comes from one Git Trees API call, cached by tree SHA.
     """
-    url = f"{BASE_URL}/{owner}/{repo}/contents/{path}"
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-    }
-
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
-        contents = response.json()
-    except requests.exceptions.RequestException as e:
+        return await vault_trees.folder(owner, repo, path)
+    except (GitHubApiError, httpx.HTTPError) as e:
         print(f"Error fetching contents for {path}: {e}")
         return None
 
-    folder_tree = {}
-    for item in contents:
-        name = item["name"]
-        item_type = item["type"]
-        html_url = item["html_url"]  # Useful for direct links
-
-        if item_type == "dir":
-            # Recursively get contents of subdirectories
-            sub_folder_path = f"{path}/{name}" if path else name
-            folder_tree[name] = get_github_folder_contents(owner, repo, sub_folder_path)
-        elif item_type == "file":
-            folder_tree[name] = "file"  # You can store more info here if needed
-    return folder_tree
-
 
-def print_folder_tree(tree, indent=0, prefix="", is_last=True):
+def print_folder_tree(tree):
     """Prints the folder tree in an organized format using tree-style syntax."""
-    items = list(tree.items())
-    for i, (name, content) in enumerate(items):
-        is_last_item = i == len(items) - 1
-
-        # Choose the appropriate tree character
-        if is_last_item:
-            current_prefix = "└── "
-            next_prefix = "    "
-        else:
-            current_prefix = "├── "
-            next_prefix = "│   "
-
-        if content == "file":
-            print(f"{prefix}{current_prefix}{name}")
-        else:
-            print(f"{prefix}{current_prefix}{name}")
-            print_folder_tree(content, indent + 1, prefix + next_prefix, is_last_item)
+    print(render_folder_tree(tree))
 
 
 # --- Example Usage ---
@@ -69,9 +35,9 @@ if __name__ == "__main__":
     # Make sure to set your GITHUB_TOKEN environment variable
     if GITHUB_TOKEN:
         print(f"Listing contents of '{target_folder}' in '{owner}/{repo}':")
-        repo_tree = get_github_folder_contents(owner, repo, target_folder)
+        repo_tree = asyncio.run(get_github_folder_contents(owner, repo, target_folder))
 
-        if repo_tree:
+        if repo_tree is not None:
             print_folder_tree(repo_tree)
         else:
             print("Could not retrieve folder tree.")
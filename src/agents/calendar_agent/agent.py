@@ -1,15 +1,27 @@
 """Agent module."""
 
+from datetime import datetime, time
+from zoneinfo import ZoneInfo
+
 from pydantic_ai import Agent, RunContext
 
-from src.mcp_handler.mcp_gcal import server
+from src.mcp_handler.mcp_gcal import MUTATING_TOOLS, compactor, hooks, server
 from dotenv import load_dotenv
 
+from src.agents.common.google_api import GoogleApiError
+from src.agents.common.model import rate_limited
+from .slots import WorkingHours, find_slots, query_free_busy
+from .store import CalendarStore, parse_when
+
 load_dotenv(override=True)
 
+store = CalendarStore.from_env()
+hooks.on_result(store.invalidate, MUTATING_TOOLS)
+
 agent = Agent(
-    model="google-gla:gemini-2.5-flash",
+    model=rate_limited("google-gla:gemini-2.5-flash"),
     mcp_servers=[server],
+    tools=[compactor.retrieval_tool()],
 )
 
 
@@ -20,11 +32,19 @@ def review_agent_system_prompt(ctx: RunContext) -> str:
 
     The prompt provides detailed, step-by-step instructions for conducting a multi-phase PR review, including technical analysis, lint report evaluation, interactive feedback, risk assessment, and actionable review comment generation. It specifies the required comment format, outlines the use of available GitHub MCP tools, and defines the expected structure and tone for the agent's output. The prompt is dynamically populated with PR metadata from the provided context.
     """
-    return """
+    return f"""
 You are a Google Calendar agent.
 You are given a task to create a new event in Google Calendar.
 You are also given a list of events that are already in Google Calendar.
 You are also given a list of events that are already in Google Calendar.
+
+The current local time is {datetime.now().astimezone():%A %Y-%m-%d %H:%M %Z}.
+To answer questions about what is on the calendar in a time range, use
+`list_events_between`; it reads a locally synced copy of all calendars and is
+much faster than the MCP list/search tools. For availability questions and
+meeting scheduling ("when am I free Tuesday afternoon?") always use
+`find_free_slots` instead of reasoning over event lists yourself. Use the MCP
+tools to create, update and delete events.
 """
 
 
@@ -36,4 +56,107 @@ async def run_calendar_agent(task: str) -> str:
         return result.output
 
 
+@agent.tool
+async def list_events_between(
+    ctx: RunContext,
+    start: str,
+    end: str,
+    calendar_ids: list[str] | None = None,
+    query: str | None = None,
+) -> dict:
+    """List events overlapping a time range, across all calendars, by start time.
+
+    Args:
+        start: Range start as an ISO date or datetime (in the primary calendar's
+            zone if no offset).
+        end: Range end (exclusive) as an ISO date or datetime.
+        calendar_ids: Only include these calendars (default: all).
+        query: Only include events whose title or location contains this text.
+    """
+    try:
+        await store.ensure_fresh()
+        # Same zone as find_free_slots, so both tools read a bare time alike.
+        tz = store.time_zone()
+        lo, hi = parse_when(start, tz), parse_when(end, tz)
+        events = store.events_between(lo, hi, calendar_ids, query)
+    except (GoogleApiError, OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+    result = {"success": True, "events": [e.to_dict(tz) for e in events]}
+    window_start = store.window_start(calendar_ids)
+    if lo.timestamp() < window_start:
+        since = datetime.fromtimestamp(window_start, tz).date().isoformat()
+        result["note"] = (
+            f"Only events since {since} are stored locally; use the calendar "
+            "MCP tools for earlier events."
+        )
+    return result
+
+
+@agent.tool
+async def find_free_slots(
+    ctx: RunContext,
+    start: str,
+    end: str,
+    duration_minutes: int,
+    attendees: list[str] | None = None,
+    calendar_ids: list[str] | None = None,
+    working_hours_start: str = "09:00",
+    working_hours_end: str = "17:00",
+    include_weekends: bool = False,
+    time_zone: str | None = None,
+    limit: int = 10,
+) -> dict:
+    """Find free time slots of a given length across the user's calendars and attendees.
+
+    Args:
+        start: Search range start as an ISO date or datetime.
+        end: Search range end (exclusive) as an ISO date or datetime.
+        duration_minutes: Required meeting length in minutes.
+        attendees: Other people's email addresses whose free/busy must also be free.
+        calendar_ids: The user's calendars to consider busy (default: all).
+        working_hours_start: Earliest slot time of day (HH:MM) in ``time_zone``.
+        working_hours_end: Latest slot end time of day (HH:MM) in ``time_zone``.
+        include_weekends: Also search Saturdays and Sundays.
+        time_zone: IANA time zone for the range and working hours
+            (default: the primary calendar's zone).
+        limit: Maximum number of slots to return.
+    """
+    try:
+        await store.ensure_fresh()
+        tz = ZoneInfo(time_zone) if time_zone else store.time_zone()
+        lo, hi = parse_when(start, tz), parse_when(end, tz)
+        hours = WorkingHours(
+            time.fromisoformat(working_hours_start),
+            time.fromisoformat(working_hours_end),
+            frozenset(range(7 if include_weekends else 5)),
+        )
+        own = store.busy_intervals(lo, hi, calendar_ids)
+        others, unavailable = await query_free_busy(
+            store.api, attendees or [], lo.timestamp(), hi.timestamp()
+        )
+        slots = find_slots(
+            [own, *others.values()],
+            lo.timestamp(),
+            hi.timestamp(),
+            duration_minutes * 60,
+            tz,
+            hours,
+            limit=limit,
+        )
+    except (GoogleApiError, OSError, ValueError, KeyError) as e:
+        return {"success": False, "error": str(e)}
+    return {
+        "success": True,
+        "time_zone": tz.key,
+        "slots": [
+            {
+                "start": datetime.fromtimestamp(a, tz).isoformat(),
+                "free_until": datetime.fromtimestamp(b, tz).isoformat(),
+            }
+            for a, b in slots
+        ],
+        "unavailable_attendees": unavailable,
+    }
+
+
 app = agent.to_a2a()
@@ -0,0 +1,157 @@
+"""
+Deterministic free-slot finding.
+
+Busy intervals from any number of sources (the user's calendars from the local
+store, other attendees' free/busy) are merged with one sort-and-sweep pass,
+then swept against the working-hours windows of the requested range to yield
+the free gaps that can hold a meeting of the requested duration. All times are
+POSIX timestamps; working hours are interpreted in a given time zone, so DST
+changes and attendees in other zones are handled by the conversion alone.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from datetime import time as dt_time
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from src.agents.common.google_api import GoogleApiClient
+
+Interval = tuple[float, float]
+
+
+@dataclass(frozen=True)
+class WorkingHours:
+    """Daily working window, e.g. 09:00-17:00 Monday to Friday."""
+
+    start: dt_time = dt_time(9)
+    end: dt_time = dt_time(17)
+    weekdays: frozenset[int] = field(default_factory=lambda: frozenset(range(5)))
+
+    def windows(self, start: float, end: float, tz: ZoneInfo) -> list[Interval]:
+        """Working windows intersecting ``[start, end)``, in order."""
+        windows: list[Interval] = []
+        day = datetime.fromtimestamp(start, tz).date()
+        last = datetime.fromtimestamp(end, tz).date()
+        while day <= last:
+            if day.weekday() in self.weekdays:
+                lo = datetime.combine(day, self.start, tz).timestamp()
+                hi = datetime.combine(day, self.end, tz).timestamp()
+                lo, hi = max(lo, start), min(hi, end)
+                if lo < hi:
+                    windows.append((lo, hi))
+            day += timedelta(days=1)
+        return windows
+
+
+def merge_busy(*sources: Iterable[Interval]) -> list[Interval]:
+    """Merge overlapping or touching busy intervals from all sources."""
+    intervals = sorted(i for source in sources for i in source if i[1] > i[0])
+    merged: list[Interval] = []
+    for lo, hi in intervals:
+        if merged and lo <= merged[-1][1]:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def free_gaps(
+    busy: list[Interval], windows: list[Interval], min_length: float
+) -> list[Interval]:
+    """Sweep merged ``busy`` against sorted ``windows``; keep gaps >= min_length."""
+    gaps: list[Interval] = []
+    i = 0
+    for lo, hi in windows:
+        # Busy intervals ending before this window can't affect later ones either.
+        while i < len(busy) and busy[i][1] <= lo:
+            i += 1
+        cursor = lo
+        j = i
+        while j < len(busy) and busy[j][0] < hi:
+            if busy[j][0] - cursor >= min_length:
+                gaps.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if hi - cursor >= min_length:
+            gaps.append((cursor, hi))
+    return gaps
+
+
+def find_slots(
+    busy_sources: Iterable[Iterable[Interval]],
+    start: float,
+    end: float,
+    duration: float,
+    tz: ZoneInfo,
+    hours: WorkingHours | None = None,
+    granularity: float = 15 * 60,
+    limit: int | None = None,
+) -> list[Interval]:
+    """
+    Free gaps of at least ``duration`` seconds, with starts rounded up to
+    ``granularity``. ``hours=None`` treats the whole range as available.
+    """
+    # Drop intervals outside the range before the O(n log n) sort.
+    busy = merge_busy(
+        *(
+            [(lo, hi) for lo, hi in source if hi > start and lo < end]
+            for source in busy_sources
+        )
+    )
+    windows = hours.windows(start, end, tz) if hours else [(start, end)]
+    slots: list[Interval] = []
+    for lo, hi in free_gaps(busy, windows, duration):
+        aligned = _align(lo, granularity, tz)
+        if hi - aligned >= duration:
+            slots.append((aligned, hi))
+            if limit is not None and len(slots) >= limit:
+                break
+    return slots
+
+
+def _align(moment: float, granularity: float, tz: ZoneInfo) -> float:
+    """Round up to the next multiple of ``granularity`` past local midnight."""
+    if granularity <= 0:
+        return moment
+    local = datetime.fromtimestamp(moment, tz)
+    midnight = datetime.combine(local.date(), dt_time.min, tz).timestamp()
+    steps = -(-(moment - midnight) // granularity)
+    return midnight + steps * granularity
+
+
+async def query_free_busy(
+    api: GoogleApiClient, calendar_ids: list[str], start: float, end: float
+) -> tuple[dict[str, list[Interval]], list[str]]:
+    """
+    Busy intervals of other people's calendars via ``freeBusy.query``.
+
+    Returns the intervals per calendar and the calendars whose free/busy
+    could not be read (not shared, unknown address, ...).
+    """
+    if not calendar_ids:
+        return {}, []
+    body = {
+        "timeMin": datetime.fromtimestamp(start).astimezone().isoformat(),
+        "timeMax": datetime.fromtimestamp(end).astimezone().isoformat(),
+        "items": [{"id": c} for c in calendar_ids],
+    }
+    response: dict[str, Any] = await api.request("POST", "freeBusy", json_body=body)
+    busy: dict[str, list[Interval]] = {}
+    unavailable: list[str] = []
+    for calendar_id, entry in response.get("calendars", {}).items():
+        if entry.get("errors"):
+            unavailable.append(calendar_id)
+            continue
+        busy[calendar_id] = [
+            (
+                datetime.fromisoformat(b["start"]).timestamp(),
+                datetime.fromisoformat(b["end"]).timestamp(),
+            )
+            for b in entry.get("busy", [])
+        ]
+    return busy, unavailable
@@ -0,0 +1,432 @@
+"""
+Local Google Calendar event store.
+
+The store performs one full ``events.list`` per calendar, bounded to the last
+``history_days`` so decades of recurring instances are not expanded, then
+keeps itself up to date with the ``nextSyncToken`` incremental sync protocol
+(a 410 from the API means the token expired and triggers a bounded full
+resync of that calendar). Each calendar keeps its events in arrays sorted by
+start time, so "what is on between A and B" is two bisections and a short
+scan instead of an MCP round trip; the few events longer than
+``LONG_EVENT_SECONDS`` are kept aside so one multi-week event does not widen
+every scan. Event-mutating MCP tools invalidate the store, so the next query picks
+up the change through an incremental sync.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from datetime import UTC, date, datetime
+from datetime import time as dt_time
+from typing import Any
+from urllib.parse import quote
+from zoneinfo import ZoneInfo
+
+import logfire
+
+from src.agents.common.google_api import GoogleApiClient, GoogleApiError, GoogleAuth
+
+CALENDAR_API_BASE_URL = "https://www.googleapis.com/calendar/v3"
+EVENT_FIELDS = (
+    "nextPageToken,nextSyncToken,items(id,status,summary,location,start,end,"
+    "transparency,attendees(self,responseStatus))"
+)
+# Events longer than this are scanned linearly instead of widening the bisection.
+LONG_EVENT_SECONDS = 2 * 86400
+
+
+@dataclass(slots=True)
+class CalendarEvent:
+    """One (expanded) event instance; times are POSIX timestamps."""
+
+    id: str
+    calendar_id: str
+    summary: str
+    start: float
+    end: float
+    all_day: bool = False
+    location: str = ""
+    busy: bool = True
+
+    def to_dict(self, tz: ZoneInfo | None = None) -> dict[str, Any]:
+        if self.all_day:
+            start = datetime.fromtimestamp(self.start, tz).date().isoformat()
+            end = datetime.fromtimestamp(self.end, tz).date().isoformat()
+        else:
+            start = datetime.fromtimestamp(self.start, tz).isoformat()
+            end = datetime.fromtimestamp(self.end, tz).isoformat()
+        return {
+            "id": self.id,
+            "calendar_id": self.calendar_id,
+            "summary": self.summary,
+            "start": start,
+            "end": end,
+            "all_day": self.all_day,
+            "location": self.location,
+        }
+
+
+# Events persist as positional rows, in field order.
+_EVENT_COLUMNS = tuple(f.name for f in fields(CalendarEvent))
+
+
+def _parse_time(value: dict[str, str], tz: ZoneInfo) -> tuple[float, bool]:
+    """Return ``(timestamp, all_day)`` for an event ``start``/``end`` object."""
+    if "dateTime" in value:
+        moment = datetime.fromisoformat(value["dateTime"])
+        return moment.timestamp(), False
+    day = date.fromisoformat(value["date"])
+    return datetime.combine(day, dt_time.min, tz).timestamp(), True
+
+
+def event_from_api(
+    item: dict[str, Any], calendar_id: str, tz: ZoneInfo
+) -> CalendarEvent:
+    # All-day events carry only a date, which is midnight in the calendar's zone.
+    start, all_day = _parse_time(item["start"], tz)
+    end, _ = _parse_time(item["end"], tz)
+    declined = any(
+        a.get("self") and a.get("responseStatus") == "declined"
+        for a in item.get("attendees", [])
+    )
+    return CalendarEvent(
+        id=item["id"],
+        calendar_id=calendar_id,
+        summary=item.get("summary", ""),
+        start=start,
+        end=end,
+        all_day=all_day,
+        location=item.get("location", ""),
+        busy=item.get("transparency") != "transparent" and not declined,
+    )
+
+
+@dataclass
+class _CalendarIndex:
+    """Events of one calendar, with a lazily rebuilt start-sorted array."""
+
+    time_zone: str = "UTC"
+    sync_token: str | None = None
+    # Events ending before this were not requested by the last full sync.
+    window_start: float = 0.0
+    events: dict[str, CalendarEvent] = field(default_factory=dict)
+    _ordered: list[CalendarEvent] = field(default_factory=list, repr=False)
+    _starts: list[float] = field(default_factory=list, repr=False)
+    _long: list[CalendarEvent] = field(default_factory=list, repr=False)
+    _max_duration: float = 0.0
+    _dirty: bool = True
+
+    def put(self, event: CalendarEvent) -> None:
+        self.events[event.id] = event
+        self._dirty = True
+
+    def remove(self, event_id: str) -> None:
+        if self.events.pop(event_id, None) is not None:
+            self._dirty = True
+
+    def clear(self) -> None:
+        self.events.clear()
+        self._dirty = True
+
+    def overlapping(self, start: float, end: float) -> list[CalendarEvent]:
+        """Events with ``event.start < end`` and ``event.end > start``."""
+        if self._dirty:
+            self._ordered, self._long = [], []
+            for e in sorted(self.events.values(), key=lambda e: e.start):
+                if e.end - e.start > LONG_EVENT_SECONDS:
+                    self._long.append(e)
+                else:
+                    self._ordered.append(e)
+            self._starts = [e.start for e in self._ordered]
+            self._max_duration = max(
+                (e.end - e.start for e in self._ordered), default=0.0
+            )
+            self._dirty = False
+        # No event starting before start - max_duration can reach into the range;
+        # max_duration is at most LONG_EVENT_SECONDS, so the scan stays short.
+        lo = bisect.bisect_left(self._starts, start - self._max_duration)
+        hi = bisect.bisect_left(self._starts, end)
+        found = [e for e in self._ordered[lo:hi] if e.end > start]
+        long = [e for e in self._long if e.start < end and e.end > start]
+        if long:
+            found = sorted(found + long, key=lambda e: e.start)
+        return found
+
+
+class CalendarStore:
+    """Keeps a local, incrementally synced copy of the user's calendars."""
+
+    def __init__(
+        self,
+        api: GoogleApiClient,
+        path: str = ".cache/calendar_store.json",
+        max_age: float = 60.0,
+        history_days: float = 365.0,
+    ):
+        self.api = api
+        self.path = path
+        self.max_age = max_age
+        self.history_days = history_days
+        self.calendars: dict[str, _CalendarIndex] = {}
+        self.primary_calendar: str | None = None
+        self.synced_at = 0.0
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.queries = 0
+        self._invalidations = 0
+        self._lock = threading.Lock()
+        self._sync_lock: asyncio.Lock | None = None
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> CalendarStore:
+        auth = GoogleAuth(
+            keys_file=os.getenv(
+                "GOOGLE_OAUTH_CREDENTIALS",
+                "~/.config/google-calendar-mcp/gcp-oauth.keys.json",
+            ),
+            token_file=os.getenv(
+                "GCAL_TOKEN_FILE", "~/.config/google-calendar-mcp/tokens.json"
+            ),
+        )
+        api = GoogleApiClient(
+            os.getenv("CALENDAR_API_BASE_URL", CALENDAR_API_BASE_URL), auth
+        )
+        return cls(
+            api,
+            os.getenv("CALENDAR_STORE_PATH", ".cache/calendar_store.json"),
+            history_days=float(os.getenv("CALENDAR_HISTORY_DAYS", "365")),
+        )
+
+    # -------------------- Sync --------------------
+
+    async def sync(self) -> dict[str, int]:
+        """Sync every calendar; full sync without a token, incremental with one."""
+        if self._sync_lock is None:
+            self._sync_lock = asyncio.Lock()
+        async with self._sync_lock:
+            invalidations = self._invalidations
+            listed = await self._list_calendars()
+            with self._lock:
+                for calendar_id in set(self.calendars) - set(listed):
+                    del self.calendars[calendar_id]
+                for calendar_id, time_zone in listed.items():
+                    self.calendars.setdefault(
+                        calendar_id, _CalendarIndex(time_zone=time_zone)
+                    ).time_zone = time_zone
+            changes = await asyncio.gather(
+                *(self._sync_calendar(calendar_id) for calendar_id in listed)
+            )
+            # A mutation during the sync may not be included yet: stay stale.
+            if invalidations == self._invalidations:
+                self.synced_at = time.time()
+            with self._lock:
+                self._save()
+            return {"calendars": len(listed), "changed": sum(changes)}
+
+    async def ensure_fresh(self) -> None:
+        if time.time() - self.synced_at > self.max_age:
+            await self.sync()
+
+    def invalidate(self, *_: Any) -> None:
+        """Force an incremental sync before the next query.
+
+        Accepts and ignores ``(tool_name, arguments, result)`` so it can be
+        registered directly as a tool-call listener.
+        """
+        self._invalidations += 1
+        self.synced_at = 0.0
+
+    async def _list_calendars(self) -> dict[str, str]:
+        calendars: dict[str, str] = {}
+        page_token = None
+        while True:
+            params = {"fields": "nextPageToken,items(id,timeZone,primary)"}
+            if page_token:
+                params["pageToken"] = page_token
+            page = await self.api.get("users/me/calendarList", params)
+            for item in page.get("items", []):
+                calendars[item["id"]] = item.get("timeZone") or "UTC"
+                if item.get("primary"):
+                    self.primary_calendar = item["id"]
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return calendars
+
+    async def _sync_calendar(self, calendar_id: str) -> int:
+        index = self.calendars[calendar_id]
+        try:
+            return await self._list_events(calendar_id, index, index.sync_token)
+        except GoogleApiError as e:
+            if e.status_code != 410 or index.sync_token is None:
+                raise
+            logfire.info(
+                "calendar sync token expired for {calendar}", calendar=calendar_id
+            )
+            return await self._list_events(calendar_id, index, None)
+
+    async def _list_events(
+        self, calendar_id: str, index: _CalendarIndex, sync_token: str | None
+    ) -> int:
+        tz = ZoneInfo(index.time_zone)
+        path = f"calendars/{quote(calendar_id, safe='')}/events"
+        window_start = time.time() - self.history_days * 86400
+        items: list[dict[str, Any]] = []
+        page_token = None
+        while True:
+            # syncToken may not be combined with timeMin/timeMax/orderBy; the
+            # token keeps the timeMin of the full sync that issued it.
+            params: dict[str, Any] = {
+                "singleEvents": "true",
+                "maxResults": 2500,
+                "fields": EVENT_FIELDS,
+            }
+            if sync_token:
+                params["syncToken"] = sync_token
+            else:
+                params["timeMin"] = datetime.fromtimestamp(
+                    window_start, UTC
+                ).isoformat()
+            if page_token:
+                params["pageToken"] = page_token
+            page = await self.api.get(path, params)
+            items.extend(page.get("items", []))
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+
+        with self._lock:
+            if sync_token is None:
+                index.clear()
+                index.window_start = window_start
+                self.full_syncs += 1
+            else:
+                self.incremental_syncs += 1
+            for item in items:
+                if item.get("status") == "cancelled" or "start" not in item:
+                    index.remove(item["id"])
+                else:
+                    index.put(event_from_api(item, calendar_id, tz))
+            index.sync_token = page.get("nextSyncToken")
+        return len(items)
+
+    # -------------------- Queries --------------------
+
+    def events_between(
+        self,
+        start: datetime,
+        end: datetime,
+        calendar_ids: list[str] | None = None,
+        query: str | None = None,
+    ) -> list[CalendarEvent]:
+        """Events overlapping ``[start, end)`` across calendars, by start time."""
+        lo, hi = start.timestamp(), end.timestamp()
+        needle = query.lower() if query else None
+        found: list[CalendarEvent] = []
+        with self._lock:
+            self.queries += 1
+            for calendar_id, index in self.calendars.items():
+                if calendar_ids and calendar_id not in calendar_ids:
+                    continue
+                found.extend(
+                    e
+                    for e in index.overlapping(lo, hi)
+                    if needle is None
+                    or needle in e.summary.lower()
+                    or needle in e.location.lower()
+                )
+        found.sort(key=lambda e: (e.start, e.end))
+        return found
+
+    def busy_intervals(
+        self, start: datetime, end: datetime, calendar_ids: list[str] | None = None
+    ) -> list[tuple[float, float]]:
+        """``(start, end)`` of events that block time (not free, not declined)."""
+        return [
+            (e.start, e.end)
+            for e in self.events_between(start, end, calendar_ids)
+            if e.busy
+        ]
+
+    def window_start(self, calendar_ids: list[str] | None = None) -> float:
+        """Earliest time from which the store holds every event of the calendars."""
+        return max(
+            (
+                index.window_start
+                for calendar_id, index in self.calendars.items()
+                if not calendar_ids or calendar_id in calendar_ids
+            ),
+            default=0.0,
+        )
+
+    def time_zone(self, calendar_id: str | None = None) -> ZoneInfo:
+        """Zone of ``calendar_id``, or of the primary calendar by default."""
+        index = self.calendars.get(calendar_id or self.primary_calendar or "")
+        return ZoneInfo(index.time_zone if index else "UTC")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "calendars": len(self.calendars),
+                "events": sum(len(c.events) for c in self.calendars.values()),
+                "full_syncs": self.full_syncs,
+                "incremental_syncs": self.incremental_syncs,
+                "queries": self.queries,
+                "age_seconds": round(time.time() - self.synced_at, 1),
+            }
+
+    # -------------------- Persistence --------------------
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.primary_calendar = data.get("primary_calendar")
+        for calendar_id, raw in data.get("calendars", {}).items():
+            index = _CalendarIndex(
+                time_zone=raw["time_zone"],
+                sync_token=raw.get("sync_token"),
+                window_start=raw.get("window_start", 0.0),
+            )
+            for row in raw.get("events", []):
+                index.put(CalendarEvent(*row))
+            self.calendars[calendar_id] = index
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "primary_calendar": self.primary_calendar,
+            "calendars": {
+                calendar_id: {
+                    "time_zone": index.time_zone,
+                    "sync_token": index.sync_token,
+                    "window_start": index.window_start,
+                    "events": [
+                        [getattr(e, name) for name in _EVENT_COLUMNS]
+                        for e in index.events.values()
+                    ],
+                }
+                for calendar_id, index in self.calendars.items()
+            },
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # json.dumps uses the C encoder; json.dump streams in pure Python.
+            f.write(json.dumps(data))
+        os.replace(tmp_path, self.path)
+
+
+def parse_when(value: str, default_tz: ZoneInfo | None = None) -> datetime:
+    """Parse an ISO date or datetime; naive values are local (or ``default_tz``)."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=default_tz) if default_tz else parsed.astimezone()
+    return parsed
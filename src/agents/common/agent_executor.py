@@ -1,3 +1,5 @@
+from contextlib import nullcontext
+
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
@@ -9,6 +11,10 @@ from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 
+from src.agents.common.speculation import Speculator
+from src.core.rate_limit import Priority, priority
+from src.core.tool_timing import run_timed
+
 
 class PydanticAgentExecutor(AgentExecutor):
     def __init__(
@@ -16,6 +22,8 @@ class PydanticAgentExecutor(AgentExecutor):
         agent: Agent,
         status_message="Processing request...",
         artifact_name="response",
+        default_priority: Priority = Priority.DEFAULT,
+        speculator: Speculator | None = None,
     ):
         """Initialize a generic ADK agent executor.
 
@@ -23,10 +31,14 @@ class PydanticAgentExecutor(AgentExecutor):
             agent: The ADK agent instance
             status_message: Message to display while processing
             artifact_name: Name for the response artifact
+            default_priority: Rate-limiter priority for requests that don't carry one
+            speculator: Optional speculative prefetch of predicted sub-agent calls
         """
         self.agent = agent
         self.status_message = status_message
         self.artifact_name = artifact_name
+        self.default_priority = default_priority
+        self.speculator = speculator
         self.runner = Runner(
             app_name=agent.name,
             agent=agent,
@@ -49,9 +61,18 @@ class PydanticAgentExecutor(AgentExecutor):
                 TaskState.working,
                 new_agent_text_message(self.status_message, task.contextId, task.id),
             )
+            # Callers (e.g. the orchestrator) propagate their priority class
+            # in the message metadata so sub-agent model calls inherit it.
+            metadata = (context.message.metadata if context.message else None) or {}
+            level = metadata.get("priority", self.default_priority)
             # Directly invoke the pydantic agent
-            async with self.agent.run_mcp_servers():
-                result = await self.agent.run(query)
+            speculation = (
+                self.speculator.session(query) if self.speculator else nullcontext()
+            )
+            with priority(level):
+                async with speculation, self.agent.run_mcp_servers():
+                    # Logs per-turn wall-clock vs summed tool time.
+                    result, _ = await run_timed(self.agent, query)
             # Extract string output from result if needed
             response_text = result.output if hasattr(result, "output") else result
             await updater.add_artifact(
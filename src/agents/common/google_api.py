@@ -0,0 +1,158 @@
+"""
+Minimal async Google REST client shared by the native Gmail and Calendar tools.
+
+It reuses the OAuth client keys and the refresh tokens already written by the
+Gmail/Calendar MCP servers, keeps one pooled ``httpx.AsyncClient`` per event
+loop, and accepts a ``base_url`` (or ``transport``) so tests can point it at a
+local stand-in of the API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import weakref
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+TOKEN_URL = "https://oauth2.googleapis.com/token"
+
+
+class GoogleApiError(RuntimeError):
+    """Raised when a Google API call returns an error status."""
+
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"Google API error {status_code}: {body[:500]}")
+        self.status_code = status_code
+
+
+def _find_token_entry(data: dict[str, Any]) -> dict[str, Any]:
+    """Token files are either flat or nested by account (e.g. ``{"normal": {...}}``)."""
+    if "refresh_token" in data or "access_token" in data:
+        return data
+    for value in data.values():
+        if isinstance(value, dict) and (
+            "refresh_token" in value or "access_token" in value
+        ):
+            return value
+    return {}
+
+
+class GoogleAuth:
+    """Access-token provider backed by an OAuth keys file and a token file."""
+
+    def __init__(
+        self,
+        keys_file: str | None = None,
+        token_file: str | None = None,
+        access_token: str | None = None,
+    ):
+        self.keys_file = keys_file
+        self.token_file = token_file
+        self._access_token = access_token or os.getenv("GOOGLE_ACCESS_TOKEN")
+        # A token passed explicitly (e.g. for a stand-in server) never expires.
+        self._expires_at = float("inf") if self._access_token else 0.0
+        self._lock = asyncio.Lock()
+
+    async def token(self, client: httpx.AsyncClient) -> str:
+        if self._access_token and time.time() < self._expires_at - 60:
+            return self._access_token
+        async with self._lock:
+            if self._access_token and time.time() < self._expires_at - 60:
+                return self._access_token
+            await self._refresh(client)
+            return self._access_token
+
+    async def _refresh(self, client: httpx.AsyncClient) -> None:
+        keys = json.loads(Path(self.keys_file).expanduser().read_text())
+        keys = keys.get("installed") or keys.get("web") or keys
+        entry = _find_token_entry(
+            json.loads(Path(self.token_file).expanduser().read_text())
+        )
+        response = await client.post(
+            TOKEN_URL,
+            data={
+                "client_id": keys["client_id"],
+                "client_secret": keys["client_secret"],
+                "refresh_token": entry["refresh_token"],
+                "grant_type": "refresh_token",
+            },
+        )
+        if response.status_code != 200:
+            raise GoogleApiError(response.status_code, response.text)
+        payload = response.json()
+        self._access_token = payload["access_token"]
+        self._expires_at = time.time() + payload.get("expires_in", 3600)
+
+
+class GoogleApiClient:
+    """Pooled JSON client for one Google API (e.g. Gmail v1, Calendar v3)."""
+
+    def __init__(
+        self,
+        base_url: str,
+        auth: GoogleAuth,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.auth = auth
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.transport = transport
+        self.requests_sent = 0
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+
+    def http(self) -> httpx.AsyncClient:
+        """The pooled client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=self.timeout,
+                transport=self.transport,
+            )
+            self._clients[loop] = client
+        return client
+
+    async def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {await self.auth.token(self.http())}"}
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | list[tuple[str, Any]] | None = None,
+        json_body: Any = None,
+    ) -> dict[str, Any]:
+        url = path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+        self.requests_sent += 1
+        response = await self.http().request(
+            method, url, params=params, json=json_body, headers=await self.headers()
+        )
+        if response.status_code >= 400:
+            raise GoogleApiError(response.status_code, response.text)
+        if response.status_code == 204 or not response.content:
+            return {}
+        return response.json()
+
+    async def get(
+        self, path: str, params: dict[str, Any] | list[tuple[str, Any]] | None = None
+    ) -> dict[str, Any]:
+        return await self.request("GET", path, params=params)
+
+    async def aclose(self) -> None:
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
@@ -0,0 +1,96 @@
+"""Rate-limited model wrapper shared by every pydantic-ai agent."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import KnownModelName, Model, ModelRequestParameters
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+from src.core.rate_limit import (
+    Priority,
+    RateLimiter,
+    current_priority,
+    estimate_tokens,
+    limiter,
+)
+
+
+class RateLimitedModel(WrapperModel):
+    """
+    Routes every request of the wrapped model through the process-wide limiter.
+
+    ``priority`` is the default class for the agent; a priority set by the
+    caller through ``src.core.rate_limit.priority`` takes precedence.
+    """
+
+    def __init__(
+        self,
+        wrapped: Model | KnownModelName,
+        priority: Priority = Priority.DEFAULT,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        super().__init__(wrapped)
+        self.priority = priority
+        self.rate_limiter = rate_limiter or limiter
+
+    def _estimate(
+        self, messages: list[ModelMessage], model_settings: ModelSettings | None
+    ) -> int:
+        max_tokens = (model_settings or {}).get("max_tokens") or 0
+        return estimate_tokens([m.parts for m in messages]) + max_tokens
+
+    def _level(self) -> Priority:
+        return p if (p := current_priority.get()) is not None else self.priority
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        async with self.rate_limiter.slot(
+            self.model_name, self._estimate(messages, model_settings), self._level()
+        ) as slot:
+            try:
+                response = await self.wrapped.request(
+                    messages, model_settings, model_request_parameters
+                )
+            except ModelHTTPError as e:
+                if e.status_code == 429:
+                    self.rate_limiter.report_throttled(self.model_name)
+                raise
+            slot["actual_tokens"] = response.usage.total_tokens
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator:
+        async with self.rate_limiter.slot(
+            self.model_name, self._estimate(messages, model_settings), self._level()
+        ) as slot:
+            try:
+                async with self.wrapped.request_stream(
+                    messages, model_settings, model_request_parameters
+                ) as response_stream:
+                    yield response_stream
+                    slot["actual_tokens"] = response_stream.usage().total_tokens
+            except ModelHTTPError as e:
+                if e.status_code == 429:
+                    self.rate_limiter.report_throttled(self.model_name)
+                raise
+
+
+def rate_limited(
+    model: Model | KnownModelName, priority: Priority = Priority.DEFAULT
+) -> RateLimitedModel:
+    """Wrap ``model`` so its calls share the process-wide rate limiter."""
+    return RateLimitedModel(model, priority=priority)
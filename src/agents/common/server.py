@@ -9,6 +9,8 @@ from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard
 from pydantic_ai import Agent
 from src.agents.common.agent_executor import PydanticAgentExecutor
+from src.agents.common.speculation import Speculator
+from src.core.rate_limit import Priority
 
 servers = []
 
@@ -22,6 +24,8 @@ def create_agent_a2a_server(
     port=10020,
     status_message="Processing request...",
     artifact_name="response",
+    default_priority: Priority = Priority.DEFAULT,
+    speculator: Speculator | None = None,
 ):
     """Create an A2A server for any ADK agent.
 
@@ -34,6 +38,8 @@ def create_agent_a2a_server(
         port: Server port
         status_message: Message shown while processing
         artifact_name: Name for response artifacts
+        default_priority: Rate-limiter priority class for the agent's model calls
+        speculator: Optional speculative prefetch of predicted sub-agent calls
 
     Returns:
         A2AStarletteApplication instance
@@ -55,7 +61,11 @@ def create_agent_a2a_server(
 
     # Create executor with custom parameters
     executor = PydanticAgentExecutor(
-        agent=agent, status_message=status_message, artifact_name=artifact_name
+        agent=agent,
+        status_message=status_message,
+        artifact_name=artifact_name,
+        default_priority=default_priority,
+        speculator=speculator,
     )
 
     request_handler = DefaultRequestHandler(
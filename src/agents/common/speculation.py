@@ -0,0 +1,260 @@
+"""
+Speculative prefetch of sub-agent calls for the orchestration agent.
+
+When a query arrives, a cheap keyword classifier predicts which sub-agents
+the orchestrator will consult and starts read-only calls to them right away,
+in parallel with the orchestrator's first LLM call. The orchestrator's first
+``create_task`` to a predicted agent is then served from the in-flight
+result when it asks the same thing; speculation that is not used is cancelled
+as soon as the orchestrator asks that agent something else, or when the
+request ends. The orchestrator's prompt gets ``FORWARD_QUERY_INSTRUCTION``
+so that its first call forwards the user's request unchanged instead of a
+rephrasing that could not be served.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import logfire
+
+from src.core.rate_limit import Priority, priority
+
+if TYPE_CHECKING:
+    from src.agents.common.tool_client import A2AToolClient
+
+DEFAULT_RULES: dict[str, tuple[str, ...]] = {
+    "calendar": (
+        "meeting",
+        "calendar",
+        "event",
+        "appointment",
+        "free",
+        "busy",
+        "my day",
+        "my week",
+    ),
+    "todoist": (
+        "task",
+        "todo",
+        "to-do",
+        "due",
+        "overdue",
+        "todoist",
+        "my day",
+        "my week",
+    ),
+    "gmail": (
+        "email",
+        "e-mail",
+        "mail",
+        "inbox",
+        "unread",
+        "sent me",
+        "emailed",
+        "my day",
+    ),
+}
+
+# Anything that looks like it could change state is never speculated.
+MUTATING_PATTERN = re.compile(
+    r"\b(add|create|schedule|book|move|reschedule|update|change|edit|delete|remove|"
+    r"cancel|complete|finish|mark|send|reply|forward|draft|archive)\b",
+    re.IGNORECASE,
+)
+
+READ_ONLY_PREFIX = (
+    "Read-only request: answer using lookups only and do not create, modify, "
+    "send or delete anything.\n\n"
+)
+
+FORWARD_QUERY_INSTRUCTION = """
+**Forwarding requests:** For a request that only looks things up, make your first `create_task` call to each agent you need with the user's request copied word for word as the message, not a rephrasing; that call is answered from a lookup already in progress. Ask narrower follow-up questions after it only if its answer is not enough.
+"""
+
+current_session: ContextVar[SpeculationSession | None] = ContextVar(
+    "current_speculation_session", default=None
+)
+
+
+def is_mutating(text: str) -> bool:
+    return bool(MUTATING_PATTERN.search(text))
+
+
+def normalize_message(text: str) -> str:
+    """Case, whitespace and punctuation folded, without the read-only prefix."""
+    text = text.removeprefix(READ_ONLY_PREFIX)
+    return " ".join(re.sub(r"[^\w\s]", " ", text.casefold()).split())
+
+
+@dataclass
+class _Speculation:
+    agent_url: str
+    message: str
+    task: asyncio.Task
+    started: float
+    finished: float | None = None
+    used: bool = False
+    discarded: bool = False
+
+    def __post_init__(self) -> None:
+        self.task.add_done_callback(self._mark_finished)
+
+    def _mark_finished(self, _task: asyncio.Task) -> None:
+        self.finished = time.monotonic()
+
+
+@dataclass
+class SpeculationSession:
+    """The speculative calls started for one orchestrator request."""
+
+    query: str
+    started: float = field(default_factory=time.monotonic)
+    speculations: dict[str, _Speculation] = field(default_factory=dict)
+    head_start_seconds: float = 0.0
+
+    def take(self, agent_url: str, message: str) -> asyncio.Task | None:
+        """
+        Hand over the in-flight call to ``agent_url`` if it asked the same as ``message``.
+
+        A call that asked something else cannot serve this one or any later
+        one (the orchestrator has moved on), so it is cancelled and counted
+        as wasted when the session ends.
+        """
+        speculation = self.speculations.get(agent_url)
+        if speculation is None or speculation.used or speculation.discarded:
+            return None
+        if is_mutating(message) or normalize_message(message) != normalize_message(
+            speculation.message
+        ):
+            speculation.discarded = True
+            speculation.task.cancel()
+            return None
+        speculation.used = True
+        self.head_start_seconds += time.monotonic() - speculation.started
+        return speculation.task
+
+
+@dataclass
+class SpeculationStats:
+    sessions: int = 0
+    speculated_calls: int = 0
+    hits: int = 0
+    wasted_calls: int = 0
+    wasted_seconds: float = 0.0
+    head_start_seconds: float = 0.0
+    session_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "sessions": self.sessions,
+            "speculated_calls": self.speculated_calls,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.speculated_calls, 3)
+            if self.speculated_calls
+            else 0.0,
+            "wasted_calls": self.wasted_calls,
+            "wasted_seconds": round(self.wasted_seconds, 3),
+            "head_start_seconds": round(self.head_start_seconds, 3),
+            "avg_session_seconds": round(self.session_seconds / self.sessions, 3)
+            if self.sessions
+            else 0.0,
+        }
+
+
+class Speculator:
+    """Starts predicted sub-agent calls for each orchestrator request."""
+
+    def __init__(
+        self,
+        client: A2AToolClient,
+        rules: dict[str, tuple[str, ...]] | None = None,
+        max_speculations: int = 3,
+    ):
+        self.client = client
+        self.rules = rules or DEFAULT_RULES
+        self.max_speculations = max_speculations
+        self._stats = SpeculationStats()
+
+    @classmethod
+    def from_env(cls, client: A2AToolClient) -> Speculator | None:
+        """Build a speculator when ``ORCHESTRATOR_SPECULATION`` is enabled."""
+        if os.getenv("ORCHESTRATOR_SPECULATION", "").lower() in ("1", "true", "yes"):
+            return cls(client)
+        return None
+
+    def classify(self, query: str) -> list[str]:
+        """Return the sub-agent domains the query most likely needs."""
+        if is_mutating(query):
+            return []
+        text = query.lower()
+        scores = {
+            domain: sum(keyword in text for keyword in keywords)
+            for domain, keywords in self.rules.items()
+        }
+        ranked = sorted((d for d, s in scores.items() if s), key=lambda d: -scores[d])
+        return ranked[: self.max_speculations]
+
+    def resolve(self, domain: str) -> str | None:
+        """Map a domain to a registered agent URL using the cached agent cards."""
+        for url, card in self.client._agent_info_cache.items():
+            if card and domain in card.get("name", "").lower():
+                return url
+        return None
+
+    @asynccontextmanager
+    async def session(self, query: str) -> AsyncIterator[SpeculationSession]:
+        session = SpeculationSession(query=query)
+        # Speculation runs below interactive priority so real calls preempt it.
+        with priority(Priority.DEFAULT):
+            for domain in self.classify(query):
+                url = self.resolve(domain)
+                if url is None:
+                    continue
+                message = READ_ONLY_PREFIX + query
+                task = asyncio.create_task(self.client.send_message(url, message))
+                session.speculations[url] = _Speculation(
+                    url, message, task, time.monotonic()
+                )
+        if session.speculations:
+            logfire.debug(
+                "speculating {agents} for query",
+                agents=list(session.speculations),
+            )
+
+        token = current_session.set(session)
+        try:
+            yield session
+        finally:
+            current_session.reset(token)
+            self._finish(session)
+
+    def stats(self) -> dict[str, Any]:
+        return self._stats.as_dict()
+
+    def _finish(self, session: SpeculationSession) -> None:
+        now = time.monotonic()
+        stats = self._stats
+        stats.sessions += 1
+        stats.session_seconds += now - session.started
+        stats.head_start_seconds += session.head_start_seconds
+        for speculation in session.speculations.values():
+            stats.speculated_calls += 1
+            if speculation.used:
+                stats.hits += 1
+                continue
+            stats.wasted_calls += 1
+            stats.wasted_seconds += (speculation.finished or now) - speculation.started
+            if not speculation.task.done():
+                speculation.task.cancel()
+            elif not speculation.task.cancelled():
+                # Retrieve the exception (if any) so it isn't reported as unhandled.
+                speculation.task.exception()
@@ -1,5 +1,9 @@
+import asyncio
 import json
+import os
+import time
 import uuid
+from collections.abc import Callable
 from typing import Any
 
 import httpx
@@ -34,7 +38,7 @@ try:
                     pass
 
     # Expose decorator helper only if Logfire import succeeded
-    span = getattr(logfire, "instrument", lambda *a, **k: (lambda f: f))
+    span = getattr(logfire, "instrument", lambda *a, **k: lambda f: f)
 
 except ModuleNotFoundError:
     # Logfire not installed; define a no-op decorator so the rest of the code
@@ -51,16 +55,31 @@ except ModuleNotFoundError:
 from a2a.client import A2AClient
 from a2a.types import AgentCard, MessageSendParams, SendMessageRequest
 
+from src.agents.common.speculation import current_session
+from src.core.rate_limit import current_priority
+from src.core.tool_timing import record_queue_wait
+
 
 class A2AToolClient:
     """A2A client."""
 
-    def __init__(self, default_timeout: float = 120.0):
+    def __init__(
+        self, default_timeout: float = 120.0, max_parallel_per_agent: int | None = None
+    ):
         # Cache for agent metadata - also serves as the list of registered agents
         # None value indicates agent is registered but metadata not yet fetched
         self._agent_info_cache: dict[str, dict[str, Any] | None] = {}
         # Default timeout for requests (in seconds)
         self.default_timeout = default_timeout
+        # Callbacks notified after every create_task, e.g. to refresh the
+        # daily briefing when a sub-agent is asked to change something
+        self._mutation_listeners: list[Callable[[str, str], None]] = []
+        # Parallel create_task calls (one model turn can emit several) are
+        # capped per sub-agent; keyed by event loop as agents run on their own
+        self.max_parallel_per_agent = max_parallel_per_agent or int(
+            os.getenv("A2A_MAX_PARALLEL_PER_AGENT", "4")
+        )
+        self._agent_slots: dict[tuple, asyncio.Semaphore] = {}
 
     def _normalize_url(self, url: str) -> str:
         """Ensure the URL contains a scheme and has no trailing slash."""
@@ -112,6 +131,35 @@ class A2AToolClient:
         # a caller accidentally omits the scheme.
         agent_url = self._normalize_url(agent_url)
 
+        # Serve the call from a speculative prefetch if one is in flight
+        session = current_session.get()
+        if session is not None:
+            speculative = session.take(agent_url, message)
+            if speculative is not None:
+                return await speculative
+
+        key = (asyncio.get_running_loop(), agent_url)
+        slots = self._agent_slots.get(key)
+        if slots is None:
+            slots = self._agent_slots[key] = asyncio.Semaphore(
+                self.max_parallel_per_agent
+            )
+        queued_at = time.perf_counter()
+        async with slots:
+            record_queue_wait(time.perf_counter() - queued_at)
+            response = await self.send_message(agent_url, message)
+        for listener in self._mutation_listeners:
+            listener(agent_url, message)
+        return response
+
+    def add_mutation_listener(self, listener: Callable[[str, str], None]):
+        """Register ``listener(agent_url, message)`` to run after each task."""
+        self._mutation_listeners.append(listener)
+
+    async def send_message(self, agent_url: str, message: str) -> str:
+        """Send ``message`` to the agent at ``agent_url`` and return its text reply."""
+        agent_url = self._normalize_url(agent_url)
+
         # Configure httpx client with timeout
         timeout_config = httpx.Timeout(
             timeout=self.default_timeout,
@@ -150,6 +198,13 @@ class A2AToolClient:
                 }
             }
 
+            # Forward the caller's rate-limiter priority to the remote agent
+            level = current_priority.get()
+            if level is not None:
+                send_message_payload["message"]["metadata"] = {
+                    "priority": level.name.lower()
+                }
+
             # Create the request
             request = SendMessageRequest(
                 id=str(uuid.uuid4()), params=MessageSendParams(**send_message_payload)
@@ -1,15 +1,42 @@
 """Agent module."""
 
+from datetime import datetime
+
 from pydantic_ai import Agent, RunContext
 
-from src.mcp_handler.mcp_gmail import server
+from src.mcp_handler.mcp_gmail import compactor, server
 from dotenv import load_dotenv
 
+from src.agents.common.google_api import GoogleApiError
+from src.agents.common.model import rate_limited
+from .batch import GmailBatchFetcher
+from .index import GmailIndex
+
 load_dotenv(override=True)
 
+_index: GmailIndex | None = None
+_fetcher: GmailBatchFetcher | None = None
+
+
+def get_index() -> GmailIndex:
+    """The message index, opened on first use rather than at import."""
+    global _index
+    if _index is None:
+        _index = GmailIndex.from_env()
+    return _index
+
+
+def get_fetcher() -> GmailBatchFetcher:
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = GmailBatchFetcher.from_env(get_index().api)
+    return _fetcher
+
+
 agent = Agent(
-    model="google-gla:gemini-2.5-flash",
+    model=rate_limited("google-gla:gemini-2.5-flash"),
     mcp_servers=[server],
+    tools=[compactor.retrieval_tool()],
     name="gmail_agent",
 )
 
@@ -26,6 +53,12 @@ You are a Gmail agent.
 You are given a task to create a new email in Gmail.
 You are also given a list of emails that are already in Gmail.
 You are also given a list of emails that are already in Gmail.
+
+For lookups such as "has X emailed me today?" prefer the local index tools
+(`find_emails_from`, `find_emails_with_label`, `search_email_index`); they answer
+in milliseconds. To read several emails at once use `fetch_emails` with all the
+ids in one call instead of calling `read_email` once per message. Use the Gmail
+MCP tools to send, draft and modify emails.
 """
 
 
@@ -37,4 +70,142 @@ async def run_gmail_agent(task: str) -> str:
         return result.output
 
 
+def _since_timestamp(since_date: str | None) -> float | None:
+    if not since_date:
+        return None
+    return datetime.fromisoformat(since_date).timestamp()
+
+
+def _gmail_date(since_date: str | None) -> str:
+    if not since_date:
+        return ""
+    return f" after:{datetime.fromisoformat(since_date):%Y/%m/%d}"
+
+
+@agent.tool
+async def find_emails_from(
+    ctx: RunContext,
+    sender: str,
+    since_date: str | None = None,
+    limit: int = 20,
+) -> dict:
+    """Find emails from a sender (name or address), newest first.
+
+    Args:
+        sender: Sender name or email address (partial matches allowed).
+        since_date: Only include emails received on/after this ISO date (YYYY-MM-DD);
+            dates before the indexed window search the live mailbox.
+        limit: Maximum number of emails to return.
+    """
+    try:
+        index = get_index()
+        since = _since_timestamp(since_date)
+        await index.ensure_fresh()
+        messages = index.from_sender(sender, since, limit)
+        source = "index"
+        if not messages and not index.covers(since):
+            messages = await index.live_search(
+                f"from:{sender}{_gmail_date(since_date)}", limit
+            )
+            source = "live"
+    except (GoogleApiError, OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "source": source, "messages": messages}
+
+
+@agent.tool
+async def find_emails_with_label(
+    ctx: RunContext,
+    label: str,
+    since_date: str | None = None,
+    limit: int = 20,
+) -> dict:
+    """Find emails carrying a Gmail label id such as UNREAD, IMPORTANT, STARRED or INBOX.
+
+    Args:
+        label: The Gmail label id.
+        since_date: Only include emails received on/after this ISO date (YYYY-MM-DD);
+            dates before the indexed window search the live mailbox.
+        limit: Maximum number of emails to return.
+    """
+    try:
+        index = get_index()
+        since = _since_timestamp(since_date)
+        await index.ensure_fresh()
+        messages = index.with_label(label, since, limit)
+        source = "index"
+        if not messages and not index.covers(since):
+            messages = await index.live_search(
+                f"label:{label.lower()}{_gmail_date(since_date)}", limit
+            )
+            source = "live"
+    except (GoogleApiError, OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "source": source, "messages": messages}
+
+
+@agent.tool
+async def search_email_index(
+    ctx: RunContext,
+    query: str,
+    since_date: str | None = None,
+    limit: int = 20,
+) -> dict:
+    """Full-text search over sender, recipients, subject and snippet of indexed emails.
+
+    Args:
+        query: Words to search for.
+        since_date: Only include emails received on/after this ISO date (YYYY-MM-DD);
+            dates before the indexed window search the live mailbox.
+        limit: Maximum number of emails to return.
+    """
+    try:
+        index = get_index()
+        since = _since_timestamp(since_date)
+        await index.ensure_fresh()
+        messages = index.search(query, since, limit)
+        source = "index"
+        if not messages and not index.covers(since):
+            messages = await index.live_search(
+                f"{query}{_gmail_date(since_date)}", limit
+            )
+            source = "live"
+    except (GoogleApiError, OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "source": source, "messages": messages}
+
+
+@agent.tool
+async def fetch_emails(
+    ctx: RunContext,
+    message_ids: list[str],
+    include_body: bool = False,
+    download_attachments: bool = False,
+) -> dict:
+    """Fetch many emails by id in one batched request.
+
+    Args:
+        message_ids: The Gmail message ids to fetch.
+        include_body: Also return the plain-text body and attachment list.
+        download_attachments: Save attachments to disk and return their paths
+            (implies include_body).
+    """
+    include_body = include_body or download_attachments
+    try:
+        fetcher = get_fetcher()
+        messages = await fetcher.fetch_messages(message_ids, include_body)
+        if download_attachments:
+            for message in messages:
+                for attachment in message.get("attachments", []):
+                    if attachment["attachment_id"]:
+                        attachment["path"] = await fetcher.download_attachment(
+                            message["id"],
+                            attachment["attachment_id"],
+                            attachment["filename"],
+                        )
+    except (GoogleApiError, OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "messages": messages}
+
+
 app = agent.to_a2a()
@@ -0,0 +1,344 @@
+"""
+Native batched Gmail fetch.
+
+Instead of one MCP tool call (and one HTTP request) per message, messages are
+fetched through Gmail's batch endpoint: up to 50 ``messages.get`` calls are
+packed into one ``multipart/mixed`` request, several batches run concurrently
+over the shared connection pool, and only the needed ``format``/``fields`` are
+requested. Batch responses are parsed part by part as they arrive and each
+message is shaped as soon as its part is complete, so only one raw part is
+held at a time; large bodies and attachments are streamed to disk. Parts that
+fail with 429 or 5xx are sent again, on their own, with exponential backoff.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import os
+import random
+import re
+import uuid
+from collections.abc import AsyncIterator
+from typing import IO, Any
+from urllib.parse import urlencode
+
+import pydantic_core
+
+from src.agents.common.google_api import GoogleApiClient, GoogleApiError
+
+from .index import METADATA_HEADERS
+
+GMAIL_BATCH_URL = "https://gmail.googleapis.com/batch/gmail/v1"
+GMAIL_MESSAGES_PATH = "/gmail/v1/users/me/messages"
+MAX_BATCH_SIZE = 50  # Gmail rejects larger batches with 429s
+STREAM_CHUNK_BYTES = 64 * 1024
+# Per-part statuses worth sending again; Gmail throttles inside a batch.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+METADATA_FIELDS = "id,threadId,labelIds,snippet,internalDate,payload/headers"
+FULL_FIELDS = (
+    "id,threadId,labelIds,snippet,internalDate,"
+    "payload(headers,mimeType,filename,body,parts)"
+)
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class GmailBatchFetcher:
+    """Fetches many Gmail messages per HTTP request using the batch endpoint."""
+
+    def __init__(
+        self,
+        api: GoogleApiClient,
+        batch_url: str = GMAIL_BATCH_URL,
+        download_dir: str = ".cache/gmail_downloads",
+        batch_size: int = MAX_BATCH_SIZE,
+        max_concurrent_batches: int = 4,
+        inline_body_chars: int = 20_000,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+    ):
+        self.api = api
+        self.batch_url = batch_url
+        self.download_dir = download_dir
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_concurrent_batches = max_concurrent_batches
+        self.inline_body_chars = inline_body_chars
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    @classmethod
+    def from_env(cls, api: GoogleApiClient) -> GmailBatchFetcher:
+        return cls(
+            api,
+            batch_url=os.getenv("GMAIL_BATCH_URL", GMAIL_BATCH_URL),
+            download_dir=os.getenv("GMAIL_DOWNLOAD_DIR", ".cache/gmail_downloads"),
+        )
+
+    # -------------------- Public API --------------------
+
+    async def fetch_messages(
+        self, ids: list[str], include_body: bool = False
+    ) -> list[dict[str, Any]]:
+        """Fetch ``ids`` in as few requests as possible, preserving order."""
+        if include_body:
+            params = [("format", "full"), ("fields", FULL_FIELDS)]
+        else:
+            params = [("format", "metadata"), ("fields", METADATA_FIELDS)] + [
+                ("metadataHeaders", h) for h in METADATA_HEADERS
+            ]
+        chunks = [
+            ids[i : i + self.batch_size] for i in range(0, len(ids), self.batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+
+        async def run(chunk: list[str]) -> list[dict[str, Any]]:
+            return await self._batch_get(chunk, params, include_body, semaphore)
+
+        results = await asyncio.gather(*(run(c) for c in chunks))
+        return [message for chunk in results for message in chunk]
+
+    async def download_attachment(
+        self, message_id: str, attachment_id: str, filename: str
+    ) -> str:
+        """Stream one attachment to ``download_dir`` and return its path."""
+        os.makedirs(self.download_dir, exist_ok=True)
+        safe_name = re.sub(r"[^\w.\-]", "_", filename) or attachment_id[:16]
+        path = os.path.join(self.download_dir, f"{message_id}_{safe_name}")
+        url = f"{self.api.base_url}/messages/{message_id}/attachments/{attachment_id}"
+        self.api.requests_sent += 1
+        async with self.api.http().stream(
+            "GET", url, headers=await self.api.headers()
+        ) as response:
+            if response.status_code >= 400:
+                raise GoogleApiError(
+                    response.status_code, (await response.aread()).decode()
+                )
+            out = await asyncio.to_thread(open, path, "wb")
+            try:
+                await _stream_json_data_field(response.aiter_bytes(), out)
+            finally:
+                await asyncio.to_thread(out.close)
+        return path
+
+    # -------------------- Batch transport --------------------
+
+    async def _batch_get(
+        self,
+        ids: list[str],
+        params: list[tuple[str, str]],
+        include_body: bool,
+        semaphore: asyncio.Semaphore,
+    ) -> list[dict[str, Any]]:
+        """Fetch ``ids`` in one batch; re-send only parts that failed transiently."""
+        results: dict[int, dict[str, Any]] = {}
+        statuses: dict[int, int] = {}
+        pending = list(range(len(ids)))
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Full jitter, as in the LLM client, so batches don't retry in lockstep.
+                await asyncio.sleep(
+                    random.uniform(
+                        0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+                    )
+                )
+            async with semaphore:
+                parts = await self._send_batch(
+                    [ids[i] for i in pending], params, include_body
+                )
+            retry = []
+            for position, i in enumerate(pending):
+                status, message = parts.get(position, (0, None))
+                if status == 200 and message is not None:
+                    results[i] = message
+                    continue
+                statuses[i] = status
+                # A part missing from the response (status 0) is retried too.
+                if status in RETRY_STATUSES or status == 0:
+                    retry.append(i)
+            pending = retry
+            if not pending:
+                break
+
+        return [
+            results[i] if i in results else {"id": m, "error": f"status {statuses[i]}"}
+            for i, m in enumerate(ids)
+        ]
+
+    async def _send_batch(
+        self, ids: list[str], params: list[tuple[str, str]], include_body: bool
+    ) -> dict[int, tuple[int, dict[str, Any] | None]]:
+        """One batch request; ``(status, shaped message)`` per position in ``ids``."""
+        boundary = f"batch_{uuid.uuid4().hex}"
+        query = urlencode(params)
+        parts = []
+        for i, message_id in enumerate(ids):
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <item-{i}>\r\n\r\n"
+                f"GET {GMAIL_MESSAGES_PATH}/{message_id}?{query}\r\n\r\n"
+            )
+        body = "".join(parts) + f"--{boundary}--\r\n"
+
+        headers = await self.api.headers()
+        headers["Content-Type"] = f"multipart/mixed; boundary={boundary}"
+        self.api.requests_sent += 1
+        by_index: dict[int, tuple[int, dict[str, Any] | None]] = {}
+        async with self.api.http().stream(
+            "POST", self.batch_url, content=body.encode(), headers=headers
+        ) as response:
+            if response.status_code in RETRY_STATUSES:
+                # The whole batch was throttled: every part is retried.
+                await response.aread()
+                return {i: (response.status_code, None) for i in range(len(ids))}
+            if response.status_code >= 400:
+                raise GoogleApiError(
+                    response.status_code, (await response.aread()).decode()
+                )
+            content_type = response.headers.get("content-type", "")
+            async for index, (status, payload) in _iter_batch_parts(
+                response.aiter_bytes(STREAM_CHUNK_BYTES), content_type
+            ):
+                if status == 200 and payload is not None:
+                    payload = self._simplify(payload, include_body)
+                by_index[index] = (status, payload)
+        return by_index
+
+    # -------------------- Shaping --------------------
+
+    def _simplify(self, message: dict[str, Any], include_body: bool) -> dict[str, Any]:
+        if "error" in message:
+            return message
+        payload = message.get("payload", {})
+        headers = {h["name"].lower(): h["value"] for h in payload.get("headers", [])}
+        result: dict[str, Any] = {
+            "id": message["id"],
+            "thread_id": message.get("threadId"),
+            "from": headers.get("from", ""),
+            "to": headers.get("to", ""),
+            "subject": headers.get("subject", ""),
+            "date": headers.get("date", ""),
+            "labels": message.get("labelIds", []),
+            "snippet": message.get("snippet", ""),
+        }
+        if not include_body:
+            return result
+
+        text_parts: list[str] = []
+        attachments: list[dict[str, Any]] = []
+        stack = [payload]
+        while stack:
+            part = stack.pop(0)
+            stack.extend(part.get("parts", []))
+            body = part.get("body", {})
+            if part.get("filename"):
+                attachments.append(
+                    {
+                        "filename": part["filename"],
+                        "mime_type": part.get("mimeType"),
+                        "size": body.get("size", 0),
+                        "attachment_id": body.get("attachmentId"),
+                    }
+                )
+            elif part.get("mimeType") == "text/plain" and body.get("data"):
+                text_parts.append(_b64url_decode(body["data"]).decode(errors="replace"))
+        text = "\n".join(text_parts)
+        if len(text) > self.inline_body_chars:
+            os.makedirs(self.download_dir, exist_ok=True)
+            path = os.path.join(self.download_dir, f"{message['id']}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            result["body"] = text[: self.inline_body_chars]
+            result["body_truncated"] = True
+            result["body_path"] = path
+        else:
+            result["body"] = text
+        result["attachments"] = attachments
+        return result
+
+
+async def _iter_batch_parts(
+    chunks: AsyncIterator[bytes], content_type: str
+) -> AsyncIterator[tuple[int, tuple[int, Any]]]:
+    """
+    Yield ``(index, (status, json))`` for each part of a batch response.
+
+    Parts are split off as the chunks arrive, so memory holds the current
+    part and one chunk rather than the whole response.
+    """
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        raise GoogleApiError(500, f"batch response without boundary: {content_type}")
+    delimiter = f"--{match.group(1)}".encode()
+
+    buffer = bytearray()
+    scan = 0
+    async for chunk in chunks:
+        buffer += chunk
+        while (at := buffer.find(delimiter, scan)) >= 0:
+            part = bytes(buffer[:at])
+            del buffer[: at + len(delimiter)]
+            scan = 0
+            if part.strip():
+                yield _parse_part(part.lstrip())
+            if buffer.startswith(b"--"):  # the closing delimiter
+                return
+        # The delimiter may straddle the next chunk.
+        scan = max(0, len(buffer) - len(delimiter) + 1)
+    if buffer.strip() and not buffer.startswith(b"--"):
+        yield _parse_part(bytes(buffer).lstrip())
+
+
+def _parse_part(raw: bytes) -> tuple[int, tuple[int, Any]]:
+    outer_headers, _, http_message = raw.replace(b"\r\n", b"\n").partition(b"\n\n")
+    match = re.search(
+        rb"Content-ID:\s*<response-item-(\d+)>", outer_headers, re.IGNORECASE
+    )
+    index = int(match.group(1)) if match else -1
+    status_line, _, rest = http_message.lstrip().partition(b"\n")
+    status = int(status_line.split()[1]) if len(status_line.split()) > 1 else 0
+    _, _, body = rest.partition(b"\n\n")
+    try:
+        payload = pydantic_core.from_json(body.strip()) if body.strip() else None
+    except ValueError:
+        payload = None
+    return index, (status, payload)
+
+
+async def _stream_json_data_field(chunks, out: IO[bytes]) -> None:
+    """
+    Decode the base64url ``data`` field of a JSON body straight to ``out``.
+
+    Attachment responses look like ``{"size": n, "data": "<base64url>"}``; the
+    data is decoded in 4-byte-aligned slices so memory stays bounded by the
+    chunk size regardless of the attachment size.
+    """
+    marker = b'"data"'
+    state = "seek"
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        if state == "seek":
+            at = pending.find(marker)
+            if at < 0:
+                pending = pending[-len(marker) :]
+                continue
+            quote = pending.find(b'"', at + len(marker))
+            if quote < 0:
+                continue
+            pending = pending[quote + 1 :]
+            state = "data"
+        end = pending.find(b'"')
+        if end >= 0:
+            data = pending[:end]
+            out.write(base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4)))
+            return
+        usable = len(pending) - len(pending) % 4
+        out.write(base64.urlsafe_b64decode(pending[:usable]))
+        pending = pending[usable:]
@@ -0,0 +1,377 @@
+"""
+Local Gmail message index.
+
+Message metadata (from, to, subject, date, labels, snippet) is mirrored into
+SQLite with an FTS5 table for full-text search, and kept current through
+Gmail's incremental ``history.list`` sync starting from the last seen
+history id. Sender, label and date lookups are answered from the index in
+milliseconds. A miss is only worth a live ``messages.list`` search (whose
+results are added to the index) when the index has not been synced or the
+query reaches further back than the window the first sync mirrored; see
+``covers``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+import logfire
+
+from src.agents.common.google_api import GoogleApiClient, GoogleApiError, GoogleAuth
+
+GMAIL_API_BASE_URL = "https://gmail.googleapis.com/gmail/v1/users/me"
+METADATA_HEADERS = ("From", "To", "Cc", "Subject", "Date")
+MESSAGE_FIELDS = "id,threadId,historyId,internalDate,labelIds,snippet,payload/headers"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    thread_id TEXT,
+    history_id INTEGER,
+    internal_date INTEGER,
+    sender TEXT,
+    recipients TEXT,
+    subject TEXT,
+    snippet TEXT,
+    labels TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_date ON messages(internal_date);
+CREATE INDEX IF NOT EXISTS messages_sender ON messages(sender);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    sender, recipients, subject, snippet,
+    content='messages', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, sender, recipients, subject, snippet)
+    VALUES (new.rowid, new.sender, new.recipients, new.subject, new.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, sender, recipients, subject, snippet)
+    VALUES ('delete', old.rowid, old.sender, old.recipients, old.subject, old.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, sender, recipients, subject, snippet)
+    VALUES ('delete', old.rowid, old.sender, old.recipients, old.subject, old.snippet);
+    INSERT INTO messages_fts(rowid, sender, recipients, subject, snippet)
+    VALUES (new.rowid, new.sender, new.recipients, new.subject, new.snippet);
+END;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _record_from_message(message: dict[str, Any]) -> dict[str, Any]:
+    headers = {
+        h["name"].lower(): h["value"]
+        for h in message.get("payload", {}).get("headers", [])
+    }
+    recipients = ", ".join(v for v in (headers.get("to"), headers.get("cc")) if v)
+    return {
+        "id": message["id"],
+        "thread_id": message.get("threadId"),
+        "history_id": int(message.get("historyId", 0)),
+        "internal_date": int(message.get("internalDate", 0)),
+        "sender": headers.get("from", ""),
+        "recipients": recipients,
+        "subject": headers.get("subject", ""),
+        "snippet": message.get("snippet", ""),
+        "labels": ",".join(message.get("labelIds", [])),
+    }
+
+
+def _fts_query(text: str) -> str:
+    """Quote each term so user text can't be parsed as FTS5 syntax."""
+    terms = [t.replace('"', "") for t in text.split()]
+    return " ".join(f'"{t}"' for t in terms if t)
+
+
+class GmailIndex:
+    """SQLite/FTS5 mirror of Gmail message metadata with history-id sync."""
+
+    def __init__(
+        self,
+        path: str,
+        api: GoogleApiClient,
+        initial_days: int = 90,
+        max_age: float = 60.0,
+        fetch_concurrency: int = 10,
+    ):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.api = api
+        self.initial_days = initial_days
+        self.max_age = max_age
+        self.fetch_concurrency = fetch_concurrency
+        self.index_hits = 0
+        self.live_fallbacks = 0
+        self._lock = threading.Lock()
+        self._sync_lock: asyncio.Lock | None = None
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> GmailIndex:
+        auth = GoogleAuth(
+            keys_file=os.getenv(
+                "GOOGLE_OAUTH_CREDENTIALS", "~/.gmail-mcp/gcp-oauth.keys.json"
+            ),
+            token_file=os.getenv("GMAIL_TOKEN_FILE", "~/.gmail-mcp/credentials.json"),
+        )
+        api = GoogleApiClient(os.getenv("GMAIL_API_BASE_URL", GMAIL_API_BASE_URL), auth)
+        return cls(os.getenv("GMAIL_INDEX_PATH", ".cache/gmail_index.sqlite3"), api)
+
+    # -------------------- Sync --------------------
+
+    async def sync(self) -> dict[str, int]:
+        """Bring the index up to date; full sync first time, history sync after."""
+        if self._sync_lock is None:
+            self._sync_lock = asyncio.Lock()
+        async with self._sync_lock:
+            history_id = self._meta("history_id")
+            if history_id is None:
+                stats = await self._full_sync()
+            else:
+                try:
+                    stats = await self._history_sync(int(history_id))
+                except GoogleApiError as e:
+                    if e.status_code != 404:
+                        raise
+                    # History ids expire after about a week: start over.
+                    logfire.info("gmail history id expired; running full sync")
+                    stats = await self._full_sync()
+            now = time.time()
+            if self._meta("window_start") is None:
+                # Indexes built before the window was recorded cover at least this.
+                self._set_meta("window_start", str(now - self.initial_days * 86400))
+            self._set_meta("synced_at", str(now))
+            return stats
+
+    async def ensure_fresh(self) -> None:
+        synced_at = self._meta("synced_at")
+        if synced_at is None or time.time() - float(synced_at) > self.max_age:
+            await self.sync()
+
+    def covers(self, since: float | None = None) -> bool:
+        """
+        Whether the index holds every message received since ``since``.
+
+        True when a sync finished within ``max_age`` and ``since`` is inside
+        the mirrored window; no ``since`` means the window itself. Only then is
+        an empty lookup a real answer rather than a reason to ask Gmail.
+        """
+        synced_at = self._meta("synced_at")
+        window_start = self._meta("window_start")
+        if synced_at is None or window_start is None:
+            return False
+        if time.time() - float(synced_at) > self.max_age:
+            return False
+        return since is None or since >= float(window_start)
+
+    async def _full_sync(self) -> dict[str, int]:
+        started = time.time()
+        profile = await self.api.get("profile")
+        ids: list[str] = []
+        page_token = None
+        while True:
+            params = {"q": f"newer_than:{self.initial_days}d", "maxResults": 500}
+            if page_token:
+                params["pageToken"] = page_token
+            page = await self.api.get("messages", params)
+            ids.extend(m["id"] for m in page.get("messages", []))
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+        with self._lock:
+            self._db.execute("DELETE FROM messages")
+            self._db.commit()
+        await self._fetch_and_store(ids)
+        self._set_meta("history_id", str(profile["historyId"]))
+        self._set_meta("window_start", str(started - self.initial_days * 86400))
+        return {"added": len(ids), "deleted": 0, "relabeled": 0}
+
+    async def _history_sync(self, start_history_id: int) -> dict[str, int]:
+        added: set[str] = set()
+        deleted: set[str] = set()
+        relabeled: dict[str, list[str]] = {}
+        latest = start_history_id
+        page_token = None
+        while True:
+            params: list[tuple[str, Any]] = [("startHistoryId", start_history_id)]
+            params += [
+                ("historyTypes", t)
+                for t in (
+                    "messageAdded",
+                    "messageDeleted",
+                    "labelAdded",
+                    "labelRemoved",
+                )
+            ]
+            if page_token:
+                params.append(("pageToken", page_token))
+            page = await self.api.get("history", params)
+            latest = max(latest, int(page.get("historyId", latest)))
+            for record in page.get("history", []):
+                for item in record.get("messagesAdded", []):
+                    added.add(item["message"]["id"])
+                for item in record.get("messagesDeleted", []):
+                    deleted.add(item["message"]["id"])
+                for key in ("labelsAdded", "labelsRemoved"):
+                    for item in record.get(key, []):
+                        message = item["message"]
+                        relabeled[message["id"]] = message.get("labelIds", [])
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+
+        added -= deleted
+        with self._lock:
+            self._db.executemany(
+                "DELETE FROM messages WHERE id = ?", [(i,) for i in deleted]
+            )
+            self._db.executemany(
+                "UPDATE messages SET labels = ? WHERE id = ?",
+                [
+                    (",".join(labels), i)
+                    for i, labels in relabeled.items()
+                    if i not in deleted
+                ],
+            )
+            self._db.commit()
+        await self._fetch_and_store(sorted(added))
+        self._set_meta("history_id", str(latest))
+        return {
+            "added": len(added),
+            "deleted": len(deleted),
+            "relabeled": len(relabeled),
+        }
+
+    async def _fetch_and_store(self, ids: list[str]) -> None:
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+
+        async def fetch(message_id: str) -> dict[str, Any] | None:
+            async with semaphore:
+                try:
+                    return await self.api.get(
+                        f"messages/{message_id}",
+                        [("format", "metadata"), ("fields", MESSAGE_FIELDS)]
+                        + [("metadataHeaders", h) for h in METADATA_HEADERS],
+                    )
+                except GoogleApiError as e:
+                    if e.status_code == 404:
+                        return None
+                    raise
+
+        messages = await asyncio.gather(*(fetch(i) for i in ids))
+        self.upsert([m for m in messages if m is not None])
+
+    def upsert(self, messages: list[dict[str, Any]]) -> None:
+        records = [_record_from_message(m) for m in messages]
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO messages (id, thread_id, history_id, internal_date, sender,"
+                " recipients, subject, snippet, labels)"
+                " VALUES (:id, :thread_id, :history_id, :internal_date, :sender,"
+                " :recipients, :subject, :snippet, :labels)"
+                " ON CONFLICT(id) DO UPDATE SET history_id = excluded.history_id,"
+                " labels = excluded.labels, snippet = excluded.snippet",
+                records,
+            )
+            self._db.commit()
+
+    # -------------------- Queries --------------------
+
+    def from_sender(
+        self, sender: str, since: float | None = None, limit: int = 20
+    ) -> list[dict[str, Any]]:
+        return self._select("sender LIKE ?", [f"%{sender}%"], since=since, limit=limit)
+
+    def with_label(
+        self, label: str, since: float | None = None, limit: int = 20
+    ) -> list[dict[str, Any]]:
+        return self._select(
+            "(',' || labels || ',') LIKE ?",
+            [f"%,{label.upper()},%"],
+            since=since,
+            limit=limit,
+        )
+
+    def search(
+        self, text: str, since: float | None = None, limit: int = 20
+    ) -> list[dict[str, Any]]:
+        query = _fts_query(text)
+        if not query:
+            return []
+        return self._select(
+            "rowid IN (SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)",
+            [query],
+            since=since,
+            limit=limit,
+        )
+
+    async def live_search(self, query: str, limit: int = 20) -> list[dict[str, Any]]:
+        """Run a Gmail search against the API and add the hits to the index."""
+        self.live_fallbacks += 1
+        page = await self.api.get("messages", {"q": query, "maxResults": limit})
+        ids = [m["id"] for m in page.get("messages", [])]
+        await self._fetch_and_store(ids)
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        return self._select(f"id IN ({placeholders})", ids, limit=limit)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        return {
+            "messages": count,
+            "history_id": self._meta("history_id"),
+            "index_hits": self.index_hits,
+            "live_fallbacks": self.live_fallbacks,
+        }
+
+    # -------------------- Internals --------------------
+
+    def _select(
+        self, where: str, args: list[Any], since: float | None = None, limit: int = 20
+    ) -> list[dict[str, Any]]:
+        if since is not None:
+            where += " AND internal_date >= ?"
+            args = [*args, int(since * 1000)]
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, thread_id, internal_date, sender, recipients, subject,"
+                f" snippet, labels FROM messages WHERE {where}"
+                " ORDER BY internal_date DESC LIMIT ?",
+                [*args, limit],
+            ).fetchall()
+        results = []
+        for row in rows:
+            record = dict(row)
+            record["date"] = email.utils.formatdate(
+                record.pop("internal_date") / 1000, localtime=True
+            )
+            record["labels"] = record["labels"].split(",") if record["labels"] else []
+            results.append(record)
+        if results:
+            self.index_hits += 1
+        return results
+
+    def _meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+            self._db.commit()
@@ -4,20 +4,33 @@ from pydantic_ai import Agent, RunContext
 from dotenv import load_dotenv
 import logfire
 
-from src.mcp_handler.mcp_gmail import server
+from src.agents.common.model import rate_limited
+
+from src.mcp_handler.mcp_gmail import compactor, server
+from .models import NoteChange
 from .tools import (
+    GITHUB_TOKEN,
+    commit_notes_to_github,
     get_github_folder_contents,
-    print_folder_tree,
     get_github_file_contents,
+    get_github_files_contents,
+    search_github_notes,
+    get_note_neighbors,
+    get_note_backlinks,
+    get_notes_by_tag,
+    get_note_outline,
+    get_note_section,
     send_new_content_to_github,
     delete_note_from_github,
 )
+from .vault import render_folder_tree
 
 load_dotenv(override=True)
 
 agent = Agent(
-    model="google-gla:gemini-2.5-flash",
+    model=rate_limited("google-gla:gemini-2.5-flash"),
     mcp_servers=[server],
+    tools=[compactor.retrieval_tool()],
     name="obsidian_agent",
 )
 
@@ -43,7 +56,7 @@ async def run_obsidian_agent(task: str) -> str:
 
 
 @agent.tool
-def list_folder_tree(
+async def list_folder_tree(
     ctx: RunContext,
     folder: str = "meetings",
     owner: str = "connorbell133",
@@ -51,14 +64,14 @@ def list_folder_tree(
 ) -> dict:
     """List the folder tree of the given folder."""
     # Make sure to set your GITHUB_TOKEN environment variable
-    if ctx.deps.GITHUB_TOKEN:
+    if GITHUB_TOKEN:
         logfire.debug(f"Listing contents of '{folder}' in '{owner}/{repo}':")
-        repo_tree = get_github_folder_contents(owner, repo, folder)
+        repo_tree = await get_github_folder_contents(owner, repo, folder)
 
-        if repo_tree:
+        if repo_tree is not None:
             return {
                 "success": True,
-                "folder_tree": print_folder_tree(repo_tree),
+                "folder_tree": render_folder_tree(repo_tree),
             }
         else:
             return {
@@ -73,7 +86,7 @@ def list_folder_tree(
 
 
 @agent.tool
-def create_note(
+async def create_note(
     ctx: RunContext,
     note_path: str,
     content: str,
@@ -82,59 +95,186 @@ def create_note(
 ) -> dict:
     """Create a new note."""
     # create the note
-    response = send_new_content_to_github(note_path, content, owner, repo)
+    response = await send_new_content_to_github(note_path, content, owner, repo)
 
     return response
 
 
 @agent.tool
-def read_note(
+async def read_note(
+    ctx: RunContext,
+    note_path: str,
+    owner: str = "connorbell133",
+    repo: str = "obsidian",
+) -> dict:
+    """Get the full content of the given note.
+
+    For long notes such as journals or meeting logs, prefer note_outline and
+    read_note_section to fetch only the part you need.
+    """
+    return await get_github_file_contents(owner, repo, note_path)
+
+
+@agent.tool
+async def note_outline(
     ctx: RunContext,
     note_path: str,
+    max_level: int = 6,
+    owner: str = "connorbell133",
+    repo: str = "obsidian",
+) -> dict:
+    """The headings of a note, each with its byte range and estimated tokens.
+
+    Args:
+        note_path: The note to outline.
+        max_level: Deepest heading level listed; 2 keeps long journals short.
+    """
+    return await get_note_outline(owner, repo, note_path, max_level)
+
+
+@agent.tool
+async def read_note_section(
+    ctx: RunContext,
+    note_path: str,
+    heading: str | None = None,
+    start: int | None = None,
+    end: int | None = None,
+    owner: str = "connorbell133",
+    repo: str = "obsidian",
+) -> dict:
+    """Read one section of a note, or a byte range of it.
+
+    Args:
+        note_path: The note to read.
+        heading: Heading title of the section, subsections included; use
+            "Parent > Child" when a title repeats, e.g. "2024-05-02 > Actions".
+        start: First byte to read, when no heading is given.
+        end: Byte to stop before, when no heading is given.
+    """
+    return await get_note_section(owner, repo, note_path, heading, start, end)
+
+
+@agent.tool
+async def read_notes(
+    ctx: RunContext,
+    note_paths: list[str],
+    owner: str = "connorbell133",
+    repo: str = "obsidian",
+) -> dict:
+    """Get the content of several notes in one call; missing notes are null."""
+    return await get_github_files_contents(owner, repo, note_paths)
+
+
+@agent.tool
+async def search_notes(
+    ctx: RunContext,
+    query: str,
+    limit: int = 10,
+    owner: str = "connorbell133",
+    repo: str = "obsidian",
+) -> dict:
+    """Full-text search of the vault's notes.
+
+    Returns the best matching note paths, ranked, each with a snippet of the
+    matching text. Use it to find notes before reading them.
+
+    Args:
+        query: Words to look for, e.g. "Q3 offsite".
+        limit: Maximum number of results.
+    """
+    return await search_github_notes(owner, repo, query, limit)
+
+
+@agent.tool
+async def note_neighbors(
+    ctx: RunContext,
+    note: str,
+    depth: int = 1,
+    owner: str = "connorbell133",
+    repo: str = "obsidian",
+) -> dict:
+    """Notes connected to a note through [[wikilinks]].
+
+    Returns the note's tags, the notes it links to, the notes linking to it,
+    links that point to no note, and (for depth > 1) notes further away with
+    their distance. Use it for "related notes" questions.
+
+    Args:
+        note: Note path or name, e.g. "meetings/Q3 offsite" or "Q3 offsite".
+        depth: How many links away to look.
+    """
+    return await get_note_neighbors(owner, repo, note, depth)
+
+
+@agent.tool
+async def note_backlinks(
+    ctx: RunContext,
+    note: str,
     owner: str = "connorbell133",
     repo: str = "obsidian",
 ) -> dict:
-    """Get the content of the given note."""
-    return get_github_file_contents(owner, repo, note_path)
+    """The notes that link to the given note (path or name)."""
+    return await get_note_backlinks(owner, repo, note)
 
 
 @agent.tool
-def update_note(
+async def notes_by_tag(
+    ctx: RunContext,
+    tag: str | None = None,
+    owner: str = "connorbell133",
+    repo: str = "obsidian",
+) -> dict:
+    """Notes with a tag, inline or in frontmatter; nested tags are included.
+
+    Without a tag, returns every tag in the vault with its number of notes.
+    """
+    return await get_notes_by_tag(owner, repo, tag)
+
+
+@agent.tool
+async def update_note(
     ctx: RunContext,
     note_path: str,
     content: str,
     owner: str = "connorbell133",
     repo: str = "obsidian",
 ) -> dict:
-    """Update the content of the given note."""
-    # get the note content
-    note_content = read_note(note_path, owner, repo)
-    if not note_content["success"]:
-        return note_content
-
-    # update the note content
-    new_content = {
-        "success": True,
-        "file_contents": note_content["file_contents"] + content,
-    }
-
-    # send new content to github
-    response = send_new_content_to_github(
-        note_path, new_content["file_contents"], owner, repo
+    """Append content to the end of the given note."""
+    # read and append within one commit, so concurrent edits are not lost
+    return await commit_notes_to_github(
+        [NoteChange(path=note_path, action="append", content=content)], owner, repo
     )
 
-    return response
-
 
 @agent.tool
-def delete_note(
+async def delete_note(
     ctx: RunContext,
     note_path: str,
     owner: str = "connorbell133",
     repo: str = "obsidian",
 ) -> dict:
     """Delete the given note."""
-    return delete_note_from_github(note_path, owner, repo)
+    return await delete_note_from_github(note_path, owner, repo)
+
+
+@agent.tool
+async def write_notes(
+    ctx: RunContext,
+    changes: list[NoteChange],
+    message: str | None = None,
+    owner: str = "connorbell133",
+    repo: str = "obsidian",
+) -> dict:
+    """Write, append to or delete several notes as one commit.
+
+    Use this instead of calling create_note/update_note/delete_note once per
+    note whenever a request touches more than one note.
+
+    Args:
+        changes: The note changes, applied in order; all or none are committed.
+        message: Commit message; a summary of the changes by default.
+    """
+    return await commit_notes_to_github(changes, owner, repo, message)
 
 
 app = agent.to_a2a()
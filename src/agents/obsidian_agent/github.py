@@ -0,0 +1,313 @@
+"""
+This module contains the async GitHub client used by the Obsidian tools.
+
+* One ``httpx.AsyncClient`` per event loop with a bounded keep-alive pool,
+  shared by every tool call on that loop.
+* GET responses are cached with their ``ETag`` and revalidated with
+  ``If-None-Match``; a ``304 Not Modified`` is answered from the cache and
+  does not count against the rate limit. Blobs are cached by SHA and never
+  refetched.
+* The ``X-RateLimit-Remaining``/``X-RateLimit-Reset`` headers of every
+  response drive throttling: once fewer than ``min_remaining`` requests are
+  left, requests are spaced out so the budget lasts until the reset, and a
+  rate-limited response waits for ``Retry-After`` or the reset (up to
+  ``max_wait``) and retries.
+* ``files()`` fetches many notes in one GraphQL query per 100 paths.
+
+Args:
+    token: GitHub token; the same budget is shared by every caller.
+    api_url: Base URL of the REST API; GraphQL is served at ``/graphql``.
+    max_connections: Connections kept per event loop.
+
+Returns:
+    GitHubClient: ``await request(method, path, ...)``, ``blob(...)`` and
+    ``files(...)``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json as jsonlib
+import os
+import time
+import weakref
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+import logfire
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GRAPHQL_BATCH = 100
+
+
+class GitHubApiError(RuntimeError):
+    """Raised when the GitHub API returns an error status."""
+
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"GitHub API error {status_code}: {body[:500]}")
+        self.status_code = status_code
+
+
+class GitHubClient:
+    """Pooled, conditional and rate-limit aware access to the GitHub API."""
+
+    def __init__(
+        self,
+        token: str | None,
+        api_url: str = GITHUB_API_URL,
+        max_connections: int = 10,
+        etag_entries: int = 512,
+        blob_entries: int = 4096,
+        min_remaining: int = 100,
+        max_wait: float = 60.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.max_connections = max_connections
+        self.etag_entries = etag_entries
+        self.blob_entries = blob_entries
+        self.min_remaining = min_remaining
+        self.max_wait = max_wait
+        self.transport = transport
+        # Rate-limit resource ("core", "graphql") -> (remaining, reset epoch).
+        self.limits: dict[str, tuple[int, float]] = {}
+        self.requests_sent = 0
+        self.not_modified = 0
+        self.throttled = 0.0
+        # (url, accept) -> (etag, status, body, content type)
+        self._etags: OrderedDict[tuple[str, str], tuple[str, int, bytes, str]] = (
+            OrderedDict()
+        )
+        self._blobs: OrderedDict[str, bytes] = OrderedDict()
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_env(cls) -> GitHubClient:
+        return cls(
+            os.getenv("GITHUB_TOKEN"),
+            api_url=GITHUB_API_URL,
+            max_connections=int(os.getenv("GITHUB_MAX_CONNECTIONS", "10")),
+            min_remaining=int(os.getenv("GITHUB_MIN_RATE_REMAINING", "100")),
+        )
+
+    # -------------------- REST --------------------
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, str] | None = None,
+        json: Any = None,
+        accept: str = "application/vnd.github+json",
+    ) -> httpx.Response:
+        """Call the REST API; raises ``GitHubApiError`` on 4xx/5xx."""
+        url = str(httpx.URL(f"{self.api_url}{path}", params=params))
+        headers = {"Accept": accept, "X-GitHub-Api-Version": "2022-11-28"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        key = (url, accept)
+        cached = self._etags.get(key) if method == "GET" else None
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+        resource = "graphql" if path == "/graphql" else "core"
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            await self._throttle(resource)
+            self.requests_sent += 1
+            response = await self._http().request(
+                method, url, json=json, headers=headers
+            )
+            self._observe(response)
+            if response.status_code == 304 and cached is not None:
+                self.not_modified += 1
+                self._etags.move_to_end(key)
+                _, status, body, content_type = cached
+                return httpx.Response(
+                    status,
+                    content=body,
+                    headers={"Content-Type": content_type},
+                    request=response.request,
+                )
+            wait = self._rate_limited_for(response, resource)
+            if wait is not None and time.monotonic() + wait <= deadline:
+                logfire.warn("GitHub rate limit hit; waiting {wait:.1f}s", wait=wait)
+                self.throttled += wait
+                await asyncio.sleep(wait)
+                continue
+            break
+        if response.status_code >= 400:
+            raise GitHubApiError(response.status_code, response.text)
+        etag = response.headers.get("etag")
+        if method == "GET" and etag:
+            self._etags[key] = (
+                etag,
+                response.status_code,
+                response.content,
+                response.headers.get("content-type", ""),
+            )
+            self._etags.move_to_end(key)
+            while len(self._etags) > self.etag_entries:
+                self._etags.popitem(last=False)
+        return response
+
+    async def blob(self, owner: str, repo: str, sha: str) -> bytes:
+        """Contents of a blob; immutable, so cached by SHA."""
+        data = self._blobs.get(sha)
+        if data is None:
+            payload = (
+                await self.request("GET", f"/repos/{owner}/{repo}/git/blobs/{sha}")
+            ).json()
+            data = base64.b64decode(payload["content"])
+            self.remember_blob(sha, data)
+        else:
+            self._blobs.move_to_end(sha)
+        return data
+
+    def remember_blob(self, sha: str, data: bytes) -> None:
+        self._blobs[sha] = data
+        self._blobs.move_to_end(sha)
+        while len(self._blobs) > self.blob_entries:
+            self._blobs.popitem(last=False)
+
+    # -------------------- GraphQL --------------------
+
+    async def graphql(
+        self, query: str, variables: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        response = await self.request(
+            "POST", "/graphql", json={"query": query, "variables": variables or {}}
+        )
+        payload = response.json()
+        if payload.get("errors"):
+            raise GitHubApiError(response.status_code, jsonlib.dumps(payload["errors"]))
+        return payload["data"]
+
+    async def files(
+        self, owner: str, repo: str, paths: list[str], ref: str = "HEAD"
+    ) -> dict[str, str | None]:
+        """Text of many notes at ``ref``, 100 per GraphQL query; ``None`` if missing."""
+        found: dict[str, str | None] = {}
+        batches = [
+            paths[i : i + GRAPHQL_BATCH] for i in range(0, len(paths), GRAPHQL_BATCH)
+        ]
+        for batch in await asyncio.gather(
+            *(self._files_batch(owner, repo, b, ref) for b in batches)
+        ):
+            found.update(batch)
+        return found
+
+    async def _files_batch(
+        self, owner: str, repo: str, paths: list[str], ref: str
+    ) -> dict[str, str | None]:
+        params = ", ".join(f"$e{i}: String!" for i in range(len(paths)))
+        fields = " ".join(
+            f"f{i}: object(expression: $e{i}) "
+            "{ ... on Blob { oid text isBinary isTruncated } }"
+            for i in range(len(paths))
+        )
+        query = (
+            f"query($owner: String!, $name: String!, {params}) "
+            f"{{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+        )
+        variables: dict[str, Any] = {"owner": owner, "name": repo}
+        variables.update({f"e{i}": f"{ref}:{p}" for i, p in enumerate(paths)})
+        repository = (await self.graphql(query, variables))["repository"]
+        found: dict[str, str | None] = {}
+        for i, path in enumerate(paths):
+            blob = repository.get(f"f{i}")
+            if not blob or blob.get("isBinary"):
+                found[path] = None
+            elif blob.get("isTruncated") or blob.get("text") is None:
+                # GraphQL truncates large blobs; fetch those over REST.
+                found[path] = (await self.blob(owner, repo, blob["oid"])).decode()
+            else:
+                found[path] = blob["text"]
+                self.remember_blob(blob["oid"], blob["text"].encode())
+        return found
+
+    # -------------------- Rate limits --------------------
+
+    def _observe(self, response: httpx.Response) -> None:
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset = response.headers.get("x-ratelimit-reset")
+        if remaining is not None and reset is not None:
+            resource = response.headers.get("x-ratelimit-resource", "core")
+            self.limits[resource] = (int(remaining), float(reset))
+
+    async def _throttle(self, resource: str) -> None:
+        """Spread the requests left in the window evenly until its reset."""
+        remaining, reset_at = self.limits.get(resource, (None, 0.0))
+        if remaining is None or remaining > self.min_remaining:
+            return
+        window = reset_at - time.time()
+        if window <= 0 or remaining <= 0:
+            return
+        wait = min(window / remaining, self.max_wait)
+        self.throttled += wait
+        await asyncio.sleep(wait)
+
+    def _rate_limited_for(
+        self, response: httpx.Response, resource: str
+    ) -> float | None:
+        """Seconds (at most ``max_wait``) to wait before retrying, else ``None``.
+
+        A 403 is only a rate limit when GitHub says so: an exhausted budget or
+        a secondary rate limit message. Other 403s (permissions) are errors.
+        """
+        exhausted = response.headers.get("x-ratelimit-remaining") == "0"
+        if response.status_code == 403:
+            if not (exhausted or "rate limit" in response.text.lower()):
+                return None
+        elif response.status_code != 429:
+            return None
+        wait = _retry_after(response.headers.get("retry-after"))
+        if wait is None and exhausted:
+            reset_at = self.limits.get(resource, (0, 0.0))[1]
+            wait = max(reset_at - time.time(), 0.0) + 0.5
+        return None if wait is None else min(wait, self.max_wait)
+
+    def _http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=30.0,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._clients[loop] = client
+        return client
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests_sent,
+            "not_modified": self.not_modified,
+            "rate_remaining": {r: rem for r, (rem, _) in self.limits.items()},
+            "throttled_s": round(self.throttled, 3),
+        }
+
+
+def _retry_after(value: str | None) -> float | None:
+    """``Retry-After`` in seconds, from delay-seconds or an HTTP date."""
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return max(seconds, 0.0)
+
+
+github = GitHubClient.from_env()
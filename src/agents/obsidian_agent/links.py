@@ -0,0 +1,378 @@
+"""
+This module contains the link graph of the Obsidian vault.
+
+Every note is parsed once per blob SHA for its ``[[wikilinks]]`` (embeds,
+aliases and heading links included), relative Markdown links, inline
+``#tags`` and frontmatter ``tags``. Links are resolved the way Obsidian
+resolves them — by path, else by note name, preferring the linking note's
+folder and then the shortest path — into forward links and backlinks, and
+tags into tag membership, all held in memory.
+
+An update diffs the vault tree against the notes already parsed: only notes
+whose blob SHA changed are fetched and parsed, their edges are replaced, and
+links elsewhere that named an added or removed note are resolved again. The
+parsed notes are saved to ``path``, so a restart only fetches what changed.
+
+Args:
+    path: JSON file holding the parsed notes of every vault.
+    fetch_batch: Notes fetched and parsed per step of an update.
+
+Returns:
+    VaultLinks: ``await update(owner, repo, tree, fetch)``, then
+    ``neighbors``, ``backlinks`` and ``tagged`` for that vault.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import os
+import posixpath
+import re
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import Any
+from urllib.parse import unquote
+
+import logfire
+
+from .vault import VaultTree
+
+Fetch = Callable[[list[str]], Awaitable[dict[str, str | None]]]
+
+_FRONTMATTER = re.compile(r"\A---\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)", re.DOTALL)
+_CODE = re.compile(r"^(```|~~~).*?^\1|`[^`\n]*`", re.DOTALL | re.MULTILINE)
+_WIKILINK = re.compile(r"!?\[\[([^\]|#^\n]*)(?:[#^][^\]|\n]*)?(?:\|[^\]\n]*)?\]\]")
+_MDLINK = re.compile(r"\[[^\]\n]*\]\(<?([^)\s>]+?\.md)(?:#[^)\s>]*)?>?\)")
+_ATTACHMENTS = {
+    "png", "jpg", "jpeg", "gif", "svg", "webp", "bmp", "pdf", "mp3", "wav",
+    "m4a", "ogg", "mp4", "mov", "webm", "canvas", "excalidraw", "csv",
+}  # fmt: skip
+# Obsidian tags need a non-digit character and can't follow a word or a URL.
+_TAG = re.compile(r"(?<![\w/#&])#([\w/-]*[A-Za-z_/-][\w/-]*)")
+
+
+def parse_note(text: str) -> tuple[list[str], list[str]]:
+    """Link targets (as written) and lower-cased tags of one note."""
+    tags: list[str] = []
+    frontmatter = ""
+    match = _FRONTMATTER.match(text)
+    if match:
+        frontmatter = match.group(1)
+        tags.extend(_frontmatter_tags(frontmatter))
+        text = text[match.end() :]
+    prose = _CODE.sub(" ", text)
+    # Frontmatter properties can link to notes too.
+    links = [m.group(1).strip() for m in _WIKILINK.finditer(f"{frontmatter}\n{prose}")]
+    links += [unquote(m.group(1)) for m in _MDLINK.finditer(prose)]
+    tags += [t.strip("/").lower() for t in _TAG.findall(_WIKILINK.sub(" ", prose))]
+    return (
+        list(dict.fromkeys(link for link in links if link and not _attachment(link))),
+        list(dict.fromkeys(tag for tag in tags if tag)),
+    )
+
+
+def _attachment(target: str) -> bool:
+    return target.rpartition(".")[2].lower() in _ATTACHMENTS
+
+
+def _frontmatter_tags(block: str) -> list[str]:
+    lines = block.splitlines()
+    for i, line in enumerate(lines):
+        key, sep, value = line.partition(":")
+        if not sep or key.strip().lower() not in ("tags", "tag"):
+            continue
+        value = value.strip()
+        if value.startswith("["):
+            items = value.strip("[]").split(",")
+        elif value:
+            items = re.split(r"[,\s]+", value)
+        else:
+            items = []
+            for item in lines[i + 1 :]:
+                if not item.lstrip().startswith("-"):
+                    break
+                items.append(item.lstrip()[1:])
+        return [
+            item.strip().strip("'\"").lstrip("#").lower()
+            for item in items
+            if item.strip().strip("'\"")
+        ]
+    return []
+
+
+@functools.lru_cache(maxsize=65536)
+def _key(target: str) -> str:
+    """Case-insensitive form of a note path or name, without ``.md``."""
+    target = target.strip().strip("/").lower()
+    return target.removesuffix(".md")
+
+
+def _name(target: str) -> str:
+    return _key(target).rpartition("/")[2]
+
+
+class LinkGraph:
+    """Forward links, backlinks and tags of one vault."""
+
+    def __init__(self):
+        self.tree: str | None = None
+        # path -> (blob sha, link targets as written, tags)
+        self.notes: dict[str, tuple[str, list[str], list[str]]] = {}
+        self.links: dict[str, set[str]] = {}
+        self.backlinks: dict[str, set[str]] = {}
+        self.unresolved: dict[str, set[str]] = {}
+        self.tags: dict[str, set[str]] = {}
+        self._paths: dict[str, str] = {}  # key of the full path -> path
+        self._names: dict[str, set[str]] = {}  # key of the note name -> paths
+        self._linkers: dict[str, set[str]] = {}  # name linked to -> linking notes
+
+    def apply(
+        self,
+        added: dict[str, tuple[str, list[str], list[str]]],
+        removed: list[str],
+    ) -> None:
+        """Replace the notes in ``added`` and drop those in ``removed``."""
+        renamed = {_name(p) for p in removed if p in self.notes}
+        renamed |= {_name(p) for p in added if p not in self.notes}
+        for path in [*removed, *added]:
+            self._remove(path)
+        for path, note in added.items():
+            self._add(path, note)
+        # A note appearing or vanishing can change what other links point to.
+        stale = set().union(*(self._linkers.get(n, set()) for n in renamed))
+        for source in stale | set(added):
+            self._resolve_links(source)
+
+    def resolve(self, target: str, source: str | None = None) -> str | None:
+        """The note ``target`` points to, as Obsidian would pick it."""
+        key = _key(target)
+        if source is not None and "/" in key:
+            relative = _key(posixpath.normpath(posixpath.join(source, "..", target)))
+            if relative in self._paths:
+                return self._paths[relative]
+        if key in self._paths:
+            return self._paths[key]
+        candidates = self._names.get(key.rpartition("/")[2])
+        if not candidates:
+            return None
+        if "/" in key:
+            candidates = {c for c in candidates if _key(c).endswith(f"/{key}")}
+            if not candidates:
+                return None
+        if len(candidates) == 1:
+            return next(iter(candidates))
+        if source is not None:
+            folder = source.rpartition("/")[0]
+            near = [c for c in candidates if c.rpartition("/")[0] == folder]
+            if near:
+                return near[0]
+        return min(candidates, key=lambda c: (c.count("/"), len(c), c))
+
+    # -------------------- Internals --------------------
+
+    def _add(self, path: str, note: tuple[str, list[str], list[str]]) -> None:
+        self.notes[path] = note
+        self._paths[_key(path)] = path
+        self._names.setdefault(_name(path), set()).add(path)
+        for tag in note[2]:
+            self.tags.setdefault(tag, set()).add(path)
+        for target in note[1]:
+            self._linkers.setdefault(_name(target), set()).add(path)
+
+    def _remove(self, path: str) -> None:
+        note = self.notes.pop(path, None)
+        if note is None:
+            return
+        self._drop_links(path)
+        del self._paths[_key(path)]
+        _discard(self._names, _name(path), path)
+        for tag in note[2]:
+            _discard(self.tags, tag, path)
+        for target in note[1]:
+            _discard(self._linkers, _name(target), path)
+
+    def _resolve_links(self, source: str) -> None:
+        self._drop_links(source)
+        links, unresolved = set(), set()
+        for target in self.notes[source][1]:
+            resolved = self.resolve(target, source)
+            if resolved is None:
+                unresolved.add(target)
+            elif resolved != source:
+                links.add(resolved)
+        for target in links:
+            self.backlinks.setdefault(target, set()).add(source)
+        if links:
+            self.links[source] = links
+        if unresolved:
+            self.unresolved[source] = unresolved
+
+    def _drop_links(self, source: str) -> None:
+        for target in self.links.pop(source, ()):
+            _discard(self.backlinks, target, source)
+        self.unresolved.pop(source, None)
+
+
+def _discard(index: dict[str, set[str]], key: str, value: str) -> None:
+    values = index.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del index[key]
+
+
+class VaultLinks:
+    """Link graphs of the vaults, updated per changed blob SHA."""
+
+    def __init__(self, path: str | None, fetch_batch: int = 1000):
+        self.path = path
+        self.fetch_batch = fetch_batch
+        self._graphs: dict[str, LinkGraph] = {}
+        self._update_lock: asyncio.Lock | None = None
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> VaultLinks:
+        return cls(os.getenv("OBSIDIAN_LINKS_PATH", ".cache/obsidian_links.json"))
+
+    # -------------------- Updates --------------------
+
+    async def update(
+        self, owner: str, repo: str, tree: VaultTree, fetch: Fetch
+    ) -> dict[str, int]:
+        """Bring the graph of ``owner/repo`` in line with ``tree``."""
+        if self._update_lock is None:
+            self._update_lock = asyncio.Lock()
+        async with self._update_lock:
+            graph = self.graph(owner, repo)
+            stats = {"parsed": 0, "fetched": 0, "removed": 0}
+            if graph.tree == tree.sha:
+                return stats
+            start = time.perf_counter()
+            notes = {e.path: e.sha for e in tree.files() if e.path.endswith(".md")}
+            parsed = {sha: (links, tags) for sha, links, tags in graph.notes.values()}
+            changed = [
+                p for p, sha in notes.items() if graph.notes.get(p, ("",))[0] != sha
+            ]
+            added: dict[str, tuple[str, list[str], list[str]]] = {}
+            for i in range(0, len(changed), self.fetch_batch):
+                batch = changed[i : i + self.fetch_batch]
+                missing = [p for p in batch if notes[p] not in parsed]
+                if missing:
+                    texts = await fetch(missing)
+                    stats["fetched"] += len(missing)
+                    for path in missing:
+                        if texts.get(path) is not None:
+                            parsed[notes[path]] = parse_note(texts[path])
+                for path in batch:
+                    if notes[path] in parsed:
+                        added[path] = (notes[path], *parsed[notes[path]])
+            removed = [p for p in graph.notes if p not in notes]
+            graph.apply(added, removed)
+            graph.tree = tree.sha
+            stats["parsed"], stats["removed"] = len(added), len(removed)
+            await asyncio.to_thread(self._save)
+            logfire.info(
+                "Updated vault link graph {owner}/{repo}: {stats} in {ms:.0f}ms",
+                owner=owner,
+                repo=repo,
+                stats=stats,
+                ms=(time.perf_counter() - start) * 1000,
+            )
+            return stats
+
+    def graph(self, owner: str, repo: str) -> LinkGraph:
+        return self._graphs.setdefault(f"{owner}/{repo}", LinkGraph())
+
+    # -------------------- Queries --------------------
+
+    def neighbors(
+        self, owner: str, repo: str, note: str, depth: int = 1
+    ) -> dict[str, Any] | None:
+        """Notes within ``depth`` links of ``note``, in either direction."""
+        graph = self.graph(owner, repo)
+        path = graph.resolve(note)
+        if path is None:
+            return None
+        seen = {path: 0}
+        frontier = [path]
+        for distance in range(1, depth + 1):
+            next_frontier = []
+            for current in frontier:
+                for other in graph.links.get(current, set()) | graph.backlinks.get(
+                    current, set()
+                ):
+                    if other not in seen:
+                        seen[other] = distance
+                        next_frontier.append(other)
+            frontier = next_frontier
+        return {
+            "note": path,
+            "tags": graph.notes[path][2],
+            "links": sorted(graph.links.get(path, ())),
+            "backlinks": sorted(graph.backlinks.get(path, ())),
+            "unresolved": sorted(graph.unresolved.get(path, ())),
+            "nearby": {p: d for p, d in sorted(seen.items()) if d > 1},
+        }
+
+    def backlinks(self, owner: str, repo: str, note: str) -> dict[str, Any] | None:
+        graph = self.graph(owner, repo)
+        path = graph.resolve(note)
+        if path is None:
+            return None
+        return {"note": path, "backlinks": sorted(graph.backlinks.get(path, ()))}
+
+    def tagged(self, owner: str, repo: str, tag: str) -> list[str]:
+        """Notes tagged ``tag`` or one of its nested tags (``tag/...``)."""
+        tag = tag.strip().lstrip("#").strip("/").lower()
+        tags = self.graph(owner, repo).tags
+        found: set[str] = set(tags.get(tag, ()))
+        for other, paths in tags.items():
+            if other.startswith(f"{tag}/"):
+                found |= paths
+        return sorted(found)
+
+    def tag_counts(self, owner: str, repo: str) -> dict[str, int]:
+        tags = self.graph(owner, repo).tags
+        return dict(Counter({t: len(p) for t, p in tags.items()}).most_common())
+
+    # -------------------- Persistence --------------------
+
+    def _load(self) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        try:
+            for key, saved in data.items():
+                graph = self._graphs[key] = LinkGraph()
+                graph.apply(
+                    {
+                        p: (sha, links, tags)
+                        for p, (sha, links, tags) in saved["notes"].items()
+                    },
+                    [],
+                )
+                graph.tree = saved["tree"]
+        except (KeyError, TypeError, ValueError) as e:
+            logfire.warn("ignoring corrupt vault link graph: {error}", error=str(e))
+            self._graphs.clear()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            key: {"tree": graph.tree, "notes": graph.notes}
+            for key, graph in self._graphs.items()
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,258 @@
+"""
+This module contains an optional local git mirror of the Obsidian vault.
+
+When ``OBSIDIAN_MIRROR_DIR`` is set, the vault repository is cloned there
+once and later brought up to date with an incremental ``git fetch``, either
+on demand (reads after ``max_age`` seconds, or after a write through the
+API) or on a background interval. Listings and note reads are then served
+from the working tree; notes of ``mmap_threshold`` bytes or more are
+memory-mapped, so a byte range is read without loading the whole file.
+Writes still go through the GitHub API.
+
+Args:
+    remote: Clone URL of the vault repository (a local bare repo works too).
+    path: Directory holding the working tree.
+    token: GitHub token sent to the remote as an HTTP header, never stored.
+    max_age: Seconds after which a read fetches before answering.
+
+Returns:
+    VaultMirror: ``read_bytes(path, start, end)``, ``read(path)`` and
+    ``tree()`` for the vault at the last fetched commit.
+"""
+
+from __future__ import annotations
+
+import base64
+import mmap
+import os
+import subprocess
+import threading
+import time
+
+import logfire
+
+from .vault import TreeEntry, VaultTree
+
+OBSIDIAN_GIT_URL = os.getenv(
+    "OBSIDIAN_GIT_URL", "https://github.com/{owner}/{repo}.git"
+)
+
+
+class MirrorError(RuntimeError):
+    """Raised when a git command on the mirror fails."""
+
+
+class VaultMirror:
+    """Working-tree copy of one vault repository, refreshed by ``git fetch``."""
+
+    def __init__(
+        self,
+        remote: str,
+        path: str,
+        token: str | None = None,
+        branch: str | None = None,
+        max_age: float = 60.0,
+        mmap_threshold: int = 64 * 1024,
+    ):
+        self.remote = remote
+        self.path = os.path.realpath(path)
+        self.token = token
+        self.branch = branch
+        self.max_age = max_age
+        self.mmap_threshold = mmap_threshold
+        self.fetched_at = 0.0
+        self.fetches = 0
+        self.commit: str | None = None
+        self.tree_sha: str | None = None
+        self._stale = False
+        self._tree: VaultTree | None = None
+        self._lock = threading.RLock()
+        self._refresher: threading.Thread | None = None
+
+    # -------------------- Sync --------------------
+
+    def sync(self) -> str:
+        """Clone on first use, otherwise fetch; returns the checked-out commit."""
+        with self._lock:
+            start = time.perf_counter()
+            if not os.path.isdir(os.path.join(self.path, ".git")):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                branch = ["--branch", self.branch] if self.branch else []
+                self._git(
+                    "clone",
+                    "--single-branch",
+                    "--no-tags",
+                    *branch,
+                    self.remote,
+                    self.path,
+                    cwd=None,
+                )
+                action = "cloned"
+            else:
+                self._git("fetch", "--no-tags", "origin", self.branch or "HEAD")
+                self._git("reset", "--hard", "--quiet", "FETCH_HEAD")
+                action = "fetched"
+            self.fetches += 1
+            self.fetched_at = time.monotonic()
+            self._stale = False
+            self.commit, self.tree_sha = self._git(
+                "rev-parse", "HEAD", "HEAD^{tree}"
+            ).split()
+            logfire.info(
+                "Vault mirror {action} {commit} in {ms:.0f}ms",
+                action=action,
+                commit=self.commit[:7],
+                ms=(time.perf_counter() - start) * 1000,
+            )
+            return self.commit
+
+    def ensure_fresh(self) -> None:
+        if (
+            self._stale
+            or self.fetched_at == 0.0
+            or time.monotonic() - self.fetched_at > self.max_age
+        ):
+            self.sync()
+
+    def mark_stale(self) -> None:
+        """Fetch before the next read, e.g. after a write through the API."""
+        self._stale = True
+
+    def start(self, interval: float) -> None:
+        """Fetch every ``interval`` seconds on a background thread."""
+        if self._refresher is not None:
+            return
+
+        def refresh() -> None:
+            while True:
+                try:
+                    self.sync()
+                except MirrorError as e:
+                    logfire.warn("Vault mirror fetch failed: {error}", error=str(e))
+                time.sleep(interval)
+
+        self._refresher = threading.Thread(
+            target=refresh, name="vault-mirror", daemon=True
+        )
+        self._refresher.start()
+
+    # -------------------- Reads --------------------
+
+    def tree(self) -> VaultTree:
+        """The vault tree at the checked-out commit, with blob SHAs."""
+        with self._lock:
+            self.ensure_fresh()
+            if self._tree is None or self._tree.sha != self.tree_sha:
+                entries = []
+                listing = self._git("ls-tree", "-r", "-t", "-l", "-z", "HEAD")
+                for line in filter(None, listing.split("\0")):
+                    meta, _, path = line.partition("\t")
+                    _, kind, sha, size = meta.split()
+                    entries.append(
+                        TreeEntry(path, kind, sha, None if size == "-" else int(size))
+                    )
+                self._tree = VaultTree(self.tree_sha, entries)
+            return self._tree
+
+    def read_bytes(self, path: str, start: int = 0, end: int | None = None) -> bytes:
+        """Bytes ``start:end`` of a note; large notes are memory-mapped."""
+        with self._lock:
+            self.ensure_fresh()
+            full = self._resolve(path)
+            with open(full, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < self.mmap_threshold:
+                    return f.read()[start:end]
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[start:end]
+
+    def read(self, path: str) -> str:
+        return self.read_bytes(path).decode("utf-8")
+
+    def _resolve(self, path: str) -> str:
+        full = os.path.realpath(os.path.join(self.path, path.lstrip("/")))
+        relative = os.path.relpath(full, self.path).split(os.sep)
+        if relative[0] in (os.pardir, ".git") or not os.path.isfile(full):
+            raise FileNotFoundError(path)
+        return full
+
+    # -------------------- git --------------------
+
+    def _git(self, *args: str, cwd: str | None = "") -> str:
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        if self.token and self.remote.startswith("https://"):
+            # Through the environment, not ``-c``: argv is visible in ``ps``.
+            basic = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+            n = int(env.get("GIT_CONFIG_COUNT") or 0)
+            env.update(
+                {
+                    "GIT_CONFIG_COUNT": str(n + 1),
+                    f"GIT_CONFIG_KEY_{n}": "http.extraHeader",
+                    f"GIT_CONFIG_VALUE_{n}": f"Authorization: Basic {basic}",
+                }
+            )
+        proc = subprocess.run(
+            ["git", *args],
+            cwd=self.path if cwd == "" else cwd,
+            capture_output=True,
+            text=True,
+            check=False,
+            env=env,
+        )
+        if proc.returncode != 0:
+            raise MirrorError(f"git {args[0]} failed: {proc.stderr.strip()[:500]}")
+        return proc.stdout
+
+
+class VaultMirrors:
+    """One mirror per vault repository, or none when mirroring is off."""
+
+    def __init__(
+        self,
+        root: str | None,
+        url_template: str = OBSIDIAN_GIT_URL,
+        token: str | None = None,
+        max_age: float = 60.0,
+        interval: float = 0.0,
+    ):
+        self.root = root
+        self.url_template = url_template
+        self.token = token
+        self.max_age = max_age
+        self.interval = interval
+        self._mirrors: dict[tuple[str, str], VaultMirror] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> VaultMirrors:
+        return cls(
+            os.getenv("OBSIDIAN_MIRROR_DIR") or None,
+            url_template=OBSIDIAN_GIT_URL,
+            token=os.getenv("GITHUB_TOKEN"),
+            max_age=float(os.getenv("OBSIDIAN_MIRROR_MAX_AGE", "60")),
+            interval=float(os.getenv("OBSIDIAN_MIRROR_INTERVAL", "0")),
+        )
+
+    def get(self, owner: str, repo: str) -> VaultMirror | None:
+        if not self.root:
+            return None
+        with self._lock:
+            mirror = self._mirrors.get((owner, repo))
+            if mirror is None:
+                mirror = self._mirrors[(owner, repo)] = VaultMirror(
+                    self.url_template.format(owner=owner, repo=repo),
+                    os.path.join(self.root, owner, repo),
+                    token=self.token,
+                    max_age=self.max_age,
+                )
+                if self.interval > 0:
+                    mirror.start(self.interval)
+            return mirror
+
+    def mark_stale(self, owner: str, repo: str) -> None:
+        mirror = self._mirrors.get((owner, repo))
+        if mirror is not None:
+            mirror.mark_stale()
+
+
+vault_mirrors = VaultMirrors.from_env()
@@ -0,0 +1,24 @@
+"""
+Models for the Obsidian agent's native tools.
+"""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class NoteChange(BaseModel):
+    """
+    One note change in a multi-note commit.
+
+    ``write`` creates the note or replaces its contents, ``append`` adds
+    ``content`` to the end of an existing note and ``delete`` removes it.
+    """
+
+    path: str = Field(description='Vault path of the note, e.g. "meetings/q3.md".')
+    action: Literal["write", "append", "delete"] = "write"
+    content: str | None = Field(
+        default=None, description="For write and append: the text to write."
+    )
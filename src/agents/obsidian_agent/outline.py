@@ -0,0 +1,151 @@
+"""
+This module contains heading outlines of Obsidian notes, for section reads.
+
+A note's outline lists its ATX headings (``#`` to ``######``, outside
+frontmatter and fenced code) with the byte range of each section: from the
+heading line up to the next heading of the same or a higher level, so a
+section includes its subsections. Outlines are computed once per blob SHA
+and kept in an LRU cache; a section is then read as a byte range — from the
+local mirror, where large notes are memory-mapped, or from the blob cached
+by SHA — instead of handing the whole note to the agent.
+
+Args:
+    max_entries: Outlines kept in memory.
+
+Returns:
+    NoteOutlines: ``get(sha)`` and ``compute(sha, data)``; ``find_section``
+    picks a heading by title or ``Parent > Child`` path.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+
+_ATX = re.compile(rb"^ {0,3}(#{1,6})(?:[ \t]+(.*?))??(?:[ \t]+#+)?[ \t]*\r?\n?$")
+_FENCE = re.compile(rb"^ {0,3}(`{3,}|~{3,})")
+_LEADING_HASHES = re.compile(r"^#+(?:\s+|$)")
+
+
+@dataclass(frozen=True)
+class Heading:
+    level: int
+    title: str
+    start: int  # byte offset of the heading line
+    end: int  # byte offset where the section, subsections included, ends
+
+
+def parse_outline(data: bytes) -> list[Heading]:
+    """Headings of a note with the byte range of each section."""
+    found: list[tuple[int, str, int]] = []
+    offset = 0
+    fence: bytes | None = None
+    lines = data.splitlines(keepends=True)
+    if lines and lines[0].rstrip() == b"---":
+        # Skip frontmatter: everything up to the closing ``---``.
+        for i, line in enumerate(lines[1:], start=1):
+            if line.rstrip() == b"---":
+                offset = sum(len(x) for x in lines[: i + 1])
+                lines = lines[i + 1 :]
+                break
+    for line in lines:
+        fenced = _FENCE.match(line)
+        if fenced:
+            marker = fenced.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+        elif fence is None:
+            match = _ATX.match(line)
+            if match:
+                title = (match.group(2) or b"").decode("utf-8", "replace").strip()
+                found.append((len(match.group(1)), title, offset))
+        offset += len(line)
+    # A section ends where the next heading of the same or a higher level starts.
+    ends = [len(data)] * len(found)
+    open_sections: list[int] = []
+    for i, (level, _, start) in enumerate(found):
+        while open_sections and found[open_sections[-1]][0] >= level:
+            ends[open_sections.pop()] = start
+        open_sections.append(i)
+    return [
+        Heading(level, title, start, end)
+        for (level, title, start), end in zip(found, ends)
+    ]
+
+
+def find_section(outline: list[Heading], heading: str) -> Heading | None:
+    """The heading titled ``heading``; ``A > B`` picks B under A.
+
+    Titles match case-insensitively, and a leading ``#`` run (``## Title``) is
+    ignored; any other ``#`` is part of the title, as in "C# notes" or "#1
+    priorities". Without an exact match, the first title containing the text
+    is used.
+    """
+    parts = [_LEADING_HASHES.sub("", p.strip()).lower() for p in heading.split(">")]
+    parts = [p for p in parts if p]
+    if not parts:
+        return None
+    exact, partial = None, None
+    ancestors: list[Heading] = []
+    for entry in outline:
+        while ancestors and ancestors[-1].level >= entry.level:
+            ancestors.pop()
+        titles = [a.title.lower() for a in ancestors]
+        if _in_order(parts[:-1], titles):
+            title = entry.title.lower()
+            if title == parts[-1] and exact is None:
+                exact = entry
+            elif parts[-1] in title and partial is None:
+                partial = entry
+        ancestors.append(entry)
+    return exact or partial
+
+
+def _in_order(wanted: list[str], titles: list[str]) -> bool:
+    remaining = iter(titles)
+    return all(any(w == t for t in remaining) for w in wanted)
+
+
+def snap_range(data: bytes, start: int, end: int) -> tuple[int, int]:
+    """Clamp ``start:end`` to ``data`` and move it off UTF-8 continuation bytes."""
+    start, end = max(0, min(start, len(data))), max(0, min(end, len(data)))
+    while start < len(data) and data[start] & 0xC0 == 0x80:
+        start += 1
+    while end < len(data) and data[end] & 0xC0 == 0x80:
+        end += 1
+    return start, max(start, end)
+
+
+class NoteOutlines:
+    """Outlines keyed by blob SHA; a note's outline never changes."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._outlines: OrderedDict[str, list[Heading]] = OrderedDict()
+
+    def get(self, sha: str) -> list[Heading] | None:
+        outline = self._outlines.get(sha)
+        if outline is None:
+            return None
+        self.hits += 1
+        self._outlines.move_to_end(sha)
+        return outline
+
+    def compute(self, sha: str, data: bytes) -> list[Heading]:
+        self.misses += 1
+        outline = self._outlines[sha] = parse_outline(data)
+        while len(self._outlines) > self.max_entries:
+            self._outlines.popitem(last=False)
+        return outline
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "outlines": len(self._outlines),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
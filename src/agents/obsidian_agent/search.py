@@ -0,0 +1,279 @@
+"""
+This module contains the full-text search index of the Obsidian vault.
+
+Note titles and contents are indexed in SQLite with an FTS5 table and
+ranked with its ``bm25()``. The FTS table is contentless and the note text
+is stored zlib-compressed next to it, so the file holds the text once and
+small; snippets are cut from that text for the few hits returned. Each row
+remembers the blob SHA it was indexed from, so
+an update compares the vault tree with the index and only touches notes
+whose SHA changed: unchanged notes cost nothing, renamed or copied notes
+reuse the text already indexed, and only genuinely new blobs are fetched.
+The index lives in one SQLite file, so it survives restarts and only the
+notes changed in between are fetched again.
+
+Args:
+    path: SQLite file holding the index.
+    fetch_batch: Notes fetched and written per step of an update.
+
+Returns:
+    VaultSearchIndex: ``await update(owner, repo, tree, fetch)`` and
+    ``search(owner, repo, query)``, which returns ranked paths with snippets.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import logfire
+
+from .vault import VaultTree
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    rowid INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    text BLOB NOT NULL,
+    UNIQUE (repo, path)
+);
+CREATE INDEX IF NOT EXISTS notes_sha ON notes(sha);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, body, content='', tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Titles are short; a match there says more than one in the body.
+TITLE_WEIGHT = 5.0
+SNIPPET_WORDS = 24
+
+Fetch = Callable[[list[str]], Awaitable[dict[str, str | None]]]
+
+
+def _fts_terms(text: str) -> list[str]:
+    """Quote each term so user text can't be parsed as FTS5 syntax."""
+    terms = [t.replace('"', "") for t in text.split()]
+    return [f'"{t}"' for t in terms if t]
+
+
+def _title(path: str) -> str:
+    name = path.rpartition("/")[2]
+    return name.removesuffix(".md")
+
+
+def _snippet(text: str, terms: list[str]) -> str:
+    """The window of ``SNIPPET_WORDS`` words with the most query terms."""
+    # A prefix match stands in for the porter stemming done by FTS5.
+    stems = [t.strip('"').lower()[:5] for t in terms]
+    words = list(re.finditer(r"\w+", text))
+    if not words:
+        return ""
+    hits = [any(w.group().lower().startswith(s) for s in stems) for w in words]
+    best, best_hits = 0, -1
+    for start in range(max(len(words) - SNIPPET_WORDS, 0) + 1):
+        count = sum(hits[start : start + SNIPPET_WORDS])
+        if count > best_hits:
+            best, best_hits = start, count
+    window = words[best : best + SNIPPET_WORDS]
+    parts = []
+    position = window[0].start()
+    for word, hit in zip(window, hits[best : best + SNIPPET_WORDS]):
+        parts.append(text[position : word.start()])
+        parts.append(f"**{word.group()}**" if hit else word.group())
+        position = word.end()
+    prefix = "…" if best > 0 else ""
+    suffix = "…" if best + SNIPPET_WORDS < len(words) else ""
+    return prefix + "".join(parts) + suffix
+
+
+class VaultSearchIndex:
+    """BM25 search over vault notes, updated per changed blob SHA."""
+
+    def __init__(self, path: str, fetch_batch: int = 1000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.fetch_batch = fetch_batch
+        self._lock = threading.Lock()
+        self._update_lock: asyncio.Lock | None = None
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> VaultSearchIndex:
+        return cls(
+            os.getenv("OBSIDIAN_SEARCH_INDEX_PATH", ".cache/obsidian_search.sqlite3")
+        )
+
+    # -------------------- Updates --------------------
+
+    async def update(
+        self, owner: str, repo: str, tree: VaultTree, fetch: Fetch
+    ) -> dict[str, int]:
+        """Bring the notes of ``owner/repo`` in line with ``tree``.
+
+        ``fetch`` returns the text of the given paths in ``tree`` (``None``
+        for a note that vanished); it is only called for unseen blobs.
+        """
+        if self._update_lock is None:
+            self._update_lock = asyncio.Lock()
+        key = f"{owner}/{repo}"
+        async with self._update_lock:
+            stats = {"indexed": 0, "fetched": 0, "removed": 0}
+            if self._meta(f"tree:{key}") == tree.sha:
+                return stats
+            start = time.perf_counter()
+            notes = {e.path: e.sha for e in tree.files() if e.path.endswith(".md")}
+            with self._lock:
+                indexed = dict(
+                    self._db.execute(
+                        "SELECT path, sha FROM notes WHERE repo = ?", (key,)
+                    ).fetchall()
+                )
+            changed = [p for p, sha in notes.items() if indexed.get(p) != sha]
+            for i in range(0, len(changed), self.fetch_batch):
+                batch = {p: notes[p] for p in changed[i : i + self.fetch_batch]}
+                texts = self._indexed_texts(set(batch.values()))
+                missing = [p for p, sha in batch.items() if sha not in texts]
+                if missing:
+                    fetched = await fetch(missing)
+                    stats["fetched"] += len(missing)
+                    for path in missing:
+                        if fetched.get(path) is not None:
+                            texts[batch[path]] = fetched[path]
+                rows = [
+                    (p, sha, texts[sha]) for p, sha in batch.items() if sha in texts
+                ]
+                await asyncio.to_thread(self._write, key, rows, [])
+                stats["indexed"] += len(rows)
+            gone = [p for p in indexed if p not in notes]
+            await asyncio.to_thread(self._write, key, [], gone)
+            stats["removed"] = len(gone)
+            if stats["indexed"] + stats["removed"] > self.fetch_batch:
+                await asyncio.to_thread(self._optimize)
+            self._set_meta(f"tree:{key}", tree.sha)
+            logfire.info(
+                "Updated vault search index {repo}: {stats} in {ms:.0f}ms",
+                repo=key,
+                stats=stats,
+                ms=(time.perf_counter() - start) * 1000,
+            )
+            return stats
+
+    def _indexed_texts(self, shas: set[str]) -> dict[str, str]:
+        """Text already indexed for any of ``shas`` (renamed or copied notes)."""
+        if not shas:
+            return {}
+        placeholders = ",".join("?" * len(shas))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT sha, text FROM notes WHERE sha IN ({placeholders})"
+                " GROUP BY sha",
+                list(shas),
+            ).fetchall()
+        return {sha: zlib.decompress(text).decode() for sha, text in rows}
+
+    def _write(
+        self, key: str, rows: list[tuple[str, str, str]], removed: list[str]
+    ) -> None:
+        paths = removed + [p for p, _, _ in rows]
+        with self._lock, self._db:
+            for i in range(0, len(paths), 500):
+                batch = paths[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                old = self._db.execute(
+                    "SELECT rowid, path, text FROM notes"
+                    f" WHERE repo = ? AND path IN ({placeholders})",
+                    [key, *batch],
+                ).fetchall()
+                # A contentless FTS5 row is removed by repeating what was indexed.
+                self._db.executemany(
+                    "INSERT INTO notes_fts (notes_fts, rowid, title, body)"
+                    " VALUES ('delete', ?, ?, ?)",
+                    [
+                        (rowid, _title(path), zlib.decompress(text).decode())
+                        for rowid, path, text in old
+                    ],
+                )
+                self._db.executemany(
+                    "DELETE FROM notes WHERE rowid = ?", [(r[0],) for r in old]
+                )
+            for path, sha, text in rows:
+                rowid = self._db.execute(
+                    "INSERT INTO notes (repo, path, sha, text) VALUES (?, ?, ?, ?)",
+                    (key, path, sha, zlib.compress(text.encode())),
+                ).lastrowid
+                self._db.execute(
+                    "INSERT INTO notes_fts (rowid, title, body) VALUES (?, ?, ?)",
+                    (rowid, _title(path), text),
+                )
+
+    def _optimize(self) -> None:
+        """Merge the FTS segments left by a large update and drop free pages."""
+        with self._lock:
+            with self._db:
+                self._db.execute("INSERT INTO notes_fts(notes_fts) VALUES ('optimize')")
+            self._db.execute("VACUUM")
+
+    # -------------------- Queries --------------------
+
+    def search(
+        self, owner: str, repo: str, query: str, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        """Best matches first; notes with every term, else with any of them."""
+        terms = _fts_terms(query)
+        if not terms:
+            return []
+        rows = self._select(f"{owner}/{repo}", " ".join(terms), limit)
+        if not rows and len(terms) > 1:
+            rows = self._select(f"{owner}/{repo}", " OR ".join(terms), limit)
+        # bm25() is negated so that ascending order puts the best match first.
+        return [
+            {
+                "path": path,
+                "snippet": _snippet(zlib.decompress(text).decode(), terms),
+                "score": round(-rank, 3),
+            }
+            for path, text, rank in rows
+        ]
+
+    def _select(self, key: str, match: str, limit: int) -> list[tuple[Any, ...]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT notes.path, notes.text,"
+                f" bm25(notes_fts, {TITLE_WEIGHT}, 1.0) AS rank"
+                " FROM notes_fts JOIN notes ON notes.rowid = notes_fts.rowid"
+                " WHERE notes_fts MATCH ? AND notes.repo = ?"
+                " ORDER BY rank LIMIT ?",
+                (match, key, limit),
+            ).fetchall()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        return {"notes": count, "bytes": os.path.getsize(self.path)}
+
+    # -------------------- Internals --------------------
+
+    def _meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+            self._db.commit()
@@ -1,46 +1,40 @@
+import asyncio
 import os
-import requests
-import base64
+
+import httpx
+
+from src.mcp_handler.compaction import estimate_tokens
+
+from .github import GitHubApiError, github
+from .links import VaultLinks
+from .mirror import MirrorError, vault_mirrors
+from .models import NoteChange
+from .outline import NoteOutlines, find_section, snap_range
+from .search import VaultSearchIndex
+from .vault import render_folder_tree, vault_trees
+from .writer import CommitConflictError, VaultWriter
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")  # Get token from environment variable
-BASE_URL = "https://api.github.com/repos"
 
 
-def get_github_folder_contents(owner, repo, path=""):
+async def get_github_folder_contents(owner, repo, path=""):
     """
     Fetches the contents of a given folder in a GitHub repository.
-    Recursively fetches contents of subfolders to build a complete tree.
+    The whole vault tree is listed with one Git Trees API call and cached by
+    tree SHA (or read from the local mirror, when enabled), so subfolders are
+    served from the cached tree.
     """
-    url = f"{BASE_URL}/{owner}/{repo}/contents/{path}"
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-    }
-
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
-        contents = response.json()
-    except requests.exceptions.RequestException as e:
+        mirror = vault_mirrors.get(owner, repo)
+        if mirror is not None:
+            return (await asyncio.to_thread(mirror.tree)).folder(path)
+        return await vault_trees.folder(owner, repo, path)
+    except (GitHubApiError, MirrorError, httpx.HTTPError) as e:
         print(f"Error fetching contents for {path}: {e}")
         return None
 
-    folder_tree = {}
-    for item in contents:
-        name = item["name"]
-        item_type = item["type"]
-        html_url = item["html_url"]  # Useful for direct links
 
-        if item_type == "dir":
-            # Recursively get contents of subdirectories
-            sub_folder_path = f"{path}/{name}" if path else name
-            folder_tree[name] = get_github_folder_contents(owner, repo, sub_folder_path)
-        elif item_type == "file":
-            folder_tree[name] = "file"  # You can store more info here if needed
-    return folder_tree
-
-
-def get_github_file_contents(owner, repo, path):
+async def get_github_file_contents(owner, repo, path):
     """
     Fetches the contents of a given file in a GitHub repository.
     """
@@ -52,68 +46,295 @@ def get_github_file_contents(owner, repo, path):
             "error": "File is not a markdown file.",
         }
 
-    # get the file contents
-    url = f"{BASE_URL}/{owner}/{repo}/contents/{path}"
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
+    # serve from the local mirror when enabled
+    mirror = vault_mirrors.get(owner, repo)
+    try:
+        if mirror is not None:
+            contents = await asyncio.to_thread(mirror.read, path)
+        else:
+            # the raw media type returns the file itself, no base64 JSON;
+            # an unchanged note is a 304 that costs no rate limit
+            response = await github.request(
+                "GET",
+                f"/repos/{owner}/{repo}/contents/{path}",
+                accept="application/vnd.github.raw",
+            )
+            contents = response.text
+    except FileNotFoundError:
+        return {"success": False, "error": f"Note '{path}' not found."}
+    except (GitHubApiError, MirrorError, httpx.HTTPError) as e:
+        if getattr(e, "status_code", None) == 404:
+            return {"success": False, "error": f"Note '{path}' not found."}
+        return {"success": False, "error": str(e)}
+
+    return {"success": True, "file_contents": contents}
+
+
+async def get_github_files_contents(owner, repo, paths):
+    """
+    Fetches several files at once: one GraphQL query per 100 paths, or the
+    local mirror when enabled. Missing notes map to ``None``.
+    """
+    mirror = vault_mirrors.get(owner, repo)
+    try:
+        if mirror is None:
+            files = await github.files(owner, repo, paths)
+        else:
+            files = await asyncio.to_thread(_read_mirror, mirror, paths)
+    except (GitHubApiError, MirrorError, httpx.HTTPError) as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "files": files}
+
+
+def _read_mirror(mirror, paths):
+    found = {}
+    for path in paths:
+        try:
+            found[path] = mirror.read(path)
+        except FileNotFoundError:
+            found[path] = None
+    return found
+
+
+async def _vault_snapshot(owner, repo):
+    """The current vault tree and a function fetching notes at that tree."""
+    mirror = vault_mirrors.get(owner, repo)
+    if mirror is not None:
+        tree = await asyncio.to_thread(mirror.tree)
+
+        def fetch(paths):
+            return asyncio.to_thread(_read_mirror, mirror, paths)
+
+    else:
+        head = await vault_trees.head(owner, repo)
+        tree = await vault_trees.tree_at(owner, repo, head)
+
+        def fetch(paths):
+            return github.files(owner, repo, paths, ref=head)
+
+    return tree, fetch
+
+
+async def search_github_notes(owner, repo, query, limit=10):
+    """
+    Ranks notes against ``query`` with the BM25 index, first bringing the
+    index up to date with the vault; only notes whose blob SHA changed since
+    the last search are fetched.
+    """
+    try:
+        index = get_vault_search()
+        tree, fetch = await _vault_snapshot(owner, repo)
+        await index.update(owner, repo, tree, fetch)
+        results = await asyncio.to_thread(index.search, owner, repo, query, limit)
+    except (GitHubApiError, MirrorError, httpx.HTTPError) as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "results": results}
+
+
+async def _updated_links(owner, repo):
+    tree, fetch = await _vault_snapshot(owner, repo)
+    await get_vault_links().update(owner, repo, tree, fetch)
+
+
+async def get_note_neighbors(owner, repo, note, depth=1):
+    """
+    Links, backlinks and tags of ``note`` from the in-memory link graph,
+    plus the notes up to ``depth`` links away in either direction.
+    """
+    try:
+        await _updated_links(owner, repo)
+    except (GitHubApiError, MirrorError, httpx.HTTPError) as e:
+        return {"success": False, "error": str(e)}
+    found = get_vault_links().neighbors(owner, repo, note, depth)
+    if found is None:
+        return {"success": False, "error": f"Note '{note}' not found."}
+    return {"success": True, **found}
+
+
+async def get_note_backlinks(owner, repo, note):
+    """Notes linking to ``note``, from the in-memory link graph."""
+    try:
+        await _updated_links(owner, repo)
+    except (GitHubApiError, MirrorError, httpx.HTTPError) as e:
+        return {"success": False, "error": str(e)}
+    found = get_vault_links().backlinks(owner, repo, note)
+    if found is None:
+        return {"success": False, "error": f"Note '{note}' not found."}
+    return {"success": True, **found}
+
+
+async def get_notes_by_tag(owner, repo, tag=None):
+    """Notes carrying ``tag`` (nested tags included), or every tag's count."""
+    try:
+        await _updated_links(owner, repo)
+    except (GitHubApiError, MirrorError, httpx.HTTPError) as e:
+        return {"success": False, "error": str(e)}
+    if not tag:
+        return {"success": True, "tags": get_vault_links().tag_counts(owner, repo)}
+    return {"success": True, "notes": get_vault_links().tagged(owner, repo, tag)}
+
+
+async def _note_outline(owner, repo, path):
+    """Blob SHA, size and outline of a note; the outline is cached by SHA."""
+    mirror = vault_mirrors.get(owner, repo)
+    if mirror is not None:
+        tree = await asyncio.to_thread(mirror.tree)
+    else:
+        tree = await vault_trees.tree(owner, repo)
+    sha = tree.blob_sha(path.strip("/"))
+    if sha is None:
+        raise FileNotFoundError(path)
+    outline = note_outlines.get(sha)
+    data = None
+    if outline is None:
+        data = await _note_bytes(owner, repo, path, sha)
+        outline = note_outlines.compute(sha, data)
+    size = tree.entries[path.strip("/")].size
+    return sha, len(data) if size is None else size, outline
+
+
+async def _note_bytes(owner, repo, path, sha, start=0, end=None):
+    """Bytes ``start:end`` of a note: a mirror range read or the cached blob."""
+    mirror = vault_mirrors.get(owner, repo)
+    if mirror is not None:
+        return await asyncio.to_thread(mirror.read_bytes, path, start, end)
+    return (await github.blob(owner, repo, sha))[start:end]
+
+
+async def get_note_outline(owner, repo, path, max_level=6):
+    """
+    Headings of a note (down to ``max_level``) with the byte range and
+    estimated tokens of each section, computed once per blob SHA.
+    """
+    if not path.endswith(".md"):
+        return {"success": False, "error": "File is not a markdown file."}
+    try:
+        _, size, outline = await _note_outline(owner, repo, path)
+    except FileNotFoundError:
+        return {"success": False, "error": f"Note '{path}' not found."}
+    except (GitHubApiError, MirrorError, httpx.HTTPError) as e:
+        return {"success": False, "error": str(e)}
+    return {
+        "success": True,
+        "path": path,
+        "bytes": size,
+        "tokens": estimate_tokens(size),
+        "headings": [
+            {
+                "level": h.level,
+                "title": h.title,
+                "start": h.start,
+                "end": h.end,
+                "tokens": estimate_tokens(h.end - h.start),
+            }
+            for h in outline
+            if h.level <= max_level
+        ],
     }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
 
-    # load contents from  the content base64 encoded
+
+async def get_note_section(owner, repo, path, heading=None, start=None, end=None):
+    """
+    One section of a note (by heading, subsections included) or a byte range,
+    read without returning the rest of the note.
+    """
+    if not path.endswith(".md"):
+        return {"success": False, "error": "File is not a markdown file."}
+    try:
+        sha, size, outline = await _note_outline(owner, repo, path)
+        if heading:
+            section = find_section(outline, heading)
+            if section is None:
+                return {
+                    "success": False,
+                    "error": f"No heading '{heading}' in '{path}'.",
+                    "headings": [h.title for h in outline],
+                }
+            start, end = section.start, section.end
+        elif start is None and end is None:
+            return {"success": False, "error": "Give a heading or a byte range."}
+        start = 0 if start is None else start
+        end = size if end is None else end
+        # Widen by a few bytes so the range can be moved off split characters.
+        data = await _note_bytes(owner, repo, path, sha, max(start, 0), end + 3)
+        first, last = snap_range(data, 0, end - max(start, 0))
+    except FileNotFoundError:
+        return {"success": False, "error": f"Note '{path}' not found."}
+    except (GitHubApiError, MirrorError, httpx.HTTPError) as e:
+        return {"success": False, "error": str(e)}
     return {
         "success": True,
-        "file_contents": base64.b64decode(response.json()["content"]).decode("utf-8"),
+        "path": path,
+        "start": max(start, 0) + first,
+        "end": max(start, 0) + last,
+        "content": data[first:last].decode("utf-8", "replace"),
     }
 
 
-def print_folder_tree(tree, indent=0, prefix="", is_last_item=True):
+def print_folder_tree(tree):
     """Prints the folder tree in an organized format using tree-style syntax."""
-    items = list(tree.items())
-    for i, (name, content) in enumerate(items):
-        is_last_item = i == len(items) - 1
-
-        # Choose the appropriate tree character
-        if is_last_item:
-            current_prefix = "└── "
-            next_prefix = "    "
-        else:
-            current_prefix = "├── "
-            next_prefix = "│   "
+    print(render_folder_tree(tree))
 
-        if content == "file":
-            print(f"{prefix}{current_prefix}{name}")
-        else:
-            print(f"{prefix}{current_prefix}{name}")
-            print_folder_tree(content, indent + 1, prefix + next_prefix, is_last_item)
+
+async def commit_notes_to_github(
+    changes: list[NoteChange], owner: str, repo: str, message: str | None = None
+) -> dict:
+    """Write, append to or delete several notes in one commit."""
+    try:
+        return await vault_writer.commit(owner, repo, changes, message)
+    except (
+        GitHubApiError,
+        CommitConflictError,
+        FileNotFoundError,
+        ValueError,
+        httpx.HTTPError,
+    ) as e:
+        return {"success": False, "error": str(e)}
+    finally:
+        vault_changed(owner, repo)
 
 
-def send_new_content_to_github(
+async def send_new_content_to_github(
     note_path: str, content: str, owner: str, repo: str
 ) -> dict:
     """Send the new content to github."""
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{note_path}"
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-    data = {
-        "message": "my commit message",
-        "committer": {"name": "Monalisa Octocat", "email": "octocat@github.com"},
-        "content": base64.b64encode(content.encode()).decode(),
-    }
-    response = requests.put(url, headers=headers, json=data)
-    return response.json()
+    return await commit_notes_to_github(
+        [NoteChange(path=note_path, content=content)], owner, repo
+    )
 
 
-def delete_note_from_github(note_path: str, owner: str, repo: str) -> dict:
+async def delete_note_from_github(note_path: str, owner: str, repo: str) -> dict:
     """Delete the given note from github."""
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{note_path}"
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-    }
-    response = requests.delete(url, headers=headers)
-    return response.json()
+    return await commit_notes_to_github(
+        [NoteChange(path=note_path, action="delete")], owner, repo
+    )
+
+
+def vault_changed(owner: str, repo: str) -> None:
+    """Make the next listing or read see a write made through the API."""
+    vault_trees.invalidate(owner, repo)
+    vault_mirrors.mark_stale(owner, repo)
+
+
+vault_writer = VaultWriter(vault_trees)
+_vault_search: VaultSearchIndex | None = None
+_vault_links: VaultLinks | None = None
+
+
+def get_vault_search() -> VaultSearchIndex:
+    """The search index, opened on first use rather than at import."""
+    global _vault_search
+    if _vault_search is None:
+        _vault_search = VaultSearchIndex.from_env()
+    return _vault_search
+
+
+def get_vault_links() -> VaultLinks:
+    """The link graph, loaded on first use rather than at import."""
+    global _vault_links
+    if _vault_links is None:
+        _vault_links = VaultLinks.from_env()
+    return _vault_links
+
+
+note_outlines = NoteOutlines()
@@ -0,0 +1,237 @@
+"""
+This module contains the cached tree listing of the Obsidian vault repository.
+
+The whole vault is listed with one Git Trees API call
+(``git/trees/<sha>?recursive=1``) and the result is cached by tree SHA, so
+listing any folder is answered from memory. The branch head is re-resolved
+(a small request returning just the commit SHA) at most every ``max_age``
+seconds; an unchanged head serves the cached tree without fetching it again.
+When GitHub truncates a very large recursive listing, the subtrees of each
+level are fetched concurrently.
+
+Args:
+    client: The shared ``GitHubClient``.
+    max_age: Seconds a resolved branch head is trusted before re-checking.
+
+Returns:
+    VaultTreeCache: ``folder(owner, repo, path)`` returns the nested
+    ``{name: "file" | {...}}`` listing of ``path``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import logfire
+
+from .github import GitHubClient, github
+
+
+@dataclass(frozen=True)
+class TreeEntry:
+    path: str
+    type: str  # "blob", "tree" or "commit" (submodule)
+    sha: str
+    size: int | None = None
+
+
+class VaultTree:
+    """One snapshot of the vault, as returned by the Git Trees API."""
+
+    def __init__(self, sha: str, entries: list[TreeEntry]):
+        self.sha = sha
+        self.entries = {e.path: e for e in entries}
+        # Folder path ("" for the root) -> names of its direct children.
+        self._children: dict[str, list[str]] = {"": []}
+        for entry in entries:
+            if entry.type == "tree":
+                self._children.setdefault(entry.path, [])
+            parent, _, _ = entry.path.rpartition("/")
+            self._children.setdefault(parent, []).append(entry.path)
+
+    def blob_sha(self, path: str) -> str | None:
+        entry = self.entries.get(path)
+        return entry.sha if entry is not None and entry.type == "blob" else None
+
+    def files(self, folder: str = "") -> list[TreeEntry]:
+        """Every file below ``folder``."""
+        prefix = f"{folder.strip('/')}/" if folder.strip("/") else ""
+        return [
+            e
+            for e in self.entries.values()
+            if e.type == "blob" and e.path.startswith(prefix)
+        ]
+
+    def folder(self, path: str = "") -> dict[str, Any] | None:
+        """Nested listing of ``path``, or ``None`` if it is not a folder."""
+        path = path.strip("/")
+        if path not in self._children:
+            return None
+        listing: dict[str, Any] = {}
+        for child in self._children[path]:
+            entry = self.entries[child]
+            name = child.rpartition("/")[2]
+            if entry.type == "tree":
+                listing[name] = self.folder(child)
+            elif entry.type == "blob":
+                listing[name] = "file"
+        return listing
+
+
+class VaultTreeCache:
+    """Vault trees keyed by tree SHA, with branch heads re-checked lazily."""
+
+    def __init__(
+        self,
+        client: GitHubClient,
+        max_age: float = 30.0,
+        max_trees: int = 8,
+    ):
+        self.client = client
+        self.max_age = max_age
+        self.max_trees = max_trees
+        self.hits = 0
+        self.misses = 0
+        self._trees: OrderedDict[str, VaultTree] = OrderedDict()
+        # Commit SHA -> tree SHA, and (owner, repo, ref) -> (commit SHA, checked at).
+        self._commit_trees: dict[str, str] = {}
+        self._heads: dict[tuple[str, str, str], tuple[str, float]] = {}
+
+    @classmethod
+    def from_env(cls) -> VaultTreeCache:
+        return cls(github, max_age=float(os.getenv("OBSIDIAN_TREE_MAX_AGE", "30")))
+
+    # -------------------- Public API --------------------
+
+    async def tree(self, owner: str, repo: str, ref: str = "HEAD") -> VaultTree:
+        """The vault tree at ``ref``, fetched only if its tree SHA is new."""
+        return await self.tree_at(owner, repo, await self.head(owner, repo, ref))
+
+    async def tree_at(self, owner: str, repo: str, commit: str) -> VaultTree:
+        """The vault tree of ``commit``."""
+        tree_sha = self._commit_trees.get(commit)
+        if tree_sha is not None and tree_sha in self._trees:
+            self.hits += 1
+            self._trees.move_to_end(tree_sha)
+            return self._trees[tree_sha]
+        self.misses += 1
+        start = time.perf_counter()
+        tree_sha, entries = await self._fetch_tree(owner, repo, commit)
+        tree = VaultTree(tree_sha, entries)
+        self._commit_trees[commit] = tree_sha
+        self._trees[tree_sha] = tree
+        while len(self._trees) > self.max_trees:
+            self._trees.popitem(last=False)
+        logfire.info(
+            "Fetched vault tree {owner}/{repo}@{sha}: {n} entries in {ms:.0f}ms",
+            owner=owner,
+            repo=repo,
+            sha=tree_sha[:7],
+            n=len(entries),
+            ms=(time.perf_counter() - start) * 1000,
+        )
+        return tree
+
+    async def folder(
+        self, owner: str, repo: str, path: str = "", ref: str = "HEAD"
+    ) -> dict[str, Any] | None:
+        return (await self.tree(owner, repo, ref)).folder(path)
+
+    async def head(self, owner: str, repo: str, ref: str = "HEAD") -> str:
+        """Commit SHA of ``ref``, re-checked at most every ``max_age`` seconds."""
+        key = (owner, repo, ref)
+        cached = self._heads.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.max_age:
+            return cached[0]
+        # The ``sha`` media type returns the bare commit SHA; an unchanged head
+        # is a 304 that costs no rate limit.
+        response = await self.client.request(
+            "GET",
+            f"/repos/{owner}/{repo}/commits/{ref}",
+            accept="application/vnd.github.sha",
+        )
+        commit = response.text.strip()
+        self._heads[key] = (commit, time.monotonic())
+        return commit
+
+    def invalidate(self, owner: str, repo: str) -> None:
+        """Re-check the branch heads of ``owner/repo`` on the next listing."""
+        for key in [k for k in self._heads if k[:2] == (owner, repo)]:
+            del self._heads[key]
+
+    def stats(self) -> dict[str, int]:
+        return {"trees": len(self._trees), "hits": self.hits, "misses": self.misses}
+
+    # -------------------- GitHub --------------------
+
+    async def _fetch_tree(
+        self, owner: str, repo: str, sha: str
+    ) -> tuple[str, list[TreeEntry]]:
+        payload = (
+            await self.client.request(
+                "GET",
+                f"/repos/{owner}/{repo}/git/trees/{sha}",
+                params={"recursive": "1"},
+            )
+        ).json()
+        entries = [_entry(item) for item in payload["tree"]]
+        if payload.get("truncated"):
+            entries = await self._walk(owner, repo, payload["sha"], "")
+        return payload["sha"], entries
+
+    async def _walk(
+        self, owner: str, repo: str, sha: str, prefix: str
+    ) -> list[TreeEntry]:
+        """List a tree too large for one recursive call, a level at a time."""
+        path = f"/repos/{owner}/{repo}/git/trees"
+        payload = (await self.client.request("GET", f"{path}/{sha}")).json()
+        entries = [_entry(item, prefix) for item in payload["tree"]]
+        subtrees = [e for e in entries if e.type == "tree"]
+        listings = await asyncio.gather(
+            *(
+                self.client.request("GET", f"{path}/{e.sha}", params={"recursive": "1"})
+                for e in subtrees
+            )
+        )
+        for entry, response in zip(subtrees, listings):
+            sub = response.json()
+            if sub.get("truncated"):
+                entries.extend(
+                    await self._walk(owner, repo, entry.sha, f"{entry.path}/")
+                )
+            else:
+                entries.extend(_entry(i, f"{entry.path}/") for i in sub["tree"])
+        return entries
+
+
+def _entry(item: dict[str, Any], prefix: str = "") -> TreeEntry:
+    return TreeEntry(
+        path=f"{prefix}{item['path']}",
+        type=item["type"],
+        sha=item["sha"],
+        size=item.get("size"),
+    )
+
+
+def render_folder_tree(tree: dict[str, Any], prefix: str = "") -> str:
+    """Render a nested listing with tree-style connectors, one entry per line."""
+    lines = []
+    items = list(tree.items())
+    for i, (name, content) in enumerate(items):
+        is_last_item = i == len(items) - 1
+        lines.append(f"{prefix}{'└── ' if is_last_item else '├── '}{name}")
+        if content != "file" and content:
+            lines.append(
+                render_folder_tree(
+                    content, prefix + ("    " if is_last_item else "│   ")
+                )
+            )
+    return "\n".join(lines)
+
+
+vault_trees = VaultTreeCache.from_env()
@@ -0,0 +1,178 @@
+"""
+This module contains atomic multi-note commits to the Obsidian vault.
+
+Every batch of note writes, appends and deletions becomes a single commit
+built with the Git Data API: the branch head is read, a new tree is created
+on top of the head's tree (note contents inline, deletions as ``sha: null``
+entries), a commit is created with the head as its parent, and the branch
+ref is moved to it without ``force``. If someone else moved the branch in
+the meantime the ref update is rejected as not a fast-forward, and the whole
+batch is rebuilt on the new head, up to ``max_retries`` times.
+
+Args:
+    trees: The ``VaultTreeCache`` whose client and trees are used.
+    max_retries: Rebuilds attempted after a concurrent update of the branch.
+
+Returns:
+    VaultWriter: ``commit(owner, repo, changes, message)`` returns the new
+    commit SHA and the paths it changed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Any
+
+import logfire
+
+from .github import GitHubApiError
+from .models import NoteChange
+from .vault import VaultTree, VaultTreeCache
+
+
+class CommitConflictError(RuntimeError):
+    """Raised when the branch kept moving for every commit attempt."""
+
+
+class VaultWriter:
+    """Writes batches of note changes as one commit each."""
+
+    def __init__(self, trees: VaultTreeCache, max_retries: int = 3):
+        self.trees = trees
+        self.max_retries = max_retries
+        self.conflicts = 0
+        self._branches: dict[tuple[str, str], str] = {}
+
+    async def commit(
+        self,
+        owner: str,
+        repo: str,
+        changes: list[NoteChange],
+        message: str | None = None,
+    ) -> dict[str, Any]:
+        """Commit ``changes`` atomically; nothing is written if any change fails."""
+        if not changes:
+            raise ValueError("no changes to commit")
+        for change in changes:
+            if change.action != "delete" and change.content is None:
+                raise ValueError(f"{change.action} of {change.path} needs content")
+        client = self.trees.client
+        branch = await self._default_branch(owner, repo)
+        message = message or _message(changes)
+        base = f"/repos/{owner}/{repo}/git"
+        for attempt in range(self.max_retries + 1):
+            head = (await client.request("GET", f"{base}/ref/heads/{branch}")).json()
+            head_sha = head["object"]["sha"]
+            # Appends and deletions need the head's listing to find the notes.
+            listing = None
+            if any(c.action != "write" for c in changes):
+                listing = await self.trees.tree_at(owner, repo, head_sha)
+                base_tree = listing.sha
+            else:
+                commit = await client.request("GET", f"{base}/commits/{head_sha}")
+                base_tree = commit.json()["tree"]["sha"]
+            entries = await self._entries(owner, repo, listing, changes)
+            tree = await client.request(
+                "POST", f"{base}/trees", json={"base_tree": base_tree, "tree": entries}
+            )
+            commit = (
+                await client.request(
+                    "POST",
+                    f"{base}/commits",
+                    json={
+                        "message": message,
+                        "tree": tree.json()["sha"],
+                        "parents": [head_sha],
+                    },
+                )
+            ).json()
+            try:
+                await client.request(
+                    "PATCH",
+                    f"{base}/refs/heads/{branch}",
+                    json={"sha": commit["sha"], "force": False},
+                )
+            except GitHubApiError as e:
+                # 422 "Update is not a fast forward": the branch moved under us.
+                if e.status_code not in (409, 422):
+                    raise
+                self.conflicts += 1
+                logfire.warn(
+                    "Vault commit conflict on {owner}/{repo}, attempt {attempt}",
+                    owner=owner,
+                    repo=repo,
+                    attempt=attempt + 1,
+                )
+                await asyncio.sleep(random.uniform(0, 0.1 * 2**attempt))
+                continue
+            return {
+                "success": True,
+                "commit": commit["sha"],
+                "changed": [c.path for c in changes],
+                "attempts": attempt + 1,
+            }
+        raise CommitConflictError(
+            f"{owner}/{repo}@{branch} kept changing; gave up after "
+            f"{self.max_retries + 1} attempts"
+        )
+
+    # -------------------- Helpers --------------------
+
+    async def _default_branch(self, owner: str, repo: str) -> str:
+        branch = self._branches.get((owner, repo))
+        if branch is None:
+            response = await self.trees.client.request("GET", f"/repos/{owner}/{repo}")
+            payload = response.json()
+            branch = self._branches[(owner, repo)] = payload["default_branch"]
+        return branch
+
+    async def _entries(
+        self,
+        owner: str,
+        repo: str,
+        listing: VaultTree | None,
+        changes: list[NoteChange],
+    ) -> list[dict[str, Any]]:
+        """Tree entries applying ``changes`` on top of ``listing``."""
+        contents: dict[str, str | None] = {}
+        for change in changes:
+            path = change.path.strip("/")
+            if change.action == "write":
+                contents[path] = change.content
+                continue
+            blob = listing.blob_sha(path)
+            if path in contents:
+                current = contents[path]
+            elif blob is None:
+                current = None
+            elif change.action == "append":
+                current = (await self.trees.client.blob(owner, repo, blob)).decode()
+            else:
+                current = ""  # a delete only needs to know the note exists
+            if current is None:
+                raise FileNotFoundError(f"Note '{path}' not found.")
+            if change.action == "append":
+                contents[path] = current + change.content
+            else:
+                contents[path] = None
+        entries = []
+        for path, text in contents.items():
+            if text is not None:
+                entries.append(
+                    {"path": path, "mode": "100644", "type": "blob", "content": text}
+                )
+            elif listing.blob_sha(path) is not None:
+                # Deleting a note written earlier in the batch needs no entry.
+                entries.append(
+                    {"path": path, "mode": "100644", "type": "blob", "sha": None}
+                )
+        return entries
+
+
+def _message(changes: list[NoteChange]) -> str:
+    verbs = {"write": "Update", "append": "Append to", "delete": "Delete"}
+    if len(changes) == 1:
+        return f"{verbs[changes[0].action]} {changes[0].path}"
+    lines = [f"{verbs[c.action]} {c.path}" for c in changes]
+    return f"Update {len(changes)} notes\n\n" + "\n".join(lines)
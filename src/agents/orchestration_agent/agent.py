@@ -3,18 +3,22 @@
 from pydantic_ai import Agent, RunContext
 from dotenv import load_dotenv
 
+from src.agents.common.model import rate_limited
+from src.agents.common.speculation import FORWARD_QUERY_INSTRUCTION
+from src.core.rate_limit import Priority
+
 load_dotenv(override=True)
 
 # agent = Agent(model="google-gla:gemini-2.5-pro", name="personal_assistant_agent")
 
 
-def personal_assistant_system_prompt() -> str:
+def personal_assistant_system_prompt(speculation: bool = False) -> str:
     """
     Returns the comprehensive system prompt for the AI-powered GitHub Pull Request review agent.
 
     The prompt provides detailed, step-by-step instructions for conducting a multi-phase PR review, including technical analysis, lint report evaluation, interactive feedback, risk assessment, and actionable review comment generation. It specifies the required comment format, outlines the use of available GitHub MCP tools, and defines the expected structure and tone for the agent's output. The prompt is dynamically populated with PR metadata from the provided context.
     """
-    return """
+    prompt = """
 You are an AI-powered personal assistant designed to help with a wide range of tasks by leveraging specialized tools. Your primary goal is to understand the user's request, determine the most appropriate tool(s) to use (Todoist, Calendar, Gmail), execute the necessary actions, and provide a clear, concise, and helpful response.
 
 Here's how you should operate:
@@ -26,6 +30,7 @@ Here's how you should operate:
     * If the request involves managing events, appointments, meetings, checking availability, or setting reminders related to a calendar, use the `calendar_agent`.
     * If the request involves reading, sending, drafting, or searching emails, use the `gmail_agent`.
     * If a request can be fulfilled by combining multiple tools, plan your steps accordingly.
+    * If the `get_daily_briefing` tool is available, call it first for broad "what does my day/week look like" questions and answer from it when it is fresh; only query the agents for sections it reports as stale or missing.
 3.  **Clarification (if necessary):** If the request is ambiguous or requires more information to proceed effectively, ask clarifying questions. Be specific about what information you need.
 4.  **Action and Response:** Once you have a clear understanding and have used the appropriate tool(s), provide a direct and helpful response to the user.
     * Confirm the action taken (e.g., "I've added 'Buy groceries' to your Todoist list.").
@@ -53,11 +58,15 @@ Here's how you should operate:
 * "Summarize my unread emails."
 
 """
+    if speculation:
+        # Speculative lookups are only served for the message they sent.
+        prompt += FORWARD_QUERY_INSTRUCTION
+    return prompt
 
 
 def create_orchestration_agent(tools):
     agent = Agent(
-        model="google-gla:gemini-2.5-pro",
+        model=rate_limited("google-gla:gemini-2.5-pro", Priority.INTERACTIVE),
         name="personal_assistant_agent",
         tools=tools,
         system_prompt=personal_assistant_system_prompt,
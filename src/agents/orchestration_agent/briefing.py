@@ -0,0 +1,235 @@
+"""
+Precomputed daily briefing for the orchestration agent.
+
+A background job periodically asks the Calendar, Todoist and Gmail agents for
+the standing "what does my day/week look like" facts and stores them as a
+snapshot on disk. The orchestrator answers broad day/week questions from the
+snapshot when it is fresh enough, and a mutation sent through the A2A client
+(e.g. creating an event) refreshes only the affected section.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import logfire
+
+from src.agents.common.speculation import is_mutating
+from src.core.rate_limit import Priority, priority
+
+if TYPE_CHECKING:
+    from src.agents.common.tool_client import A2AToolClient
+
+SECTION_PROMPTS: dict[str, str] = {
+    "calendar": (
+        "List all of my events for today, then all remaining events for this week "
+        "(through Sunday). Include start/end times, titles and locations."
+    ),
+    "todoist": (
+        "List my overdue tasks, tasks due today and tasks due later this week, "
+        "with their due dates and priorities."
+    ),
+    "gmail": (
+        "Summarize my unread emails marked important from the last 2 days: "
+        "sender, subject and a one-line summary each."
+    ),
+}
+
+
+class BriefingService:
+    """Builds, stores and serves the daily briefing snapshot."""
+
+    def __init__(
+        self,
+        client: A2AToolClient,
+        path: str = ".cache/briefing.json",
+        refresh_interval: float = 15 * 60,
+        max_age: float = 30 * 60,
+    ):
+        self.client = client
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.sections: dict[str, dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        # Sections changed by a mutation, with when; cleared by the first
+        # refresh of the section that starts after it.
+        self._dirty: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._load()
+        client.add_mutation_listener(self._on_mutation)
+
+    @classmethod
+    def from_env(cls, client: A2AToolClient) -> BriefingService | None:
+        """Build the service when ``DAILY_BRIEFING`` is enabled."""
+        if os.getenv("DAILY_BRIEFING", "").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(
+            client,
+            path=os.getenv("BRIEFING_PATH", ".cache/briefing.json"),
+            refresh_interval=float(os.getenv("BRIEFING_REFRESH_MINUTES", "15")) * 60,
+            max_age=float(os.getenv("BRIEFING_MAX_AGE_MINUTES", "30")) * 60,
+        )
+
+    # -------------------- Background job --------------------
+
+    async def run_forever(self) -> None:
+        """Refresh stale or dirty sections until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            # Cleared before reading _dirty so a mutation during the refresh
+            # wakes the loop again instead of waiting a full interval.
+            self._wakeup.clear()
+            with self._lock:
+                due = {
+                    name
+                    for name in SECTION_PROMPTS
+                    if self._age(name) >= self.refresh_interval
+                } | set(self._dirty)
+            if due:
+                await self.refresh(sorted(due))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.refresh_interval)
+            except TimeoutError:
+                pass
+
+    def run_in_background(self) -> threading.Thread:
+        """Run the refresh job on its own event loop in a daemon thread."""
+        thread = threading.Thread(
+            target=lambda: asyncio.run(self.run_forever()), daemon=True
+        )
+        thread.start()
+        return thread
+
+    async def refresh(self, sections: list[str] | None = None) -> None:
+        """Rebuild the given sections (all by default) at background priority."""
+        names = sections or list(SECTION_PROMPTS)
+        urls = {name: self._resolve(name) for name in names}
+        started = time.time()
+        with priority(Priority.BACKGROUND):
+            results = await asyncio.gather(
+                *(
+                    self.client.send_message(url, SECTION_PROMPTS[name])
+                    for name, url in urls.items()
+                    if url is not None
+                ),
+                return_exceptions=True,
+            )
+        resolved = [name for name, url in urls.items() if url is not None]
+        now = time.time()
+        with self._lock:
+            for name, result in zip(resolved, results):
+                if isinstance(result, BaseException):
+                    logfire.warn(
+                        "briefing refresh of {section} failed: {error}",
+                        section=name,
+                        error=str(result),
+                    )
+                    continue
+                self.sections[name] = {"content": result, "refreshed_at": now}
+                if name in self._dirty and self._dirty[name] <= started:
+                    del self._dirty[name]
+            self.refreshes += 1
+            self._save()
+
+    # -------------------- Serving --------------------
+
+    def get_daily_briefing(self, max_age_minutes: int = 30) -> str:
+        """
+        Return the precomputed briefing of today's and this week's events, due and overdue tasks and unread important emails.
+
+        Call this first for broad questions about the user's day or week. If it
+        reports that a section is stale or missing, query that agent directly.
+
+        Args:
+            max_age_minutes: Oldest snapshot age, in minutes, that is acceptable.
+        """
+        max_age = min(max_age_minutes * 60, self.max_age)
+        lines = []
+        fresh = True
+        with self._lock:
+            for name in SECTION_PROMPTS:
+                section = self.sections.get(name)
+                age = self._age(name)
+                if section is None or age > max_age or name in self._dirty:
+                    fresh = False
+                    lines.append(
+                        f"## {name}\n(stale or missing - ask the {name} agent)"
+                    )
+                    continue
+                stamp = datetime.fromtimestamp(section["refreshed_at"]).isoformat(
+                    timespec="minutes"
+                )
+                lines.append(
+                    f"## {name} (as of {stamp}, {int(age // 60)} min old)\n"
+                    f"{section['content']}"
+                )
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return "\n\n".join(lines)
+
+    def stats(self) -> dict[str, Any]:
+        """Hit rate and per-section staleness of the snapshot."""
+        with self._lock:
+            served = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / served, 3) if served else 0.0,
+                "refreshes": self.refreshes,
+                "staleness_seconds": {
+                    name: round(self._age(name), 1) for name in SECTION_PROMPTS
+                },
+            }
+
+    # -------------------- Internals --------------------
+
+    def _on_mutation(self, agent_url: str, message: str) -> None:
+        if not is_mutating(message):
+            return
+        card = self.client._agent_info_cache.get(agent_url) or {}
+        for name in SECTION_PROMPTS:
+            if name in card.get("name", "").lower():
+                with self._lock:
+                    self._dirty[name] = time.time()
+                if self._loop is not None and self._wakeup is not None:
+                    self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _resolve(self, name: str) -> str | None:
+        for url, card in self.client._agent_info_cache.items():
+            if card and name in card.get("name", "").lower():
+                return url
+        return None
+
+    def _age(self, name: str) -> float:
+        section = self.sections.get(name)
+        if section is None:
+            return float("inf")
+        return time.time() - section["refreshed_at"]
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.sections = json.load(f)
+        except (OSError, ValueError):
+            self.sections = {}
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.sections, f)
+        os.replace(tmp_path, self.path)
@@ -1,15 +1,31 @@
 """Agent module."""
 
+from datetime import date
+
 from pydantic_ai import Agent, RunContext
 
-from src.mcp_handler.mcp_todoist import server
+from src.mcp_handler.mcp_todoist import (
+    MUTATING_TOOLS,
+    compactor,
+    hooks,
+    scheduler,
+    server,
+)
 from dotenv import load_dotenv
 
+from src.agents.common.model import rate_limited
+from .mirror import TodoistApiError, TodoistMirror
+from .models import TaskOperation
+
 load_dotenv(override=True)
 
+mirror = TodoistMirror.from_env()
+hooks.on_result(mirror.invalidate, MUTATING_TOOLS)
+
 agent = Agent(
-    model="google-gla:gemini-2.5-flash",
+    model=rate_limited("google-gla:gemini-2.5-flash"),
     mcp_servers=[server],
+    tools=[compactor.retrieval_tool()],
 )
 
 
@@ -64,6 +80,14 @@ You are capable of handling requests that require multiple actions or tool calls
 *   **`todoist_complete_task`**: Marks tasks as complete. Finds task by partial name.
 *   **`todoist_delete_task`**: Removes tasks. Finds task by partial name. Requires confirmation.
 
+**Fast Local Lookups:**
+
+A local, continuously synced mirror of the account backs two extra tools. Prefer them over `todoist_get_tasks` for reading:
+
+*   **`list_tasks`**: Tasks filtered by `due` ("overdue", "today" or an ISO date), a `due_after`/`due_before` range, `priority`, `project` or `label`.
+*   **`find_tasks`**: Fuzzy task-name search. Use it to resolve which task the user means before updating, completing or deleting it, and pass the exact task name it returns to the MCP tool. If several tasks score similarly, ask the user which one they meant.
+*   **`bulk_update_tasks`**: Whenever a request touches more than one task ("complete these five tasks and move the rest to Monday"), resolve the task ids with `find_tasks`/`list_tasks` and submit ALL the changes in a single `bulk_update_tasks` call instead of calling the MCP tools once per task. New tasks can be given a `ref` that later operations in the same call use as `task_id` or `parent_id`.
+
 **Your Goal:** To be a seamless and reliable interface between the user and their Todoist, making task management effortless. Strive for accuracy and clarity above all.
 """
 
@@ -76,4 +100,108 @@ async def run_todoist_agent(task: str) -> str:
         return result.output
 
 
+@agent.tool
+async def list_tasks(
+    ctx: RunContext,
+    due: str | None = None,
+    due_after: str | None = None,
+    due_before: str | None = None,
+    priority: int | None = None,
+    project: str | None = None,
+    label: str | None = None,
+    limit: int = 50,
+) -> dict:
+    """List active tasks from the local mirror, soonest due first.
+
+    Args:
+        due: "overdue", "today", or an ISO date (YYYY-MM-DD) for tasks due that day.
+        due_after: Only tasks due on/after this ISO date.
+        due_before: Only tasks due on/before this ISO date.
+        priority: API priority, 4 (the apps' p1, urgent) down to 1 (p4, none).
+        project: Project name or id.
+        label: Label name.
+        limit: Maximum number of tasks to return.
+    """
+    try:
+        await mirror.ensure_fresh()
+        filters = {"priority": priority, "project": project, "label": label}
+        if due == "overdue":
+            tasks = mirror.overdue(limit=limit, **filters)
+        elif due == "today":
+            tasks = mirror.due_today(limit=limit, **filters)
+        else:
+            if due is not None:
+                due_after = due_before = date.fromisoformat(due).isoformat()
+            tasks = mirror.query(due_after, due_before, limit=limit, **filters)
+    except (TodoistApiError, OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "tasks": tasks}
+
+
+@agent.tool
+async def find_tasks(ctx: RunContext, name: str, limit: int = 5) -> dict:
+    """Fuzzy-match active tasks by name; best matches first with a 0-1 match_score.
+
+    Args:
+        name: The task name or part of it, as the user said it.
+        limit: Maximum number of matches to return.
+    """
+    try:
+        await mirror.ensure_fresh()
+        tasks = mirror.find(name, limit)
+    except (TodoistApiError, OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "tasks": tasks}
+
+
+@agent.tool
+async def bulk_update_tasks(ctx: RunContext, operations: list[TaskOperation]) -> dict:
+    """Apply many task changes (add, update, complete, reopen, delete, move) in one request.
+
+    Args:
+        operations: The changes, applied in order. Each result reports the
+            operation's status and the (resolved) task id.
+    """
+    commands = []
+    results: list[dict] = []
+    for position, operation in enumerate(operations):
+        try:
+            command = operation.to_command()
+        except ValueError as e:
+            results.append({"index": position, "status": "error", "error": str(e)})
+            continue
+        commands.append(command)
+        results.append(
+            {
+                "index": position,
+                "action": operation.action,
+                "uuid": command["uuid"],
+                "temp_id": command.get("temp_id"),
+            }
+        )
+    try:
+        # Ordered with the MCP server's mutating tools called in the same turn.
+        async with scheduler.slot("bulk_update_tasks", mutating=True):
+            outcome = await mirror.commit(commands) if commands else {}
+    except (TodoistApiError, OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+
+    mapping = outcome.get("temp_id_mapping", {})
+    for result, operation in zip(results, operations):
+        command_uuid = result.pop("uuid", None)
+        temp_id = result.pop("temp_id", None)
+        if command_uuid is None:
+            continue
+        status = outcome["sync_status"].get(command_uuid, "missing")
+        result["status"] = "ok" if status == "ok" else "error"
+        if status != "ok":
+            result["error"] = status
+        task_id = mapping.get(temp_id) if temp_id else operation.task_id
+        result["task_id"] = mapping.get(task_id, task_id)
+    return {
+        "success": all(r["status"] == "ok" for r in results),
+        "results": results,
+    }
+
+
 app = agent.to_a2a()
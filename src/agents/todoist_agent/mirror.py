@@ -0,0 +1,454 @@
+"""
+Local mirror of the user's Todoist tasks, projects and labels.
+
+The mirror is kept current with Todoist's incremental Sync API: the first
+request uses ``sync_token="*"`` (full sync) and every later one sends the
+token from the previous response, receiving only what changed. Active tasks
+are indexed by due date (a sorted array of dates), priority, project and
+label, and a trigram index answers fuzzy task-name lookups, so "what is
+overdue?" or "complete the dentist task" need no MCP round trip.
+
+The mirror is written to disk at most every ``save_interval`` seconds and only
+when a sync changed something. A file that lags behind is harmless: it holds
+the sync token that matches its contents, so the next process re-receives the
+changes it is missing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+from datetime import UTC, date, datetime
+from typing import Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import httpx
+import logfire
+
+TODOIST_SYNC_URL = "https://api.todoist.com/api/v1/sync"
+RESOURCE_TYPES = ["items", "projects", "labels"]
+
+
+class TodoistApiError(RuntimeError):
+    """Raised when the Todoist Sync API returns an error status."""
+
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"Todoist API error {status_code}: {body[:500]}")
+        self.status_code = status_code
+
+
+def trigrams(text: str) -> set[str]:
+    """Character trigrams of the lower-cased, space-padded words of ``text``."""
+    grams: set[str] = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _due_date(task: dict[str, Any]) -> str | None:
+    due = task.get("due")
+    return due["date"][:10] if due and due.get("date") else None
+
+
+def _due_moment(task: dict[str, Any]) -> datetime | None:
+    """The aware due time of a timed task, or None for date-only due dates."""
+    due = task.get("due") or {}
+    value = due.get("date") or ""
+    if "T" not in value:
+        return None
+    # Fixed-zone times are UTC ("...Z"); floating ones are wall-clock times in
+    # the task's time zone if it has one, else in the local zone.
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        return moment
+    try:
+        tz = ZoneInfo(due["timezone"]) if due.get("timezone") else None
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = None
+    return moment.replace(tzinfo=tz) if tz else moment.astimezone()
+
+
+class TodoistMirror:
+    """Incrementally synced, indexed copy of the Todoist account."""
+
+    def __init__(
+        self,
+        token: str,
+        url: str = TODOIST_SYNC_URL,
+        path: str = ".cache/todoist_mirror.json",
+        max_age: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+        save_interval: float = 30.0,
+    ):
+        self.token = token
+        self.url = url
+        self.path = path
+        self.max_age = max_age
+        self.transport = transport
+        self.save_interval = save_interval
+        self.sync_token = "*"
+        self.tasks: dict[str, dict[str, Any]] = {}
+        self.projects: dict[str, dict[str, Any]] = {}
+        self.labels: dict[str, dict[str, Any]] = {}
+        self.synced_at = 0.0
+        self.requests_sent = 0
+        self.queries = 0
+        self.saves = 0
+        self._invalidations = 0
+        self._unsaved = False
+        self._saved_at = 0.0
+        self._by_due: dict[str, set[str]] = defaultdict(set)
+        self._due_dates: list[str] = []
+        self._by_priority: dict[int, set[str]] = defaultdict(set)
+        self._by_project: dict[str, set[str]] = defaultdict(set)
+        self._by_label: dict[str, set[str]] = defaultdict(set)
+        self._by_trigram: dict[str, set[str]] = defaultdict(set)
+        self._gram_counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._sync_lock: asyncio.Lock | None = None
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> TodoistMirror:
+        return cls(
+            os.getenv("TODOIST_API_TOKEN", ""),
+            url=os.getenv("TODOIST_SYNC_URL", TODOIST_SYNC_URL),
+            path=os.getenv("TODOIST_MIRROR_PATH", ".cache/todoist_mirror.json"),
+        )
+
+    # -------------------- Sync --------------------
+
+    async def sync(self) -> dict[str, Any]:
+        """Pull changes since the last sync token (everything the first time)."""
+        payload, changed = await self._sync_request({})
+        return {"full_sync": payload.get("full_sync", False), "changed": changed}
+
+    async def commit(self, commands: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Send ``commands`` as one Sync API batch and fold the changes in.
+
+        The same request also reads everything changed since the last sync, so
+        the mirror reflects the batch without a second round trip. Returns the
+        per-command ``sync_status`` (keyed by command uuid) and the
+        ``temp_id_mapping`` of added tasks.
+        """
+        payload, _ = await self._sync_request({"commands": json.dumps(commands)})
+        return {
+            "sync_status": payload.get("sync_status", {}),
+            "temp_id_mapping": payload.get("temp_id_mapping", {}),
+        }
+
+    async def _sync_request(self, data: dict[str, Any]) -> tuple[dict[str, Any], int]:
+        if self._sync_lock is None:
+            self._sync_lock = asyncio.Lock()
+        async with self._sync_lock:
+            invalidations = self._invalidations
+            payload = await self._post(
+                {
+                    **data,
+                    "sync_token": self.sync_token,
+                    "resource_types": json.dumps(RESOURCE_TYPES),
+                }
+            )
+            changed = self.apply(payload)
+            if invalidations == self._invalidations:
+                self.synced_at = time.time()
+            if time.monotonic() - self._saved_at >= self.save_interval:
+                self.flush()
+            return payload, changed
+
+    async def ensure_fresh(self) -> None:
+        if time.time() - self.synced_at > self.max_age:
+            await self.sync()
+
+    def invalidate(self, *_: Any) -> None:
+        """Sync before the next query (usable as a tool-call listener)."""
+        self._invalidations += 1
+        self.synced_at = 0.0
+
+    def flush(self) -> None:
+        """Write the mirror to disk if it changed since the last write."""
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def apply(self, payload: dict[str, Any]) -> int:
+        """Apply a Sync API response to the mirror; ``flush`` persists it."""
+        with self._lock:
+            if payload.get("full_sync"):
+                self._reset()
+            for project in payload.get("projects", []):
+                if project.get("is_deleted"):
+                    self.projects.pop(project["id"], None)
+                else:
+                    self.projects[project["id"]] = project
+            for label in payload.get("labels", []):
+                if label.get("is_deleted"):
+                    self.labels.pop(label["id"], None)
+                else:
+                    self.labels[label["id"]] = label
+            items = payload.get("items", [])
+            for task in items:
+                self._unindex(task["id"])
+                if task.get("is_deleted") or task.get("checked"):
+                    continue
+                self.tasks[task["id"]] = task
+                self._index(task)
+            self.sync_token = payload.get("sync_token", self.sync_token)
+            if (
+                payload.get("full_sync")
+                or items
+                or payload.get("projects")
+                or payload.get("labels")
+            ):
+                self._unsaved = True
+            return len(items)
+
+    async def _post(self, data: dict[str, Any]) -> dict[str, Any]:
+        self.requests_sent += 1
+        response = await self._http().post(
+            self.url, data=data, headers={"Authorization": f"Bearer {self.token}"}
+        )
+        if response.status_code >= 400:
+            raise TodoistApiError(response.status_code, response.text)
+        return response.json()
+
+    def _http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=30.0, transport=self.transport)
+            self._clients[loop] = client
+        return client
+
+    # -------------------- Indexes --------------------
+
+    def _index(self, task: dict[str, Any]) -> None:
+        task_id = task["id"]
+        due = _due_date(task)
+        if due is not None:
+            if not self._by_due[due]:
+                bisect.insort(self._due_dates, due)
+            self._by_due[due].add(task_id)
+        self._by_priority[task.get("priority", 1)].add(task_id)
+        self._by_project[task.get("project_id") or ""].add(task_id)
+        for label in task.get("labels", []):
+            self._by_label[label.lower()].add(task_id)
+        grams = trigrams(task.get("content", ""))
+        for gram in grams:
+            self._by_trigram[gram].add(task_id)
+        self._gram_counts[task_id] = len(grams)
+
+    def _unindex(self, task_id: str) -> None:
+        task = self.tasks.pop(task_id, None)
+        if task is None:
+            return
+        due = _due_date(task)
+        if due is not None:
+            self._by_due[due].discard(task_id)
+            if not self._by_due[due]:
+                del self._by_due[due]
+                self._due_dates.pop(bisect.bisect_left(self._due_dates, due))
+        self._by_priority[task.get("priority", 1)].discard(task_id)
+        self._by_project[task.get("project_id") or ""].discard(task_id)
+        for label in task.get("labels", []):
+            self._by_label[label.lower()].discard(task_id)
+        for gram in trigrams(task.get("content", "")):
+            self._by_trigram[gram].discard(task_id)
+        self._gram_counts.pop(task_id, None)
+
+    def _reset(self) -> None:
+        self.tasks.clear()
+        self.projects.clear()
+        self.labels.clear()
+        for index in (
+            self._by_due,
+            self._by_priority,
+            self._by_project,
+            self._by_label,
+            self._by_trigram,
+            self._gram_counts,
+        ):
+            index.clear()
+        self._due_dates.clear()
+
+    # -------------------- Queries --------------------
+
+    def query(
+        self,
+        due_after: str | None = None,
+        due_before: str | None = None,
+        priority: int | None = None,
+        project: str | None = None,
+        label: str | None = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """
+        Active tasks matching every given filter, soonest due first.
+
+        ``due_after``/``due_before`` are inclusive ISO dates; ``project`` is a
+        project id or (case-insensitive) name.
+        """
+        with self._lock:
+            self.queries += 1
+            candidates: list[set[str]] = []
+            if due_after is not None or due_before is not None:
+                lo = bisect.bisect_left(self._due_dates, due_after or "")
+                hi = (
+                    bisect.bisect_right(self._due_dates, due_before)
+                    if due_before is not None
+                    else len(self._due_dates)
+                )
+                candidates.append(
+                    set().union(*(self._by_due[d] for d in self._due_dates[lo:hi]))
+                )
+            if priority is not None:
+                candidates.append(self._by_priority.get(priority, set()))
+            if project is not None:
+                candidates.append(
+                    set().union(
+                        *(
+                            self._by_project.get(project_id, set())
+                            for project_id in self._project_ids(project)
+                        )
+                    )
+                )
+            if label is not None:
+                candidates.append(self._by_label.get(label.lower(), set()))
+            if candidates:
+                ids = set.intersection(*sorted(candidates, key=len))
+            else:
+                ids = set(self.tasks)
+            tasks = [self.tasks[i] for i in ids]
+        tasks.sort(key=lambda t: (_due_date(t) or "9999", -t.get("priority", 1)))
+        return [self.summarize(t) for t in tasks[:limit]]
+
+    def overdue(
+        self, today: date | None = None, limit: int = 50, **filters: Any
+    ) -> list[dict[str, Any]]:
+        """Tasks due before today, plus timed tasks due earlier today."""
+        today = today or date.today()
+        before = self.query(due_before=_previous_day(today), limit=limit, **filters)
+        now = datetime.now(UTC)
+        for task in self.due_today(today, limit, **filters):
+            with self._lock:
+                moment = _due_moment(self.tasks.get(task["id"], {}))
+            if moment is not None and moment < now:
+                before.append(task)
+        return before[:limit]
+
+    def due_today(
+        self, today: date | None = None, limit: int = 50, **filters: Any
+    ) -> list[dict[str, Any]]:
+        day = (today or date.today()).isoformat()
+        return self.query(due_after=day, due_before=day, limit=limit, **filters)
+
+    def find(
+        self, text: str, limit: int = 5, min_score: float = 0.3
+    ) -> list[dict[str, Any]]:
+        """Fuzzy task-name match ranked by trigram (Dice) similarity."""
+        grams = trigrams(text)
+        if not grams:
+            return []
+        with self._lock:
+            self.queries += 1
+            shared: dict[str, int] = defaultdict(int)
+            for gram in grams:
+                for task_id in self._by_trigram.get(gram, ()):
+                    shared[task_id] += 1
+            needle = text.lower()
+            scored = []
+            for task_id, count in shared.items():
+                score = 2 * count / (len(grams) + self._gram_counts[task_id])
+                if needle in self.tasks[task_id].get("content", "").lower():
+                    score = max(score, 0.9)
+                if score >= min_score:
+                    scored.append((score, task_id))
+            scored.sort(reverse=True)
+            return [
+                {**self.summarize(self.tasks[i]), "match_score": round(s, 2)}
+                for s, i in scored[:limit]
+            ]
+
+    def summarize(self, task: dict[str, Any]) -> dict[str, Any]:
+        due = task.get("due") or {}
+        project = self.projects.get(task.get("project_id") or "", {})
+        return {
+            "id": task["id"],
+            "content": task.get("content", ""),
+            "description": task.get("description", ""),
+            "due": due.get("date"),
+            "due_string": due.get("string"),
+            "recurring": due.get("is_recurring", False),
+            # API priority 4 is what the apps show as "p1".
+            "priority": task.get("priority", 1),
+            "project": project.get("name"),
+            "labels": task.get("labels", []),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "tasks": len(self.tasks),
+                "projects": len(self.projects),
+                "labels": len(self.labels),
+                "requests": self.requests_sent,
+                "queries": self.queries,
+                "saves": self.saves,
+                "age_seconds": round(time.time() - self.synced_at, 1),
+            }
+
+    def _project_ids(self, project: str) -> list[str]:
+        if project in self.projects:
+            return [project]
+        name = project.lower()
+        return [
+            p["id"] for p in self.projects.values() if p.get("name", "").lower() == name
+        ]
+
+    # -------------------- Persistence --------------------
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        try:
+            self.apply({**data, "full_sync": True})
+        except KeyError as e:
+            logfire.warn("ignoring corrupt todoist mirror: {error}", error=str(e))
+            self._reset()
+            self.sync_token = "*"
+        # The file already holds what was just loaded.
+        self._unsaved = False
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "sync_token": self.sync_token,
+            "items": list(self.tasks.values()),
+            "projects": list(self.projects.values()),
+            "labels": list(self.labels.values()),
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data))
+        os.replace(tmp_path, self.path)
+        self.saves += 1
+        self._unsaved = False
+        self._saved_at = time.monotonic()
+
+
+def _previous_day(day: date) -> str:
+    return date.fromordinal(day.toordinal() - 1).isoformat()
@@ -0,0 +1,80 @@
+"""
+Models for the Todoist agent's native tools.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+COMMAND_TYPES = {
+    "add": "item_add",
+    "update": "item_update",
+    # item_close moves recurring tasks to their next occurrence.
+    "complete": "item_close",
+    "reopen": "item_uncomplete",
+    "delete": "item_delete",
+    "move": "item_move",
+}
+
+
+class TaskOperation(BaseModel):
+    """
+    One task mutation in a bulk request.
+
+    Existing tasks are addressed by ``task_id``. An ``add`` may set ``ref`` so
+    later operations in the same request can use it as their ``task_id`` or
+    ``parent_id`` before the real id exists.
+    """
+
+    action: Literal["add", "update", "complete", "reopen", "delete", "move"]
+    task_id: str | None = Field(
+        default=None, description="Id of the task, or the ref of an earlier add."
+    )
+    ref: str | None = Field(
+        default=None, description="For add: a name later operations can refer to."
+    )
+    content: str | None = None
+    description: str | None = None
+    due_string: str | None = Field(
+        default=None, description='Natural-language due date, e.g. "next Monday".'
+    )
+    due_date: str | None = Field(default=None, description="ISO due date.")
+    priority: int | None = Field(default=None, ge=1, le=4)
+    labels: list[str] | None = None
+    project_id: str | None = None
+    parent_id: str | None = None
+
+    def to_command(self) -> dict[str, Any]:
+        """The Sync API command for this operation."""
+        if self.action != "add" and not self.task_id:
+            raise ValueError(f"{self.action} needs a task_id")
+        if self.action == "add" and not self.content:
+            raise ValueError("add needs content")
+        args: dict[str, Any] = {}
+        if self.action != "add":
+            args["id"] = self.task_id
+        if self.action in ("add", "update"):
+            for name in ("content", "description", "priority", "labels"):
+                value = getattr(self, name)
+                if value is not None:
+                    args[name] = value
+            if self.due_string is not None:
+                args["due"] = {"string": self.due_string}
+            elif self.due_date is not None:
+                args["due"] = {"date": self.due_date}
+        if self.action in ("add", "move"):
+            if self.project_id is not None:
+                args["project_id"] = self.project_id
+            if self.parent_id is not None:
+                args["parent_id"] = self.parent_id
+        command = {
+            "type": COMMAND_TYPES[self.action],
+            "uuid": str(uuid.uuid4()),
+            "args": args,
+        }
+        if self.action == "add":
+            command["temp_id"] = self.ref or str(uuid.uuid4())
+        return command
@@ -1,69 +1,497 @@
 """
 This module contains the function to run a command in a subprocess.
 
+Commands run in their own process group (session), so a timeout can kill
+the command together with everything it started — ``npm``, ``pytest`` and
+semgrep all spawn children that would otherwise outlive it.
+
+``run_command`` buffers all output until the command exits. For tools that
+can print megabytes, ``stream_command`` / ``run_command_async`` hand out
+lines as they arrive and keep only the first and last lines of each stream
+(optionally spooling everything to a temporary file), so memory stays flat
+whatever the command prints.
+
 Args:
     command: The command to run.
     cwd: The current working directory.
+    timeout: Seconds before the command's process tree is killed.
+    head_lines: Lines kept from the start of each stream when streaming.
+    tail_lines: Lines kept from the end of each stream when streaming.
+    spool: Whether streaming also writes the full output to a temporary file.
 
 Returns:
     dict: The output of the command.
 """
 
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
 import subprocess
-from typing import Any
+import tempfile
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any, Self
 
 from core.logger import logger
 
+# How long a timed-out command gets to exit after SIGTERM before SIGKILL.
+KILL_GRACE = 2.0
+
+
+def kill_process_tree(proc: subprocess.Popen, grace: float = KILL_GRACE) -> None:
+    """
+    Terminate a process started with ``start_new_session=True`` and its children.
+
+    Sends SIGTERM to the whole process group, then SIGKILL to whatever is still
+    running after ``grace`` seconds.
+    """
+    if not hasattr(os, "killpg"):
+        proc.kill()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        proc.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        pass
+    # Children may ignore SIGTERM or outlive the leader.
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
 
-def run_command(command: list[str | int], cwd: str) -> dict[str, Any]:
+def run_command(
+    command: list[str | int], cwd: str, timeout: float | None = None
+) -> dict[str, Any]:
     """
     Execute a shell command as a subprocess in a specified working directory.
 
     Parameters:
         command (list[str | int]): The command and its arguments to execute.
         cwd (str): The working directory in which to run the command.
+        timeout (float, optional): Seconds to wait before killing the command and its child processes. Defaults to no limit.
 
     Returns:
-        dict[str, Any]: A dictionary containing the executed command string, return code, standard output, standard error, and a success flag. If the command is not found or exits with a non-zero status, success is set to False and error details are included.
+        dict[str, Any]: A dictionary containing the executed command string, return code, standard output, standard error, wall time in seconds, and a success flag. If the command is not found, exits with a non-zero status or times out, success is set to False and error details are included; a timeout also sets ``timed_out``.
     """
     # Ensure every part of the command is a string for join/exec safety
     command_str_parts = [str(c) for c in command]
-    logger.info("Executing command: `%s` in `%s`", " ".join(command_str_parts), cwd)
+    command_str = " ".join(command_str_parts)
+    logger.info("Executing command: `%s` in `%s`", command_str, cwd)
+    start = time.perf_counter()
     try:
-        completed = subprocess.run(
+        proc = subprocess.Popen(
             command_str_parts,
             cwd=cwd,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            check=True,  # Raise exception on non-zero exit codes
+            start_new_session=True,
         )
-        logger.info("Command succeeded.")
-        return {
-            "command": " ".join(command_str_parts),
-            "returncode": completed.returncode,
-            "stdout": completed.stdout,
-            "stderr": completed.stderr,
-            "success": True,
-        }
     except FileNotFoundError:
         logger.exception("Command not found: %s", command_str_parts[0])
         return {
-            "command": " ".join(command_str_parts),
+            "command": command_str,
             "returncode": -1,
             "stdout": "",
             "stderr": (
                 f"Error: Command '{command_str_parts[0]}' not found. "
                 "Is it installed and in the system's PATH?"
             ),
+            "duration_s": round(time.perf_counter() - start, 3),
+            "success": False,
+        }
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logger.warning("Command timed out after %ss: %s", timeout, command_str)
+        kill_process_tree(proc)
+        try:
+            stdout, stderr = proc.communicate(timeout=KILL_GRACE)
+        except subprocess.TimeoutExpired:
+            # A child escaped the process group and still holds the pipes.
+            stdout, stderr = "", ""
+        return {
+            "command": command_str,
+            "returncode": proc.returncode,
+            "stdout": stdout,
+            "stderr": f"{stderr}\nError: Command timed out after {timeout}s.",
+            "duration_s": round(time.perf_counter() - start, 3),
             "success": False,
+            "timed_out": True,
         }
-    except subprocess.CalledProcessError as e:
+    except BaseException:
+        # Interrupted (KeyboardInterrupt, cancelled worker): don't leak the tree.
+        kill_process_tree(proc)
+        raise
+    duration = round(time.perf_counter() - start, 3)
+    if proc.returncode != 0:
         # This is expected for linting/testing failures
-        logger.warning("Command failed with exit code %d.", e.returncode)
+        logger.warning("Command failed with exit code %d.", proc.returncode)
         return {
-            "command": " ".join(command_str_parts),
-            "returncode": e.returncode,
-            "stdout": e.stdout,
-            "stderr": e.stderr,
+            "command": command_str,
+            "returncode": proc.returncode,
+            "stdout": stdout,
+            "stderr": stderr,
+            "duration_s": duration,
             "success": False,
         }
+    logger.info("Command succeeded.")
+    return {
+        "command": command_str,
+        "returncode": proc.returncode,
+        "stdout": stdout,
+        "stderr": stderr,
+        "duration_s": duration,
+        "success": True,
+    }
+
+
+# Streaming capture: lines are handed out as they arrive and only a bounded
+# head and tail of each stream is kept in the result.
+HEAD_LINES = 200
+TAIL_LINES = 200
+# Longer lines are split; bounds memory for output without newlines.
+MAX_LINE_BYTES = 64 * 1024
+# Characters of a line kept in the head/tail buffers (the spool keeps it all).
+KEPT_LINE_CHARS = 4096
+_READ_CHUNK = 64 * 1024
+# Chunks read ahead of the consumer before the command is held back by its pipes.
+_QUEUE_CHUNKS = 64
+
+
+def _kept(line: str) -> str:
+    return line if len(line) <= KEPT_LINE_CHARS else line[:KEPT_LINE_CHARS] + "…"
+
+
+class OutputCapture:
+    """Head and tail of one output stream, optionally spooled in full to a file."""
+
+    def __init__(self, name: str, head: int, tail: int, spool: bool):
+        self.name = name
+        self.head: list[str] = []
+        self.tail: deque[str] = deque(maxlen=tail)
+        self.max_head = head
+        self.lines = 0
+        self.bytes = 0
+        self.spool_path: str | None = None
+        self._spool: int | None = None
+        self._pending = bytearray()
+        if spool:
+            self._spool, self.spool_path = tempfile.mkstemp(
+                prefix="cmd-", suffix=f".{name}.log"
+            )
+
+    def add(self, block: bytes) -> list[str]:
+        """Record a block of whole lines; returns them decoded, without newlines."""
+        self.bytes += len(block)
+        if self._spool is not None:
+            self._pending += block
+            if len(self._pending) >= _READ_CHUNK:
+                self._flush()
+        lines = block.decode("utf-8", "replace").splitlines()
+        self.lines += len(lines)
+        room = self.max_head - len(self.head)
+        if room > 0:
+            self.head.extend(_kept(line) for line in lines[:room])
+        self.tail.extend(
+            _kept(line) for line in lines[max(room, 0) :][-self.tail.maxlen :]
+        )
+        return lines
+
+    def _flush(self) -> None:
+        view = memoryview(self._pending)
+        while view:
+            view = view[os.write(self._spool, view) :]
+        view.release()
+        self._pending.clear()
+
+    def close(self) -> None:
+        if self._spool is not None:
+            self._flush()
+            os.close(self._spool)
+            self._spool = None
+
+    @property
+    def omitted(self) -> int:
+        return self.lines - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        parts = list(self.head)
+        if self.omitted:
+            where = f"; full output in {self.spool_path}" if self.spool_path else ""
+            parts.append(f"... {self.omitted} lines omitted{where} ...")
+        parts.extend(self.tail)
+        return "\n".join(parts)
+
+
+class CommandStream:
+    """
+    An async, line-by-line run of a command with bounded capture.
+
+    Use as an async context manager and iterate it for ``(stream, line)``
+    pairs, ``stream`` being ``"stdout"`` or ``"stderr"``; ``result`` holds a
+    ``run_command``-shaped dictionary once the block exits. Leaving the block
+    without iterating waits for the command (bounded by ``timeout``); leaving
+    it before the iteration is exhausted (a ``break``), raising or being
+    cancelled kills the command's process tree.
+    """
+
+    def __init__(
+        self,
+        command: list[str | int],
+        cwd: str,
+        timeout: float | None = None,
+        head_lines: int = HEAD_LINES,
+        tail_lines: int = TAIL_LINES,
+        spool: bool = False,
+    ):
+        self.parts = [str(c) for c in command]
+        self.command = " ".join(self.parts)
+        self.cwd = cwd
+        self.timeout = timeout
+        self.captures = {
+            name: OutputCapture(name, head_lines, tail_lines, spool)
+            for name in ("stdout", "stderr")
+        }
+        self.result: dict[str, Any] | None = None
+        self.timed_out = False
+        self._proc: asyncio.subprocess.Process | None = None
+        self._queue: asyncio.Queue[tuple[str, list[str]] | None] = asyncio.Queue(
+            _QUEUE_CHUNKS
+        )
+        self._batch: deque[tuple[str, str]] = deque()
+        self._tasks: list[asyncio.Task] = []
+        self._open = 0
+        self._iterated = False
+        self._exhausted = False
+        self._start = 0.0
+
+    async def __aenter__(self) -> Self:
+        logger.info("Streaming command: `%s` in `%s`", self.command, self.cwd)
+        self._start = time.perf_counter()
+        try:
+            self._proc = await asyncio.create_subprocess_exec(
+                *self.parts,
+                cwd=self.cwd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+        except FileNotFoundError:
+            logger.exception("Command not found: %s", self.parts[0])
+            self._close_captures()
+            self.result = {
+                "command": self.command,
+                "returncode": -1,
+                "stdout": "",
+                "stderr": (
+                    f"Error: Command '{self.parts[0]}' not found. "
+                    "Is it installed and in the system's PATH?"
+                ),
+                "duration_s": round(time.perf_counter() - self._start, 3),
+                "success": False,
+            }
+            return self
+        self._open = 2
+        self._tasks = [
+            asyncio.create_task(self._read(self._proc.stdout, "stdout")),
+            asyncio.create_task(self._read(self._proc.stderr, "stderr")),
+            asyncio.create_task(self._watch()),
+        ]
+        return self
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> tuple[str, str]:
+        self._iterated = True
+        while not self._batch and self._open:
+            item = await self._queue.get()
+            if item is None:
+                self._open -= 1
+            else:
+                name, lines = item
+                self._batch.extend((name, line) for line in lines)
+        if self._batch:
+            return self._batch.popleft()
+        self._exhausted = True
+        raise StopAsyncIteration
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._proc is None:
+            return
+        cancelled = exc_type is not None
+        try:
+            if not cancelled:
+                if self._iterated and not self._exhausted:
+                    # Broke out of the loop: the rest of the output is unwanted.
+                    _killpg(self._proc.pid, signal.SIGKILL)
+                    cancelled = True
+                else:
+                    async for _ in self:
+                        pass
+                await self._tasks[-1]
+        except BaseException:
+            cancelled = True
+            raise
+        finally:
+            if self._proc.returncode is None:
+                # Left early, failed or cancelled: take the tree down now.
+                _killpg(self._proc.pid, signal.SIGKILL)
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            if self._proc.returncode is None:
+                # Reap it, so the transport closes with this loop still running.
+                try:
+                    await asyncio.wait_for(self._proc.wait(), KILL_GRACE)
+                except TimeoutError:
+                    pass
+            self._close_captures()
+            self.result = self._result(cancelled)
+
+    async def _read(self, reader: asyncio.StreamReader, name: str) -> None:
+        capture = self.captures[name]
+        pending = b""
+        try:
+            while chunk := await reader.read(_READ_CHUNK):
+                pending += chunk
+                end = pending.rfind(b"\n") + 1
+                if not end and len(pending) > MAX_LINE_BYTES:
+                    # No newline in sight: hand out what we have as a line.
+                    end = len(pending)
+                if end:
+                    block, pending = pending[:end], pending[end:]
+                    await self._queue.put((name, capture.add(block)))
+            if pending:
+                await self._queue.put((name, capture.add(pending)))
+        finally:
+            # End of this stream for the iterator, unless we are being torn down.
+            if not asyncio.current_task().cancelling():
+                await self._queue.put(None)
+
+    async def _watch(self) -> None:
+        try:
+            await asyncio.wait_for(self._proc.wait(), self.timeout)
+        except TimeoutError:
+            self.timed_out = True
+            logger.warning(
+                "Command timed out after %ss: %s", self.timeout, self.command
+            )
+            _killpg(self._proc.pid, signal.SIGTERM)
+            try:
+                await asyncio.wait_for(self._proc.wait(), KILL_GRACE)
+            except TimeoutError:
+                pass
+            _killpg(self._proc.pid, signal.SIGKILL)
+            await self._proc.wait()
+            readers = self._tasks[:2]
+            await asyncio.wait(readers, timeout=KILL_GRACE)
+            for reader in readers:
+                if not reader.done():
+                    # A child escaped the process group and holds the pipe open.
+                    reader.cancel()
+                    await self._queue.put(None)
+
+    def _close_captures(self) -> None:
+        for capture in self.captures.values():
+            capture.close()
+
+    def _result(self, cancelled: bool) -> dict[str, Any]:
+        stdout, stderr = self.captures["stdout"], self.captures["stderr"]
+        result: dict[str, Any] = {
+            "command": self.command,
+            "returncode": self._proc.returncode,
+            "stdout": stdout.text(),
+            "stderr": stderr.text(),
+            "duration_s": round(time.perf_counter() - self._start, 3),
+            "success": self._proc.returncode == 0 and not cancelled,
+            "stdout_lines": stdout.lines,
+            "stderr_lines": stderr.lines,
+            "truncated": bool(stdout.omitted or stderr.omitted),
+        }
+        for capture in (stdout, stderr):
+            if capture.spool_path:
+                result[f"{capture.name}_path"] = capture.spool_path
+        if self.timed_out:
+            result["success"] = False
+            result["timed_out"] = True
+            result["stderr"] += f"\nError: Command timed out after {self.timeout}s."
+        elif cancelled:
+            result["cancelled"] = True
+        elif self._proc.returncode != 0:
+            logger.warning("Command failed with exit code %d.", self._proc.returncode)
+        return result
+
+
+def _killpg(pid: int, sig: int) -> None:
+    try:
+        os.killpg(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def stream_command(
+    command: list[str | int],
+    cwd: str,
+    timeout: float | None = None,
+    head_lines: int = HEAD_LINES,
+    tail_lines: int = TAIL_LINES,
+    spool: bool = False,
+) -> CommandStream:
+    """
+    Run a command and stream its output lines as they are produced.
+
+    Parameters:
+        command (list[str | int]): The command and its arguments to execute.
+        cwd (str): The working directory in which to run the command.
+        timeout (float, optional): Seconds before the command and its child processes are killed. Defaults to no limit.
+        head_lines (int, optional): Lines kept from the start of each stream. Defaults to 200.
+        tail_lines (int, optional): Lines kept from the end of each stream. Defaults to 200.
+        spool (bool, optional): Also write each stream in full to a temporary file, reported as ``stdout_path`` / ``stderr_path``; the caller deletes it. Defaults to False.
+
+    Returns:
+        CommandStream: Enter it with ``async with`` and iterate for ``(stream, line)`` pairs; ``result`` is set when the block exits.
+    """
+    return CommandStream(command, cwd, timeout, head_lines, tail_lines, spool)
+
+
+async def run_command_async(
+    command: list[str | int],
+    cwd: str,
+    timeout: float | None = None,
+    on_line: Callable[[str, str], Any] | None = None,
+    head_lines: int = HEAD_LINES,
+    tail_lines: int = TAIL_LINES,
+    spool: bool = False,
+) -> dict[str, Any]:
+    """
+    Async ``run_command`` whose memory use does not grow with the command's output.
+
+    Parameters:
+        command (list[str | int]): The command and its arguments to execute.
+        cwd (str): The working directory in which to run the command.
+        timeout (float, optional): Seconds before the command and its child processes are killed. Defaults to no limit.
+        on_line (Callable[[str, str], Any], optional): Called with ``(stream, line)`` for every line as it arrives.
+        head_lines (int, optional): Lines kept from the start of each stream. Defaults to 200.
+        tail_lines (int, optional): Lines kept from the end of each stream. Defaults to 200.
+        spool (bool, optional): Also write the full output to temporary files. Defaults to False.
+
+    Returns:
+        dict[str, Any]: The ``run_command`` dictionary, with ``stdout`` and ``stderr`` cut to their head and tail, line counts, ``truncated``, and the spool file paths if requested. Cancelling the call kills the command.
+    """
+    async with stream_command(
+        command, cwd, timeout, head_lines, tail_lines, spool
+    ) as stream:
+        if on_line is not None:
+            async for name, line in stream:
+                on_line(name, line)
+    return stream.result
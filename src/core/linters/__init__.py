@@ -10,6 +10,7 @@ Returns:
 
 from core.cmd import run_command
 
+from .cache import LintCache, changed_files
 from .dotenv_linter import run_dotenv_linter
 from .gitleaks import run_gitleaks
 from .markdownlint import run_markdownlint
@@ -18,6 +19,8 @@ from .pytest import run_pytest
 from .semgrep import run_semgrep
 
 __all__ = [
+    "LintCache",
+    "changed_files",
     "run_command",
     "run_semgrep",
     "run_gitleaks",
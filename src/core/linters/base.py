@@ -1,8 +1,21 @@
 """
 This module contains the base class for the lint report.
 
+The tools are independent of each other and mostly wait on their own
+subprocess, so ``lint_repo`` runs them concurrently — at most
+``LINT_MAX_PARALLEL`` at a time — and the whole run takes about as long as
+the slowest tool instead of the sum of all of them. Each tool gets a
+timeout (``LINT_TOOL_TIMEOUT`` seconds, or a per-tool override) after which
+its process tree is killed, and the report records each tool's wall time.
+File-level tools (pylint, markdownlint) run incrementally against the
+content-hash cache at ``LINT_CACHE_PATH``: only files whose findings are not
+cached are linted.
+
 Args:
     repo_path: The path to the repository.
+    max_parallel: Tools run at the same time.
+    timeout: Seconds before a tool is killed.
+    incremental: Whether file-level tools use the lint cache.
 
 Returns:
     LintReport: The lint report for the repository.
@@ -10,11 +23,18 @@ Returns:
 
 from __future__ import annotations
 
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from core.logger import logger
 
 from . import (
+    LintCache,
     run_dotenv_linter,
     run_gitleaks,
     run_markdownlint,
@@ -23,6 +43,31 @@ from . import (
     run_semgrep,
 )
 
+DEFAULT_TOOL_TIMEOUT = 600.0
+
+# Report field -> runner. Slow tools first, so that with a concurrency cap
+# below the number of tools the quick ones fill in behind them.
+LINTERS: dict[str, Callable[..., dict[str, Any]]] = {
+    "semgrep": run_semgrep,
+    "pytest": run_pytest,
+    "pylint": run_pylint,
+    "gitleaks": run_gitleaks,
+    "markdownlint": run_markdownlint,
+    "dotenv_linter": run_dotenv_linter,
+}
+# Tools that report per file and so can reuse cached findings.
+INCREMENTAL = {"pylint", "markdownlint"}
+
+_lint_cache: LintCache | None = None
+
+
+def get_lint_cache() -> LintCache:
+    """The lint cache, opened on first use rather than at import."""
+    global _lint_cache
+    if _lint_cache is None:
+        _lint_cache = LintCache.from_env()
+    return _lint_cache
+
 
 class LintReport(BaseModel):
     """
@@ -35,24 +80,90 @@ class LintReport(BaseModel):
     markdownlint: dict[str, Any] | None = None
     pytest: dict[str, Any] | None = None
     pylint: dict[str, Any] | None = None
+    # Wall time per tool and for the whole run, in seconds.
+    timings: dict[str, float] = Field(default_factory=dict)
+    wall_s: float = 0.0
+
+
+def _max_parallel() -> int:
+    return int(os.getenv("LINT_MAX_PARALLEL", str(len(LINTERS))))
+
+
+def _tool_timeout() -> float:
+    return float(os.getenv("LINT_TOOL_TIMEOUT", str(DEFAULT_TOOL_TIMEOUT)))
+
+
+def _run_tool(
+    name: str,
+    run: Callable[..., dict[str, Any]],
+    repo_path: str,
+    timeout: float,
+    cache: LintCache | None,
+) -> dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        if cache is not None and name in INCREMENTAL:
+            result = run(repo_path, timeout=timeout, cache=cache)
+        else:
+            result = run(repo_path, timeout=timeout)
+    except Exception as e:
+        # One broken tool must not cost the report of the others.
+        logger.exception("Linter %s failed", name)
+        result = {"tool": name, "success": False, "error": str(e)}
+    result["duration_s"] = round(time.perf_counter() - start, 3)
+    return result
 
 
-def lint_repo(repo_path: str) -> LintReport:
+def lint_repo(
+    repo_path: str,
+    max_parallel: int | None = None,
+    timeout: float | None = None,
+    timeouts: dict[str, float] | None = None,
+    incremental: bool = True,
+) -> LintReport:
     """
     Runs multiple linters and test tools on the specified repository path and aggregates their results into a LintReport.
 
     Parameters:
         repo_path (str): Path to the repository to be analyzed.
+        max_parallel (int, optional): How many tools run at the same time. Defaults to ``LINT_MAX_PARALLEL``, or all of them; 1 runs them one after another.
+        timeout (float, optional): Seconds before a tool's commands are killed. Defaults to ``LINT_TOOL_TIMEOUT`` (600).
+        timeouts (dict[str, float], optional): Per-tool overrides of ``timeout``, keyed by report field (e.g. ``{"pytest": 1800}``).
+        incremental (bool, optional): Lint only files whose pylint/markdownlint findings are not cached, and merge in the cached ones. Set to False for a full run. Defaults to True.
 
     Returns:
-        LintReport: An object containing the results from various linting and testing tools for the repository.
+        LintReport: An object containing the results from various linting and testing tools for the repository, with each tool's wall time in ``timings``.
     """
+    max_parallel = max(1, max_parallel or _max_parallel())
+    timeout = timeout or _tool_timeout()
+    timeouts = timeouts or {}
+    cache = get_lint_cache() if incremental else None
     curr_report = LintReport()
-    curr_report.semgrep = run_semgrep(repo_path)
-    curr_report.gitleaks = run_gitleaks(repo_path)
-    curr_report.dotenv_linter = run_dotenv_linter(repo_path)
-    curr_report.markdownlint = run_markdownlint(repo_path)
-    curr_report.pytest = run_pytest(repo_path)
-    curr_report.pylint = run_pylint(repo_path)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(
+        max_workers=min(max_parallel, len(LINTERS)), thread_name_prefix="lint"
+    ) as pool:
+        futures = {
+            name: pool.submit(
+                _run_tool,
+                name,
+                run,
+                repo_path,
+                timeouts.get(name, timeout),
+                cache,
+            )
+            for name, run in LINTERS.items()
+        }
+        for name, future in futures.items():
+            result = future.result()
+            setattr(curr_report, name, result)
+            curr_report.timings[name] = result["duration_s"]
+    curr_report.wall_s = round(time.perf_counter() - start, 3)
+    logger.info(
+        "Linted %s in %.1fs (tools summed %.1fs)",
+        repo_path,
+        curr_report.wall_s,
+        sum(curr_report.timings.values()),
+    )
 
     return curr_report
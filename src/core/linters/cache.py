@@ -0,0 +1,305 @@
+"""
+This module contains the content-hash lint cache for incremental linting.
+
+File-level linters (pylint, ruff, markdownlint) report findings per file, and
+a file's findings only change when the file, the tool or its configuration
+does. Results are cached in SQLite under (tool, tool version, config hash,
+content hash); ``run_incremental`` lints only the files whose key is not
+cached and merges the cached findings of the others back in.
+
+Content hashes are git blob ids. For a git checkout, ``git ls-files`` already
+knows them for every file that matches the index, so only the files
+``changed_files`` reports (modified or untracked) are read and hashed; outside
+git every file is hashed. Findings that depend on other files — unresolved
+imports, duplicate code across files — are refreshed only when the file
+itself or the configuration changes; run without the cache for a full pass.
+
+Args:
+    path: The SQLite file holding cached findings.
+
+Returns:
+    LintCache: Cached findings per (tool, version, config, content) key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from typing import Any
+
+from core.cmd import run_command
+from core.logger import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    tool TEXT NOT NULL,
+    version TEXT NOT NULL,
+    config TEXT NOT NULL,
+    content TEXT NOT NULL,
+    findings TEXT NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (tool, version, config, content)
+) WITHOUT ROWID;
+"""
+
+# Files per linter invocation, to stay well below the argv size limit.
+BATCH_FILES = 500
+# Cached results not used for this long are dropped when the cache is opened.
+MAX_AGE_DAYS = 30
+_SKIP_DIRS = {".git", ".venv", "venv", "node_modules", "__pycache__", ".cache"}
+
+
+class LintCache:
+    """SQLite store of per-file lint findings keyed by content hash."""
+
+    def __init__(self, path: str, max_age_days: float = MAX_AGE_DAYS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM results WHERE used_at < ?",
+                (time.time() - max_age_days * 86400,),
+            )
+
+    @classmethod
+    def from_env(cls) -> LintCache:
+        return cls(os.getenv("LINT_CACHE_PATH", ".cache/lint_cache.sqlite3"))
+
+    def get_many(
+        self, tool: str, version: str, config: str, contents: Iterable[str]
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Cached findings for each content hash that has them."""
+        contents = list(set(contents))
+        found: dict[str, list[dict[str, Any]]] = {}
+        with self._lock:
+            for i in range(0, len(contents), 500):
+                chunk = contents[i : i + 500]
+                rows = self._db.execute(
+                    "SELECT content, findings FROM results WHERE tool = ? AND "
+                    f"version = ? AND config = ? AND content IN "
+                    f"({','.join('?' * len(chunk))})",
+                    (tool, version, config, *chunk),
+                )
+                found.update((c, json.loads(f)) for c, f in rows)
+            if found:
+                with self._db:
+                    self._db.executemany(
+                        "UPDATE results SET used_at = ? WHERE tool = ? AND "
+                        "version = ? AND config = ? AND content = ?",
+                        [(time.time(), tool, version, config, c) for c in found],
+                    )
+        return found
+
+    def put_many(
+        self,
+        tool: str,
+        version: str,
+        config: str,
+        findings: dict[str, list[dict[str, Any]]],
+    ) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (tool, version, config, content, json.dumps(items), now)
+                    for content, items in findings.items()
+                ],
+            )
+
+    def clear(self, tool: str | None = None) -> None:
+        with self._lock, self._db:
+            if tool is None:
+                self._db.execute("DELETE FROM results")
+            else:
+                self._db.execute("DELETE FROM results WHERE tool = ?", (tool,))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+        return {"entries": entries, "bytes": os.path.getsize(self.path)}
+
+
+def _git(repo_path: str, *args: str) -> list[str] | None:
+    """NUL-separated output of a git command, or None outside a git checkout."""
+    try:
+        completed = subprocess.run(
+            ["git", *args], cwd=repo_path, capture_output=True, check=True
+        )
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        return None
+    return [p for p in completed.stdout.decode("utf-8", "replace").split("\0") if p]
+
+
+def changed_files(repo_path: str, base: str | None = None) -> set[str] | None:
+    """
+    Files whose content differs from ``base``, plus untracked files.
+
+    Parameters:
+        repo_path (str): Path to the git checkout.
+        base (str, optional): Commit to compare the working tree with (e.g. ``HEAD`` or ``origin/main``). Defaults to the index, i.e. unstaged changes.
+
+    Returns:
+        set[str] | None: Repository-relative paths, or None when ``repo_path`` is not a git checkout.
+    """
+    diff = _git(
+        repo_path, "diff", "--name-only", "--relative", "-z", *([base] if base else [])
+    )
+    untracked = _git(repo_path, "ls-files", "--others", "--exclude-standard", "-z")
+    if diff is None or untracked is None:
+        return None
+    return set(diff) | set(untracked)
+
+
+def blob_hash(data: bytes) -> str:
+    """The git blob id of ``data``."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _hash_file(repo_path: str, path: str) -> str | None:
+    try:
+        with open(os.path.join(repo_path, path), "rb") as f:
+            return blob_hash(f.read())
+    except OSError:
+        return None
+
+
+def file_hashes(repo_path: str, suffixes: tuple[str, ...]) -> dict[str, str]:
+    """
+    Content hash of every file in the repository ending in one of ``suffixes``.
+
+    Parameters:
+        repo_path (str): Path to the repository.
+        suffixes (tuple[str, ...]): File name endings to include, e.g. ``(".py",)``.
+
+    Returns:
+        dict[str, str]: Repository-relative path to git blob id. Ignored files are left out in a git checkout.
+    """
+    staged = _git(repo_path, "ls-files", "--stage", "-z")
+    changed = changed_files(repo_path)
+    if staged is None or changed is None:
+        found = {}
+        for root, dirs, files in os.walk(repo_path):
+            dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
+            for name in files:
+                if name.endswith(suffixes):
+                    path = os.path.relpath(os.path.join(root, name), repo_path)
+                    found[path] = _hash_file(repo_path, path)
+        return {p: h for p, h in found.items() if h}
+    hashes: dict[str, str | None] = {}
+    for entry in staged:
+        # "<mode> <object> <stage>\t<path>"
+        info, path = entry.split("\t", 1)
+        mode, blob, _ = info.split()
+        if path.endswith(suffixes) and mode != "160000" and path not in changed:
+            hashes[path] = blob
+    for path in changed:
+        if path.endswith(suffixes):
+            hashes[path] = _hash_file(repo_path, path)  # None once deleted
+    return {p: h for p, h in hashes.items() if h}
+
+
+@lru_cache
+def tool_version(binary: str) -> str:
+    """``<binary> --version`` output, read once per process."""
+    result = run_command([binary, "--version"], cwd=".")
+    return (result["stdout"] or result["stderr"]).strip()
+
+
+def config_hash(repo_path: str, config_files: Iterable[str], *args: str) -> str:
+    """Hash of the configuration files that exist and of the tool arguments."""
+    digest = hashlib.sha1(json.dumps(args).encode())
+    for name in config_files:
+        path = os.path.join(repo_path, name)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()
+
+
+def run_incremental(
+    tool: str,
+    repo_path: str,
+    cache: LintCache,
+    suffixes: tuple[str, ...],
+    command: Callable[[list[str]], list[str]],
+    parse: Callable[[dict[str, Any]], dict[str, list[dict[str, Any]]] | None],
+    config_files: Iterable[str] = (),
+    timeout: float | None = None,
+) -> dict[str, Any]:
+    """
+    Lint the files that changed since they were last linted; reuse cached findings for the rest.
+
+    Parameters:
+        tool (str): Tool name, which is also the executable run for ``--version``.
+        repo_path (str): Path to the repository.
+        cache (LintCache): Where findings are looked up and stored.
+        suffixes (tuple[str, ...]): Endings of the files the tool lints.
+        command (Callable[[list[str]], list[str]]): Builds the command for a batch of repository-relative paths; the paths must come last.
+        parse (Callable): Turns a ``run_command`` result into findings per repository-relative path, or None if the run failed; files missing from the result had no findings. Findings are cached by content hash, so they must not carry the path or anything derived from it.
+        config_files (Iterable[str], optional): Configuration files whose content is part of the key.
+        timeout (float, optional): Seconds before a linter run is killed.
+
+    Returns:
+        dict[str, Any]: The tool name, all findings (each with its ``path``), how many files were linted and how many came from the cache, and a success flag that is False when there are findings or a run failed.
+    """
+    start = time.perf_counter()
+    hashes = file_hashes(repo_path, suffixes)
+    version = tool_version(tool)
+    config = config_hash(repo_path, config_files, *command([]))
+    cached = cache.get_many(tool, version, config, hashes.values())
+    todo = sorted(p for p, h in hashes.items() if h not in cached)
+    logger.info(
+        "%s: %d files, %d cached, linting %d", tool, len(hashes), len(cached), len(todo)
+    )
+
+    fresh: dict[str, list[dict[str, Any]]] = {}
+    failed: dict[str, Any] | None = None
+    linted = 0
+    for i in range(0, len(todo), BATCH_FILES):
+        batch = todo[i : i + BATCH_FILES]
+        result = run_command(command(batch), cwd=repo_path, timeout=timeout)
+        try:
+            by_path = parse(result)
+        except ValueError:  # output that is not the JSON we asked for
+            by_path = None
+        if by_path is None:
+            failed = result
+            break
+        linted += len(batch)
+        for path in batch:
+            fresh[hashes[path]] = by_path.get(path, [])
+    if fresh:
+        cache.put_many(tool, version, config, fresh)
+
+    findings = []
+    for path in sorted(hashes):
+        items = fresh.get(hashes[path], cached.get(hashes[path]))
+        findings.extend({"path": path, **item} for item in items or [])
+    report: dict[str, Any] = {
+        "tool": tool,
+        "findings": findings,
+        "files": len(hashes),
+        "linted": linted,
+        "cached": len(hashes) - len(todo),
+        "duration_s": round(time.perf_counter() - start, 3),
+        "success": failed is None and not findings,
+    }
+    if failed is not None:
+        report.update(
+            command=failed["command"],
+            returncode=failed["returncode"],
+            stderr=failed["stderr"],
+            error=f"{tool} failed; its findings for the remaining files are missing.",
+        )
+    return report
@@ -17,12 +17,13 @@ from typing import Any
 from core.cmd import run_command
 
 
-def run_dotenv_linter(repo_path: str) -> dict[str, Any]:
+def run_dotenv_linter(repo_path: str, timeout: float | None = None) -> dict[str, Any]:
     """
     Lints `.env` files in the specified repository directory using dotenv-linter.
 
     Parameters:
         repo_path (str): Path to the repository directory to search for `.env` files.
+        timeout (float, optional): Seconds before a command the tool runs is killed along with its child processes. Defaults to no limit.
 
     Returns:
         dict[str, Any]: A dictionary containing the tool name and the output of the linter, or a skip message if no `.env` files are found.
@@ -36,7 +37,9 @@ def run_dotenv_linter(repo_path: str) -> dict[str, Any]:
 
     # check if dotenv-linter is installed
     if not shutil.which("dotenv-linter"):
-        run_command(["brew", "install", "dotenv-linter"], cwd=repo_path)
+        run_command(
+            ["brew", "install", "dotenv-linter"], cwd=repo_path, timeout=timeout
+        )
 
     cmd = ["dotenv-linter", repo_path]
-    return {"tool": tool_name, **run_command(cmd, cwd=repo_path)}
+    return {"tool": tool_name, **run_command(cmd, cwd=repo_path, timeout=timeout)}
@@ -16,13 +16,16 @@ from typing import Any
 from core.cmd import run_command
 
 
-def run_gitleaks(repo_path: str, config_file: str | None = None) -> dict[str, Any]:
+def run_gitleaks(
+    repo_path: str, config_file: str | None = None, timeout: float | None = None
+) -> dict[str, Any]:
     """
     Scan a repository directory for secrets using Gitleaks.
 
     Parameters:
         repo_path (str): Path to the repository directory to scan.
         config_file (str, optional): Path to a Gitleaks configuration file to use for the scan.
+        timeout (float, optional): Seconds before a command the tool runs is killed along with its child processes. Defaults to no limit.
 
     Returns:
         dict[str, Any]: A dictionary containing the results of the Gitleaks scan, including the tool name and output details.
@@ -32,5 +35,5 @@ def run_gitleaks(repo_path: str, config_file: str | None = None) -> dict[str, An
         cmd.append("--config-file")
         cmd.append(config_file)
 
-    lint_result = run_command(cmd, cwd=repo_path)
+    lint_result = run_command(cmd, cwd=repo_path, timeout=timeout)
     return {"tool": "gitleaks", **lint_result}
@@ -10,21 +10,49 @@ Returns:
     dict: The output of the markdownlint command.
 """
 
+from __future__ import annotations
+
+import json
 import os
 import shutil
 from typing import Any
 
 from core.cmd import run_command
 
+from .cache import LintCache, run_incremental
+
+CONFIG_FILES = (
+    ".markdownlint.json",
+    ".markdownlint.jsonc",
+    ".markdownlint.yaml",
+    ".markdownlint.yml",
+    ".markdownlintrc",
+)
+
 
-def run_markdownlint(repo_path: str) -> dict[str, Any]:
+def _parse_json(result: dict[str, Any]) -> dict[str, list[dict[str, Any]]] | None:
+    # 0: clean, 1: findings; anything else means markdownlint itself failed.
+    # With --json the findings are written to stderr.
+    if result["returncode"] not in (0, 1):
+        return None
+    by_path: dict[str, list[dict[str, Any]]] = {}
+    for finding in json.loads(result["stderr"] or "[]"):
+        by_path.setdefault(finding.pop("fileName"), []).append(finding)
+    return by_path
+
+
+def run_markdownlint(
+    repo_path: str, timeout: float | None = None, cache: LintCache | None = None
+) -> dict[str, Any]:
     """
     Executes markdownlint on all Markdown files in the specified repository directory.
 
-    If no Markdown files are found, returns a result indicating the linting was skipped. Installs markdownlint locally using npm if it is not already available. Returns a dictionary containing the tool name and the output from the linting process.
+    If no Markdown files are found, returns a result indicating the linting was skipped. Installs markdownlint locally using npm if it is not already available. Returns a dictionary containing the tool name and the output from the linting process. With a cache, every Markdown file in the repository is covered, but only files whose findings are not cached are linted.
 
     Parameters:
         repo_path (str): Path to the repository directory to lint.
+        timeout (float, optional): Seconds before a command the tool runs is killed along with its child processes. Defaults to no limit.
+        cache (LintCache, optional): Per-file findings from earlier runs; enables incremental linting.
 
     Returns:
         dict[str, Any]: A dictionary with the tool name, and either the linting results or a skip reason.
@@ -41,7 +69,23 @@ def run_markdownlint(repo_path: str) -> dict[str, Any]:
 
     # check if markdownlint is installed
     if not shutil.which("markdownlint"):
-        run_command(["npm", "install", "markdownlint", "--save-dev"], cwd=repo_path)
+        run_command(
+            ["npm", "install", "markdownlint", "--save-dev"],
+            cwd=repo_path,
+            timeout=timeout,
+        )
+
+    if cache is not None:
+        return run_incremental(
+            tool_name,
+            repo_path,
+            cache,
+            (".md",),
+            lambda files: ["markdownlint", "--json", *files],
+            _parse_json,
+            config_files=CONFIG_FILES,
+            timeout=timeout,
+        )
 
     cmd = ["markdownlint", "directories", repo_path]
-    return {"tool": tool_name, **run_command(cmd, cwd=repo_path)}
+    return {"tool": tool_name, **run_command(cmd, cwd=repo_path, timeout=timeout)}
@@ -10,20 +10,47 @@ Returns:
     dict: The output of the Pylint command.
 """
 
+from __future__ import annotations
+
+import json
 import os
 from typing import Any
 
 from core.cmd import run_command
 
+from .cache import LintCache, run_incremental
+
+# pylint exit status bits for a fatal message and a usage error.
+_FATAL = 1 | 32
+# Files pylint reads its configuration from, explicitly or by discovery.
+CONFIG_FILES = ("pylint.rc", ".pylintrc", "pylintrc", "pyproject.toml", "setup.cfg")
+
 
-def run_pylint(repo_path: str) -> dict[str, Any]:
+def _parse_json(result: dict[str, Any]) -> dict[str, list[dict[str, Any]]] | None:
+    if result["returncode"] < 0 or result["returncode"] & _FATAL:
+        return None
+    by_path: dict[str, list[dict[str, Any]]] = {}
+    for message in json.loads(result["stdout"] or "[]"):
+        # Findings are cached by content, so nothing derived from where the file
+        # is may be kept: ``module`` is the dotted path. ``obj`` is the scope
+        # inside the file and stays.
+        message.pop("module", None)
+        by_path.setdefault(message.pop("path"), []).append(message)
+    return by_path
+
+
+def run_pylint(
+    repo_path: str, timeout: float | None = None, cache: LintCache | None = None
+) -> dict[str, Any]:
     """
     Run Pylint on the specified repository path using an available configuration file.
 
-    Checks for a `pylint.rc` or `pyproject.toml` file in the repository directory and uses it as the Pylint configuration if found. Returns a dictionary containing the tool name and the results of the Pylint execution.
+    Checks for a `pylint.rc` or `pyproject.toml` file in the repository directory and uses it as the Pylint configuration if found. Returns a dictionary containing the tool name and the results of the Pylint execution. With a cache, only Python files whose findings are not cached are linted, and the result lists the findings of every file.
 
     Parameters:
         repo_path (str): Path to the repository to be linted.
+        timeout (float, optional): Seconds before a command the tool runs is killed along with its child processes. Defaults to no limit.
+        cache (LintCache, optional): Per-file findings from earlier runs; enables incremental linting.
 
     Returns:
         dict[str, Any]: Dictionary with the tool name and the result of the Pylint command.
@@ -37,10 +64,25 @@ def run_pylint(repo_path: str) -> dict[str, Any]:
     else:
         config_file = None
 
+    if cache is not None:
+        options = ["--output-format=json"]
+        if config_file:
+            options += ["--rcfile", config_file]
+        return run_incremental(
+            tool_name,
+            repo_path,
+            cache,
+            (".py",),
+            lambda files: ["pylint", *options, *files],
+            _parse_json,
+            config_files=CONFIG_FILES,
+            timeout=timeout,
+        )
+
     base_command = ["pylint", repo_path]
     if config_file:
-        base_command.append("--config")
+        base_command.append("--rcfile")
         base_command.append(config_file)
 
-    lint_result = run_command(base_command, cwd=repo_path)
+    lint_result = run_command(base_command, cwd=repo_path, timeout=timeout)
     return {"tool": tool_name, **lint_result}
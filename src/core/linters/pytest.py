@@ -16,7 +16,7 @@ from typing import Any
 from core.cmd import run_command
 
 
-def run_pytest(repo_path: str) -> dict[str, Any]:
+def run_pytest(repo_path: str, timeout: float | None = None) -> dict[str, Any]:
     """
     Run Pytest tests in the specified repository if a configuration file is present.
 
@@ -24,6 +24,7 @@ def run_pytest(repo_path: str) -> dict[str, Any]:
 
     Parameters:
         repo_path (str): Path to the repository directory to run Pytest in.
+        timeout (float, optional): Seconds before a command the tool runs is killed along with its child processes. Defaults to no limit.
 
     Returns:
         dict[str, Any]: Dictionary with the tool name and either the Pytest execution result or skip details.
@@ -39,7 +40,9 @@ def run_pytest(repo_path: str) -> dict[str, Any]:
     # This is a simplified example. A real-world case might need `pip install
     # -r requirements.txt`
     if os.path.exists(os.path.join(repo_path, "requirements.txt")):
-        run_command(["pip", "install", "-r", "requirements.txt"], cwd=repo_path)
+        run_command(
+            ["pip", "install", "-r", "requirements.txt"], cwd=repo_path, timeout=timeout
+        )
 
-    result = run_command(["pytest"], cwd=repo_path)
+    result = run_command(["pytest"], cwd=repo_path, timeout=timeout)
     return {"tool": tool_name, **result}
@@ -10,26 +10,61 @@ Returns:
     dict: The output of the Ruff command.
 """
 
+from __future__ import annotations
+
+import json
 import os
 from typing import Any
 
 from core.cmd import run_command
 from core.logger import logger
 
+from .cache import LintCache, run_incremental
+
+CONFIG_FILES = ("pyproject.toml", "ruff.toml", ".ruff.toml")
+
+
+def _parse_json(
+    result: dict[str, Any], repo_path: str
+) -> dict[str, list[dict[str, Any]]] | None:
+    # 0: clean, 1: findings, 2: Ruff itself failed.
+    if result["returncode"] not in (0, 1):
+        return None
+    root = os.path.abspath(repo_path)
+    by_path: dict[str, list[dict[str, Any]]] = {}
+    for item in json.loads(result["stdout"] or "[]"):
+        path = os.path.relpath(item["filename"], root)
+        by_path.setdefault(path, []).append(
+            {
+                "code": item["code"],
+                "message": item["message"],
+                "line": item["location"]["row"],
+                "column": item["location"]["column"],
+                "end_line": item["end_location"]["row"],
+                "end_column": item["end_location"]["column"],
+                "fixable": item.get("fix") is not None,
+            }
+        )
+    return by_path
+
 
 # COMPLETE :: NOT TESTED
 def run_ruff(
-    repo_path: str, fix: bool = False, request_action: bool = False
+    repo_path: str,
+    fix: bool = False,
+    request_action: bool = False,
+    cache: LintCache | None = None,
 ) -> dict[str, Any]:
     """
     Run the Ruff linter on a Python repository and return the results.
 
-    Attempts to install Ruff in the specified repository directory to ensure it is available. Detects Ruff configuration files and constructs the appropriate lint command. If installation fails, returns a result indicating the tool was skipped. Optionally includes a message prompting a fix action if requested.
+    Attempts to install Ruff in the specified repository directory to ensure it is available. Detects Ruff configuration files and constructs the appropriate lint command. If installation fails, returns a result indicating the tool was skipped. Optionally includes a message prompting a fix action if requested. With a cache (and without ``fix``, which rewrites files), only files whose findings are not cached are linted.
 
     Parameters:
         repo_path (str): Path to the root of the Python repository to lint.
         fix (bool, optional): If True, applies automatic fixes using Ruff. Defaults to False.
         request_action (bool, optional): If True, includes a message prompting a fix action in the result. Defaults to False.
+        cache (LintCache, optional): Per-file findings from earlier runs; enables incremental linting.
 
     Returns:
         dict[str, Any]: A dictionary containing the tool name and the results of the Ruff lint command, or a skip reason if Ruff could not be installed.
@@ -61,7 +96,21 @@ def run_ruff(
         base_command.append("--config")
         base_command.append(config_file)
 
-    lint_result = run_command(base_command, cwd=repo_path)
+    if cache is not None and not fix:
+        options = ["--output-format=json", "--force-exclude"]
+        if config_file:
+            options += ["--config", config_file]
+        lint_result = run_incremental(
+            tool_name,
+            repo_path,
+            cache,
+            (".py", ".pyi"),
+            lambda files: ["ruff", "check", *options, *files],
+            lambda result: _parse_json(result, repo_path),
+            config_files=CONFIG_FILES,
+        )
+    else:
+        lint_result = run_command(base_command, cwd=repo_path)
     if request_action:
         message = """
 Looks like ruff found some issues in the repository: reply '@repo-sage ruff' to fix them.
@@ -15,16 +15,17 @@ from typing import Any
 from core.cmd import run_command
 
 
-def run_semgrep(repo_path: str) -> dict[str, Any]:
+def run_semgrep(repo_path: str, timeout: float | None = None) -> dict[str, Any]:
     """
     Run the Semgrep security scanner on the specified repository path.
 
     Parameters:
         repo_path (str): Path to the repository to be scanned.
+        timeout (float, optional): Seconds before a command the tool runs is killed along with its child processes. Defaults to no limit.
 
     Returns:
         dict[str, Any]: A dictionary containing the tool name and the results from the Semgrep scan.
     """
     tool_name = "semgrep"
     cmd = ["semgrep", "scan", repo_path]
-    return {"tool": tool_name, **run_command(cmd, cwd=repo_path)}
+    return {"tool": tool_name, **run_command(cmd, cwd=repo_path, timeout=timeout)}
@@ -0,0 +1,123 @@
+"""
+This module contains the on-disk response cache for LLM completions.
+
+Responses are stored in a small SQLite database keyed on a hash of
+(model, messages, params). When the total stored size exceeds the configured
+budget, the least recently used entries are evicted.
+
+Args:
+    path: Directory holding the cache database.
+    max_bytes: Size budget for stored responses.
+
+Returns:
+    ResponseCache: The exact-match response cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+
+def cache_key(model: str, messages: list[dict], params: dict[str, Any]) -> str:
+    """Build the exact-match key for a completion request."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Exact-match completion cache persisted in SQLite with size-based eviction.
+
+    The cache is safe to share between threads; every agent in the process
+    may hold a reference to the same instance.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024):
+        os.makedirs(path, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(path, "llm_cache.sqlite3"), check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, accessed)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._evict()
+            self._db.commit()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _evict(self) -> None:
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed ASC"
+        ).fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
@@ -1,20 +1,58 @@
+"""
+This module contains the LLM completion helpers.
+
+Completions go through a shared, pooled ``AsyncOpenAI`` client pointed at an
+OpenAI-compatible endpoint (OpenRouter by default, override with
+``LLM_BASE_URL`` to target a local stub). Requests are retried with jittered
+exponential backoff on 429/5xx and connection errors, and can optionally be
+served from an on-disk exact-match cache (``LLM_CACHE_DIR``).
+
+Args:
+    model: The model to use.
+    messages: A prompt string or a list of chat messages.
+
+Returns:
+    str: The completion text.
+"""
+
+from __future__ import annotations
+
+import asyncio
 import os
-from typing import Union
-from openai import OpenAI
+import random
+import weakref
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),
+import httpx
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    AsyncOpenAI,
 )
 
+from .llm_cache import ResponseCache, cache_key
+from .rate_limit import RateLimiter, estimate_tokens, limiter
 
-def completion(
-    model: str,
-    messages: Union[list[dict], str],
-    system_prompt: str = "",
-) -> str:
-    if not model:
-        raise ValueError("Model parameter is required")
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+# Longest Retry-After honoured; a larger value would stall the caller.
+MAX_RETRY_AFTER = 60.0
+
+
+@dataclass
+class CompletionRequest:
+    """A single completion request, as submitted to ``complete_many``."""
+
+    model: str
+    messages: list[dict] | str
+    system_prompt: str = ""
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+def build_messages(messages: list[dict] | str, system_prompt: str = "") -> list[dict]:
     final_messages = []
     if system_prompt:
         final_messages.append({"role": "system", "content": system_prompt})
@@ -22,13 +60,232 @@ def completion(
         final_messages.extend([{"role": "user", "content": messages}])
     else:
         final_messages.extend(messages)
+    return final_messages
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=final_messages,
+        seconds = float(value) if value is not None else None
+    except ValueError:
+        return None
+    return None if seconds is None else min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class LLMClient:
+    """
+    Async completion client with pooling, bounded batches, retries and caching.
+
+    One ``AsyncOpenAI`` client (and its httpx connection pool) is kept per
+    event loop, because the agents in ``app.py`` each run their own loop in
+    a background thread.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        max_connections: int = 20,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        timeout: float = 120.0,
+        cache: ResponseCache | None = None,
+        rate_limiter: RateLimiter | None = limiter,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.base_url = base_url or os.getenv("LLM_BASE_URL", DEFAULT_BASE_URL)
+        self.api_key = api_key or os.getenv("OPENROUTER_API_KEY") or "unset"
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.transport = transport
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, AsyncOpenAI
+        ] = weakref.WeakKeyDictionary()
+
+    def _client(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                transport=self.transport,
+            )
+            # Retries are handled here so backoff is jittered and shared.
+            client = AsyncOpenAI(
+                base_url=self.base_url,
+                api_key=self.api_key,
+                http_client=http_client,
+                max_retries=0,
+            )
+            self._clients[loop] = client
+        return client
+
+    async def complete(
+        self,
+        model: str,
+        messages: list[dict] | str,
+        system_prompt: str = "",
+        use_cache: bool = True,
+        **params: Any,
+    ) -> str:
+        if not model:
+            raise ValueError("Model parameter is required")
+        final_messages = build_messages(messages, system_prompt)
+
+        key = None
+        if self.cache is not None and use_cache:
+            key = cache_key(model, final_messages, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        content = await self._request_with_retries(model, final_messages, params)
+        if key is not None:
+            self.cache.set(key, content)
+        return content
+
+    async def complete_many(
+        self,
+        requests: Iterable[CompletionRequest],
+        max_concurrency: int = 8,
+        return_exceptions: bool = False,
+    ) -> list[str | BaseException]:
+        """Run many completions with at most ``max_concurrency`` in flight."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(request: CompletionRequest) -> str:
+            async with semaphore:
+                return await self.complete(
+                    request.model,
+                    request.messages,
+                    request.system_prompt,
+                    **request.params,
+                )
+
+        return await asyncio.gather(
+            *(run_one(r) for r in requests), return_exceptions=return_exceptions
         )
-        if not response.choices or not response.choices[0].message.content:
-            raise ValueError("Invalid response from OpenAI API")
-        return response.choices[0].message.content
-    except Exception as e:
-        raise RuntimeError(f"Failed to generate completion: {str(e)}") from e
+
+    async def aclose(self) -> None:
+        """Close the connection pool owned by the current event loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    async def _request_with_retries(
+        self, model: str, messages: list[dict], params: dict[str, Any]
+    ) -> str:
+        attempt = 0
+        estimated = estimate_tokens(messages) + params.get("max_tokens", 0)
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(model, estimated)
+            try:
+                response = await self._client().chat.completions.create(
+                    model=model, messages=messages, **params
+                )
+            except Exception as e:
+                if (
+                    isinstance(e, APIStatusError)
+                    and e.status_code == 429
+                    and self.rate_limiter is not None
+                ):
+                    self.rate_limiter.report_throttled(model, _retry_after(e))
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    raise RuntimeError(f"Failed to generate completion: {e!s}") from e
+                delay = _retry_after(e)
+                if delay is None:
+                    # Full jitter keeps concurrent callers from retrying in lockstep.
+                    delay = random.uniform(
+                        0, min(self.backoff_cap, self.backoff_base * 2**attempt)
+                    )
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            if self.rate_limiter is not None and response.usage is not None:
+                self.rate_limiter.reconcile(
+                    model, estimated, response.usage.total_tokens
+                )
+            if not response.choices or not response.choices[0].message.content:
+                raise RuntimeError(
+                    "Failed to generate completion: Invalid response from OpenAI API"
+                )
+            return response.choices[0].message.content
+
+
+def _default_cache() -> ResponseCache | None:
+    cache_dir = os.getenv("LLM_CACHE_DIR")
+    if not cache_dir:
+        return None
+    max_mb = int(os.getenv("LLM_CACHE_MAX_MB", "64"))
+    return ResponseCache(cache_dir, max_bytes=max_mb * 1024 * 1024)
+
+
+client = LLMClient(cache=_default_cache())
+
+
+async def acompletion(
+    model: str,
+    messages: list[dict] | str,
+    system_prompt: str = "",
+    **params: Any,
+) -> str:
+    return await client.complete(model, messages, system_prompt, **params)
+
+
+async def complete_many(
+    requests: Iterable[CompletionRequest],
+    max_concurrency: int = 8,
+    return_exceptions: bool = False,
+) -> list[str | BaseException]:
+    return await client.complete_many(requests, max_concurrency, return_exceptions)
+
+
+def completion(
+    model: str,
+    messages: list[dict] | str,
+    system_prompt: str = "",
+    **params: Any,
+) -> str:
+    """
+    Synchronous wrapper around ``acompletion`` for scripts and notebooks.
+
+    Called from a thread that is already running an event loop (a notebook
+    cell, a sync tool inside an agent), the request runs on a worker thread
+    with its own loop; like the previous synchronous client, this blocks the
+    calling loop until the completion arrives.
+    """
+
+    async def run() -> str:
+        try:
+            return await acompletion(model, messages, system_prompt, **params)
+        finally:
+            await client.aclose()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run())
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, run()).result()
@@ -0,0 +1,324 @@
+"""
+This module contains the process-wide LLM rate limiter.
+
+Every agent in the ``app.py`` process (each running its own event loop in a
+background thread) and ``core.llms`` draw from the same token buckets, one
+pair (requests/min, tokens/min) per model. Waiters are served strictly by
+priority class and then FIFO, so interactive orchestrator requests preempt
+background work. A provider 429 pauses the bucket for everyone instead of
+letting every caller retry at once.
+
+Args:
+    None
+
+Returns:
+    RateLimiter: The shared limiter instance, ``limiter``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any
+
+import logfire
+from dotenv import load_dotenv
+
+
+class Priority(IntEnum):
+    """Priority classes; lower values are served first."""
+
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BACKGROUND = 2
+
+
+current_priority: ContextVar[Priority | None] = ContextVar(
+    "current_priority", default=None
+)
+
+
+@contextmanager
+def priority(level: Priority | str) -> Iterator[None]:
+    """Run the enclosed model calls (and A2A sub-tasks) at ``level``."""
+    if isinstance(level, str):
+        level = Priority[level.upper()]
+    token = current_priority.set(level)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+@dataclass
+class ModelLimits:
+    requests_per_minute: float = 60
+    tokens_per_minute: float | None = None
+
+
+@dataclass
+class _Bucket:
+    limits: ModelLimits
+    requests: float = 0.0
+    tokens: float = 0.0
+    updated: float = field(default_factory=time.monotonic)
+    paused_until: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.requests = self.limits.requests_per_minute
+        self.tokens = self.limits.tokens_per_minute or 0.0
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.updated = now
+        rpm = self.limits.requests_per_minute
+        self.requests = min(rpm, self.requests + elapsed * rpm / 60)
+        if self.limits.tokens_per_minute:
+            tpm = self.limits.tokens_per_minute
+            self.tokens = min(tpm, self.tokens + elapsed * tpm / 60)
+
+    def delay_for(self, tokens: int, now: float) -> float:
+        """Seconds until a request of ``tokens`` can be admitted (0 if now)."""
+        delay = max(0.0, self.paused_until - now)
+        if self.requests < 1:
+            delay = max(
+                delay, (1 - self.requests) * 60 / self.limits.requests_per_minute
+            )
+        tpm = self.limits.tokens_per_minute
+        if tpm:
+            # A single request larger than the whole bucket waits for a full bucket.
+            needed = min(tokens, tpm)
+            if self.tokens < needed:
+                delay = max(delay, (needed - self.tokens) * 60 / tpm)
+        return delay
+
+    def consume(self, tokens: int) -> None:
+        self.requests -= 1
+        if self.limits.tokens_per_minute:
+            self.tokens -= tokens
+
+
+@dataclass
+class _Waiter:
+    priority: Priority
+    seq: int
+    tokens: int
+    loop: asyncio.AbstractEventLoop
+    event: asyncio.Event
+
+    def wake(self) -> None:
+        self.loop.call_soon_threadsafe(self.event.set)
+
+
+@dataclass
+class _ModelStats:
+    requests: int = 0
+    throttled: int = 0
+    provider_throttles: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    waits_by_priority: dict[str, float] = field(default_factory=dict)
+
+
+class RateLimiter:
+    """Thread-safe, priority-aware token-bucket limiter shared by all agents."""
+
+    def __init__(
+        self,
+        limits: dict[str, ModelLimits] | None = None,
+        default_limits: ModelLimits | None = None,
+        throttle_pause: float = 5.0,
+    ):
+        self.limits = limits or {}
+        self.default_limits = default_limits or ModelLimits()
+        self.throttle_pause = throttle_pause
+        self._lock = threading.Lock()
+        self._buckets: dict[str, _Bucket] = {}
+        self._queues: dict[str, list[_Waiter]] = {}
+        self._stats: dict[str, _ModelStats] = {}
+        self._seq = itertools.count()
+
+    # -------------------- Public API --------------------
+
+    async def acquire(
+        self, model: str, tokens: int = 0, level: Priority | None = None
+    ) -> float:
+        """Wait for capacity for one request of ``tokens``; returns seconds waited."""
+        if level is None:
+            # INTERACTIVE is 0, so an unset priority must be told apart by None.
+            level = p if (p := current_priority.get()) is not None else Priority.DEFAULT
+        waiter = _Waiter(
+            priority=level,
+            seq=next(self._seq),
+            tokens=tokens,
+            loop=asyncio.get_running_loop(),
+            event=asyncio.Event(),
+        )
+        start = time.monotonic()
+        throttled = False
+        with self._lock:
+            queue = self._queues.setdefault(model, [])
+            queue.append(waiter)
+            queue.sort(key=lambda w: (w.priority, w.seq))
+        try:
+            while True:
+                with self._lock:
+                    bucket = self._bucket(model)
+                    now = time.monotonic()
+                    bucket.refill(now)
+                    queue = self._queues[model]
+                    if queue[0] is waiter:
+                        delay = bucket.delay_for(tokens, now)
+                        if delay == 0:
+                            bucket.consume(tokens)
+                            queue.pop(0)
+                            if queue:
+                                queue[0].wake()
+                            break
+                    else:
+                        delay = None
+                    waiter.event.clear()
+                throttled = True
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), delay)
+                except TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                queue = self._queues[model]
+                was_head = bool(queue) and queue[0] is waiter
+                if waiter in queue:
+                    queue.remove(waiter)
+                if was_head and queue:
+                    queue[0].wake()
+            raise
+
+        waited = time.monotonic() - start
+        self._record(model, level, waited, throttled)
+        return waited
+
+    @asynccontextmanager
+    async def slot(
+        self, model: str, tokens: int = 0, level: Priority | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Hold a request slot around a model call.
+
+        The caller may set ``slot["actual_tokens"]`` once usage is known so the
+        token bucket is corrected for the difference with the estimate.
+        """
+        await self.acquire(model, tokens, level)
+        slot: dict[str, Any] = {"estimated_tokens": tokens, "actual_tokens": None}
+        try:
+            yield slot
+        finally:
+            actual = slot["actual_tokens"]
+            if actual is not None:
+                self.reconcile(model, tokens, actual)
+
+    def reconcile(self, model: str, estimated: int, actual: int) -> None:
+        with self._lock:
+            bucket = self._bucket(model)
+            if bucket.limits.tokens_per_minute:
+                bucket.tokens -= actual - estimated
+
+    def report_throttled(self, model: str, retry_after: float | None = None) -> None:
+        """Record a provider 429 and pause the model's bucket for every caller."""
+        pause = retry_after if retry_after is not None else self.throttle_pause
+        with self._lock:
+            bucket = self._bucket(model)
+            bucket.paused_until = max(bucket.paused_until, time.monotonic() + pause)
+            self._stats.setdefault(model, _ModelStats()).provider_throttles += 1
+        logfire.warn(
+            "provider throttled {model}; pausing {pause}s", model=model, pause=pause
+        )
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per-model request counts, throttle events and queue wait times."""
+        with self._lock:
+            return {
+                model: {
+                    "requests": s.requests,
+                    "throttled": s.throttled,
+                    "provider_throttles": s.provider_throttles,
+                    "queue_depth": len(self._queues.get(model, [])),
+                    "avg_wait_seconds": round(s.wait_seconds / s.requests, 4)
+                    if s.requests
+                    else 0.0,
+                    "max_wait_seconds": round(s.max_wait_seconds, 4),
+                    "wait_seconds_by_priority": {
+                        k: round(v, 4) for k, v in s.waits_by_priority.items()
+                    },
+                }
+                for model, s in self._stats.items()
+            }
+
+    # -------------------- Internals --------------------
+
+    def _bucket(self, model: str) -> _Bucket:
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            bucket = _Bucket(self.limits.get(model, self.default_limits))
+            self._buckets[model] = bucket
+        return bucket
+
+    def _record(
+        self, model: str, level: Priority, waited: float, throttled: bool
+    ) -> None:
+        with self._lock:
+            s = self._stats.setdefault(model, _ModelStats())
+            s.requests += 1
+            s.wait_seconds += waited
+            s.max_wait_seconds = max(s.max_wait_seconds, waited)
+            s.waits_by_priority[level.name.lower()] = (
+                s.waits_by_priority.get(level.name.lower(), 0.0) + waited
+            )
+            if throttled:
+                s.throttled += 1
+        if throttled:
+            logfire.debug(
+                "rate limiter delayed {model} ({priority}) by {waited:.3f}s",
+                model=model,
+                priority=level.name.lower(),
+                waited=waited,
+            )
+
+
+def estimate_tokens(payload: Any) -> int:
+    """Cheap token estimate (~4 characters per token) for bucket accounting."""
+    if isinstance(payload, str):
+        return len(payload) // 4
+    return len(json.dumps(payload, default=str)) // 4
+
+
+def load_limits_from_env() -> tuple[dict[str, ModelLimits], ModelLimits]:
+    """
+    Read limits from ``LLM_RATE_LIMITS``.
+
+    The variable holds JSON mapping model names to ``{"rpm": .., "tpm": ..}``;
+    the ``"default"`` entry applies to models that are not listed.
+    """
+    raw = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+    limits = {
+        name: ModelLimits(
+            requests_per_minute=cfg.get("rpm", 60),
+            tokens_per_minute=cfg.get("tpm"),
+        )
+        for name, cfg in raw.items()
+    }
+    default = limits.pop("default", ModelLimits(requests_per_minute=60))
+    return limits, default
+
+
+load_dotenv()
+_limits, _default_limits = load_limits_from_env()
+limiter = RateLimiter(_limits, _default_limits)
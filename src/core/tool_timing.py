@@ -0,0 +1,129 @@
+"""
+This module contains per-turn tool timing for agent runs.
+
+When the model emits several tool calls in one response, pydantic-ai runs
+them concurrently. ``run_timed`` drives an agent run node by node and, for
+every tool-calling turn, compares the turn's wall-clock time with the summed
+time of its tool calls; a ratio near 1 means the calls effectively ran one
+after another. Time a call spent queued behind a concurrency cap (reported
+via ``record_queue_wait``) is not counted as tool time.
+
+Args:
+    None
+
+Returns:
+    run_timed: Runs an agent and returns its result with a ``RunTiming``.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import logfire
+from pydantic_ai import Agent
+from pydantic_ai.messages import FunctionToolCallEvent, FunctionToolResultEvent
+
+
+@dataclass
+class TurnTiming:
+    """Tool calls made in one model response."""
+
+    step: int
+    wall: float = 0.0
+    queued: float = 0.0
+    calls: dict[str, str] = field(default_factory=dict)
+    latencies: dict[str, float] = field(default_factory=dict)
+    _started: float = 0.0
+
+    @property
+    def summed(self) -> float:
+        return max(sum(self.latencies.values()) - self.queued, 0.0)
+
+    def observe(self, event: Any) -> None:
+        now = time.perf_counter()
+        if isinstance(event, FunctionToolCallEvent):
+            # Calls start together once the last call event is out.
+            self.calls[event.call_id] = event.part.tool_name
+            self._started = now
+        elif isinstance(event, FunctionToolResultEvent):
+            self.latencies[event.tool_call_id] = now - self._started
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "step": self.step,
+            "tools": sorted(self.calls.values()),
+            "wall_s": round(self.wall, 3),
+            "summed_s": round(self.summed, 3),
+            "queued_s": round(self.queued, 3),
+        }
+
+
+@dataclass
+class RunTiming:
+    turns: list[TurnTiming] = field(default_factory=list)
+    current: TurnTiming | None = None
+
+    @contextmanager
+    def turn(self, step: int) -> Iterator[TurnTiming]:
+        timing = TurnTiming(step)
+        self.current = timing
+        start = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            timing.wall = time.perf_counter() - start
+            self.current = None
+            if timing.calls:
+                self.turns.append(timing)
+
+    @property
+    def wall(self) -> float:
+        return sum(t.wall for t in self.turns)
+
+    @property
+    def summed(self) -> float:
+        return sum(t.summed for t in self.turns)
+
+    def log(self, agent_name: str | None) -> None:
+        if not self.turns:
+            return
+        logfire.info(
+            "{agent} tool time: {wall:.2f}s wall-clock vs {summed:.2f}s summed",
+            agent=agent_name,
+            wall=self.wall,
+            summed=self.summed,
+            turns=[t.to_dict() for t in self.turns],
+        )
+
+
+current_run: ContextVar[RunTiming | None] = ContextVar("current_run", default=None)
+
+
+def record_queue_wait(seconds: float) -> None:
+    """Exclude time a tool call spent waiting for a slot from its turn's tool time."""
+    run = current_run.get()
+    if run is not None and run.current is not None:
+        run.current.queued += seconds
+
+
+async def run_timed(agent: Agent, prompt: str, **kwargs: Any) -> tuple[Any, RunTiming]:
+    """``agent.run(prompt)``, timing each tool-calling turn."""
+    timing = RunTiming()
+    token = current_run.set(timing)
+    try:
+        async with agent.iter(prompt, **kwargs) as run:
+            async for node in run:
+                if Agent.is_call_tools_node(node):
+                    with timing.turn(run.ctx.state.run_step) as turn:
+                        async with node.stream(run.ctx) as events:
+                            async for event in events:
+                                turn.observe(event)
+    finally:
+        current_run.reset(token)
+    timing.log(agent.name)
+    return run.result, timing
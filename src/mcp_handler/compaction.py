@@ -0,0 +1,310 @@
+"""
+This module contains the tool-result compaction stage for MCP servers.
+
+MCP tools such as Gmail search or Calendar list can return very large
+payloads. The compactor sits between the MCP server and the agent (through
+``MCPServerStdio.process_tool_call``) and shrinks each result before it
+re-enters the LLM context, while keeping the full result retrievable by
+reference through the ``get_full_tool_result`` tool.
+
+Args:
+    None
+
+Returns:
+    ToolResultCompactor: The compaction stage for MCP tool results.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+import logfire
+from pydantic_ai import RunContext, Tool
+
+TRUNCATION_MARKER = "…[+{} chars]"
+
+
+@dataclass
+class CompactionPolicy:
+    """Budget and shaping rules applied to the results of one tool."""
+
+    max_bytes: int = 16_000
+    """Hard byte budget for the serialized result handed to the model."""
+
+    max_tokens: int | None = None
+    """Optional token budget, estimated as bytes / 4. The tighter budget wins."""
+
+    include_fields: tuple[str, ...] | None = None
+    """Keys to keep on each record (dict inside a list, or a top-level dict)."""
+
+    exclude_fields: tuple[str, ...] = ()
+    """Keys dropped everywhere in the result."""
+
+    max_field_chars: int = 2_000
+    """Long strings (email bodies, descriptions) are truncated to this length."""
+
+    dedupe: bool = True
+    """Drop repeated records and repeated paragraphs of text."""
+
+    @property
+    def byte_budget(self) -> int:
+        if self.max_tokens is None:
+            return self.max_bytes
+        return min(self.max_bytes, self.max_tokens * 4)
+
+
+@dataclass
+class ToolStats:
+    """Before/after size counters for one tool."""
+
+    calls: int = 0
+    compacted_calls: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        saved = self.bytes_before - self.bytes_after
+        return {
+            "calls": self.calls,
+            "compacted_calls": self.compacted_calls,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "tokens_before": estimate_tokens(self.bytes_before),
+            "tokens_after": estimate_tokens(self.bytes_after),
+            "saved_ratio": round(saved / self.bytes_before, 3)
+            if self.bytes_before
+            else 0.0,
+        }
+
+
+def estimate_tokens(n_bytes: int) -> int:
+    """Rough token estimate used for budgets and stats (~4 bytes per token)."""
+    return (n_bytes + 3) // 4
+
+
+def _serialize(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+@dataclass
+class ToolResultCompactor:
+    """
+    Compacts MCP tool results according to per-tool policies.
+
+    An instance is used directly as the ``process_tool_call`` hook of an MCP
+    server. Full results are kept in a bounded in-memory store keyed by a
+    short reference id that is included in every compacted result.
+    """
+
+    policies: dict[str, CompactionPolicy] = field(default_factory=dict)
+    default_policy: CompactionPolicy = field(default_factory=CompactionPolicy)
+    max_stored_results: int = 64
+
+    _store: OrderedDict[str, str] = field(default_factory=OrderedDict, repr=False)
+    _stats: dict[str, ToolStats] = field(default_factory=dict, repr=False)
+
+    # -------------------- MCP hook --------------------
+
+    async def __call__(
+        self,
+        ctx: RunContext[Any],
+        call_tool,
+        tool_name: str,
+        arguments: dict[str, Any],
+    ) -> Any:
+        result = await call_tool(tool_name, arguments, None)
+        return self.compact(tool_name, result)
+
+    # -------------------- Public API --------------------
+
+    def policy_for(self, tool_name: str) -> CompactionPolicy:
+        return self.policies.get(tool_name, self.default_policy)
+
+    def compact(self, tool_name: str, result: Any) -> Any:
+        """Compact a single tool result and record before/after sizes."""
+        policy = self.policy_for(tool_name)
+        full_text = _serialize(result)
+        before = len(full_text.encode())
+
+        if isinstance(result, str):
+            compacted, dropped = self._compact_text(result, policy)
+        elif isinstance(result, (dict, list)):
+            compacted, dropped = self._compact_structured(result, policy)
+        else:
+            # Binary content and other parts are passed through untouched.
+            compacted, dropped = result, 0
+
+        changed = compacted is not result and _serialize(compacted) != full_text
+        if changed:
+            ref = self._remember(full_text)
+            note = (
+                f"result compacted from {before} bytes; call "
+                f"get_full_tool_result(ref='{ref}') for the complete output"
+            )
+            if dropped:
+                note += f" ({dropped} items omitted)"
+            if isinstance(compacted, str):
+                compacted = f"{compacted}\n\n[{note}]"
+            else:
+                compacted = {"result": compacted, "_compaction": note}
+
+        after = len(_serialize(compacted).encode())
+        stats = self._stats.setdefault(tool_name, ToolStats())
+        stats.calls += 1
+        stats.compacted_calls += int(changed)
+        stats.bytes_before += before
+        stats.bytes_after += after
+        logfire.debug(
+            "compacted {tool_name}: {before} -> {after} bytes",
+            tool_name=tool_name,
+            before=before,
+            after=after,
+        )
+        return compacted
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per-tool before/after size statistics."""
+        return {name: s.as_dict() for name, s in self._stats.items()}
+
+    def get_full_result(self, ref: str, offset: int = 0, length: int = 20_000) -> str:
+        """Return a slice of a stored full result, or an error message."""
+        full_text = self._store.get(ref)
+        if full_text is None:
+            return (
+                f"Error: no stored tool result with ref '{ref}' (it may have expired)."
+            )
+        self._store.move_to_end(ref)
+        chunk = full_text[offset : offset + length]
+        remaining = len(full_text) - offset - len(chunk)
+        if remaining > 0:
+            chunk += (
+                f"\n\n[{remaining} more chars; call again with "
+                f"offset={offset + len(chunk)}]"
+            )
+        return chunk
+
+    def retrieval_tool(self) -> Tool:
+        """Build the agent tool that pages through full, uncompacted results."""
+
+        def get_full_tool_result(
+            ref: str, offset: int = 0, length: int = 20_000
+        ) -> str:
+            """
+            Retrieve the complete output of an earlier tool call that was compacted.
+
+            Args:
+                ref: The reference id quoted in the compacted result.
+                offset: Character offset to start reading from.
+                length: Maximum number of characters to return.
+            """
+            return self.get_full_result(ref, offset, length)
+
+        return Tool(get_full_tool_result, takes_ctx=False)
+
+    # -------------------- Internals --------------------
+
+    def _remember(self, full_text: str) -> str:
+        ref = hashlib.sha1(full_text.encode()).hexdigest()[:10]
+        self._store[ref] = full_text
+        self._store.move_to_end(ref)
+        while len(self._store) > self.max_stored_results:
+            self._store.popitem(last=False)
+        return ref
+
+    def _compact_text(self, text: str, policy: CompactionPolicy) -> tuple[str, int]:
+        paragraphs = re.split(r"\n\s*\n", text)
+        dropped = 0
+        if policy.dedupe:
+            seen: set[str] = set()
+            unique = []
+            for para in paragraphs:
+                key = " ".join(para.split())
+                if key and key in seen:
+                    dropped += 1
+                    continue
+                seen.add(key)
+                unique.append(para)
+            paragraphs = unique
+        paragraphs = [self._truncate(p, policy.max_field_chars) for p in paragraphs]
+        compacted = re.sub(r"[ \t]+\n", "\n", "\n\n".join(paragraphs))
+
+        budget = policy.byte_budget
+        if len(compacted.encode()) > budget:
+            cut = compacted.encode()[:budget].decode(errors="ignore")
+            compacted = cut + TRUNCATION_MARKER.format(len(compacted) - len(cut))
+        return (text if compacted == text else compacted), dropped
+
+    def _compact_structured(
+        self, value: Any, policy: CompactionPolicy
+    ) -> tuple[Any, int]:
+        shaped = self._shape(value, policy, is_record=isinstance(value, dict))
+        dropped = 0
+        budget = policy.byte_budget
+        records = self._largest_list(shaped)
+        while records and len(_serialize(shaped).encode()) > budget:
+            records.pop()
+            dropped += 1
+        if len(_serialize(shaped).encode()) > budget:
+            # Still too large (e.g. one giant record): fall back to text.
+            text = _serialize(shaped)
+            cut = text.encode()[:budget].decode(errors="ignore")
+            return cut + TRUNCATION_MARKER.format(len(text) - len(cut)), dropped
+        return shaped, dropped
+
+    def _shape(self, value: Any, policy: CompactionPolicy, is_record: bool) -> Any:
+        if isinstance(value, dict):
+            items = value.items()
+            if is_record and policy.include_fields is not None:
+                items = [(k, v) for k, v in items if k in policy.include_fields]
+            return {
+                k: self._shape(v, policy, is_record=False)
+                for k, v in items
+                if k not in policy.exclude_fields
+            }
+        if isinstance(value, list):
+            shaped = [self._shape(v, policy, is_record=True) for v in value]
+            if not policy.dedupe:
+                return shaped
+            seen: set[str] = set()
+            unique = []
+            for item in shaped:
+                key = (
+                    f"id:{item['id']}"
+                    if isinstance(item, dict) and "id" in item
+                    else json.dumps(item, sort_keys=True, default=str)
+                )
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(item)
+            return unique
+        if isinstance(value, str):
+            return self._truncate(value, policy.max_field_chars)
+        return value
+
+    @staticmethod
+    def _truncate(text: str, limit: int) -> str:
+        if len(text) <= limit:
+            return text
+        return text[:limit] + TRUNCATION_MARKER.format(len(text) - limit)
+
+    @staticmethod
+    def _largest_list(value: Any) -> list | None:
+        """Find the longest list in a shaped result, to trim records from."""
+        best: list | None = None
+        stack = [value]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                if best is None or len(node) > len(best):
+                    best = node
+                stack.extend(node)
+            elif isinstance(node, dict):
+                stack.extend(node.values())
+        return best
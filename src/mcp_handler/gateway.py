@@ -0,0 +1,222 @@
+"""
+This module contains a gateway that shares one stdio MCP server over HTTP.
+
+The Node MCP servers only speak stdio, so each agent worker would otherwise
+spawn (and authenticate) its own copy. The gateway runs a single upstream
+server and serves it to any number of clients over streamable HTTP
+(``/mcp``) and SSE (``/sse``). Requests are forwarded verbatim on one
+upstream session; the tool list is fetched once.
+
+    python -m src.mcp_handler.gateway --port 9101 gmail
+    python -m src.mcp_handler.gateway --port 9102 -- node server.js
+
+Point agents at it with ``MCP_GMAIL_URL=http://host:9101/mcp``. If
+``MCP_GATEWAY_TOKEN`` is set, clients must send it as a bearer token
+(``MCP_<NAME>_TOKEN`` on the agent side).
+
+Args:
+    None
+
+Returns:
+    MCPGateway: The gateway; ``app()`` is its ASGI application.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hmac
+import importlib
+import os
+from contextlib import asynccontextmanager
+from typing import Any
+
+import logfire
+import uvicorn
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
+from mcp.server.lowlevel import Server
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Mount, Route
+
+
+class MCPGateway:
+    """One upstream stdio MCP session shared by many HTTP clients."""
+
+    def __init__(
+        self,
+        command: str,
+        args: list[str],
+        env: dict[str, str] | None = None,
+        cwd: str | None = None,
+        token: str | None = None,
+    ):
+        self.params = StdioServerParameters(
+            command=command, args=args, env=env, cwd=cwd
+        )
+        self.token = token
+        self.server: Server = Server("mcp-gateway")
+        self.server.request_handlers[types.ListToolsRequest] = self._list_tools
+        self.server.request_handlers[types.CallToolRequest] = self._call_tool
+        self.calls = 0
+        self.connect_timeout = 60.0
+        self._session: ClientSession | None = None
+        self._tools: types.ListToolsResult | None = None
+        self._ready = asyncio.Event()
+        self._broken = asyncio.Event()
+        self._stopping = False
+
+    # -------------------- Upstream --------------------
+
+    async def run_upstream(self) -> None:
+        """Keep the upstream session open until ``stop()``; reconnect if it breaks.
+
+        The stdio transport must be opened and closed in the same task, so
+        this task owns it and request handlers only signal ``_broken``.
+        """
+        while not self._stopping:
+            try:
+                async with (
+                    stdio_client(self.params) as (read, write),
+                    ClientSession(read, write) as session,
+                ):
+                    init = await session.initialize()
+                    # Advertise the upstream identity so clients key caches on it.
+                    self.server.name = init.serverInfo.name
+                    self.server.version = init.serverInfo.version
+                    self._session, self._tools = session, None
+                    self._ready.set()
+                    logfire.info(
+                        "gateway connected to {name} {version}",
+                        name=init.serverInfo.name,
+                        version=init.serverInfo.version,
+                    )
+                    await self._broken.wait()
+            except Exception as e:
+                logfire.warn("gateway upstream failed: {error}", error=str(e))
+                await asyncio.sleep(1)
+            finally:
+                self._session = None
+                self._ready.clear()
+                self._broken.clear()
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._broken.set()
+
+    async def _upstream(self) -> ClientSession:
+        await asyncio.wait_for(self._ready.wait(), self.connect_timeout)
+        assert self._session is not None
+        return self._session
+
+    async def _list_tools(self, _: types.ListToolsRequest) -> types.ServerResult:
+        if self._tools is None:
+            session = await self._upstream()
+            try:
+                self._tools = await session.list_tools()
+            except Exception:
+                self._broken.set()
+                raise
+        return types.ServerResult(self._tools)
+
+    async def _call_tool(self, request: types.CallToolRequest) -> types.ServerResult:
+        self.calls += 1
+        session = await self._upstream()
+        try:
+            result = await session.call_tool(
+                request.params.name, request.params.arguments or {}
+            )
+        except Exception:
+            # Reconnect, but don't retry: the call may have had side effects.
+            self._broken.set()
+            raise
+        return types.ServerResult(result)
+
+    # -------------------- HTTP --------------------
+
+    def app(self) -> Starlette:
+        sessions = StreamableHTTPSessionManager(app=self.server)
+        sse = SseServerTransport("/messages/")
+
+        async def handle_streamable_http(scope, receive, send) -> None:
+            await sessions.handle_request(scope, receive, send)
+
+        async def handle_sse(request) -> Response:
+            async with sse.connect_sse(
+                request.scope, request.receive, request._send
+            ) as (read, write):
+                await self.server.run(
+                    read, write, self.server.create_initialization_options()
+                )
+            return Response()
+
+        @asynccontextmanager
+        async def lifespan(_: Starlette):
+            upstream = asyncio.create_task(self.run_upstream())
+            await self._upstream()
+            async with sessions.run():
+                yield
+            self.stop()
+            await upstream
+
+        app = Starlette(
+            routes=[
+                Mount("/mcp", app=handle_streamable_http),
+                Route("/sse", endpoint=handle_sse, methods=["GET"]),
+                Mount("/messages/", app=sse.handle_post_message),
+            ],
+            lifespan=lifespan,
+        )
+        if self.token:
+            app.add_middleware(_BearerAuth, token=self.token)
+        return app
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9100) -> None:
+        config = uvicorn.Config(
+            self.app(), host=host, port=port, log_level="error", loop="asyncio"
+        )
+        await uvicorn.Server(config).serve()
+
+
+class _BearerAuth:
+    def __init__(self, app: Any, token: str):
+        self.app = app
+        self.expected = f"Bearer {token}".encode()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http":
+            supplied = dict(scope["headers"]).get(b"authorization", b"")
+            if not hmac.compare_digest(supplied, self.expected):
+                await PlainTextResponse("Unauthorized", 401)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+def gateway_for(name: str, token: str | None = None) -> MCPGateway:
+    """Gateway for ``src.mcp_handler.mcp_<name>``'s stdio server."""
+    # The gateway itself must launch the stdio server, not connect to itself.
+    os.environ.pop(f"MCP_{name.upper()}_URL", None)
+    server = importlib.import_module(f"src.mcp_handler.mcp_{name}").server
+    return MCPGateway(server.command, list(server.args), server.env, server.cwd, token)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument(
+        "target", nargs=argparse.REMAINDER, help="server name, or -- command args"
+    )
+    options = parser.parse_args()
+    target = options.target[1:] if options.target[:1] == ["--"] else options.target
+    if not target:
+        parser.error("give a server name or -- command args")
+    token = os.getenv("MCP_GATEWAY_TOKEN")
+    if len(target) == 1:
+        gateway = gateway_for(target[0], token)
+    else:
+        gateway = MCPGateway(target[0], target[1:], env=dict(os.environ), token=token)
+    asyncio.run(gateway.serve(options.host, options.port))
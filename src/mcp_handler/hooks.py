@@ -0,0 +1,71 @@
+"""
+This module contains a composable ``process_tool_call`` hook for MCP servers.
+
+``MCPServerStdio`` accepts a single ``process_tool_call`` callable. The
+``ToolCallHooks`` wrapper lets several concerns share it: an inner processor
+(e.g. the result compactor) handles the call itself, and listeners registered
+with ``on_result`` run after matching tools succeed, for example to invalidate
+a local cache when the agent creates or updates a record.
+
+Args:
+    inner: The processor that performs the call, or ``None`` to call directly.
+
+Returns:
+    ToolCallHooks: Usable as ``process_tool_call=`` on any MCP server.
+"""
+
+from __future__ import annotations
+
+import inspect
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+import logfire
+from pydantic_ai import RunContext
+
+ProcessToolCall = Callable[..., Awaitable[Any]]
+ResultListener = Callable[[str, dict[str, Any], Any], Awaitable[None] | None]
+
+
+class ToolCallHooks:
+    """Chains an inner tool-call processor with post-call listeners."""
+
+    def __init__(self, inner: ProcessToolCall | None = None):
+        self.inner = inner
+        self._listeners: list[tuple[frozenset[str] | None, ResultListener]] = []
+
+    def on_result(
+        self, listener: ResultListener, tool_names: Iterable[str] | None = None
+    ) -> None:
+        """Call ``listener(tool_name, arguments, result)`` after matching tools.
+
+        ``tool_names=None`` matches every tool.
+        """
+        names = frozenset(tool_names) if tool_names is not None else None
+        self._listeners.append((names, listener))
+
+    async def __call__(
+        self,
+        ctx: RunContext[Any],
+        call_tool,
+        tool_name: str,
+        arguments: dict[str, Any],
+    ) -> Any:
+        if self.inner is not None:
+            result = await self.inner(ctx, call_tool, tool_name, arguments)
+        else:
+            result = await call_tool(tool_name, arguments, None)
+        for names, listener in self._listeners:
+            if names is not None and tool_name not in names:
+                continue
+            try:
+                outcome = listener(tool_name, arguments, result)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception as e:  # a listener must never fail the tool call
+                logfire.warn(
+                    "tool-call listener for {tool} failed: {error}",
+                    tool=tool_name,
+                    error=str(e),
+                )
+        return result
@@ -8,13 +8,50 @@ Returns:
     server: The MCP server for the GitHub Helper project.
 """
 
-from pydantic_ai.mcp import MCPServerStdio
-
-server = MCPServerStdio(
-    command="npx",
-    args=[
-        "--yes",
-        "@cocal/google-calendar-mcp",
-    ],
+from src.mcp_handler.compaction import CompactionPolicy, ToolResultCompactor
+from src.mcp_handler.hooks import ToolCallHooks
+from src.mcp_handler.provision import mcp_server
+from src.mcp_handler.scheduling import ToolCallScheduler
+
+_EVENT_FIELDS = (
+    "id",
+    "summary",
+    "start",
+    "end",
+    "location",
+    "status",
+    "attendees",
+    "organizer",
+    "description",
+    "calendarId",
+)
+
+compactor = ToolResultCompactor(
+    policies={
+        "list-events": CompactionPolicy(
+            max_bytes=10_000, include_fields=_EVENT_FIELDS, max_field_chars=400
+        ),
+        "search-events": CompactionPolicy(
+            max_bytes=10_000, include_fields=_EVENT_FIELDS, max_field_chars=400
+        ),
+        "get-freebusy": CompactionPolicy(max_bytes=6_000),
+        "list-colors": CompactionPolicy(max_bytes=2_000),
+    },
+)
+
+# Listeners (e.g. the local event store) attach to event-mutating tools here.
+hooks = ToolCallHooks(compactor)
+
+MUTATING_TOOLS = ("create-event", "update-event", "delete-event")
+
+# Caps calls in flight on the session and keeps mutations in call order.
+scheduler = ToolCallScheduler(hooks, mutating=MUTATING_TOOLS)
+
+# Shared over HTTP when MCP_GCAL_URL is set; otherwise launched with node from
+# the provisioned cache when available, else npx.
+server = mcp_server(
+    "@cocal/google-calendar-mcp",
+    name="gcal",
     env={"GOOGLE_OAUTH_CREDENTIALS": "/Users/connor/assistant/gcp-oauth.keys.json"},
+    process_tool_call=scheduler,
 )
@@ -8,13 +8,41 @@ Returns:
     server: The MCP server for the GitHub Helper project.
 """
 
-from pydantic_ai.mcp import MCPServerStdio
+from src.mcp_handler.compaction import CompactionPolicy, ToolResultCompactor
+from src.mcp_handler.provision import mcp_server
+from src.mcp_handler.scheduling import ToolCallScheduler
 
-server = MCPServerStdio(
-    command="npx",
-    args=[
-        "--yes",
-        "@gongrzhe/server-gmail-autoauth-mcp",
-    ],
+compactor = ToolResultCompactor(
+    policies={
+        "search_emails": CompactionPolicy(max_bytes=8_000, max_field_chars=300),
+        "read_email": CompactionPolicy(max_bytes=12_000, max_field_chars=4_000),
+        "list_email_labels": CompactionPolicy(
+            max_bytes=4_000, exclude_fields=("color", "messageListVisibility")
+        ),
+    },
+)
+
+MUTATING_TOOLS = (
+    "send_email",
+    "draft_email",
+    "modify_email",
+    "delete_email",
+    "batch_modify_emails",
+    "batch_delete_emails",
+    "create_label",
+    "update_label",
+    "delete_label",
+    "get_or_create_label",
+)
+
+# Caps calls in flight on the session and keeps mutations in call order.
+scheduler = ToolCallScheduler(compactor, mutating=MUTATING_TOOLS)
+
+# Shared over HTTP when MCP_GMAIL_URL is set; otherwise launched with node from
+# the provisioned cache when available, else npx.
+server = mcp_server(
+    "@gongrzhe/server-gmail-autoauth-mcp",
+    name="gmail",
     env={"GOOGLE_OAUTH_CREDENTIALS": "/Users/connor/assistant/gcp-oauth.keys.json"},
+    process_tool_call=scheduler,
 )
@@ -11,18 +11,41 @@ Returns:
 import os
 
 from dotenv import load_dotenv
-from pydantic_ai.mcp import MCPServerStdio
+
+from src.mcp_handler.compaction import CompactionPolicy, ToolResultCompactor
+from src.mcp_handler.hooks import ToolCallHooks
+from src.mcp_handler.provision import mcp_server
+from src.mcp_handler.scheduling import ToolCallScheduler
 
 load_dotenv()
 token = os.getenv("TODOIST_API_TOKEN")
 if not token:
     raise ValueError("Set TODOIST_API_TOKEN in your env/.env file")
 
-server = MCPServerStdio(
-    command="npx",
-    args=[
-        "--yes",
-        "@abhiz123/todoist-mcp-server",
-    ],
+compactor = ToolResultCompactor(
+    policies={
+        "todoist_get_tasks": CompactionPolicy(max_bytes=8_000, max_field_chars=300),
+    },
+)
+
+# Listeners (e.g. the local task mirror) attach to task-mutating tools here.
+hooks = ToolCallHooks(compactor)
+
+MUTATING_TOOLS = (
+    "todoist_create_task",
+    "todoist_update_task",
+    "todoist_complete_task",
+    "todoist_delete_task",
+)
+
+# Caps calls in flight on the session and keeps mutations in call order.
+scheduler = ToolCallScheduler(hooks, mutating=MUTATING_TOOLS)
+
+# Shared over HTTP when MCP_TODOIST_URL is set; otherwise launched with node from
+# the provisioned cache when available, else npx.
+server = mcp_server(
+    "@abhiz123/todoist-mcp-server",
+    name="todoist",
     env={"TODOIST_API_TOKEN": token},
+    process_tool_call=scheduler,
 )
@@ -0,0 +1,364 @@
+"""
+This module contains provisioning for the Node MCP servers.
+
+``npx --yes <package>`` resolves the package against the npm registry on
+every spawn, so each agent request pays seconds of cold start and needs the
+network. Provisioning installs each server once, at a pinned version, into
+a local cache directory; servers are then launched directly with ``node``.
+
+* Pins live in a lock file (``mcp_servers.lock.json``) mapping package to
+  version and npm ``integrity``. The first provisioning run records them;
+  later runs install exactly that version and fail if the integrity differs.
+* Every time a server process is started (not only when the server object
+  is built) the install is verified: the ``package-lock.json`` integrity
+  must match the pin and the bin entry must match the SHA-256 recorded at
+  install time. Anything missing or modified falls back to
+  ``npx --yes <package>@<pinned version>``.
+* The lock file is meant to be committed next to this code. ``app.py``
+  provisions any server without a pin at startup, which writes it; a server
+  that still has no pin launches unpinned through ``npx``, which is logged
+  at every start. ``--check`` fails while any server is unpinned.
+* Spawn-to-ready time is logged for every server start.
+
+Provision with ``python -m src.mcp_handler.provision``; check the pins with
+``python -m src.mcp_handler.provision --check``.
+
+Args:
+    None
+
+Returns:
+    mcp_server: Builds the MCP server for a package: shared over HTTP when
+        configured, else provisioned or via npx.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import logfire
+from pydantic_ai.mcp import MCPServer
+
+from .remote import remote_server
+from .tool_cache import CachedMCPServerStdio
+
+SERVER_PACKAGES = (
+    "@gongrzhe/server-gmail-autoauth-mcp",
+    "@cocal/google-calendar-mcp",
+    "@abhiz123/todoist-mcp-server",
+)
+
+DEFAULT_CACHE_DIR = ".cache/mcp_servers"
+DEFAULT_LOCK_PATH = "mcp_servers.lock.json"
+_MANIFEST = ".provisioned.json"
+
+
+class ProvisionError(RuntimeError):
+    """An install failed or does not match its pinned integrity."""
+
+
+@dataclass
+class InstalledServer:
+    package: str
+    version: str
+    integrity: str
+    bin_path: str
+    bin_sha256: str
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _bin_entry(package: str, manifest: dict[str, Any]) -> str:
+    """The bin script npx would run for ``package``."""
+    bins = manifest.get("bin")
+    if isinstance(bins, str):
+        return bins
+    if not bins:
+        raise ProvisionError(f"{package} has no bin entry")
+    short = package.rsplit("/", 1)[-1]
+    return bins.get(short) or bins.get(package) or next(iter(bins.values()))
+
+
+class MCPServerCache:
+    """Pinned installs of MCP server packages under one cache directory."""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        lock_path: str = DEFAULT_LOCK_PATH,
+        npm: str = "npm",
+    ):
+        self.cache_dir = cache_dir
+        self.lock_path = lock_path
+        self.npm = npm
+
+    @classmethod
+    def from_env(cls) -> MCPServerCache:
+        return cls(
+            os.getenv("MCP_SERVER_CACHE_DIR", DEFAULT_CACHE_DIR),
+            os.getenv("MCP_SERVERS_LOCK", DEFAULT_LOCK_PATH),
+        )
+
+    # -------------------- Pins --------------------
+
+    def pins(self) -> dict[str, dict[str, str]]:
+        try:
+            with open(self.lock_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def unpinned(self, packages: tuple[str, ...] = SERVER_PACKAGES) -> list[str]:
+        """``packages`` without a pinned version and integrity."""
+        pins = self.pins()
+        return [
+            p
+            for p in packages
+            if not all(pins.get(p, {}).get(k) for k in ("version", "integrity"))
+        ]
+
+    def _pin(self, installed: InstalledServer) -> None:
+        pins = self.pins()
+        pins[installed.package] = {
+            "version": installed.version,
+            "integrity": installed.integrity,
+        }
+        with open(self.lock_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(pins, indent=2, sort_keys=True) + "\n")
+
+    # -------------------- Install --------------------
+
+    def install_dir(self, package: str, version: str) -> str:
+        slug = package.lstrip("@").replace("/", "__")
+        return os.path.join(self.cache_dir, f"{slug}@{version}")
+
+    def provision(
+        self, package: str, version: str | None = None, source: str | None = None
+    ) -> InstalledServer:
+        """Install ``package`` at its pinned (or given, or latest) version.
+
+        ``source`` overrides what npm installs, e.g. a local tarball.
+        Idempotent: an install that still verifies is reused.
+        """
+        pin = self.pins().get(package, {})
+        version = version or pin.get("version")
+        if version:
+            installed = self.resolve(package, version)
+            if installed is not None:
+                return installed
+        spec = os.path.abspath(source) if source else f"{package}@{version or 'latest'}"
+        staging = self.install_dir(package, "staging")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        proc = subprocess.run(
+            [self.npm, "install", "--prefix", staging, "--save-exact"]
+            + ["--no-audit", "--no-fund", "--omit=dev", spec],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if proc.returncode != 0:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise ProvisionError(f"npm install {spec} failed: {proc.stderr.strip()}")
+
+        with open(os.path.join(staging, "package-lock.json"), encoding="utf-8") as f:
+            locked = json.load(f)["packages"][f"node_modules/{package}"]
+        pinned = pin.get("version") == locked["version"] and pin.get("integrity")
+        if pinned and locked.get("integrity") != pin["integrity"]:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise ProvisionError(
+                f"{package}@{locked['version']} integrity {locked.get('integrity')} "
+                f"does not match the pinned {pin['integrity']}"
+            )
+        package_dir = os.path.join(staging, "node_modules", package)
+        with open(os.path.join(package_dir, "package.json"), encoding="utf-8") as f:
+            bin_rel = _bin_entry(package, json.load(f))
+
+        target = self.install_dir(package, locked["version"])
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+        bin_path = os.path.abspath(
+            os.path.join(target, "node_modules", package, bin_rel)
+        )
+        installed = InstalledServer(
+            package=package,
+            version=locked["version"],
+            integrity=locked.get("integrity", ""),
+            bin_path=bin_path,
+            bin_sha256=_sha256(bin_path),
+        )
+        with open(os.path.join(target, _MANIFEST), "w", encoding="utf-8") as f:
+            f.write(json.dumps(installed.__dict__))
+        self._pin(installed)
+        logfire.info(
+            "provisioned {package}@{version}",
+            package=package,
+            version=installed.version,
+        )
+        return installed
+
+    def provision_missing(
+        self, packages: tuple[str, ...] = SERVER_PACKAGES
+    ) -> list[InstalledServer]:
+        """Provision (and so pin) every unpinned package; failures are logged.
+
+        A package that fails (no network, no npm) keeps launching via ``npx``.
+        """
+        installed = []
+        for package in self.unpinned(packages):
+            try:
+                installed.append(self.provision(package))
+            except (ProvisionError, OSError) as e:
+                logfire.warn(
+                    "could not provision {package}: {error}",
+                    package=package,
+                    error=str(e),
+                )
+        return installed
+
+    # -------------------- Launch --------------------
+
+    def resolve(
+        self, package: str, version: str | None = None
+    ) -> InstalledServer | None:
+        """The verified install of ``package``'s pinned version, if any."""
+        pin = self.pins().get(package, {})
+        version = version or pin.get("version")
+        if not version:
+            return None
+        target = self.install_dir(package, version)
+        try:
+            with open(os.path.join(target, _MANIFEST), encoding="utf-8") as f:
+                installed = InstalledServer(**json.load(f))
+            with open(os.path.join(target, "package-lock.json"), encoding="utf-8") as f:
+                locked = json.load(f)["packages"][f"node_modules/{package}"]
+            bin_sha256 = _sha256(installed.bin_path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        expected = installed.integrity
+        if pin.get("version") == version and pin.get("integrity"):
+            expected = pin["integrity"]
+        if locked.get("integrity") != expected or bin_sha256 != installed.bin_sha256:
+            logfire.warn(
+                "cached {package}@{version} failed verification; using npx",
+                package=package,
+                version=version,
+            )
+            return None
+        return installed
+
+    def launch_spec(self, package: str) -> tuple[str, list[str], str | None, str]:
+        """``(command, args, version, launcher)`` to start ``package``."""
+        installed = self.resolve(package)
+        if installed is not None:
+            return "node", [installed.bin_path], installed.version, "node"
+        version = self.pins().get(package, {}).get("version")
+        spec = f"{package}@{version}" if version else package
+        return "npx", ["--yes", spec], version, "npx"
+
+
+@dataclass
+class ProvisionedMCPServerStdio(CachedMCPServerStdio):
+    """``CachedMCPServerStdio`` that records how it was launched and how fast.
+
+    With ``server_cache`` set, the install is verified again before every
+    process start, so a cache changed after startup is not launched.
+    """
+
+    launcher: str = "npx"
+    server_cache: MCPServerCache | None = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.spawn_seconds: float | None = None
+
+    def refresh_launch(self) -> None:
+        """Re-verify the install and update the command to launch."""
+        if self.server_cache is None:
+            return
+        self.command, self.args, self.version, self.launcher = (
+            self.server_cache.launch_spec(self.package)
+        )
+        if self.version is None:
+            logfire.warn(
+                "{package} is not pinned in {lock}; launching the latest release",
+                package=self.package,
+                lock=self.server_cache.lock_path,
+            )
+
+    async def __aenter__(self):
+        if self._running_count:
+            return await super().__aenter__()
+        self.refresh_launch()
+        start = time.perf_counter()
+        await super().__aenter__()
+        self.spawn_seconds = time.perf_counter() - start
+        logfire.info(
+            "{package} ready in {seconds:.2f}s via {launcher}",
+            package=self.package,
+            seconds=self.spawn_seconds,
+            launcher=self.launcher,
+        )
+        return self
+
+
+def mcp_server(
+    package: str,
+    name: str | None = None,
+    cache: MCPServerCache | None = None,
+    **kwargs: Any,
+) -> MCPServer:
+    """The MCP server for ``package``.
+
+    A shared server configured for ``name`` (``MCP_<NAME>_URL``) wins; else a
+    stdio server, provisioned ``node`` or ``npx``. ``kwargs`` (``env``,
+    ``process_tool_call``, ...) pass through.
+    """
+    if name is not None:
+        remote_kwargs = {k: v for k, v in kwargs.items() if k not in ("env", "cwd")}
+        server = remote_server(name, package=package, **remote_kwargs)
+        if server is not None:
+            return server
+    cache = cache or server_cache
+    command, args, version, launcher = cache.launch_spec(package)
+    return ProvisionedMCPServerStdio(
+        command=command,
+        args=args,
+        package=package,
+        version=version,
+        launcher=launcher,
+        server_cache=cache,
+        **kwargs,
+    )
+
+
+server_cache = MCPServerCache.from_env()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--check"]:
+        missing = server_cache.unpinned(tuple(sys.argv[2:]) or SERVER_PACKAGES)
+        for name in missing:
+            print(f"{name}: not pinned in {server_cache.lock_path}", file=sys.stderr)
+        sys.exit(1 if missing else 0)
+    failed = False
+    for name in sys.argv[1:] or SERVER_PACKAGES:
+        try:
+            server = server_cache.provision(name)
+        except ProvisionError as e:
+            failed = True
+            print(f"{name}: {e}", file=sys.stderr)
+            continue
+        print(f"{server.package}@{server.version}  {server.integrity}")
+        print(f"    node {server.bin_path}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,217 @@
+"""
+This module contains the client side of shared, long-lived MCP servers.
+
+Instead of spawning its own stdio server, an agent worker can reach an MCP
+server over streamable HTTP (or SSE), e.g. one started with
+``python -m src.mcp_handler.gateway``. Many agent workers and replicas then
+share one Node process and one OAuth token.
+
+The transport clients in ``mcp`` open (and close) an ``httpx.AsyncClient``
+per session. ``HTTPClientPool`` keeps one long-lived client per endpoint and
+lends it to every session without closing it, so reconnects reuse warm
+keep-alive connections and the number of sockets per worker stays bounded.
+
+Servers are selected per name through the environment, e.g.
+``MCP_GMAIL_URL=http://mcp-host:9101/mcp`` with ``MCP_GMAIL_TRANSPORT``
+``streamable-http`` (default) or ``sse``.
+
+Args:
+    None
+
+Returns:
+    remote_server: The HTTP MCP server configured for a name, if any.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+from mcp import types
+from mcp.shared.message import SessionMessage
+from pydantic_ai.mcp import MCPServerSSE, MCPServerStreamableHTTP
+
+from .tool_cache import ToolCacheMixin
+
+TRANSPORTS = ("streamable-http", "sse")
+
+
+class HTTPClientPool:
+    """One shared ``httpx.AsyncClient`` per event loop, endpoint and header set.
+
+    Each agent server runs its own event loop (see ``agents.common.server``),
+    and an ``httpx.AsyncClient`` must stay on the loop it was first used on.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        timeout: float = 30,
+        read_timeout: float = 300,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+        )
+        self.timeout = httpx.Timeout(timeout, read=read_timeout)
+        self._clients: dict[tuple, httpx.AsyncClient] = {}
+
+    @classmethod
+    def from_env(cls) -> HTTPClientPool:
+        return cls(
+            max_connections=int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive=int(os.getenv("MCP_HTTP_MAX_KEEPALIVE", "10")),
+        )
+
+    def client(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: httpx.Timeout | None = None,
+        auth: httpx.Auth | None = None,
+    ) -> httpx.AsyncClient:
+        timeout = timeout or self.timeout
+        origin = urlsplit(url)
+        key = (
+            asyncio.get_running_loop(),
+            origin.scheme,
+            origin.netloc,
+            tuple(sorted((headers or {}).items())),
+            tuple(timeout.as_dict().items()),
+            auth,
+        )
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                headers=headers,
+                limits=self.limits,
+                timeout=timeout,
+                auth=auth,
+                follow_redirects=True,
+            )
+            self._clients[key] = client
+        return client
+
+    def factory(self, url: str, headers: dict[str, str] | None = None):
+        """An ``httpx_client_factory`` for ``mcp`` transports that never closes.
+
+        The transport's own headers, timeout (with its SSE read timeout) and
+        auth apply to the lent client; equal settings share one client.
+        """
+        configured = headers
+
+        def lend(
+            headers: dict[str, str] | None = None,
+            timeout: httpx.Timeout | None = None,
+            auth: httpx.Auth | None = None,
+        ):
+            merged = {**(configured or {}), **(headers or {})}
+            return _lease(self.client(url, merged or None, timeout, auth))
+
+        return lend
+
+    async def aclose(self) -> None:
+        """Close this event loop's clients."""
+        loop = asyncio.get_running_loop()
+        for key in [k for k in self._clients if k[0] is loop]:
+            await self._clients.pop(key).aclose()
+
+
+@asynccontextmanager
+async def _lease(client: httpx.AsyncClient):
+    yield client
+
+
+http_pool = HTTPClientPool.from_env()
+
+
+class _PooledHTTPMixin:
+    @asynccontextmanager
+    async def client_streams(self):
+        # The transport hands its headers, timeouts and auth to the factory.
+        factory = (self.pool or http_pool).factory(self.url)
+        async with self._transport_client(
+            url=self.url,
+            headers=self.headers,
+            timeout=self.timeout,
+            sse_read_timeout=self.sse_read_timeout,
+            httpx_client_factory=factory,
+        ) as (read_stream, write_stream, *_):
+            yield _ServerInfoStream(read_stream, self.server_reported), write_stream
+
+
+class _ServerInfoStream:
+    """Read stream that passes the initialize response's server version on.
+
+    pydantic-ai drops the ``InitializeResult``; the server's version is what
+    keys its tool list in the persistent cache.
+    """
+
+    def __init__(self, stream: Any, on_version: Callable[[str | None], None]):
+        self.stream = stream
+        self.on_version = on_version
+        self.seen = False
+
+    async def __aenter__(self):
+        await self.stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self.stream.__aexit__(*exc_info)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.stream.__anext__()
+        if not self.seen and isinstance(message, SessionMessage):
+            root = message.message.root
+            if isinstance(root, types.JSONRPCResponse) and "serverInfo" in root.result:
+                self.seen = True
+                self.on_version(root.result["serverInfo"].get("version"))
+        return message
+
+
+@dataclass
+class PooledMCPServerStreamableHTTP(
+    ToolCacheMixin, _PooledHTTPMixin, MCPServerStreamableHTTP
+):
+    """Streamable-HTTP MCP server on pooled connections with cached tool lists."""
+
+    pool: HTTPClientPool | None = None
+    """Connection pool; defaults to the module-wide ``http_pool``."""
+
+
+@dataclass
+class PooledMCPServerSSE(ToolCacheMixin, _PooledHTTPMixin, MCPServerSSE):
+    """SSE MCP server on pooled connections with cached tool lists."""
+
+    pool: HTTPClientPool | None = None
+    """Connection pool; defaults to the module-wide ``http_pool``."""
+
+
+def remote_server(
+    name: str, **kwargs: Any
+) -> PooledMCPServerStreamableHTTP | PooledMCPServerSSE | None:
+    """The shared server configured by ``MCP_<NAME>_URL``, or ``None``.
+
+    ``kwargs`` (``process_tool_call``, ``package``, ...) pass through.
+    """
+    prefix = f"MCP_{name.upper()}"
+    url = os.getenv(f"{prefix}_URL")
+    if not url:
+        return None
+    transport = os.getenv(f"{prefix}_TRANSPORT", "streamable-http")
+    if transport not in TRANSPORTS:
+        raise ValueError(f"{prefix}_TRANSPORT must be one of {TRANSPORTS}")
+    cls = PooledMCPServerSSE if transport == "sse" else PooledMCPServerStreamableHTTP
+    token = os.getenv(f"{prefix}_TOKEN")
+    headers = {"Authorization": f"Bearer {token}"} if token else None
+    return cls(url=url, headers=headers, **kwargs)
@@ -0,0 +1,124 @@
+"""
+This module contains concurrency control for calls to one MCP server.
+
+pydantic-ai starts every tool call from a model response at once. The
+``ToolCallScheduler`` wraps a server's ``process_tool_call`` to:
+
+* cap how many calls are in flight on the server's session at a time;
+* order mutating tools: a mutating call starts only after every call issued
+  before it has finished, and calls issued after it wait for it. Read-only
+  calls between two mutations still run concurrently.
+
+Calls are ordered by when they reach the scheduler, which is the order the
+model emitted them in. Each event loop gets its own cap and ordering, so
+agents running on different loops (see ``agents.common.server``) can share
+one server and its scheduler.
+
+Args:
+    inner: The processor that performs the call, or ``None`` to call directly.
+    max_concurrency: Calls allowed in flight at once.
+    mutating: Names of tools that change state.
+
+Returns:
+    ToolCallScheduler: Usable as ``process_tool_call=`` on any MCP server.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import weakref
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic_ai import RunContext
+
+from src.core.tool_timing import record_queue_wait
+
+from .hooks import ProcessToolCall
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("MCP_MAX_PARALLEL_CALLS", "4"))
+
+
+@dataclass
+class _LoopState:
+    """The cap and ordering of the calls made on one event loop."""
+
+    semaphore: asyncio.Semaphore
+    # Calls issued since the last mutation, and that mutation.
+    since_write: set[asyncio.Future] = field(default_factory=set)
+    last_write: asyncio.Future | None = None
+
+
+class ToolCallScheduler:
+    """Caps concurrent calls and orders mutating ones for one MCP server."""
+
+    def __init__(
+        self,
+        inner: ProcessToolCall | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        mutating: Iterable[str] = (),
+    ):
+        self.inner = inner
+        self.max_concurrency = max_concurrency
+        self.mutating = frozenset(mutating)
+        # Semaphores and futures belong to the loop they are used on.
+        self._loops: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoopState
+        ] = weakref.WeakKeyDictionary()
+
+    async def __call__(
+        self,
+        ctx: RunContext[Any],
+        call_tool,
+        tool_name: str,
+        arguments: dict[str, Any],
+    ) -> Any:
+        async with self.slot(tool_name):
+            if self.inner is not None:
+                return await self.inner(ctx, call_tool, tool_name, arguments)
+            return await call_tool(tool_name, arguments, None)
+
+    @asynccontextmanager
+    async def slot(
+        self, tool_name: str, mutating: bool | None = None
+    ) -> AsyncIterator[None]:
+        """Hold a call slot; also usable around native tools sharing the server."""
+        if mutating is None:
+            mutating = tool_name in self.mutating
+        state = self._state()
+        # Registration must not await so it happens in call-emission order.
+        done = asyncio.get_running_loop().create_future()
+        if mutating:
+            waits = [*state.since_write, state.last_write]
+            state.since_write = set()
+            state.last_write = done
+        else:
+            waits = [state.last_write]
+            state.since_write.add(done)
+        waits = [w for w in waits if w is not None and not w.done()]
+        start = time.perf_counter()
+        try:
+            if waits:
+                # asyncio.wait, not await: a cancelled waiter must not cancel them.
+                await asyncio.wait(waits)
+            async with state.semaphore:
+                record_queue_wait(time.perf_counter() - start)
+                yield
+        finally:
+            done.set_result(None)
+            state.since_write.discard(done)
+            if state.last_write is done:
+                state.last_write = None
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState(
+                asyncio.Semaphore(self.max_concurrency)
+            )
+        return state
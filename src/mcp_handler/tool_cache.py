@@ -0,0 +1,201 @@
+"""
+This module contains tool-list caching for MCP servers.
+
+pydantic-ai calls ``list_tools()`` on every model step and again for every
+MCP tool call, and each call is a JSON-RPC round trip to the server plus a
+conversion of every tool schema into a ``ToolDefinition``. The tool set of a
+given server package and version never changes, so ``ToolCacheMixin`` (and
+``CachedMCPServerStdio``, which uses it) keeps the converted definitions:
+
+* per server session, always — cleared whenever the server (re)connects;
+* across sessions and processes, on disk, when the package version is known
+  (pinned in the launch spec or by provisioning), keyed on package@version so
+  a version change is a cache miss. Remote servers are keyed on their URL and
+  the ``serverInfo.version`` they report when a session starts.
+
+Args:
+    None
+
+Returns:
+    CachedMCPServerStdio: A drop-in ``MCPServerStdio`` with cached tool lists.
+    ToolCacheMixin: The same caching for any other ``MCPServer`` transport.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import logfire
+from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai.tools import ToolDefinition
+
+DEFAULT_CACHE_PATH = ".cache/mcp_tools.json"
+
+
+def package_spec(args: list[str] | tuple[str, ...]) -> tuple[str | None, str | None]:
+    """``(package, version)`` from npx-style args, e.g. ``pkg@1.2.3`` or ``@scope/pkg``."""
+    for arg in args:
+        if arg.startswith("-"):
+            continue
+        at = arg.rfind("@")
+        if at > 0:
+            return arg[:at], arg[at + 1 :] or None
+        return arg, None
+    return None, None
+
+
+class ToolListCache:
+    """Persistent ``package@version`` -> tool definitions store (JSON file)."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[dict[str, Any]]] | None = None
+
+    def get(self, key: str) -> list[ToolDefinition] | None:
+        with self._lock:
+            entries = self._load()
+            raw = entries.get(key)
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return [
+            ToolDefinition(
+                name=t["name"],
+                description=t["description"],
+                parameters_json_schema=t["parameters_json_schema"],
+            )
+            for t in raw
+        ]
+
+    def set(self, key: str, tools: list[ToolDefinition]) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[key] = [
+                {
+                    "name": t.name,
+                    "description": t.description,
+                    "parameters_json_schema": t.parameters_json_schema,
+                }
+                for t in tools
+            ]
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(entries))
+            os.replace(tmp_path, self.path)
+
+    def invalidate(self, key: str | None = None) -> None:
+        with self._lock:
+            entries = self._load()
+            if key is None:
+                entries.clear()
+            else:
+                entries.pop(key, None)
+            if os.path.exists(self.path):
+                with open(self.path, "w", encoding="utf-8") as f:
+                    f.write(json.dumps(entries))
+
+    def _load(self) -> dict[str, list[dict[str, Any]]]:
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+
+tool_list_cache = ToolListCache(os.getenv("MCP_TOOL_CACHE_PATH", DEFAULT_CACHE_PATH))
+
+
+@dataclass
+class ToolCacheMixin:
+    """Serves an MCP server's ``list_tools`` from a cache (mix in before it)."""
+
+    package: str | None = None
+    """Package name; defaults to the package named in ``args``, or the URL."""
+
+    version: str | None = None
+    """Package version; defaults to the version pinned in ``args``, if any."""
+
+    cache: ToolListCache | None = None
+    """Persistent cache; defaults to the module-wide ``tool_list_cache``."""
+
+    def __post_init__(self):
+        package, pinned = package_spec(getattr(self, "args", ()))
+        self.package = (
+            self.package or package or getattr(self, "command", None) or self.url
+        )
+        self.version = self.version or pinned
+        self._pinned_version = self.version
+        self._session_tools: list[ToolDefinition] | None = None
+        self.list_calls = 0
+        self.remote_list_calls = 0
+        self.list_seconds = 0.0
+
+    @property
+    def cache_key(self) -> str | None:
+        """``package@version@prefix``, or ``None`` when the version is unknown."""
+        if not self.version:
+            return None
+        return f"{self.package}@{self.version}@{self.tool_prefix or ''}"
+
+    async def __aenter__(self):
+        if self._running_count == 0:
+            # A (re)started process may be a different build: drop session state.
+            self._session_tools = None
+        return await super().__aenter__()
+
+    async def list_tools(self) -> list[ToolDefinition]:
+        self.list_calls += 1
+        if self._session_tools is not None:
+            return self._session_tools
+        cache = self.cache or tool_list_cache
+        key = self.cache_key
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self._session_tools = cached
+                return cached
+        start = time.perf_counter()
+        tools = await super().list_tools()
+        self.list_seconds += time.perf_counter() - start
+        self.remote_list_calls += 1
+        self._session_tools = tools
+        if key is not None:
+            cache.set(key, tools)
+            logfire.debug("cached {n} tools for {key}", n=len(tools), key=key)
+        return tools
+
+    def server_reported(self, version: str | None) -> None:
+        """Key the cache on the version the server reports, unless one is pinned."""
+        if not self._pinned_version:
+            self.version = version
+
+    def invalidate_tools(self) -> None:
+        """Forget cached tools, e.g. after upgrading the server package."""
+        self._session_tools = None
+        if self.cache_key is not None:
+            (self.cache or tool_list_cache).invalidate(self.cache_key)
+
+    def tool_cache_stats(self) -> dict[str, Any]:
+        return {
+            "key": self.cache_key,
+            "list_calls": self.list_calls,
+            "remote_list_calls": self.remote_list_calls,
+            "remote_list_seconds": round(self.list_seconds, 4),
+        }
+
+
+@dataclass
+class CachedMCPServerStdio(ToolCacheMixin, MCPServerStdio):
+    """``MCPServerStdio`` whose ``list_tools`` is served from a cache."""
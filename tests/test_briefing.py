@@ -0,0 +1,74 @@
+"""Daily briefing staleness after mutations."""
+
+from __future__ import annotations
+
+import asyncio
+
+from src.agents.orchestration_agent.briefing import SECTION_PROMPTS, BriefingService
+
+URLS = {name: f"http://{name}" for name in SECTION_PROMPTS}
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self._agent_info_cache = {
+            url: {"name": f"{n} agent"} for n, url in URLS.items()
+        }
+        self.listeners = []
+        self.calls = 0
+
+    def add_mutation_listener(self, listener) -> None:
+        self.listeners.append(listener)
+
+    async def send_message(self, agent_url: str, message: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f"{agent_url} #{self.calls}"
+
+
+def test_dirty_section_is_reported_stale_until_refreshed(tmp_path):
+    client = FakeClient()
+    service = BriefingService(client, path=str(tmp_path / "briefing.json"))
+    asyncio.run(service.refresh())
+    assert "stale" not in service.get_daily_briefing()
+
+    client.listeners[0](URLS["calendar"], "Create an event at 3pm")
+    briefing = service.get_daily_briefing()
+    assert "## calendar\n(stale or missing" in briefing
+    assert "## todoist (as of" in briefing
+
+    asyncio.run(service.refresh(["calendar"]))
+    assert "stale" not in service.get_daily_briefing()
+
+
+def test_mutation_during_refresh_keeps_section_dirty(tmp_path):
+    client = FakeClient()
+    service = BriefingService(client, path=str(tmp_path / "briefing.json"))
+
+    async def run() -> None:
+        refresh = asyncio.create_task(service.refresh(["calendar"]))
+        await asyncio.sleep(0)
+        client.listeners[0](URLS["calendar"], "Delete my 3pm meeting")
+        await refresh
+
+    asyncio.run(run())
+    # The refresh started before the mutation, so its result may predate it.
+    assert "## calendar\n(stale or missing" in service.get_daily_briefing()
+
+
+def test_background_job_refreshes_mutated_section(tmp_path):
+    client = FakeClient()
+    service = BriefingService(client, path=str(tmp_path / "briefing.json"))
+
+    async def run() -> str:
+        job = asyncio.create_task(service.run_forever())
+        while service.refreshes < 1:
+            await asyncio.sleep(0.01)
+        client.listeners[0](URLS["todoist"], "Complete the report task")
+        while service.refreshes < 2:
+            await asyncio.sleep(0.01)
+        job.cancel()
+        return service.sections["todoist"]["content"]
+
+    assert asyncio.run(run()) == "http://todoist #4"
+    assert "stale" not in service.get_daily_briefing()
@@ -0,0 +1,110 @@
+"""Calendar store sync and range queries against the Calendar stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import httpx
+
+from benchmarks.calendar_standin import BASE_URL, CalendarStandIn
+from src.agents.calendar_agent.store import CalendarStore
+from src.agents.common.google_api import GoogleApiClient, GoogleAuth
+
+CALENDAR = "me@example.com"
+NOW = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+def meeting(event_id: str, start: datetime, hours: float = 1.0, **extra) -> dict:
+    return {
+        "id": event_id,
+        "status": "confirmed",
+        "summary": event_id,
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": (start + timedelta(hours=hours)).isoformat()},
+        **extra,
+    }
+
+
+def make_store(tmp_path, standin: CalendarStandIn, **kwargs):
+    events_params: list[httpx.QueryParams] = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/events"):
+            events_params.append(request.url.params)
+        return await standin.handle(request)
+
+    api = GoogleApiClient(
+        BASE_URL, GoogleAuth(access_token="test"), transport=httpx.MockTransport(handle)
+    )
+    store = CalendarStore(api, str(tmp_path / "calendar.json"), **kwargs)
+    return store, events_params
+
+
+def standin_with_events() -> CalendarStandIn:
+    standin = CalendarStandIn()
+    standin.add_calendar(CALENDAR)
+    standin.put_event(CALENDAR, meeting("recent", NOW - timedelta(days=3)))
+    standin.put_event(CALENDAR, meeting("ancient", NOW - timedelta(days=400)))
+    standin.put_event(CALENDAR, meeting("upcoming", NOW + timedelta(days=2)))
+    return standin
+
+
+def test_full_sync_is_bounded_by_history_window(tmp_path):
+    store, params = make_store(tmp_path, standin_with_events(), history_days=30)
+    asyncio.run(store.sync())
+    assert "timeMin" in params[0] and "syncToken" not in params[0]
+    assert set(store.calendars[CALENDAR].events) == {"recent", "upcoming"}
+    window_start = store.window_start()
+    assert abs(window_start - (NOW - timedelta(days=30)).timestamp()) < 3600 + 60
+
+
+def test_incremental_sync_resumes_from_token(tmp_path):
+    standin = standin_with_events()
+    store, params = make_store(tmp_path, standin)
+    asyncio.run(store.sync())
+    standin.put_event(CALENDAR, meeting("lunch", NOW + timedelta(days=1)))
+    standin.cancel_event(CALENDAR, "upcoming")
+    store.invalidate()
+
+    assert asyncio.run(store.sync())["changed"] == 2
+    assert params[-1]["syncToken"] and "timeMin" not in params[-1]
+    assert "lunch" in store.calendars[CALENDAR].events
+    assert "upcoming" not in store.calendars[CALENDAR].events
+    assert store.stats()["incremental_syncs"] == 1
+
+    # A new store picks up the persisted token instead of syncing in full.
+    reloaded, reloaded_params = make_store(tmp_path, standin)
+    asyncio.run(reloaded.sync())
+    assert "syncToken" in reloaded_params[0]
+    assert reloaded.window_start() == store.window_start()
+
+
+def test_expired_token_triggers_bounded_resync(tmp_path):
+    standin = standin_with_events()
+    store, params = make_store(tmp_path, standin, history_days=30)
+    asyncio.run(store.sync())
+    store.calendars[CALENDAR].sync_token = "expired"
+    store.invalidate()
+
+    asyncio.run(store.ensure_fresh())
+    assert params[-2]["syncToken"] == "expired"
+    assert "timeMin" in params[-1] and "syncToken" not in params[-1]
+    assert store.stats()["full_syncs"] == 2
+    assert set(store.calendars[CALENDAR].events) == {"recent", "upcoming"}
+
+
+def test_long_event_does_not_widen_range_scan(tmp_path):
+    standin = standin_with_events()
+    standin.put_event(
+        CALENDAR, meeting("sabbatical", NOW - timedelta(days=20), hours=24 * 60)
+    )
+    store, _ = make_store(tmp_path, standin)
+    asyncio.run(store.sync())
+
+    index = store.calendars[CALENDAR]
+    lo, hi = NOW + timedelta(days=2), NOW + timedelta(days=2, hours=2)
+    found = store.events_between(lo, hi)
+    assert [e.id for e in found] == ["sabbatical", "upcoming"]
+    assert index._max_duration == 3600
+    assert [e.id for e in index._long] == ["sabbatical"]
@@ -0,0 +1,141 @@
+"""Streaming command capture: truncation, timeouts, cancellation and early exit."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from core.cmd import run_command_async, stream_command
+
+
+def python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+# Prints forever, so only a kill ends it.
+ENDLESS = python(
+    "import time\nwhile True:\n    print('line', flush=True)\n    time.sleep(0.01)"
+)
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A zombie still answers signal 0 until its parent reaps it.
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().split()[2] != "Z"
+
+
+def test_keeps_head_and_tail_lines():
+    result = asyncio.run(
+        run_command_async(
+            python("for i in range(1000): print(i)"),
+            cwd=".",
+            head_lines=5,
+            tail_lines=3,
+        )
+    )
+    assert result["success"]
+    assert result["stdout_lines"] == 1000
+    assert result["truncated"]
+    assert result["stdout"].splitlines() == [
+        *map(str, range(5)),
+        "... 992 lines omitted ...",
+        "997",
+        "998",
+        "999",
+    ]
+
+
+def test_spool_keeps_full_output(tmp_path):
+    result = asyncio.run(
+        run_command_async(
+            python("for i in range(100): print(i)"),
+            cwd=str(tmp_path),
+            head_lines=1,
+            tail_lines=1,
+            spool=True,
+        )
+    )
+    try:
+        with open(result["stdout_path"]) as f:
+            assert f.read().splitlines() == list(map(str, range(100)))
+        assert "full output in" in result["stdout"]
+    finally:
+        os.unlink(result["stdout_path"])
+        os.unlink(result["stderr_path"])
+
+
+def test_on_line_sees_every_line():
+    seen = []
+    result = asyncio.run(
+        run_command_async(
+            python("import sys\nprint('out')\nprint('err', file=sys.stderr)"),
+            cwd=".",
+            on_line=lambda name, line: seen.append((name, line)),
+        )
+    )
+    assert result["success"]
+    assert sorted(seen) == [("stderr", "err"), ("stdout", "out")]
+
+
+def test_timeout_kills_the_process_group(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    # The shell's background child keeps running unless the group is killed.
+    command = ["sh", "-c", f'sleep 1000 & echo $! > "{pid_file}"; echo started; wait']
+    start = time.perf_counter()
+    result = asyncio.run(run_command_async(command, cwd=".", timeout=0.5))
+    assert time.perf_counter() - start < 5
+    assert result["timed_out"] and not result["success"]
+    assert result["stdout"] == "started"
+    assert "timed out after 0.5s" in result["stderr"]
+    assert not alive(int(pid_file.read_text()))
+
+
+def test_cancel_kills_the_command():
+    async def run() -> dict:
+        stream = stream_command(ENDLESS, cwd=".")
+
+        async def consume() -> None:
+            async with stream:
+                async for _ in stream:
+                    pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return stream.result
+
+    result = asyncio.run(run())
+    assert result["cancelled"] and not result["success"]
+    assert result["stdout_lines"] > 0
+
+
+def test_early_break_kills_the_command():
+    async def run() -> tuple[dict, int]:
+        async with stream_command(ENDLESS, cwd=".") as stream:
+            async for name, line in stream:
+                assert (name, line) == ("stdout", "line")
+                break
+        return stream.result, stream._proc.pid
+
+    start = time.perf_counter()
+    result, pid = asyncio.run(run())
+    assert time.perf_counter() - start < 5
+    assert result["cancelled"] and not result["success"]
+    assert result["returncode"] is not None and result["returncode"] < 0
+    assert not alive(pid)
+
+
+def test_missing_command():
+    result = asyncio.run(run_command_async(["no-such-command-xyz"], cwd="."))
+    assert result["returncode"] == -1 and not result["success"]
+    assert "not found" in result["stderr"]
@@ -0,0 +1,134 @@
+"""Tool-result compaction: projection, dedupe, budgets and full-result retrieval."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+
+from src.mcp_handler.compaction import CompactionPolicy, ToolResultCompactor
+
+
+def ref_of(compacted) -> str:
+    note = compacted if isinstance(compacted, str) else compacted["_compaction"]
+    return re.search(r"ref='(\w+)'", note).group(1)
+
+
+def events(n: int) -> list[dict]:
+    return [{"id": f"e{i}", "summary": f"Event {i}", "colorId": "5"} for i in range(n)]
+
+
+def test_small_results_pass_through():
+    compactor = ToolResultCompactor()
+    result = {"id": "m1", "subject": "Hi"}
+    assert compactor.compact("read", result) == result
+    assert compactor.compact("read", "short text") == "short text"
+    assert compactor.stats()["read"]["compacted_calls"] == 0
+
+
+def test_projection_keeps_and_drops_fields():
+    compactor = ToolResultCompactor(
+        policies={
+            "list": CompactionPolicy(
+                include_fields=("id", "summary", "description"),
+                exclude_fields=("etag",),
+                max_field_chars=10,
+            )
+        }
+    )
+    result = [
+        {
+            "id": "e1",
+            "summary": "Standup",
+            "colorId": "5",
+            "description": "x" * 50,
+            "etag": "dropped",
+        }
+    ]
+    compacted = compactor.compact("list", result)
+    assert compacted["result"] == [
+        {"id": "e1", "summary": "Standup", "description": "x" * 10 + "…[+40 chars]"}
+    ]
+    assert "get_full_tool_result" in compacted["_compaction"]
+
+
+def test_duplicate_records_and_paragraphs_are_dropped():
+    compactor = ToolResultCompactor()
+    records = events(3) + events(2)
+    compacted = compactor.compact("list", records)
+    assert [r["id"] for r in compacted["result"]] == ["e0", "e1", "e2"]
+
+    text = "Hello Bob,\n\nSee below.\n\nHello   Bob,\n\nThanks"
+    compacted = compactor.compact("read", text)
+    assert compacted.startswith("Hello Bob,\n\nSee below.\n\nThanks\n\n[")
+    assert "(1 items omitted)" in compacted
+
+
+def test_budget_drops_records_then_falls_back_to_text():
+    compactor = ToolResultCompactor(
+        policies={"list": CompactionPolicy(max_bytes=1_000, dedupe=False)}
+    )
+    compacted = compactor.compact("list", events(100))
+    kept = compacted["result"]
+    assert 0 < len(kept) < 100
+    assert kept == events(len(kept))
+    assert len(json.dumps(kept).encode()) <= 1_000
+    assert f"({100 - len(kept)} items omitted)" in compacted["_compaction"]
+
+    # One record bigger than the budget: cut as text.
+    giant = {"id": "m1", "body": "y" * 1_900}
+    compacted = compactor.compact("list", giant)
+    assert isinstance(compacted, str)
+    assert compacted.startswith('{"id": "m1", "body": "yyy')
+    assert "…[+" in compacted
+
+    stats = compactor.stats()["list"]
+    assert stats["calls"] == stats["compacted_calls"] == 2
+    assert stats["bytes_after"] < stats["bytes_before"]
+    assert 0 < stats["saved_ratio"] < 1
+
+
+def test_token_budget_is_the_tighter_one():
+    assert CompactionPolicy(max_bytes=1_000, max_tokens=100).byte_budget == 400
+    assert CompactionPolicy(max_bytes=300, max_tokens=100).byte_budget == 300
+
+
+def test_retrieval_tool_round_trip():
+    compactor = ToolResultCompactor(
+        policies={"list": CompactionPolicy(max_bytes=500, dedupe=False)}
+    )
+    records = events(50)
+    ref = ref_of(compactor.compact("list", records))
+    get_full_tool_result = compactor.retrieval_tool().function
+
+    assert json.loads(get_full_tool_result(ref)) == records
+    first = get_full_tool_result(ref, length=100)
+    offset = int(re.search(r"offset=(\d+)", first).group(1))
+    assert offset == 100
+    rest = get_full_tool_result(ref, offset=offset, length=10**6)
+    assert json.loads(first[:100] + rest) == records
+    assert get_full_tool_result("missing").startswith("Error: no stored tool result")
+
+
+def test_stored_results_are_bounded():
+    compactor = ToolResultCompactor(
+        default_policy=CompactionPolicy(max_bytes=50), max_stored_results=2
+    )
+    refs = [ref_of(compactor.compact("read", f"{i} " + "z" * 200)) for i in range(3)]
+    assert compactor.get_full_result(refs[0]).startswith("Error")
+    assert compactor.get_full_result(refs[2]).startswith("2 zzz")
+
+
+def test_used_as_process_tool_call():
+    compactor = ToolResultCompactor(
+        policies={"list": CompactionPolicy(include_fields=("id",))}
+    )
+    calls = []
+
+    async def call_tool(name, arguments, metadata):
+        calls.append((name, arguments))
+        return events(2)
+
+    result = asyncio.run(compactor(None, call_tool, "list", {"q": "x"}))
+    assert calls == [("list", {"q": "x"})]
+    assert result["result"] == [{"id": "e0"}, {"id": "e1"}]
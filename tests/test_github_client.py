@@ -0,0 +1,127 @@
+"""GitHub client: ETag revalidation and rate-limit handling over a mock transport."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from src.agents.obsidian_agent.github import GitHubApiError, GitHubClient
+
+API = "http://github.test"
+
+
+class Responses:
+    """Answers each request with the next queued response; records requests."""
+
+    def __init__(self, *responses: httpx.Response):
+        self.queue = list(responses)
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.queue.pop(0)
+
+
+def client(responses: Responses, **kwargs) -> GitHubClient:
+    return GitHubClient(
+        None, api_url=API, transport=httpx.MockTransport(responses), **kwargs
+    )
+
+
+def get(github: GitHubClient, times: int = 1) -> list[httpx.Response]:
+    async def run() -> list[httpx.Response]:
+        return [await github.request("GET", "/repos/o/r") for _ in range(times)]
+
+    return asyncio.run(run())
+
+
+def limited(status: int = 403, message: str = "API rate limit exceeded", **headers):
+    return httpx.Response(status, json={"message": message}, headers=headers)
+
+
+def test_not_modified_is_answered_from_the_cache():
+    responses = Responses(
+        httpx.Response(200, json={"name": "r"}, headers={"ETag": '"v1"'}),
+        httpx.Response(304, headers={"ETag": '"v1"'}),
+        httpx.Response(200, json={"name": "r2"}, headers={"ETag": '"v2"'}),
+    )
+    github = client(responses)
+    first, second, third = get(github, 3)
+    assert first.json() == second.json() == {"name": "r"}
+    assert second.status_code == 200
+    assert "if-none-match" not in responses.requests[0].headers
+    assert responses.requests[1].headers["if-none-match"] == '"v1"'
+    # A changed resource replaces the cached copy.
+    assert third.json() == {"name": "r2"}
+    assert github.not_modified == 1
+
+
+def test_retry_after_in_seconds_or_as_a_date():
+    past = formatdate(time.time() - 60, usegmt=True)
+    responses = Responses(
+        limited(429, **{"Retry-After": "0"}),
+        limited(**{"Retry-After": past, "X-RateLimit-Remaining": "0"}),
+        httpx.Response(200, json={"name": "r"}),
+    )
+    github = client(responses)
+    (response,) = get(github)
+    assert response.json() == {"name": "r"}
+    assert len(responses.requests) == 3
+
+
+def test_rate_limit_waits_are_capped_and_parsed():
+    github = client(Responses(), max_wait=30)
+    future = formatdate(time.time() + 3600, usegmt=True)
+    cases = [
+        (limited(**{"Retry-After": "5"}), 5.0),
+        (limited(**{"Retry-After": "86400"}), 30.0),
+        (limited(**{"Retry-After": future}), 30.0),
+        (limited(**{"Retry-After": "-3"}), 0.0),
+        (limited(**{"Retry-After": "soon"}), None),
+        (limited(429), None),
+        # A secondary rate limit is a 403 with the explanation in the body.
+        (limited(message="You have exceeded a secondary rate limit"), None),
+    ]
+    for response, wait in cases:
+        assert github._rate_limited_for(response, "core") == wait
+
+    github.limits["core"] = (0, time.time() + 10)
+    exhausted = limited(**{"X-RateLimit-Remaining": "0"})
+    assert 10 <= github._rate_limited_for(exhausted, "core") <= 10.5
+
+
+def test_forbidden_is_not_mistaken_for_a_rate_limit():
+    responses = Responses(
+        limited(
+            message="Resource not accessible by integration", **{"Retry-After": "0"}
+        )
+    )
+    with pytest.raises(GitHubApiError) as error:
+        get(client(responses))
+    assert error.value.status_code == 403
+    assert len(responses.requests) == 1
+
+
+def test_gives_up_when_the_wait_exceeds_max_wait():
+    responses = Responses(limited(**{"Retry-After": "3600"}))
+    github = client(responses, max_wait=1)
+    start = time.monotonic()
+    with pytest.raises(GitHubApiError):
+        get(github)
+    assert time.monotonic() - start < 1
+    assert github.throttled == 0
+
+
+def test_low_budget_spreads_requests_until_the_reset():
+    reset = str(int(time.time()) + 2)
+    headers = {"X-RateLimit-Remaining": "4", "X-RateLimit-Reset": reset}
+    responses = Responses(*(httpx.Response(200, headers=headers) for _ in range(3)))
+    github = client(responses, min_remaining=10, max_wait=0.2)
+    get(github, 3)
+    # The first response reports the low budget; the next two are spaced out.
+    assert 0 < github.throttled <= 0.4
+    assert github.stats()["rate_remaining"] == {"core": 4}
@@ -0,0 +1,154 @@
+"""Batched Gmail fetches against an httpx.MockTransport stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import re
+
+import httpx
+
+from src.agents.common.google_api import GoogleApiClient, GoogleAuth
+from src.agents.gmail_agent import batch
+from src.agents.gmail_agent.batch import GmailBatchFetcher
+
+BASE_URL = "http://standin/gmail/v1/users/me"
+BATCH_URL = "http://standin/batch/gmail/v1"
+
+
+def message(message_id: str) -> dict:
+    return {
+        "id": message_id,
+        "threadId": f"t{message_id}",
+        "labelIds": ["INBOX"],
+        "snippet": "hello",
+        "payload": {"headers": [{"name": "Subject", "value": f"About {message_id}"}]},
+    }
+
+
+class BatchStandIn:
+    """Answers batches; ``failures`` maps a message id to statuses to return first."""
+
+    def __init__(self, failures: dict[str, list[int]] | None = None):
+        self.failures = failures or {}
+        self.batches: list[list[str]] = []
+        self.batch_statuses: list[int] = []
+        self.attachment = b""
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if "/attachments/" in request.url.path:
+            data = base64.urlsafe_b64encode(self.attachment).decode().rstrip("=")
+            return httpx.Response(
+                200, json={"size": len(self.attachment), "data": data}
+            )
+        if self.batch_statuses:
+            return httpx.Response(self.batch_statuses.pop(0), text="busy")
+        items = re.findall(
+            r"Content-ID: <(item-\d+)>\r\n\r\nGET \S+/messages/([^?\s]+)",
+            request.content.decode(),
+        )
+        self.batches.append([message_id for _, message_id in items])
+        parts = []
+        for item, message_id in items:
+            statuses = self.failures.get(message_id)
+            status = statuses.pop(0) if statuses else 200
+            body = json.dumps(message(message_id) if status == 200 else {"error": {}})
+            parts.append(
+                f"--out\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{item}>\r\n\r\n"
+                f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n\r\n"
+                f"{body}\r\n"
+            )
+        return httpx.Response(
+            200,
+            content=("".join(parts) + "--out--\r\n").encode(),
+            headers={"content-type": "multipart/mixed; boundary=out"},
+        )
+
+
+def make_fetcher(standin: BatchStandIn, tmp_path=None, **kwargs) -> GmailBatchFetcher:
+    api = GoogleApiClient(
+        BASE_URL,
+        GoogleAuth(access_token="test"),
+        transport=httpx.MockTransport(standin),
+    )
+    return GmailBatchFetcher(
+        api,
+        batch_url=BATCH_URL,
+        download_dir=str(tmp_path or "."),
+        backoff_base=0.001,
+        **kwargs,
+    )
+
+
+def test_fetch_preserves_order_across_batches():
+    standin = BatchStandIn()
+    ids = [f"m{i}" for i in range(7)]
+    messages = asyncio.run(make_fetcher(standin, batch_size=3).fetch_messages(ids))
+    assert [m["id"] for m in messages] == ids
+    assert messages[4]["subject"] == "About m4"
+    assert len(standin.batches) == 3
+
+
+def test_only_failed_parts_are_resent():
+    standin = BatchStandIn({"m1": [429], "m3": [503, 500]})
+    ids = [f"m{i}" for i in range(5)]
+    messages = asyncio.run(make_fetcher(standin).fetch_messages(ids))
+    assert [m["subject"] for m in messages] == [f"About {i}" for i in ids]
+    assert standin.batches == [ids, ["m1", "m3"], ["m3"]]
+
+
+def test_permanent_errors_are_not_retried():
+    standin = BatchStandIn({"m1": [404], "m2": [429] * 5})
+    messages = asyncio.run(
+        make_fetcher(standin, max_retries=2).fetch_messages(["m0", "m1", "m2"])
+    )
+    assert messages[1] == {"id": "m1", "error": "status 404"}
+    assert messages[2] == {"id": "m2", "error": "status 429"}
+    assert standin.batches == [["m0", "m1", "m2"], ["m2"], ["m2"]]
+
+
+def test_throttled_batch_is_retried_whole():
+    standin = BatchStandIn()
+    standin.batch_statuses = [429]
+    messages = asyncio.run(make_fetcher(standin).fetch_messages(["m0", "m1"]))
+    assert [m["id"] for m in messages] == ["m0", "m1"]
+    assert "error" not in messages[0]
+
+
+def test_parts_split_across_small_chunks():
+    boundary = "b0undary"
+    payloads = [message(f"m{i}") for i in range(3)]
+    body = (
+        "".join(
+            f"--{boundary}\r\nContent-Type: application/http\r\n"
+            f"Content-ID: <response-item-{i}>\r\n\r\nHTTP/1.1 200 OK\r\n"
+            "Content-Type: application/json\r\n\r\n"
+            f"{json.dumps(p)}\r\n"
+            for i, p in enumerate(payloads)
+        )
+        + f"--{boundary}--\r\n"
+    )
+
+    async def chunks(size: int):
+        data = body.encode()
+        for i in range(0, len(data), size):
+            yield data[i : i + size]
+
+    async def parse(size: int) -> list:
+        content_type = f'multipart/mixed; boundary="{boundary}"'
+        return [p async for p in batch._iter_batch_parts(chunks(size), content_type)]
+
+    expected = [(i, (200, p)) for i, p in enumerate(payloads)]
+    for size in (1, 5, 7, 64, len(body)):
+        assert asyncio.run(parse(size)) == expected
+
+
+def test_download_attachment_streams_to_disk(tmp_path):
+    standin = BatchStandIn()
+    standin.attachment = bytes(range(256)) * 1000
+    fetcher = make_fetcher(standin, tmp_path)
+    path = asyncio.run(fetcher.download_attachment("m1", "a1", "report.pdf"))
+    with open(path, "rb") as f:
+        assert f.read() == standin.attachment
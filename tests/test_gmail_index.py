@@ -0,0 +1,121 @@
+"""Gmail index sync and lookups against an httpx.MockTransport stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from src.agents.common.google_api import GoogleApiClient, GoogleAuth
+from src.agents.gmail_agent.index import GmailIndex
+
+BASE_URL = "http://gmail.standin/gmail/v1/users/me"
+DAY = 86400
+
+
+class GmailStandIn:
+    """Messages, profile and history endpoints over a dict of messages."""
+
+    def __init__(self) -> None:
+        now_ms = int(time.time() * 1000)
+        self.messages = {
+            "m1": self.message("m1", "Alice <alice@example.com>", "Lunch", now_ms),
+            "m2": self.message("m2", "Bob <bob@example.com>", "Report", now_ms - 1000),
+        }
+        # Only a live search finds this one; it is older than the index window.
+        self.old = self.message("m0", "Carol <carol@example.com>", "Old", 0)
+        self.history_id = 100
+        self.calls: list[str] = []
+
+    @staticmethod
+    def message(id_: str, sender: str, subject: str, date_ms: int) -> dict:
+        return {
+            "id": id_,
+            "threadId": id_,
+            "historyId": "1",
+            "internalDate": str(date_ms),
+            "labelIds": ["INBOX", "UNREAD"],
+            "snippet": f"about {subject.lower()}",
+            "payload": {
+                "headers": [
+                    {"name": "From", "value": sender},
+                    {"name": "To", "value": "me@example.com"},
+                    {"name": "Subject", "value": subject},
+                ]
+            },
+        }
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/gmail/v1/users/me/")
+        self.calls.append(path)
+        if path == "profile":
+            return httpx.Response(200, json={"historyId": str(self.history_id)})
+        if path == "history":
+            return httpx.Response(200, json={"historyId": str(self.history_id)})
+        if path == "messages":
+            query = request.url.params["q"]
+            found = list(self.messages)
+            if "carol" in query:
+                found = ["m0"]
+            return httpx.Response(200, json={"messages": [{"id": i} for i in found]})
+        message_id = path.removeprefix("messages/")
+        message = self.old if message_id == "m0" else self.messages.get(message_id)
+        if message is None:
+            return httpx.Response(404, json={})
+        return httpx.Response(200, json=message)
+
+
+def make_index(tmp_path, standin: GmailStandIn) -> GmailIndex:
+    api = GoogleApiClient(
+        BASE_URL,
+        GoogleAuth(access_token="test"),
+        transport=httpx.MockTransport(standin.handle),
+    )
+    return GmailIndex(str(tmp_path / "gmail.sqlite3"), api, initial_days=30)
+
+
+def test_index_hit_needs_no_api_call(tmp_path):
+    standin = GmailStandIn()
+    index = make_index(tmp_path, standin)
+    asyncio.run(index.sync())
+    standin.calls.clear()
+
+    found = index.from_sender("alice")
+    assert [m["id"] for m in found] == ["m1"]
+    assert index.search("report")[0]["id"] == "m2"
+    assert index.covers() and standin.calls == []
+
+
+def test_miss_inside_window_is_final(tmp_path):
+    standin = GmailStandIn()
+    index = make_index(tmp_path, standin)
+    assert not index.covers()  # never synced: a miss says nothing yet
+    asyncio.run(index.sync())
+
+    assert index.from_sender("nobody") == []
+    assert index.covers(time.time() - 7 * DAY)
+    # Older than the 30 days the first sync mirrored: worth a live search.
+    assert not index.covers(time.time() - 365 * DAY)
+
+
+def test_live_search_adds_hits_to_index(tmp_path):
+    standin = GmailStandIn()
+    index = make_index(tmp_path, standin)
+    asyncio.run(index.sync())
+
+    found = asyncio.run(index.live_search("from:carol", limit=5))
+    assert [m["id"] for m in found] == ["m0"]
+    assert index.from_sender("carol")[0]["subject"] == "Old"
+    assert index.stats()["live_fallbacks"] == 1
+
+
+def test_stale_index_does_not_cover(tmp_path):
+    standin = GmailStandIn()
+    index = make_index(tmp_path, standin)
+    asyncio.run(index.sync())
+    index.max_age = 0.0
+    time.sleep(0.01)
+    assert not index.covers()
+    asyncio.run(index.ensure_fresh())
+    assert standin.calls[-1] == "history"
@@ -0,0 +1,55 @@
+"""Incremental linting against the content-hash lint cache."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from core.linters.cache import LintCache
+from core.linters.pylint import run_pylint
+
+MODULE = "import os\n\n\ndef f(x):\n    y = 1\n    return x\n"
+
+
+def test_import_does_not_create_the_cache(tmp_path):
+    src = os.path.join(os.path.dirname(__file__), os.pardir, "src")
+    subprocess.run(
+        [sys.executable, "-c", "import core.linters.base"],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": os.path.abspath(src)},
+        check=True,
+    )
+    assert not (tmp_path / ".cache").exists()
+
+
+@pytest.mark.skipif(shutil.which("pylint") is None, reason="pylint not installed")
+def test_cached_findings_carry_the_current_path(tmp_path):
+    repo = tmp_path / "repo"
+    for package in ("a", "b"):
+        (repo / package).mkdir(parents=True)
+        (repo / package / "__init__.py").write_text("")
+    (repo / "a" / "mod.py").write_text(MODULE)
+    cache = LintCache(str(tmp_path / "lint.sqlite3"))
+
+    first = run_pylint(str(repo), cache=cache)
+    assert first["linted"] == 3
+    # Same content elsewhere: served from the cache.
+    (repo / "b" / "mod.py").write_text(MODULE)
+    second = run_pylint(str(repo), cache=cache)
+    assert second["linted"] == 0 and second["cached"] == 4
+
+    by_path: dict[str, list[dict]] = {}
+    for finding in second["findings"]:
+        assert "module" not in finding
+        by_path.setdefault(finding["path"], []).append(finding)
+    assert by_path["b/mod.py"] == [
+        {**finding, "path": "b/mod.py"} for finding in by_path["a/mod.py"]
+    ]
+    assert {f["symbol"] for f in by_path["b/mod.py"]} >= {
+        "unused-import",
+        "unused-variable",
+    }
@@ -0,0 +1,150 @@
+"""Completion client against an OpenAI-compatible stand-in (httpx.MockTransport)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.core import llms
+from src.core.llm_cache import ResponseCache
+from src.core.rate_limit import ModelLimits, RateLimiter
+
+
+def chat_response(content: str) -> dict:
+    return {
+        "id": "c1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "m",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+    }
+
+
+class StandIn:
+    """Answers with the last user message upper-cased; fails on demand."""
+
+    def __init__(self, failures: list[httpx.Response] | None = None):
+        self.failures = list(failures or [])
+        self.requests = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.failures:
+            return self.failures.pop(0)
+        body = json.loads(request.content)
+        return httpx.Response(
+            200, json=chat_response(body["messages"][-1]["content"].upper())
+        )
+
+
+def client_for(standin: StandIn, **kwargs) -> llms.LLMClient:
+    return llms.LLMClient(
+        base_url="http://standin/v1",
+        api_key="test",
+        transport=httpx.MockTransport(standin),
+        backoff_base=0.001,
+        rate_limiter=None,
+        **kwargs,
+    )
+
+
+def test_complete_retries_429_and_5xx():
+    standin = StandIn(
+        [
+            httpx.Response(429, headers={"retry-after": "0"}, json={}),
+            httpx.Response(503, json={}),
+        ]
+    )
+    result = asyncio.run(client_for(standin).complete("m", "hello"))
+    assert result == "HELLO"
+    assert standin.requests == 3
+
+
+def test_complete_gives_up_after_max_retries():
+    standin = StandIn([httpx.Response(500, json={})] * 3)
+    with pytest.raises(RuntimeError, match="Failed to generate completion"):
+        asyncio.run(client_for(standin, max_retries=2).complete("m", "hello"))
+    assert standin.requests == 3
+
+
+def test_client_error_is_not_retried():
+    standin = StandIn([httpx.Response(400, json={})])
+    with pytest.raises(RuntimeError):
+        asyncio.run(client_for(standin).complete("m", "hello"))
+    assert standin.requests == 1
+
+
+def test_cache_serves_repeated_requests(tmp_path):
+    standin = StandIn()
+    client = client_for(standin, cache=ResponseCache(str(tmp_path / "llm")))
+
+    async def run() -> list[str]:
+        return [await client.complete("m", "hello") for _ in range(3)]
+
+    assert asyncio.run(run()) == ["HELLO"] * 3
+    assert standin.requests == 1
+
+
+def test_complete_many_bounds_concurrency():
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        body = json.loads(request.content)
+        return httpx.Response(200, json=chat_response(body["messages"][-1]["content"]))
+
+    client = llms.LLMClient(
+        base_url="http://standin/v1",
+        api_key="test",
+        transport=httpx.MockTransport(handler),
+        rate_limiter=None,
+    )
+    requests = [llms.CompletionRequest("m", f"q{i}") for i in range(12)]
+    results = asyncio.run(client.complete_many(requests, max_concurrency=3))
+    assert results == [f"q{i}" for i in range(12)]
+    assert peak == 3
+
+
+def test_retry_after_is_clamped():
+    class Error(Exception):
+        response = httpx.Response(429, headers={"retry-after": "86400"})
+
+    assert llms._retry_after(Error()) == llms.MAX_RETRY_AFTER
+
+
+def test_provider_429_pauses_shared_limiter():
+    limiter = RateLimiter(default_limits=ModelLimits(requests_per_minute=6000))
+    standin = StandIn([httpx.Response(429, headers={"retry-after": "0.2"}, json={})])
+    client = llms.LLMClient(
+        base_url="http://standin/v1",
+        api_key="test",
+        transport=httpx.MockTransport(standin),
+        rate_limiter=limiter,
+    )
+    assert asyncio.run(client.complete("m", "hi")) == "HI"
+    assert limiter.stats()["m"]["provider_throttles"] == 1
+
+
+def test_sync_completion_works_inside_running_loop(monkeypatch):
+    monkeypatch.setattr(llms, "client", client_for(StandIn()))
+
+    async def caller() -> str:
+        # A sync helper called from async code, e.g. a notebook cell.
+        return llms.completion("m", "from a loop")
+
+    assert asyncio.run(caller()) == "FROM A LOOP"
+    assert llms.completion("m", "no loop") == "NO LOOP"
@@ -0,0 +1,135 @@
+"""Shared MCP servers: the HTTP gateway and pooled clients talking to it."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import sys
+from importlib.metadata import version
+
+import httpx
+import pytest
+import uvicorn
+
+from src.mcp_handler.gateway import MCPGateway
+from src.mcp_handler.remote import (
+    HTTPClientPool,
+    PooledMCPServerSSE,
+    PooledMCPServerStreamableHTTP,
+)
+from src.mcp_handler.tool_cache import ToolListCache
+
+REPO = os.path.join(os.path.dirname(__file__), os.pardir)
+TOKEN = "gateway-test-token"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def with_gateway(check) -> MCPGateway:
+    """Serve a stand-in stdio server through a gateway while ``check(url)`` runs."""
+    gateway = MCPGateway(
+        sys.executable,
+        ["-m", "benchmarks.mcp_standin", "3", "0"],
+        env=dict(os.environ),
+        cwd=os.path.abspath(REPO),
+        token=TOKEN,
+    )
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            gateway.app(), port=port, log_level="error", loop="asyncio", lifespan="on"
+        )
+    )
+    serving = asyncio.create_task(server.serve())
+    try:
+        for _ in range(400):
+            if server.started:
+                break
+            await asyncio.sleep(0.05)
+        assert server.started, "gateway did not start"
+        await check(f"http://127.0.0.1:{port}")
+    finally:
+        server.should_exit = True
+        await serving
+    return gateway
+
+
+@pytest.mark.parametrize(
+    "cls, path", [(PooledMCPServerStreamableHTTP, "/mcp"), (PooledMCPServerSSE, "/sse")]
+)
+def test_round_trip_through_the_gateway(tmp_path, cls, path):
+    pool = HTTPClientPool()
+    cache = ToolListCache(str(tmp_path / "tools.json"))
+
+    async def check(base: str) -> None:
+        client = cls(
+            url=base + path,
+            headers={"Authorization": f"Bearer {TOKEN}"},
+            pool=pool,
+            cache=cache,
+        )
+        for _ in range(2):
+            async with client:
+                tools = await client.list_tools()
+                result = await client.call_tool("tool_1", {"query": "q"})
+            assert [t.name for t in tools] == ["tool_0", "tool_1", "tool_2"]
+            assert result == {"tool": 1, "query": "q", "max_results": 10}
+        # Keyed on the version the upstream server reported through the gateway;
+        # the second session's tools came from the disk cache.
+        assert client.cache_key == f"{base}{path}@{version('mcp')}@"
+        assert client.remote_list_calls == 1
+        # Both sessions were lent the same keep-alive client.
+        assert len(pool._clients) == 1
+        (lent,) = pool._clients.values()
+        assert lent.headers["authorization"] == f"Bearer {TOKEN}"
+        await pool.aclose()
+
+    gateway = asyncio.run(with_gateway(check))
+    assert gateway.calls == 2
+
+
+def test_gateway_rejects_a_missing_token():
+    async def check(base: str) -> None:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(base + "/mcp/", json={})
+        assert response.status_code == 401
+
+    asyncio.run(with_gateway(check))
+
+
+def test_lent_client_uses_the_transport_settings():
+    pool = HTTPClientPool(timeout=30, read_timeout=300)
+    lend = pool.factory("http://mcp-host:9101/mcp", {"Authorization": "Bearer t"})
+    auth = httpx.BasicAuth("user", "pass")
+
+    async def lent(**kwargs) -> httpx.AsyncClient:
+        async with lend(**kwargs) as client:
+            return client
+
+    async def run() -> None:
+        plain = await lent()
+        assert plain.timeout == httpx.Timeout(30, read=300)
+        assert plain.headers["authorization"] == "Bearer t"
+
+        sse = await lent(
+            headers={"mcp-session-id": "s1"},
+            timeout=httpx.Timeout(5, read=60),
+            auth=auth,
+        )
+        assert sse is not plain
+        assert sse.timeout == httpx.Timeout(5, read=60)
+        assert sse.headers["mcp-session-id"] == "s1"
+        assert sse.headers["authorization"] == "Bearer t"
+        assert sse.auth is auth
+        # Lending never closes; equal settings get the same client back.
+        assert not sse.is_closed
+        assert await lent() is plain
+        await pool.aclose()
+        assert plain.is_closed and sse.is_closed
+
+    asyncio.run(run())
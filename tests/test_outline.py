@@ -0,0 +1,118 @@
+"""Note outlines: heading parsing, section ranges and section lookup."""
+
+from __future__ import annotations
+
+from src.agents.obsidian_agent.outline import (
+    NoteOutlines,
+    find_section,
+    parse_outline,
+    snap_range,
+)
+
+NOTE = b"""\
+---
+title: Weekly
+# not a heading: frontmatter
+---
+# Weekly ##
+Intro.
+## 2024-05-02
+### Actions
+- ship it
+```python
+# not a heading: code
+```
+## 2024-05-09
+### Actions #
+~~~~
+## still code
+```
+~~~~~
+### C# notes
+#not-a-heading
+####### too deep
+   ## Indented
+#
+"""
+
+
+def titles(data: bytes) -> list[tuple[int, str]]:
+    return [(h.level, h.title) for h in parse_outline(data)]
+
+
+def section(data: bytes, heading: str) -> str | None:
+    found = find_section(parse_outline(data), heading)
+    return None if found is None else data[found.start : found.end].decode()
+
+
+def test_headings_skip_frontmatter_and_code():
+    assert titles(NOTE) == [
+        (1, "Weekly"),
+        (2, "2024-05-02"),
+        (3, "Actions"),
+        (2, "2024-05-09"),
+        (3, "Actions"),
+        (3, "C# notes"),
+        (2, "Indented"),
+        (1, ""),
+    ]
+
+
+def test_unclosed_frontmatter_is_not_skipped():
+    assert titles(b"---\n# Title\n") == [(1, "Title")]
+
+
+def test_sections_include_subsections_and_byte_offsets():
+    data = "# Ünïcode\nä\n## Sub\nx\n# Next\n".encode()
+    first, sub, last = parse_outline(data)
+    assert (first.start, first.end) == (0, data.index(b"# Next"))
+    assert (sub.start, sub.end) == (data.index(b"## Sub"), data.index(b"# Next"))
+    assert (last.start, last.end) == (data.index(b"# Next"), len(data))
+
+
+def test_find_section_by_title_or_path():
+    assert section(NOTE, "2024-05-02") == (
+        "## 2024-05-02\n### Actions\n- ship it\n```python\n# not a heading: code\n```\n"
+    )
+    # A repeated title needs its parent; the first one wins otherwise.
+    assert section(NOTE, "2024-05-09 > actions").startswith("### Actions #\n~~~~")
+    assert section(NOTE, "Actions") == "### Actions\n- ship it\n" + (
+        "```python\n# not a heading: code\n```\n"
+    )
+    assert section(NOTE, "Weekly > 2024-05-09 > Actions") == section(
+        NOTE, "2024-05-09 > Actions"
+    )
+    assert section(NOTE, "### 2024-05-09 > ### Actions") == section(
+        NOTE, "2024-05-09 > Actions"
+    )
+    assert section(NOTE, "Nope > Actions") is None
+    assert find_section(parse_outline(NOTE), " > ") is None
+
+
+def test_hash_inside_a_title_is_not_a_separator():
+    assert section(NOTE, "C# notes").startswith("### C# notes\n")
+    assert section(NOTE, "## c# NOTES").startswith("### C# notes\n")
+    data = b"# Plan\n## #1 priorities\nfocus\n## Later\n"
+    assert section(data, "#1 priorities") == "## #1 priorities\nfocus\n"
+    # Without an exact title, the first one containing the text.
+    assert section(data, "priorit") == "## #1 priorities\nfocus\n"
+
+
+def test_snap_range_avoids_splitting_characters():
+    data = "aé€b".encode()  # a, é (2 bytes), € (3 bytes), b
+    assert snap_range(data, 2, 4) == (3, 6)
+    assert snap_range(data, -5, 100) == (0, len(data))
+    assert snap_range(data, 5, 2) == (6, 6)
+
+
+def test_outlines_are_cached_by_sha():
+    outlines = NoteOutlines(max_entries=2)
+    assert outlines.get("a") is None
+    first = outlines.compute("a", NOTE)
+    assert outlines.get("a") is first
+    outlines.compute("b", b"# B\n")
+    outlines.get("a")
+    outlines.compute("c", b"# C\n")
+    # "b" was least recently used.
+    assert outlines.get("b") is None
+    assert outlines.stats() == {"outlines": 2, "hits": 2, "misses": 3}
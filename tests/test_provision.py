@@ -0,0 +1,99 @@
+"""Provisioned MCP server installs, using the Node stand-in package."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from src.mcp_handler.provision import MCPServerCache, ProvisionError, mcp_server
+
+PACKAGE = "mcp-node-standin"
+STANDIN_DIR = os.path.join(
+    os.path.dirname(__file__), os.pardir, "benchmarks", "node_mcp_standin"
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("npm") is None, reason="needs npm")
+
+
+@pytest.fixture
+def provisioned(tmp_path):
+    subprocess.run(
+        ["npm", "pack", "--pack-destination", str(tmp_path), STANDIN_DIR],
+        check=True,
+        capture_output=True,
+    )
+    tarball = str(tmp_path / f"{PACKAGE}-1.0.0.tgz")
+    cache = MCPServerCache(str(tmp_path / "servers"), str(tmp_path / "lock.json"))
+    return cache, cache.provision(PACKAGE, source=tarball), tarball
+
+
+def test_provision_pins_and_launches_with_node(provisioned):
+    cache, installed, tarball = provisioned
+    pin = cache.pins()[PACKAGE]
+    assert pin == {"version": "1.0.0", "integrity": installed.integrity}
+    assert cache.provision(PACKAGE, source=tarball) == installed
+
+    server = mcp_server(PACKAGE, cache=cache)
+    assert (server.command, server.args) == ("node", [installed.bin_path])
+
+
+def test_install_is_verified_again_before_each_start(provisioned):
+    cache, installed, _ = provisioned
+    server = mcp_server(PACKAGE, cache=cache)
+    with open(installed.bin_path, "a", encoding="utf-8") as f:
+        f.write("\n// tampered\n")
+
+    # Built while the install verified; the next start re-checks it.
+    assert server.launcher == "node"
+    server.refresh_launch()
+    assert server.launcher == "npx"
+    assert server.args == ["--yes", f"{PACKAGE}@1.0.0"]
+
+
+def test_integrity_mismatch_with_pin_is_refused(provisioned):
+    cache, _, tarball = provisioned
+    pins = cache.pins()
+    pins[PACKAGE]["integrity"] = "sha512-not-the-real-one"
+    with open(cache.lock_path, "w", encoding="utf-8") as f:
+        json.dump(pins, f)
+
+    assert cache.resolve(PACKAGE) is None
+    with pytest.raises(ProvisionError, match="does not match the pinned"):
+        cache.provision(PACKAGE, source=tarball)
+
+
+def test_provision_missing_skips_pinned_packages(provisioned):
+    cache, _, _ = provisioned
+    pins = cache.pins()
+    assert cache.unpinned((PACKAGE, "mcp-unknown")) == ["mcp-unknown"]
+    # The unknown package fails to install; it is logged, not raised.
+    cache.npm = "false"
+    assert cache.provision_missing((PACKAGE, "mcp-unknown")) == []
+    assert cache.pins() == pins
+
+
+def test_check_fails_while_a_server_is_unpinned(provisioned):
+    cache, _, _ = provisioned
+
+    def check(*packages: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-m", "src.mcp_handler.provision", "--check", *packages],
+            cwd=os.path.join(os.path.dirname(__file__), os.pardir),
+            env={
+                **os.environ,
+                "MCP_SERVERS_LOCK": cache.lock_path,
+                "LOGFIRE_IGNORE_NO_CONFIG": "1",
+            },
+            capture_output=True,
+            text=True,
+        )
+
+    assert check(PACKAGE).returncode == 0
+    unpinned = check(PACKAGE, "mcp-unknown")
+    assert unpinned.returncode == 1
+    assert unpinned.stderr.strip() == f"mcp-unknown: not pinned in {cache.lock_path}"
@@ -0,0 +1,52 @@
+"""Priority ordering of the shared LLM rate limiter."""
+
+from __future__ import annotations
+
+import asyncio
+
+from pydantic_ai.models.test import TestModel
+
+from src.agents.common.model import RateLimitedModel
+from src.core.rate_limit import ModelLimits, Priority, RateLimiter, priority
+
+
+def test_interactive_goes_ahead_of_queued_background():
+    limiter = RateLimiter(default_limits=ModelLimits(requests_per_minute=6000))
+    order: list[str] = []
+
+    async def call(name: str, level: Priority | None = None) -> None:
+        await limiter.acquire("m", level=level)
+        order.append(name)
+
+    async def interactive() -> None:
+        # Set the way the orchestrator does it: through the context variable.
+        with priority(Priority.INTERACTIVE):
+            await call("interactive")
+
+    async def run() -> None:
+        # A provider 429 holds every caller until the pause ends.
+        limiter.report_throttled("m", 0.2)
+        background = [
+            asyncio.create_task(call(f"background-{i}", Priority.BACKGROUND))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        await asyncio.gather(interactive(), *background)
+
+    asyncio.run(run())
+    assert order[0] == "interactive"
+    assert order[1:] == ["background-0", "background-1", "background-2"]
+    assert "interactive" in limiter.stats()["m"]["wait_seconds_by_priority"]
+
+
+def test_unset_priority_defaults():
+    limiter = RateLimiter()
+    asyncio.run(limiter.acquire("m"))
+    assert set(limiter.stats()["m"]["wait_seconds_by_priority"]) == {"default"}
+
+
+def test_model_uses_callers_interactive_priority():
+    model = RateLimitedModel(TestModel(), priority=Priority.BACKGROUND)
+    assert model._level() is Priority.BACKGROUND
+    with priority(Priority.INTERACTIVE):
+        assert model._level() is Priority.INTERACTIVE
@@ -0,0 +1,107 @@
+"""Tool call scheduling: concurrency cap, mutation ordering and per-loop state."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from src.mcp_handler.scheduling import ToolCallScheduler
+
+
+class Server:
+    """Records when each call ran and how many were in flight at once."""
+
+    def __init__(self, seconds: float = 0.05):
+        self.seconds = seconds
+        self.spans: dict[str, tuple[float, float]] = {}
+        self.in_flight = 0
+        self.peak = 0
+
+    async def call_tool(self, name, arguments, metadata):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.seconds)
+        self.in_flight -= 1
+        self.spans[name] = (start, loop.time())
+        return name
+
+
+async def issue(scheduler: ToolCallScheduler, server: Server, names: list[str]):
+    """Start the calls in order, as pydantic-ai does for one model response."""
+    return await asyncio.gather(
+        *(scheduler(None, server.call_tool, name, {}) for name in names)
+    )
+
+
+def test_reads_run_concurrently_up_to_the_cap():
+    scheduler = ToolCallScheduler(max_concurrency=3)
+    server = Server()
+    names = [f"read_{i}" for i in range(7)]
+    assert asyncio.run(issue(scheduler, server, names)) == names
+    assert server.peak == 3
+
+
+def test_mutations_wait_for_earlier_calls_and_hold_later_ones():
+    scheduler = ToolCallScheduler(max_concurrency=4, mutating=("write_a", "write_b"))
+    server = Server()
+    names = ["read_0", "read_1", "write_a", "read_2", "read_3", "write_b", "read_4"]
+    asyncio.run(issue(scheduler, server, names))
+    spans = server.spans
+
+    def before(first: str, then: str) -> bool:
+        return spans[first][1] <= spans[then][0]
+
+    def overlap(a: str, b: str) -> bool:
+        return spans[a][0] < spans[b][1] and spans[b][0] < spans[a][1]
+
+    for i, name in enumerate(names):
+        if name.startswith("write"):
+            assert all(before(earlier, name) for earlier in names[:i])
+            assert all(before(name, later) for later in names[i + 1 :])
+    # Reads between two mutations still run together.
+    assert overlap("read_0", "read_1")
+    assert overlap("read_2", "read_3")
+
+
+def test_cancelled_call_releases_the_calls_behind_it():
+    scheduler = ToolCallScheduler(mutating=("write",))
+    server = Server(seconds=0.2)
+
+    async def run() -> list:
+        first = asyncio.create_task(scheduler(None, server.call_tool, "write", {}))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(scheduler(None, server.call_tool, "read", {}))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(run())
+    assert isinstance(first, asyncio.CancelledError)
+    assert second == "read"
+
+
+def test_one_scheduler_serves_several_event_loops():
+    # Each agent server runs its own loop; they share the MCP server's scheduler.
+    scheduler = ToolCallScheduler(max_concurrency=1, mutating=("write",))
+    results: dict[int, object] = {}
+    servers = {i: Server(seconds=0.02) for i in range(3)}
+
+    def agent(i: int) -> None:
+        names = ["read_0", "write", "read_1", "read_2"]
+        try:
+            results[i] = asyncio.run(issue(scheduler, servers[i], names))
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=agent, args=(i,), daemon=True) for i in servers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+        assert not thread.is_alive(), "a loop is stuck on another loop's future"
+    for i, server in servers.items():
+        assert results[i] == ["read_0", "write", "read_1", "read_2"]
+        # The cap applies per loop.
+        assert server.peak == 1
@@ -0,0 +1,126 @@
+"""Free-slot finding: busy merging, working-hours sweeps, all-day events and DST."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import time as dt_time
+from zoneinfo import ZoneInfo
+
+from src.agents.calendar_agent.slots import (
+    WorkingHours,
+    find_slots,
+    free_gaps,
+    merge_busy,
+)
+from src.agents.calendar_agent.store import event_from_api
+
+BERLIN = ZoneInfo("Europe/Berlin")
+EVERY_DAY = WorkingHours(weekdays=frozenset(range(7)))
+HOUR = 3600
+
+
+def at(day: str, clock: str = "00:00", tz: ZoneInfo = BERLIN) -> float:
+    return datetime.fromisoformat(f"{day}T{clock}").replace(tzinfo=tz).timestamp()
+
+
+def local(moment: float, tz: ZoneInfo = BERLIN) -> str:
+    return datetime.fromtimestamp(moment, tz).strftime("%Y-%m-%d %H:%M")
+
+
+def test_merge_busy_joins_overlapping_and_touching_intervals():
+    assert merge_busy([(0, 10), (20, 30)], [(5, 15), (30, 40)], [(50, 60)]) == [
+        (0, 15),
+        (20, 40),
+        (50, 60),
+    ]
+    # Contained intervals don't shrink the outer one; empty ones are dropped.
+    assert merge_busy([(0, 100), (10, 20), (70, 70), (90, 80)]) == [(0, 100)]
+    assert merge_busy() == []
+
+
+def test_free_gaps_at_window_edges():
+    windows = [(100, 200), (300, 400)]
+    busy = merge_busy(
+        [
+            (50, 100),  # ends exactly at the first window's start
+            (150, 160),
+            (190, 310),  # spans the night into the next window
+            (400, 450),  # starts exactly at the second window's end
+        ]
+    )
+    assert free_gaps(busy, windows, 10) == [(100, 150), (160, 190), (310, 400)]
+    # Gaps shorter than the minimum are skipped, equal ones kept.
+    assert free_gaps(busy, windows, 50) == [(100, 150), (310, 400)]
+    assert free_gaps(busy, windows, 51) == [(310, 400)]
+    assert free_gaps([(0, 1_000)], windows, 1) == []
+    assert free_gaps([], windows, 100) == windows
+
+
+def test_working_hours_skip_weekends_and_clip_the_range():
+    # Friday noon to Monday 10:00.
+    start, end = at("2026-06-05", "12:00"), at("2026-06-08", "10:00")
+    windows = WorkingHours().windows(start, end, BERLIN)
+    assert [(local(a), local(b)) for a, b in windows] == [
+        ("2026-06-05 12:00", "2026-06-05 17:00"),
+        ("2026-06-08 09:00", "2026-06-08 10:00"),
+    ]
+
+
+def test_all_day_event_blocks_the_whole_local_day():
+    holiday = event_from_api(
+        {
+            "id": "holiday",
+            "summary": "Holiday",
+            "start": {"date": "2026-06-09"},
+            "end": {"date": "2026-06-10"},
+        },
+        "me@example.com",
+        BERLIN,
+    )
+    assert holiday.all_day
+    slots = find_slots(
+        [[(holiday.start, holiday.end)]],
+        at("2026-06-08"),
+        at("2026-06-11"),
+        HOUR,
+        BERLIN,
+        WorkingHours(),
+    )
+    assert [(local(a), local(b)) for a, b in slots] == [
+        ("2026-06-08 09:00", "2026-06-08 17:00"),
+        ("2026-06-10 09:00", "2026-06-10 17:00"),
+    ]
+
+
+def test_dst_change_keeps_working_hours_in_local_time():
+    # Clocks go forward at 02:00 on 29 March 2026 in Berlin: the day has 23 hours.
+    start, end = at("2026-03-28"), at("2026-03-30")
+    assert end - start == 47 * HOUR
+    windows = EVERY_DAY.windows(start, end, BERLIN)
+    assert [(local(a), local(b)) for a, b in windows] == [
+        ("2026-03-28 09:00", "2026-03-28 17:00"),
+        ("2026-03-29 09:00", "2026-03-29 17:00"),
+    ]
+    # 09:00 is 08:00 UTC before the change and 07:00 UTC after it.
+    utc = ZoneInfo("UTC")
+    assert [local(a, utc)[-5:] for a, _ in windows] == ["08:00", "07:00"]
+
+    # Slot starts round to the quarter hour on the local clock.
+    busy = [(at("2026-03-29", "09:00"), at("2026-03-29", "10:07"))]
+    slots = find_slots([busy], start, end, HOUR, BERLIN, EVERY_DAY, limit=2)
+    assert [local(a) for a, _ in slots] == ["2026-03-28 09:00", "2026-03-29 10:15"]
+
+
+def test_attendee_in_another_zone():
+    # A New York attendee busy 06:00-10:00 their time is 12:00-16:00 in Berlin.
+    new_york = ZoneInfo("America/New_York")
+    theirs = [
+        (at("2026-06-08", "06:00", new_york), at("2026-06-08", "10:00", new_york))
+    ]
+    hours = WorkingHours(dt_time(9), dt_time(17))
+    slots = find_slots(
+        [[], theirs], at("2026-06-08"), at("2026-06-09"), 2 * HOUR, BERLIN, hours
+    )
+    assert [(local(a), local(b)) for a, b in slots] == [
+        ("2026-06-08 09:00", "2026-06-08 12:00")
+    ]
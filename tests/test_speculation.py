@@ -0,0 +1,91 @@
+"""Speculative sub-agent calls are only handed to the request they answer."""
+
+from __future__ import annotations
+
+import asyncio
+
+from src.agents.common.speculation import (
+    FORWARD_QUERY_INSTRUCTION,
+    READ_ONLY_PREFIX,
+    Speculator,
+)
+from src.agents.orchestration_agent.agent import personal_assistant_system_prompt
+
+CALENDAR = "http://calendar"
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self._agent_info_cache = {CALENDAR: {"name": "Calendar Agent"}}
+        self.sent: list[str] = []
+
+    async def send_message(self, agent_url: str, message: str) -> str:
+        self.sent.append(message)
+        await asyncio.sleep(0.05)
+        return f"answer to {message.removeprefix(READ_ONLY_PREFIX)}"
+
+
+def run_session(query: str, message: str) -> tuple[asyncio.Task | None, Speculator]:
+    speculator = Speculator(FakeClient())
+
+    async def run() -> asyncio.Task | None:
+        async with speculator.session(query) as session:
+            task = session.take(CALENDAR, message)
+            if task is not None:
+                await task
+            return task
+
+    return asyncio.run(run()), speculator
+
+
+def test_equivalent_message_is_served_from_speculation():
+    task, speculator = run_session(
+        "What meetings do I have today?", "what meetings do I have today"
+    )
+    assert task is not None and task.result().startswith("answer to What meetings")
+    stats = speculator.stats()
+    assert stats["hits"] == 1 and stats["wasted_calls"] == 0
+
+
+def test_different_message_cancels_speculation():
+    speculator = Speculator(FakeClient())
+
+    async def run() -> tuple:
+        async with speculator.session("What meetings do I have today?") as session:
+            speculation = session.speculations[CALENDAR]
+            first = session.take(CALENDAR, "Am I free on Friday afternoon?")
+            # The orchestrator moved on; a later matching ask is not served either.
+            second = session.take(CALENDAR, "What meetings do I have today?")
+            await asyncio.sleep(0)
+            return first, second, speculation.task.cancelled()
+
+    first, second, cancelled = asyncio.run(run())
+    assert first is None and second is None and cancelled
+    stats = speculator.stats()
+    assert stats["hits"] == 0 and stats["wasted_calls"] == 1
+
+
+def test_mutating_message_is_not_served():
+    task, speculator = run_session(
+        "What meetings do I have today?", "Cancel my meetings today"
+    )
+    assert task is None
+    assert speculator.stats()["wasted_calls"] == 1
+
+
+def test_rephrased_message_is_wasted():
+    # What the orchestrator sends when it rewrites the request for the agent.
+    task, speculator = run_session(
+        "What meetings do I have today?", "List all calendar events for today."
+    )
+    assert task is None
+    stats = speculator.stats()
+    assert stats["hits"] == 0 and stats["hit_rate"] == 0.0
+    assert stats["wasted_calls"] == 1
+
+
+def test_prompt_asks_to_forward_the_request_when_speculating():
+    assert FORWARD_QUERY_INSTRUCTION not in personal_assistant_system_prompt()
+    assert FORWARD_QUERY_INSTRUCTION in personal_assistant_system_prompt(
+        speculation=True
+    )
@@ -0,0 +1,78 @@
+"""Batched Todoist commands with temp ids against the Sync stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from benchmarks.todoist_standin import SYNC_URL, TodoistStandIn
+from src.agents.todoist_agent.mirror import TodoistMirror
+from src.agents.todoist_agent.models import TaskOperation
+
+
+def synced_mirror(tmp_path) -> tuple[TodoistMirror, TodoistStandIn]:
+    standin = TodoistStandIn()
+    standin.populate(20)
+    mirror = TodoistMirror(
+        "test", SYNC_URL, str(tmp_path / "todoist.json"), transport=standin.transport()
+    )
+    asyncio.run(mirror.sync())
+    return mirror, standin
+
+
+def test_later_operations_resolve_an_earlier_ref(tmp_path):
+    mirror, standin = synced_mirror(tmp_path)
+    operations = [
+        TaskOperation(action="add", ref="trip", content="Plan Lisbon trip"),
+        TaskOperation(action="add", content="Book hotel", parent_id="trip"),
+        TaskOperation(action="update", task_id="trip", priority=4),
+    ]
+    commands = [op.to_command() for op in operations]
+    assert commands[0]["temp_id"] == "trip"
+
+    outcome = asyncio.run(mirror.commit(commands))
+    assert set(outcome["sync_status"].values()) == {"ok"}
+    real_id = outcome["temp_id_mapping"]["trip"]
+    assert real_id in standin.items and real_id != "trip"
+
+    # The same request read the changes back into the mirror.
+    hotel = mirror.find("book hotel")[0]
+    assert mirror.tasks[hotel["id"]]["parent_id"] == real_id
+    assert mirror.tasks[real_id]["priority"] == 4
+    assert standin.requests == 2
+
+
+def test_add_without_ref_gets_a_unique_temp_id(tmp_path):
+    mirror, _ = synced_mirror(tmp_path)
+    commands = [
+        TaskOperation(action="add", content=f"Task {i}").to_command() for i in range(3)
+    ]
+    temp_ids = {c["temp_id"] for c in commands}
+    assert len(temp_ids) == 3
+
+    outcome = asyncio.run(mirror.commit(commands))
+    assert set(outcome["temp_id_mapping"]) == temp_ids
+    assert all(i in mirror.tasks for i in outcome["temp_id_mapping"].values())
+
+
+def test_failed_command_is_reported_per_uuid(tmp_path):
+    mirror, _ = synced_mirror(tmp_path)
+    existing = next(iter(mirror.tasks))
+    commands = [
+        TaskOperation(action="complete", task_id=existing).to_command(),
+        TaskOperation(action="complete", task_id="does-not-exist").to_command(),
+    ]
+    status = asyncio.run(mirror.commit(commands))["sync_status"]
+    assert status[commands[0]["uuid"]] == "ok"
+    assert status[commands[1]["uuid"]]["error_tag"] == "ITEM_NOT_FOUND"
+    assert existing not in mirror.tasks
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [TaskOperation(action="complete"), TaskOperation(action="add")],
+)
+def test_incomplete_operations_are_rejected(operation):
+    with pytest.raises(ValueError):
+        operation.to_command()
@@ -0,0 +1,96 @@
+"""Todoist mirror sync, persistence and due-date queries against the stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, date, datetime, timedelta
+
+from benchmarks.todoist_standin import SYNC_URL, TodoistStandIn
+from src.agents.todoist_agent.mirror import TodoistMirror
+
+
+def task(task_id: str, content: str, due: dict | None = None) -> dict:
+    return {
+        "id": task_id,
+        "content": content,
+        "project_id": "p0",
+        "priority": 1,
+        "labels": [],
+        "due": due,
+        "checked": False,
+        "is_deleted": False,
+    }
+
+
+def make_mirror(tmp_path, standin: TodoistStandIn, **kwargs) -> TodoistMirror:
+    return TodoistMirror(
+        "test",
+        SYNC_URL,
+        str(tmp_path / "todoist.json"),
+        transport=standin.transport(),
+        **kwargs,
+    )
+
+
+def test_saves_are_debounced_and_flushed(tmp_path):
+    standin = TodoistStandIn()
+    standin.populate(50)
+    mirror = make_mirror(tmp_path, standin, save_interval=3600)
+
+    async def run() -> None:
+        await mirror.sync()  # the first sync is written right away
+        for i in range(3):
+            standin.put("items", task(f"new{i}", f"Added task {i}"))
+            mirror.invalidate()
+            await mirror.sync()
+        await mirror.sync()  # nothing changed
+
+    asyncio.run(run())
+    assert mirror.saves == 1
+    stale = make_mirror(tmp_path, standin)
+    assert "new2" not in stale.tasks
+    # The saved token matches the saved tasks, so a sync catches up.
+    asyncio.run(stale.sync())
+    assert "new2" in stale.tasks
+
+    mirror.flush()
+    mirror.flush()
+    assert mirror.saves == 2
+    assert "new2" in make_mirror(tmp_path, standin).tasks
+
+
+def test_overdue_compares_timed_tasks_in_their_zone(tmp_path):
+    standin = TodoistStandIn()
+    now = datetime.now(UTC).replace(microsecond=0)
+    today = date.today()
+    earlier, later = now - timedelta(minutes=5), now + timedelta(minutes=5)
+
+    def utc(moment: datetime) -> dict:
+        return {"date": moment.strftime("%Y-%m-%dT%H:%M:%SZ"), "string": ""}
+
+    standin.put("items", task("yesterday", "Old", {"date": str(today - timedelta(1))}))
+    standin.put("items", task("today", "All day", {"date": str(today)}))
+    if earlier.astimezone().date() == today:
+        standin.put("items", task("past_utc", "Past", utc(earlier)))
+        floating = earlier.astimezone().replace(tzinfo=None).isoformat()
+        standin.put("items", task("past_local", "Local", {"date": floating}))
+    if later.astimezone().date() == today:
+        standin.put("items", task("future_utc", "Future", utc(later)))
+        tokyo = later.astimezone(UTC).replace(tzinfo=None) + timedelta(hours=9)
+        # Floating time in the task's own zone, 5 minutes from now.
+        standin.put(
+            "items",
+            task(
+                "future_tokyo",
+                "Tokyo",
+                {"date": tokyo.isoformat(), "timezone": "Asia/Tokyo"},
+            ),
+        )
+    mirror = make_mirror(tmp_path, standin)
+    asyncio.run(mirror.sync())
+
+    overdue = {t["id"] for t in mirror.overdue(today)}
+    assert "yesterday" in overdue and "today" not in overdue
+    assert not overdue & {"future_utc", "future_tokyo"}
+    expected_past = {"past_utc", "past_local"} & set(mirror.tasks)
+    assert expected_past <= overdue
@@ -0,0 +1,114 @@
+"""MCP tool-list caching per session and on disk per server version."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+
+from src.mcp_handler.remote import PooledMCPServerStreamableHTTP
+from src.mcp_handler.tool_cache import (
+    CachedMCPServerStdio,
+    ToolListCache,
+    package_spec,
+)
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+
+def standin(cache: ToolListCache, version: str | None) -> CachedMCPServerStdio:
+    return CachedMCPServerStdio(
+        sys.executable,
+        ["-m", "benchmarks.mcp_standin", "3"],
+        cwd=REPO,
+        timeout=30,
+        package="mcp-standin",
+        version=version,
+        cache=cache,
+    )
+
+
+def list_names(server: CachedMCPServerStdio, steps: int = 3) -> list[str]:
+    async def run() -> list[str]:
+        async with server:
+            for _ in range(steps):
+                tools = await server.list_tools()
+        return [t.name for t in tools]
+
+    return asyncio.run(run())
+
+
+def test_package_spec():
+    assert package_spec(["-y", "@scope/pkg@1.2.3"]) == ("@scope/pkg", "1.2.3")
+    assert package_spec(["--yes", "@scope/pkg"]) == ("@scope/pkg", None)
+    assert package_spec(["pkg@"]) == ("pkg", None)
+    assert package_spec([]) == (None, None)
+
+
+def test_disk_cache_hit_across_processes(tmp_path):
+    path = tmp_path / "tools.json"
+    first = standin(ToolListCache(str(path)), "1.0")
+    assert list_names(first) == ["tool_0", "tool_1", "tool_2"]
+    # One round trip; the other steps are served from the session copy.
+    assert first.remote_list_calls == 1 and first.list_calls == 3
+    assert list(json.loads(path.read_text())) == ["mcp-standin@1.0@"]
+
+    # A new process with the same version never lists remotely.
+    cache = ToolListCache(str(path))
+    second = standin(cache, "1.0")
+    assert list_names(second) == ["tool_0", "tool_1", "tool_2"]
+    assert second.remote_list_calls == 0
+    assert cache.hits == 1
+
+
+def test_version_bump_is_a_miss(tmp_path):
+    path = tmp_path / "tools.json"
+    list_names(standin(ToolListCache(str(path)), "1.0"))
+    cache = ToolListCache(str(path))
+    upgraded = standin(cache, "1.1")
+    list_names(upgraded)
+    assert upgraded.remote_list_calls == 1
+    assert cache.misses == 1
+    assert sorted(json.loads(path.read_text())) == [
+        "mcp-standin@1.0@",
+        "mcp-standin@1.1@",
+    ]
+
+    upgraded.invalidate_tools()
+    assert list(json.loads(path.read_text())) == ["mcp-standin@1.0@"]
+
+
+def test_unknown_version_is_never_cached_on_disk(tmp_path):
+    path = tmp_path / "tools.json"
+    server = standin(ToolListCache(str(path)), None)
+    assert server.cache_key is None
+    list_names(server)
+    assert server.remote_list_calls == 1
+    assert not path.exists()
+
+
+def test_corrupt_cache_file_is_a_miss_and_rewritten(tmp_path):
+    path = tmp_path / "tools.json"
+    path.write_text('{"mcp-standin@1.0@": [{"name": ')
+    cache = ToolListCache(str(path))
+    server = standin(cache, "1.0")
+    assert list_names(server) == ["tool_0", "tool_1", "tool_2"]
+    assert server.remote_list_calls == 1 and cache.misses == 1
+    assert len(json.loads(path.read_text())["mcp-standin@1.0@"]) == 3
+
+
+def test_remote_servers_key_on_url_and_reported_version(tmp_path):
+    url = "http://mcp-host:9101/mcp"
+    cache = ToolListCache(str(tmp_path / "tools.json"))
+    server = PooledMCPServerStreamableHTTP(url=url, cache=cache)
+    assert server.cache_key is None
+    server.server_reported("0.6.2")
+    assert server.cache_key == f"{url}@0.6.2@"
+    # A redeploy reporting another version is a different entry.
+    server.server_reported("0.7.0")
+    assert server.cache_key == f"{url}@0.7.0@"
+
+    pinned = PooledMCPServerStreamableHTTP(url=url, version="1.0", cache=cache)
+    pinned.server_reported("0.7.0")
+    assert pinned.cache_key == f"{url}@1.0@"
@@ -0,0 +1,161 @@
+"""Vault link graph: link and tag extraction, resolution and incremental updates."""
+
+from __future__ import annotations
+
+import asyncio
+
+from src.agents.obsidian_agent.links import LinkGraph, VaultLinks, parse_note
+from src.agents.obsidian_agent.vault import TreeEntry, VaultTree
+
+
+class Vault:
+    """Notes by path; ``fetch`` records which paths were asked for."""
+
+    def __init__(self, notes: dict[str, str]):
+        self.notes = dict(notes)
+        self.fetched: list[str] = []
+        self.version = 0
+
+    def tree(self) -> VaultTree:
+        self.version += 1
+        entries = [
+            TreeEntry(path, "blob", f"sha-{abs(hash(text))}", len(text))
+            for path, text in self.notes.items()
+        ]
+        return VaultTree(f"tree-{self.version}", entries)
+
+    async def fetch(self, paths: list[str]) -> dict[str, str | None]:
+        self.fetched.extend(paths)
+        return {p: self.notes.get(p) for p in paths}
+
+
+def update(links: VaultLinks, vault: Vault) -> dict[str, int]:
+    return asyncio.run(links.update("o", "r", vault.tree(), vault.fetch))
+
+
+def graph_of(notes: dict[str, str]) -> LinkGraph:
+    graph = LinkGraph()
+    graph.apply({p: (p, *parse_note(text)) for p, text in notes.items()}, [])
+    return graph
+
+
+def test_wikilinks_aliases_embeds_and_headings():
+    links, _ = parse_note(
+        "See [[Project Plan]] and [[Project Plan|the plan]] again.\n"
+        "Heading [[Roadmap#Q3 goals]], block [[Roadmap^abc123]], "
+        "alias with heading [[Team/Hiring#Open roles|roles]].\n"
+        "Embedded ![[Meeting notes]] and ![[diagram.png]] and ![[sheet.pdf#page=2]].\n"
+        "Self heading [[#Local]] and empty [[]].\n"
+    )
+    # Duplicates collapse; attachments and same-note heading links are dropped.
+    assert links == ["Project Plan", "Roadmap", "Team/Hiring", "Meeting notes"]
+
+
+def test_markdown_links_and_code():
+    links, tags = parse_note(
+        "[Spec](docs/My%20Spec.md#intro) and [site](https://example.com) "
+        "and [angle](<Other.md>).\n"
+        "```\n[[In code]] #notatag\n```\n"
+        "Inline `[[also code]]` is ignored too.\n"
+    )
+    assert links == ["docs/My Spec.md", "Other.md"]
+    assert tags == []
+
+
+def test_tags_from_text_and_frontmatter():
+    text = (
+        "---\n"
+        "tags: [Project, 'area/work']\n"
+        "related: '[[Linked From Frontmatter]]'\n"
+        "---\n"
+        "# Heading is not a tag\n"
+        "Body #Idea and #nested/Tag/ plus #2024 and a#b and "
+        "https://example.com/#anchor.\n"
+    )
+    links, tags = parse_note(text)
+    assert links == ["Linked From Frontmatter"]
+    assert tags == ["project", "area/work", "idea", "nested/tag"]
+
+    _, listed = parse_note("---\ntags:\n  - one\n  - '#two'\ntitle: x\n---\nbody\n")
+    assert listed == ["one", "two"]
+
+
+def test_resolution_prefers_path_then_folder_then_shortest_path():
+    graph = graph_of(
+        {
+            "Index.md": "",
+            "a/Note.md": "",
+            "a/b/Note.md": "",
+            "c/Note.md": "",
+            "c/Source.md": "",
+            "docs/Spec.md": "",
+        }
+    )
+    assert graph.resolve("a/b/Note") == "a/b/Note.md"
+    assert graph.resolve("b/note.md") == "a/b/Note.md"
+    # Same folder as the linking note wins, else the shortest path.
+    assert graph.resolve("Note", "c/Source.md") == "c/Note.md"
+    assert graph.resolve("Note", "Index.md") == "a/Note.md"
+    # Markdown links are relative to the linking note.
+    assert graph.resolve("../docs/Spec.md", "c/Source.md") == "docs/Spec.md"
+    assert graph.resolve("Missing") is None
+    assert graph.resolve("x/Note") is None
+
+
+def test_update_resolves_links_to_notes_added_later(tmp_path):
+    vault = Vault(
+        {
+            "Home.md": "[[Project]] [[Later]] #hub",
+            "Project.md": "Back to [[Home]]. #work",
+            "image.png": "not a note",
+        }
+    )
+    links = VaultLinks(str(tmp_path / "links.json"))
+    assert update(links, vault) == {"parsed": 2, "fetched": 2, "removed": 0}
+    home = links.neighbors("o", "r", "home")
+    assert home["links"] == ["Project.md"]
+    assert home["backlinks"] == ["Project.md"]
+    assert home["unresolved"] == ["Later"]
+
+    vault.fetched.clear()
+    vault.notes["Later.md"] = "new"
+    del vault.notes["Project.md"]
+    assert update(links, vault) == {"parsed": 1, "fetched": 1, "removed": 1}
+    assert vault.fetched == ["Later.md"]
+    home = links.neighbors("o", "r", "Home")
+    assert home["links"] == ["Later.md"]
+    assert home["backlinks"] == []
+    assert home["unresolved"] == ["Project"]
+    assert links.backlinks("o", "r", "later") == {
+        "note": "Later.md",
+        "backlinks": ["Home.md"],
+    }
+    assert links.tagged("o", "r", "#hub") == ["Home.md"]
+    assert links.tagged("o", "r", "work") == []
+
+    # A restart reloads the parsed notes and fetches no unchanged note.
+    reloaded = VaultLinks(str(tmp_path / "links.json"))
+    vault.fetched.clear()
+    update(reloaded, vault)
+    assert vault.fetched == []
+    assert reloaded.neighbors("o", "r", "Home") == home
+
+
+def test_neighbors_within_depth_and_nested_tags():
+    vault = Vault(
+        {
+            "a.md": "[[b]] #topic/x",
+            "b.md": "[[c]] #topic",
+            "c.md": "[[d]]",
+            "d.md": "",
+        }
+    )
+    links = VaultLinks(None)
+    update(links, vault)
+    assert links.neighbors("o", "r", "a", depth=3)["nearby"] == {
+        "c.md": 2,
+        "d.md": 3,
+    }
+    assert links.neighbors("o", "r", "missing") is None
+    assert links.tagged("o", "r", "topic") == ["a.md", "b.md"]
+    assert links.tag_counts("o", "r") == {"topic/x": 1, "topic": 1}
@@ -0,0 +1,110 @@
+"""Vault mirror clone, fetch and reads against a local bare repository."""
+
+from __future__ import annotations
+
+import subprocess
+
+import pytest
+
+from src.agents.obsidian_agent import mirror as mirror_module
+from src.agents.obsidian_agent.mirror import VaultMirror
+
+
+def git(cwd, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@x", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """A bare vault repository and a working copy that pushes to it."""
+    bare = tmp_path / "vault.git"
+    work = tmp_path / "work"
+    git(tmp_path, "init", "-q", "--bare", "-b", "main", str(bare))
+    git(tmp_path, "clone", "-q", str(bare), str(work))
+    (work / "Notes").mkdir()
+    (work / "Notes" / "a.md").write_text("# A\nfirst\n")
+    (work / "big.md").write_text("x" * 100_000 + "tail")
+    git(work, "add", ".")
+    git(work, "commit", "-qm", "init")
+    git(work, "push", "-q", "origin", "HEAD:main")
+    return bare, work
+
+
+def push(work, path: str, text: str) -> None:
+    (work / path).write_text(text)
+    git(work, "commit", "-qam", f"edit {path}")
+    git(work, "push", "-q", "origin", "HEAD:main")
+
+
+def test_fetches_after_mark_stale(tmp_path, remote):
+    bare, work = remote
+    mirror = VaultMirror(str(bare), str(tmp_path / "mirror"), max_age=3600)
+    assert mirror.read("Notes/a.md") == "# A\nfirst\n"
+    first = mirror.commit
+
+    push(work, "Notes/a.md", "# A\nsecond\n")
+    # Within max_age and not stale: still the cloned commit.
+    assert mirror.read("Notes/a.md") == "# A\nfirst\n"
+    assert mirror.fetches == 1
+
+    mirror.mark_stale()
+    assert mirror.read("Notes/a.md") == "# A\nsecond\n"
+    assert mirror.fetches == 2
+    assert mirror.commit != first
+    assert mirror.commit == git(bare, "rev-parse", "main").strip()
+
+
+def test_tree_follows_fetched_commit(tmp_path, remote):
+    bare, work = remote
+    mirror = VaultMirror(str(bare), str(tmp_path / "mirror"), max_age=3600)
+    tree = mirror.tree()
+    assert mirror.tree() is tree
+
+    (work / "Notes" / "b.md").write_text("# B\n")
+    git(work, "add", ".")
+    git(work, "commit", "-qm", "add b")
+    git(work, "push", "-q", "origin", "HEAD:main")
+    mirror.mark_stale()
+    fresh = mirror.tree()
+    assert fresh is not tree
+    assert fresh.sha == git(bare, "rev-parse", "main^{tree}").strip()
+
+
+def test_range_reads_and_paths_outside_the_vault(tmp_path, remote):
+    bare, _ = remote
+    mirror = VaultMirror(
+        str(bare), str(tmp_path / "mirror"), max_age=3600, mmap_threshold=1024
+    )
+    # Memory-mapped: big.md is over the threshold.
+    assert mirror.read_bytes("big.md", 100_000) == b"tail"
+    assert mirror.read_bytes("Notes/a.md", 0, 3) == b"# A"
+    for path in ("../vault.git/HEAD", ".git/HEAD", "Notes/missing.md"):
+        with pytest.raises(FileNotFoundError):
+            mirror.read_bytes(path)
+
+
+def test_token_is_passed_in_the_environment(tmp_path, monkeypatch):
+    calls = []
+
+    def run(command, **kwargs):
+        calls.append((command, kwargs["env"]))
+        return subprocess.CompletedProcess(command, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(mirror_module.subprocess, "run", run)
+    monkeypatch.delenv("GIT_CONFIG_COUNT", raising=False)
+    mirror = VaultMirror(
+        "https://github.com/o/r.git", str(tmp_path / "mirror"), token="secret-token"
+    )
+    mirror._git("fetch", "origin")
+    command, env = calls[0]
+    assert command == ["git", "fetch", "origin"]
+    assert env["GIT_CONFIG_COUNT"] == "1"
+    assert env["GIT_CONFIG_KEY_0"] == "http.extraHeader"
+    assert env["GIT_CONFIG_VALUE_0"].startswith("Authorization: Basic ")
+    assert not any("secret" in part for part in command)
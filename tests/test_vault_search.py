@@ -0,0 +1,131 @@
+"""Vault search index: incremental updates per blob SHA and BM25 ranking."""
+
+from __future__ import annotations
+
+import asyncio
+
+from src.agents.obsidian_agent import tools
+from src.agents.obsidian_agent.search import VaultSearchIndex
+from src.agents.obsidian_agent.vault import TreeEntry, VaultTree
+
+
+class Vault:
+    """Notes by path; ``fetch`` records which paths were asked for."""
+
+    def __init__(self, notes: dict[str, str]):
+        self.notes = dict(notes)
+        self.fetched: list[str] = []
+        self.version = 0
+
+    def tree(self) -> VaultTree:
+        self.version += 1
+        # Content-addressed like git: the same text has the same SHA anywhere.
+        entries = [
+            TreeEntry(path, "blob", f"sha-{abs(hash(text))}", len(text))
+            for path, text in self.notes.items()
+        ]
+        return VaultTree(f"tree-{self.version}", entries)
+
+    async def fetch(self, paths: list[str]) -> dict[str, str | None]:
+        self.fetched.extend(paths)
+        return {p: self.notes.get(p) for p in paths}
+
+
+def update(index: VaultSearchIndex, vault: Vault, tree: VaultTree | None = None):
+    return asyncio.run(index.update("o", "r", tree or vault.tree(), vault.fetch))
+
+
+def paths(index: VaultSearchIndex, query: str) -> list[str]:
+    return [hit["path"] for hit in index.search("o", "r", query)]
+
+
+def test_update_fetches_only_changed_blobs(tmp_path):
+    vault = Vault(
+        {
+            "a.md": "apples and pears",
+            "b.md": "bananas",
+            "c.md": "cherries",
+            "image.png": "not a note",
+        }
+    )
+    index = VaultSearchIndex(str(tmp_path / "search.sqlite3"))
+    tree = vault.tree()
+    assert update(index, vault, tree) == {"indexed": 3, "fetched": 3, "removed": 0}
+    # Same tree SHA: nothing to do.
+    assert update(index, vault, tree) == {"indexed": 0, "fetched": 0, "removed": 0}
+
+    vault.fetched.clear()
+    vault.notes["a.md"] = "apples and plums"
+    vault.notes["renamed.md"] = vault.notes.pop("b.md")
+    del vault.notes["c.md"]
+    stats = update(index, vault)
+    # The rename reuses the text already indexed under the same SHA.
+    assert vault.fetched == ["a.md"]
+    assert stats == {"indexed": 2, "fetched": 1, "removed": 2}
+
+    assert paths(index, "plums") == ["a.md"]
+    assert paths(index, "pears") == []
+    assert paths(index, "bananas") == ["renamed.md"]
+    assert paths(index, "cherries") == []
+    assert index.stats()["notes"] == 2
+
+
+def test_index_survives_reopening(tmp_path):
+    vault = Vault({"a.md": "apples"})
+    tree = vault.tree()
+    update(VaultSearchIndex(str(tmp_path / "search.sqlite3")), vault, tree)
+    reopened = VaultSearchIndex(str(tmp_path / "search.sqlite3"))
+    vault.fetched.clear()
+    update(reopened, vault, tree)
+    assert vault.fetched == []
+    assert paths(reopened, "apples") == ["a.md"]
+
+
+def test_bm25_ranking(tmp_path):
+    vault = Vault(
+        {
+            "Gardening.md": "notes on soil",
+            "often.md": "gardening gardening gardening tips for the garden",
+            "once.md": "some gardening among many other words about travel",
+            # Enough other notes for the term to be rare, as in a real vault.
+            **{f"other-{i}.md": f"nothing relevant here {i}" for i in range(20)},
+        }
+    )
+    index = VaultSearchIndex(str(tmp_path / "search.sqlite3"))
+    update(index, vault)
+
+    hits = index.search("o", "r", "gardening")
+    # A title match outweighs body matches; more matches rank higher.
+    assert [h["path"] for h in hits] == ["Gardening.md", "often.md", "once.md"]
+    assert hits[0]["score"] > hits[1]["score"] > hits[2]["score"]
+    assert "**gardening**" in hits[2]["snippet"]
+
+
+def test_every_term_first_then_any(tmp_path):
+    vault = Vault(
+        {
+            "both.md": "soil and compost",
+            "soil.md": "soil only",
+            "compost.md": "compost only",
+        }
+    )
+    index = VaultSearchIndex(str(tmp_path / "search.sqlite3"))
+    update(index, vault)
+    assert paths(index, "soil compost") == ["both.md"]
+    assert set(paths(index, "soil travel")) == {"both.md", "soil.md"}
+    # Quotes and operators are searched as text, not FTS5 syntax.
+    assert paths(index, 'soil" OR "') == paths(index, "soil")
+
+
+def test_indexes_open_on_first_use(tmp_path, monkeypatch):
+    search_path = tmp_path / "search.sqlite3"
+    links_path = tmp_path / "links.json"
+    monkeypatch.setenv("OBSIDIAN_SEARCH_INDEX_PATH", str(search_path))
+    monkeypatch.setenv("OBSIDIAN_LINKS_PATH", str(links_path))
+    monkeypatch.setattr(tools, "_vault_search", None)
+    monkeypatch.setattr(tools, "_vault_links", None)
+    assert not search_path.exists()
+    index = tools.get_vault_search()
+    assert search_path.exists()
+    assert tools.get_vault_search() is index
+    assert tools.get_vault_links() is tools.get_vault_links()
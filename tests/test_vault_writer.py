@@ -0,0 +1,159 @@
+"""Atomic multi-note commits against the GitHub stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.github_standin import GitHubStandIn
+from src.agents.obsidian_agent.github import GitHubApiError, GitHubClient
+from src.agents.obsidian_agent.models import NoteChange
+from src.agents.obsidian_agent.vault import VaultTreeCache
+from src.agents.obsidian_agent.writer import CommitConflictError, VaultWriter
+
+API = "http://github.test"
+
+
+class RefTransport(httpx.AsyncBaseTransport):
+    """The stand-in's app; ``ref_errors`` answer the next ref updates instead.
+
+    Each injected error first lands a concurrent commit, as a racing writer
+    would.
+    """
+
+    def __init__(self, standin: GitHubStandIn):
+        self.standin = standin
+        self.app = httpx.ASGITransport(app=standin.app())
+        self.ref_errors: list[int] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "PATCH" and self.ref_errors:
+            self.standin.commit_files({"racing.md": "# Racing\n"}, "Concurrent edit")
+            return httpx.Response(self.ref_errors.pop(0), json={"message": "conflict"})
+        return await self.app.handle_async_request(request)
+
+
+def setup(max_retries: int = 3) -> tuple[GitHubStandIn, RefTransport, VaultWriter]:
+    standin = GitHubStandIn()
+    standin.commit_files(
+        {"a.md": "# A\n", "notes/b.md": "# B\n", "c.md": "# C\n"}, "Seed vault"
+    )
+    transport = RefTransport(standin)
+    client = GitHubClient(None, api_url=API, transport=transport)
+    return standin, transport, VaultWriter(VaultTreeCache(client), max_retries)
+
+
+def commit(writer: VaultWriter, *changes: NoteChange) -> dict:
+    return asyncio.run(writer.commit("owner", "vault", list(changes)))
+
+
+def text(standin: GitHubStandIn, path: str) -> str | None:
+    sha = standin.files().get(path)
+    return standin.blobs[sha].decode() if sha else None
+
+
+def test_writes_appends_and_deletes_in_one_commit():
+    standin, _, writer = setup()
+    before = standin.head()
+    result = commit(
+        writer,
+        NoteChange(path="/new.md", content="# New\n"),
+        NoteChange(path="a.md", action="append", content="more\n"),
+        NoteChange(path="notes/b.md", action="delete"),
+    )
+    assert result["attempts"] == 1
+    assert result["commit"] == standin.head()
+    assert standin.commits[standin.head()]["parents"] == [before]
+    assert standin.commits[standin.head()]["message"].startswith("Update 3 notes")
+    assert text(standin, "new.md") == "# New\n"
+    assert text(standin, "a.md") == "# A\nmore\n"
+    assert text(standin, "notes/b.md") is None
+    assert text(standin, "c.md") == "# C\n"
+
+
+def test_changes_apply_in_order_within_a_batch():
+    standin, _, writer = setup()
+    commit(
+        writer,
+        NoteChange(path="draft.md", content="one\n"),
+        NoteChange(path="draft.md", action="append", content="two\n"),
+        # Written and deleted in the same batch: never reaches the tree.
+        NoteChange(path="scratch.md", content="tmp"),
+        NoteChange(path="scratch.md", action="delete"),
+        NoteChange(path="c.md", action="delete"),
+        NoteChange(path="c.md", content="# C again\n"),
+    )
+    files = standin.files()
+    assert text(standin, "draft.md") == "one\ntwo\n"
+    assert "scratch.md" not in files
+    assert text(standin, "c.md") == "# C again\n"
+
+
+@pytest.mark.parametrize("action", ["delete", "append"])
+def test_missing_note_fails_the_whole_batch(action):
+    standin, _, writer = setup()
+    before = standin.head()
+    with pytest.raises(FileNotFoundError, match="missing.md"):
+        commit(
+            writer,
+            NoteChange(path="a.md", content="# A2\n"),
+            NoteChange(path="missing.md", action=action, content="x"),
+        )
+    assert standin.head() == before
+    assert text(standin, "a.md") == "# A\n"
+
+
+def test_rejects_changes_without_content():
+    _, _, writer = setup()
+    with pytest.raises(ValueError, match="needs content"):
+        commit(writer, NoteChange(path="a.md", action="append"))
+    with pytest.raises(ValueError, match="no changes"):
+        commit(writer)
+
+
+def test_rebuilds_on_the_new_head_after_a_concurrent_commit():
+    standin, _, writer = setup()
+    # The stand-in rejects the ref update as not a fast-forward (422).
+    standin.interfere = 2
+    result = commit(
+        writer,
+        NoteChange(path="a.md", action="append", content="mine\n"),
+        NoteChange(path="c.md", action="delete"),
+    )
+    assert result["attempts"] == 3
+    assert writer.conflicts == 2
+    # Nothing of the concurrent commits is lost, and ours sits on top of them.
+    head = standin.commits[standin.head()]
+    assert standin.commits[head["parents"][0]]["message"] == "Concurrent edit"
+    assert sum(p.startswith("elsewhere/") for p in standin.files()) == 2
+    assert text(standin, "a.md") == "# A\nmine\n"
+    assert text(standin, "c.md") is None
+
+
+@pytest.mark.parametrize("status", [409, 422])
+def test_ref_conflict_is_retried(status):
+    standin, transport, writer = setup()
+    transport.ref_errors = [status]
+    result = commit(writer, NoteChange(path="a.md", action="append", content="x"))
+    assert result["attempts"] == 2
+    assert text(standin, "racing.md") == "# Racing\n"
+    assert text(standin, "a.md") == "# A\nx"
+
+
+def test_gives_up_when_the_branch_keeps_moving():
+    standin, transport, writer = setup(max_retries=1)
+    transport.ref_errors = [422, 409]
+    with pytest.raises(CommitConflictError):
+        commit(writer, NoteChange(path="new.md", content="# New\n"))
+    assert writer.conflicts == 2
+    assert "new.md" not in standin.files()
+
+
+def test_other_ref_errors_are_not_retried():
+    _, transport, writer = setup()
+    transport.ref_errors = [404]
+    with pytest.raises(GitHubApiError):
+        commit(writer, NoteChange(path="new.md", content="# New\n"))
+    assert writer.conflicts == 0